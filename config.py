@@ -7,7 +7,7 @@ load_dotenv()
 class Config:
     # MongoDB Settings
     MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017')
-    MONGODB_DATABASE = os.getenv('MONGODB_DATABASE', 'Disaster_Management_System application')
+    MONGODB_DATABASE = os.getenv('MONGODB_DATABASE', 'Disaster_Management_System')
 
     # Application Settings
     DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
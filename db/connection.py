@@ -1,7 +1,8 @@
-from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure
 from config import Config
 from utils.logger import setup_logger
+from src.utils.mongo_pool import get_database, get_mongo_client
+from src.utils.resilience import get_connection_guard
 
 logger = setup_logger(__name__)
 
@@ -16,7 +17,7 @@ class DatabaseConnection:
         return cls._instance
 
     def __init__(self):
-        if not self._client:
+        if self._client is None:
             self.connect()
 
     def connect(self):
@@ -24,10 +25,10 @@ class DatabaseConnection:
         Establish connection to MongoDB
         """
         try:
-            self._client = MongoClient(Config.MONGODB_URI)
-            self._db = self._client[Config.MONGODB_DATABASE]
-            # Verify connection
-            self._client.admin.command('ping')
+            self._client = get_mongo_client(Config.MONGODB_URI)
+            self._db = get_database(Config.MONGODB_DATABASE, Config.MONGODB_URI)
+            # Verify connection; fails fast while the circuit is open
+            get_connection_guard().call(self._client.admin.command, 'ping')
             logger.info("Successfully connected to MongoDB")
         except ConnectionFailure as e:
             logger.error(f"Failed to connect to MongoDB: {str(e)}")
@@ -38,7 +39,7 @@ class DatabaseConnection:
         """
         Get database instance
         """
-        if not self._db:
+        if self._db is None:
             self.connect()
         return self._db
 
@@ -47,19 +48,18 @@ class DatabaseConnection:
         """
         Get MongoDB client instance
         """
-        if not self._client:
+        if self._client is None:
             self.connect()
         return self._client
 
     def close(self):
         """
-        Close MongoDB connection
+        Release the connection; the shared client is closed at shutdown
         """
-        if self._client:
-            self._client.close()
+        if self._client is not None:
             self._client = None
             self._db = None
-            logger.info("MongoDB connection closed")
+            logger.info("MongoDB connection released")
 
 # Create a singleton instance
 db_connection = DatabaseConnection()
@@ -7,7 +7,10 @@ from src.auth.login_window import LoginWindow
 from src.auth.signup_widget import SignupWindow
 from src.auth.forgot_password_widget import ForgotPasswordWindow
 from src.ui.main_window import MainWindow
-from src.utils.mongodb_client import mongodb_client
+from src.models.write_behind import close_write_behind_queue
+from src.models.offline_store import get_offline_store, offline_mode, stop_offline_sync
+from src.models.resource import ResourceManager
+from src.utils.mongo_pool import close_mongo_clients
 import logging
 
 # Set up logging
@@ -84,6 +87,11 @@ def main():
         # Show login window first
         login_window.show()
         
+        # Repair resource counter drift from other processes (or offline sync) periodically
+        resource_manager = ResourceManager(offline=get_offline_store() if offline_mode() else None)
+        reconciliation = resource_manager.start_counter_reconciliation()
+        app.aboutToQuit.connect(reconciliation.stop)
+        
         # Start the application event loop
         sys.exit(app.exec_())
         
@@ -94,7 +102,9 @@ def main():
         sys.exit(1)
     finally:
         # Clean up resources
-        mongodb_client.close_connection()
+        close_write_behind_queue()
+        stop_offline_sync()
+        close_mongo_clients()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""Measure what-if scenario throughput for 1..N worker processes"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ai.allocation_simulator import Scenario
+from src.ai.resource_availability import ResourceManager
+
+
+def build_scenarios(manager, count, seed=42):
+    """Random incoming-incident scenarios over the event types in the resource map"""
+    rng = random.Random(seed)
+    event_types = [key for kind, key in manager.capacity.requirements if kind == 'event']
+    return [
+        Scenario(
+            name=f"scenario-{i}",
+            incidents=[{'type': rng.choice(event_types), 'severity': rng.choice(['Low', 'Medium', 'High'])}
+                       for _ in range(rng.randint(10, 60))],
+        )
+        for i in range(count)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scenarios', type=int, default=500)
+    parser.add_argument('--max-processes', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    manager = ResourceManager()
+    scenarios = build_scenarios(manager, args.scenarios)
+    baseline = None
+    for processes in sorted({1, 2, 4, args.max_processes}):
+        if processes > args.max_processes:
+            continue
+        results, stats = manager.simulate(scenarios, processes=processes)
+        baseline = baseline or stats['seconds']
+        print(f"{stats['processes']:>2} processes: {stats['scenarios_per_second']:>9} scenarios/s "
+              f"({stats['seconds']}s, speedup x{baseline / stats['seconds']:.2f})")
+    mean_coverage = sum(r.coverage for r in results) / len(results)
+    print(f"Mean coverage across scenarios: {mean_coverage:.1%}")
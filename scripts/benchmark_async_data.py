@@ -0,0 +1,98 @@
+"""Requests per second of the async data layer against the blocking managers.
+
+Needs a reachable MongoDB at MONGODB_URI (default mongodb://localhost:27017/).
+Seeds --incidents documents into a scratch database that is dropped
+afterwards, then serves --requests mixed reads (get by id and one page of a
+status filter) sequentially through IncidentManager and concurrently through
+AsyncIncidentManager at each --concurrency level.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCRATCH_DATABASE = 'benchmark_async_data'
+os.environ['MONGODB_DATABASE'] = SCRATCH_DATABASE
+
+from src.models.async_data import AsyncIncidentManager, deadline
+from src.models.incident import IncidentManager
+from src.utils.mongo_pool import get_database
+
+
+def seed(manager, count):
+    rng = random.Random(5)
+    return [manager.create_incident({
+        'title': f'Incident {i}', 'type': rng.choice(['Flood', 'Fire', 'Earthquake']),
+        'severity': rng.choice(['Low', 'Medium', 'High']), 'location': 'Nairobi',
+        'description': 'benchmark', 'created_by': 'benchmark',
+    }) for i in range(count)]
+
+
+def workload(ids, count):
+    rng = random.Random(6)
+    return [('get', rng.choice(ids)) if rng.random() < 0.7 else ('page', rng.choice(['active', 'closed']))
+            for _ in range(count)]
+
+
+def report(label, elapsed, latencies):
+    latencies = sorted(latencies)
+    print(f"{label:>22}: {len(latencies) / elapsed:8.0f} req/s, "
+          f"p50 {statistics.median(latencies) * 1000:6.2f} ms, "
+          f"p95 {latencies[int(0.95 * (len(latencies) - 1))] * 1000:6.2f} ms")
+
+
+def run_sync(manager, requests):
+    latencies = []
+    started = time.perf_counter()
+    for kind, argument in requests:
+        t = time.perf_counter()
+        if kind == 'get':
+            manager.get_incident(argument)
+        else:
+            manager.page_incidents({'status': argument}, limit=20)
+        latencies.append(time.perf_counter() - t)
+    return time.perf_counter() - started, latencies
+
+
+async def run_async(manager, requests, timeout):
+    latencies = []
+
+    async def one(kind, argument):
+        t = time.perf_counter()
+        with deadline(timeout):
+            if kind == 'get':
+                await manager.get_incident(argument)
+            else:
+                await manager.page_incidents({'status': argument}, limit=20)
+        latencies.append(time.perf_counter() - t)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(kind, argument) for kind, argument in requests))
+    return time.perf_counter() - started, latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--incidents', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[8, 32, 64])
+    parser.add_argument('--deadline', type=float, default=5.0, help='seconds per request')
+    args = parser.parse_args()
+
+    database = get_database()
+    try:
+        sync = IncidentManager()
+        ids = seed(sync, args.incidents)
+        requests = workload(ids, args.requests)
+        report('sync, sequential', *run_sync(sync, requests))
+        for concurrency in args.concurrency:
+            manager = AsyncIncidentManager(sync, max_concurrency=concurrency)
+            report(f'async, {concurrency} concurrent', *asyncio.run(run_async(manager, requests, args.deadline)))
+            manager.close()
+    finally:
+        database.client.drop_database(SCRATCH_DATABASE)
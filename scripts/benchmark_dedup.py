@@ -0,0 +1,94 @@
+"""Near-duplicate detection cost and accuracy on a synthetic report stream.
+
+Streams --incidents reports (default 1M) in time order over --days days
+(default 30) across Kenya. A --duplicates fraction of them re-report a
+recent incident: shuffled and partly reworded text, a few hundred meters
+away, minutes to hours later. Every report goes through
+``DuplicateDetector.observe`` as it would at creation. Reported: latency
+per report, precision and recall against the injected duplicates, and how
+many incidents the window holds.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.dedup import DuplicateDetector
+
+VOCABULARY = ('flood river overflowing bridge collapsed market school hospital road fire burning building '
+              'families trapped injured missing landslide rain storm vehicle accident lorry overturned '
+              'residents stranded water rising houses destroyed power lines down smoke spreading estate '
+              'children evacuated police ambulance needed urgently near along behind opposite junction').split()
+PLACES = 'nyalenda kondele manyatta obunga kibera mathare kawangware likoni bondeni mwariki'.split()
+START = datetime(2025, 3, 1)
+
+
+def original(i, rng, seconds):
+    words = rng.sample(VOCABULARY, 9) + [rng.choice(PLACES), f'stage{rng.randrange(500)}']
+    return {'id': f'inc_{i:08d}', 'title': ' '.join(words[:3]), 'description': ' '.join(words[3:]),
+            'location': {'lat': rng.uniform(-4.5, 4.5), 'lng': rng.uniform(34.0, 41.5)},
+            'created_at': START + timedelta(seconds=seconds)}
+
+
+def repeat(i, rng, source, seconds):
+    words = (source['title'] + ' ' + source['description']).split()
+    rng.shuffle(words)
+    words[:2] = rng.sample(VOCABULARY, 2)  # a caller's own wording
+    lat, lng = source['location']['lat'], source['location']['lng']
+    return {'id': f'inc_{i:08d}', 'title': ' '.join(words[:3]), 'description': ' '.join(words[3:]),
+            'location': {'lat': lat + rng.uniform(-0.003, 0.003), 'lng': lng + rng.uniform(-0.003, 0.003)},
+            'created_at': source['created_at'] + timedelta(seconds=rng.uniform(60, 3 * 3600)),
+            'repeats': source['id']}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--incidents', type=int, default=1_000_000)
+    parser.add_argument('--days', type=float, default=30)
+    parser.add_argument('--duplicates', type=float, default=0.2)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    step = args.days * 86400 / args.incidents
+    stream, recent = [], []
+    for i in range(args.incidents):
+        if recent and rng.random() < args.duplicates:
+            stream.append(repeat(i, rng, rng.choice(recent[-200:]), i * step))
+        else:
+            stream.append(original(i, rng, i * step))
+            recent.append(stream[-1])
+    stream.sort(key=lambda incident: incident['created_at'])
+
+    detector = DuplicateDetector()
+    latencies, true_positive, false_positive, missed = [], 0, 0, 0
+    event_of = {}
+    started = time.perf_counter()
+    for incident in stream:
+        t0 = time.perf_counter()
+        match = detector.observe(incident)
+        latencies.append(time.perf_counter() - t0)
+        expected = incident.get('repeats')
+        event = event_of[incident['id']] = expected or incident['id']
+        if match is not None:
+            # Any earlier report of the same event is a correct match
+            if event_of[match.incident_id] == event:
+                true_positive += 1
+            else:
+                false_positive += 1
+        elif expected is not None:
+            missed += 1
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    duplicates = sum(1 for incident in stream if 'repeats' in incident)
+    print(f"{args.incidents} reports over {args.days:g} days, {duplicates} injected duplicates")
+    print(f"observe(): p50 {latencies[len(latencies) // 2] * 1e6:.0f} us, "
+          f"p99 {latencies[int(0.99 * (len(latencies) - 1))] * 1e6:.0f} us, "
+          f"{args.incidents / elapsed:,.0f} reports/s")
+    print(f"precision {true_positive / max(1, true_positive + false_positive):.3f}, "
+          f"recall {true_positive / max(1, duplicates):.3f}")
+    print(f"window holds {detector.stats()['tracked']} incidents in {detector.stats()['buckets']} buckets")
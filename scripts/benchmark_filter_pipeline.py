@@ -0,0 +1,124 @@
+"""UI responsiveness while typing into the incident search box.
+
+Indexes --incidents synthetic incidents (default 100k), shows them in a
+RecordTable offscreen, then "types" --query one character every
+--interval ms. This runs twice: once filtering synchronously on every
+keystroke (the old filter_incidents), and once through FilterPipeline.
+The same is then repeated for --broad, a short query matching most
+incidents, where handing large results to the UI thread dominates.
+
+A --heartbeat timer measures how long the event loop goes without
+running, which is how long a real user would see the UI frozen. Also
+reported: the queries run and the time from the last keystroke until its
+result is in the table.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QEventLoop, QTimer
+from PyQt5.QtWidgets import QApplication
+
+from scripts.benchmark_incident_search import make_incident
+from src.incidents.search_index import IncidentSearchIndex
+from src.widgets.filter_pipeline import FilterPipeline
+from src.widgets.record_table import Column, RecordTable, format_timestamp
+
+
+def make_table():
+    table = RecordTable([Column("Title", 'title'), Column("Type", 'type'), Column("Severity", 'severity'),
+                         Column("Location", 'location'), Column("Time", 'timestamp', format=format_timestamp)])
+    table.resize(1000, 600)
+    table.show()
+    return table
+
+
+def type_query(query, interval_ms, heartbeat_ms, on_key, done):
+    """Feed ``query`` prefixes to ``on_key``; returns the largest event-loop gap"""
+    loop = QEventLoop()
+    gaps, last = [0.0], [time.perf_counter()]
+
+    def beat():
+        now = time.perf_counter()
+        gaps[0] = max(gaps[0], now - last[0])
+        last[0] = now
+
+    heartbeat = QTimer()
+    heartbeat.timeout.connect(beat)
+    heartbeat.start(heartbeat_ms)
+    typed = [0]
+
+    def key():
+        typed[0] += 1
+        on_key(query[:typed[0]])
+        if typed[0] == len(query):
+            keyboard.stop()
+            check.start(heartbeat_ms)
+
+    keyboard = QTimer()
+    keyboard.timeout.connect(key)
+    keyboard.start(interval_ms)
+    check = QTimer()
+    check.timeout.connect(lambda: done() and loop.quit())
+    QTimer.singleShot(60_000, loop.quit)
+    loop.exec_()
+    heartbeat.stop()
+    check.stop()
+    return gaps[0]
+
+
+def run(app, index, incidents, query, interval, heartbeat):
+    """Type ``query`` synchronously and through the pipeline; prints one row each"""
+    expected = [d['id'] for d in index.search(query)]
+    row = f"{query!r:>14} {{:>10}} {len(expected):8d} {{:8d}} {{:9.1f}}ms {{:15.1f}}ms"
+
+    # Synchronous: search and table update inside the keystroke handler
+    table = make_table()
+    table.set_records(incidents)
+    app.processEvents()
+    state = {'queries': 0, 'pressed': 0.0, 'latency': 0.0}
+
+    def sync_key(text):
+        state['pressed'] = time.perf_counter()
+        table.set_records(index.search(text))
+        state['queries'] += 1
+        state['latency'] = time.perf_counter() - state['pressed']
+
+    gap = type_query(query, interval, heartbeat, sync_key, lambda: True)
+    assert [d['id'] for d in table.table_model.records()] == expected
+    print(row.format('sync', state['queries'], gap * 1000, state['latency'] * 1000))
+
+    # Pipeline: debounced request, search on the worker, diff applied on the UI thread
+    table = make_table()
+    table.set_records(incidents)
+    app.processEvents()
+    pipeline = FilterPipeline(table, lambda text, _: index.search(text))
+    gap = type_query(query, interval, heartbeat, pipeline.request,
+                     lambda: pipeline.pool.activeThreadCount() == 0 and not pipeline.timer.isActive()
+                     and len(pipeline.latencies) > 0)
+    app.processEvents()
+    assert [d['id'] for d in table.table_model.records()] == expected
+    print(row.format('pipeline', pipeline.dispatched, gap * 1000, pipeline.latencies[-1] * 1000))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--incidents', type=int, default=100_000)
+    parser.add_argument('--query', default='kisumu river')
+    parser.add_argument('--broad', default='n', help='short query matching most incidents')
+    parser.add_argument('--interval', type=int, default=60, help='ms between keystrokes')
+    parser.add_argument('--heartbeat', type=int, default=5, help='ms between event-loop probes')
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    rng = random.Random(1)
+    incidents = [dict(make_incident(i, rng), timestamp='2025-11-26T11:37:27') for i in range(args.incidents)]
+    index = IncidentSearchIndex(incidents)
+    print(f"{'query':>14} {'mode':>10} {'matches':>8} {'queries':>8} {'max UI gap':>11} {'last key -> rows':>17}")
+    for query in (args.query, args.broad):
+        run(app, index, incidents, query, args.interval, args.heartbeat)
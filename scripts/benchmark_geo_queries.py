@@ -0,0 +1,93 @@
+"""Compare 2dsphere queries on MongoDB with the local GridIndex fallback.
+
+Needs a reachable MongoDB at MONGODB_URI (default mongodb://localhost:27017/).
+Loads --documents random points (default 1M) into a scratch collection that
+is dropped afterwards; use --local-only to time just the in-process index.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.geo import GeoQueries, box_ring, near_query, within_query
+from src.utils.spatial_index import GridIndex
+
+# Kenya-sized extent
+SOUTH, NORTH, WEST, EAST = -4.7, 4.6, 33.9, 41.9
+
+
+def random_points(count, rng):
+    return [(i, rng.uniform(SOUTH, NORTH), rng.uniform(WEST, EAST)) for i in range(count)]
+
+
+def workloads(rng, queries):
+    """(name, server filter, local callable) triples of random queries"""
+    for _ in range(queries):
+        lat, lng = rng.uniform(SOUTH, NORTH), rng.uniform(WEST, EAST)
+        radius = rng.choice([1000, 5000, 20000])
+        yield ('radius', near_query(lat, lng, radius),
+               lambda g, lat=lat, lng=lng, r=radius: g.within_radius(lat, lng, r, 500))
+        half = rng.choice([0.02, 0.1])
+        box = (lat - half, lng - half, lat + half, lng + half)
+        yield ('box', within_query(box_ring(*box)), lambda g, b=box: g.within_box(*b, limit=500))
+        ring = [(lng - half, lat - half), (lng + half, lat - half), (lng, lat + half), (lng - half, lat - half)]
+        yield ('polygon', within_query(ring), lambda g, r=ring: g.within_polygon(r, 500))
+
+
+def report(label, timings):
+    for name, samples in sorted(timings.items()):
+        samples = sorted(samples)
+        print(f"{label:>6} {name:>8}: p50 {statistics.median(samples) * 1000:7.2f} ms, "
+              f"p95 {samples[int(0.95 * (len(samples) - 1))] * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--documents', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--local-only', action='store_true')
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    points = random_points(args.documents, rng)
+    queries = list(workloads(random.Random(12), args.queries))
+
+    started = time.perf_counter()
+    grid = GridIndex()
+    grid.bulk_load(points)
+    print(f"local index built over {len(grid)} points in {time.perf_counter() - started:.2f}s")
+    timings = {}
+    for name, _, local in queries:
+        started = time.perf_counter()
+        local(grid)
+        timings.setdefault(name, []).append(time.perf_counter() - started)
+    report('local', timings)
+
+    if args.local_only:
+        sys.exit(0)
+
+    from src.utils.mongo_pool import get_database
+    collection = get_database()['benchmark_geo']
+    try:
+        collection.drop()
+        started = time.perf_counter()
+        for offset in range(0, len(points), 10000):
+            collection.insert_many([
+                {'_id': i, 'location': {'type': 'Point', 'coordinates': [lng, lat]}}
+                for i, lat, lng in points[offset:offset + 10000]
+            ], ordered=False)
+        collection.create_index([('location', '2dsphere')])
+        print(f"server collection loaded and indexed in {time.perf_counter() - started:.1f}s")
+        geo = GeoQueries(collection, 'incidents')
+        timings = {}
+        for name, geo_filter, _ in queries:
+            started = time.perf_counter()
+            geo._server(geo_filter, None, ('_id',), 500)
+            timings.setdefault(name, []).append(time.perf_counter() - started)
+        report('server', timings)
+    finally:
+        collection.drop()
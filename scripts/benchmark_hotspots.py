@@ -0,0 +1,88 @@
+"""Incremental hotspot detection cost on a synthetic incident stream.
+
+Streams --incidents incidents (default 1M) in time order over --days days
+(default 30) across Kenya: a --clustered fraction of them around a few
+hundred drifting event centers, the rest scattered. Each goes through
+``HotspotEngine.add`` with a --window hour sliding window (default 24), and
+``hotspots()`` is read every --query-every incidents as a dashboard refresh
+would, and after every one of the last --live incidents as a live alert
+check would. Reported: amortized cost per incident (including evictions),
+query latency in both modes, and a from-scratch rebuild of the final window
+for comparison.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.hotspots import HotspotEngine
+
+SEVERITIES = ['Low', 'Medium', 'High', 'Critical']
+
+
+def stream(count, days, clustered, rng):
+    step = days * 86400 / count
+    centers = [(rng.uniform(-4.5, 4.5), rng.uniform(34.0, 41.5)) for _ in range(300)]
+    for i in range(count):
+        if rng.random() < clustered:
+            k = rng.randrange(len(centers))
+            if rng.random() < 1e-4:
+                centers[k] = (rng.uniform(-4.5, 4.5), rng.uniform(34.0, 41.5))  # a new event elsewhere
+            lat, lng = centers[k]
+            lat, lng = lat + rng.gauss(0, 0.004), lng + rng.gauss(0, 0.004)
+        else:
+            lat, lng = rng.uniform(-4.5, 4.5), rng.uniform(34.0, 41.5)
+        yield f'inc_{i:08d}', lat, lng, 1_740_000_000 + i * step, rng.choice(SEVERITIES)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--incidents', type=int, default=1_000_000)
+    parser.add_argument('--days', type=float, default=30)
+    parser.add_argument('--window', type=float, default=24)
+    parser.add_argument('--clustered', type=float, default=0.6)
+    parser.add_argument('--query-every', type=int, default=1000)
+    parser.add_argument('--live', type=int, default=2000)
+    args = parser.parse_args()
+
+    incidents = list(stream(args.incidents, args.days, args.clustered, random.Random(1)))
+    engine = HotspotEngine(window_hours=args.window)
+    add_seconds, queries, live = 0.0, [], []
+    for n, incident in enumerate(incidents, 1):
+        started = time.perf_counter()
+        engine.add(*incident)
+        add_seconds += time.perf_counter() - started
+        if n > args.incidents - args.live:
+            started = time.perf_counter()
+            engine.hotspots()
+            live.append(time.perf_counter() - started)
+        elif n % args.query_every == 0:
+            started = time.perf_counter()
+            engine.hotspots()
+            queries.append(time.perf_counter() - started)
+
+    queries.sort()
+    live.sort()
+    stats = engine.stats()
+    print(f"{args.incidents} incidents over {args.days:g} days, {args.window:g} h window")
+    print(f"add(): {add_seconds / args.incidents * 1e6:.1f} us amortized, "
+          f"{stats['core_checks'] / args.incidents:.2f} neighbor counts per incident")
+    print(f"hotspots() every {args.query_every}: p50 {queries[len(queries) // 2] * 1000:.2f} ms, "
+          f"p99 {queries[int(0.99 * (len(queries) - 1))] * 1000:.2f} ms")
+    print(f"hotspots() after each incident: p50 {live[len(live) // 2] * 1000:.2f} ms, "
+          f"p99 {live[int(0.99 * (len(live) - 1))] * 1000:.2f} ms")
+    print(f"Final window: {stats['points']} incidents, {stats['cells']} cells, {stats['hotspots']} hotspots")
+
+    horizon = incidents[-1][3] - args.window * 3600
+    window = [incident for incident in incidents if incident[3] >= horizon]
+    started = time.perf_counter()
+    rebuilt = HotspotEngine(window_hours=args.window)
+    for incident in window:
+        rebuilt.add(*incident)
+    found = rebuilt.hotspots()
+    seconds = time.perf_counter() - started
+    print(f"Rebuild of the final window from scratch: {seconds * 1000:.0f} ms")
+    assert sorted(h.count for h in found) == sorted(h.count for h in engine.hotspots())
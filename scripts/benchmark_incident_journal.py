@@ -0,0 +1,84 @@
+"""Per-write cost of the incident journal against rewriting incidents.json.
+
+Builds --incidents incidents (default 100k) in a temporary directory and
+times single mutations both ways, plus load (snapshot + journal replay) and
+compaction.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.incidents.journal_store import JournalStore
+
+
+def make_incident(i, rng):
+    return {
+        'id': f'inc_{i:08d}', 'title': f'Incident {i}', 'type': rng.choice(['Flood', 'Fire', 'Other']),
+        'severity': rng.choice(['Low', 'Medium', 'High']), 'location': 'Kisumu, Nyalenda',
+        'description': 'Public vehicle ran into a wide load lorry', 'status': 'Active',
+        'timestamp': '2025-11-26T11:37:27.072067', 'created_at': '2025-11-26T11:37:27.072067',
+    }
+
+
+def describe(label, samples):
+    samples = sorted(samples)
+    print(f"{label:>26}: p50 {statistics.median(samples) * 1000:9.3f} ms, "
+          f"p95 {samples[int(0.95 * (len(samples) - 1))] * 1000:9.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--incidents', type=int, default=100_000)
+    parser.add_argument('--writes', type=int, default=2000)
+    parser.add_argument('--legacy-writes', type=int, default=5, help='full rewrites to time (each is O(N))')
+    args = parser.parse_args()
+
+    rng = random.Random(9)
+    incidents = [make_incident(i, rng) for i in range(args.incidents)]
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'incidents.json')
+        legacy = []
+        for _ in range(args.legacy_writes):
+            started = time.perf_counter()
+            with open(path, 'w') as f:
+                json.dump(incidents, f, indent=2)
+            legacy.append(time.perf_counter() - started)
+        describe('rewrite incidents.json', legacy)
+
+        store = JournalStore(path, compact_min_records=10 ** 9)
+        appends = []
+        for i in range(args.writes):
+            incident = dict(rng.choice(incidents), status=rng.choice(['Active', 'Resolved']))
+            started = time.perf_counter()
+            store.put(incident)
+            appends.append(time.perf_counter() - started)
+        describe('journal append', appends)
+        fsynced = JournalStore(path, fsync=True, compact_min_records=10 ** 9)
+        durable = []
+        for i in range(min(args.writes, 200)):
+            started = time.perf_counter()
+            fsynced.put(dict(rng.choice(incidents), status='Resolved'))
+            durable.append(time.perf_counter() - started)
+        describe('journal append + fsync', durable)
+        fsynced.close()
+        store.close()
+
+        started = time.perf_counter()
+        store = JournalStore(path)
+        print(f"{'load + replay':>26}: {(time.perf_counter() - started) * 1000:9.1f} ms "
+              f"({len(store)} incidents, {os.path.getsize(store.journal_path)} journal bytes)")
+        started = time.perf_counter()
+        store.compact()
+        print(f"{'compaction':>26}: {(time.perf_counter() - started) * 1000:9.1f} ms")
+        store.close()
+    finally:
+        shutil.rmtree(directory)
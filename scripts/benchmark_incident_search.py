@@ -0,0 +1,77 @@
+"""Incident search latency: the inverted index against a full substring scan.
+
+Builds --incidents synthetic incidents (default 100k), checks that every
+query returns exactly what the scan returns, and prints p50/p95 per query.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.incidents.search_index import IncidentSearchIndex
+
+WORDS = ('flood fire river overflow accident lorry vehicle displacement people massive landslide drought '
+         'kisumu nyalenda nairobi mombasa nakuru eldoret garissa road bridge school market hospital '
+         'collapsed burning heavy rain storm wind injured missing families').split()
+QUERIES = [
+    ('flo', None, None), ('n', None, None), ('river bur', None, 'High'), ('', 'Fire', 'Low'),
+    ('kisumu, nya', 'Flood', None), ('12345', None, None), ('ri', 'Fire', 'High'), ('xyz', None, None),
+]
+
+
+def make_incident(i, rng):
+    return {
+        'id': f'inc_{i:08d}', 'title': f"{' '.join(rng.sample(WORDS, 2)).title()} {i}",
+        'description': ' '.join(rng.sample(WORDS, 6)), 'location': f'{rng.choice(WORDS).title()}, {rng.choice(WORDS)}',
+        'type': rng.choice(['Flood', 'Fire', 'Earthquake', 'Landslide', 'Other']),
+        'severity': rng.choice(['Low', 'Medium', 'High', 'Critical']),
+    }
+
+
+def scan(incidents, text, type, severity):
+    text = text.lower()
+    return [d for d in incidents
+            if (not text or text in d['title'].lower() or text in d['description'].lower()
+                or text in d['location'].lower())
+            and (type is None or d['type'] == type) and (severity is None or d['severity'] == severity)]
+
+
+def timed(function, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = function()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return result, statistics.median(samples), samples[int(0.95 * (len(samples) - 1))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--incidents', type=int, default=100_000)
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--updates', type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    incidents = [make_incident(i, rng) for i in range(args.incidents)]
+    started = time.perf_counter()
+    index = IncidentSearchIndex(incidents)
+    print(f"Indexed {args.incidents} incidents in {time.perf_counter() - started:.2f} s")
+
+    print(f"{'query':>28} {'hits':>7} {'index p50':>10} {'index p95':>10} {'scan p50':>10}")
+    for text, type, severity in QUERIES:
+        result, p50, p95 = timed(lambda: index.search(text, type, severity), args.repeats)
+        expected, scan_p50, _ = timed(lambda: scan(incidents, text, type, severity), 3)
+        assert [d['id'] for d in result] == [d['id'] for d in expected], (text, type, severity)
+        label = f"{text!r} {type or '*'}/{severity or '*'}"
+        print(f"{label:>28} {len(result):7d} {p50 * 1000:8.2f}ms {p95 * 1000:8.2f}ms {scan_p50 * 1000:8.2f}ms")
+
+    started = time.perf_counter()
+    for i in range(args.updates):
+        index.update(dict(incidents[i], title='Collapsed bridge'))
+    print(f"{args.updates} updates: {(time.perf_counter() - started) / args.updates * 1000:.3f} ms each")
@@ -0,0 +1,56 @@
+"""Compare connection count and startup latency: one client per manager vs the shared pool.
+
+Needs a reachable MongoDB at MONGODB_URI (default mongodb://localhost:27017/).
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient
+
+from src.utils.mongo_pool import DEFAULT_URI, PoolMonitor, get_database, pool_stats
+
+# IncidentManager, ResourceManager (x2 in ReportGenerator and the dialogs),
+# AuthManager and the MongoDBClient singleton each used to own a client
+LEGACY_CLIENTS = 5
+QUERIES = 200
+
+
+def run_queries(databases):
+    """Issue the same small read from several threads across the given databases"""
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda i: databases[i % len(databases)].incidents.find_one({}), range(QUERIES)))
+
+
+def legacy(uri):
+    monitor = PoolMonitor()
+    started = time.perf_counter()
+    clients = [MongoClient(uri, event_listeners=[monitor]) for _ in range(LEGACY_CLIENTS)]
+    for client in clients:
+        client.admin.command('ping')
+    startup = time.perf_counter() - started
+    run_queries([client.Disaster_Management_System for client in clients])
+    stats = monitor.stats()
+    for client in clients:
+        client.close()
+    return startup, stats
+
+
+def shared():
+    started = time.perf_counter()
+    databases = [get_database() for _ in range(LEGACY_CLIENTS)]
+    databases[0].client.admin.command('ping')
+    startup = time.perf_counter() - started
+    run_queries(databases)
+    return startup, pool_stats()
+
+
+if __name__ == "__main__":
+    uri = os.getenv('MONGODB_URI') or DEFAULT_URI
+    for label, (startup, stats) in (("one client per manager", legacy(uri)), ("shared pool", shared())):
+        print(f"{label:>24}: startup {startup * 1000:7.1f} ms, "
+              f"connections {stats['connections_created']:>3}, "
+              f"avg checkout wait {stats['avg_checkout_wait_ms']} ms, max {stats['max_checkout_wait_ms']} ms")
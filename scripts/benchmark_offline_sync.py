@@ -0,0 +1,87 @@
+"""Local latency of the offline store and sync throughput for large backlogs.
+
+Writes --backlog incidents to a fresh SQLite store, times local reads and
+writes, then (unless --local-only) pushes the backlog to a scratch database
+on MONGODB_URI, edits every document on the server and pulls the edits back.
+The scratch database and store are removed afterwards.
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.offline_store import OfflineStore, OfflineSync
+
+SCRATCH_DATABASE = 'benchmark_offline_sync'
+
+
+def timed(samples, function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    samples.append(time.perf_counter() - started)
+    return result
+
+
+def describe(label, samples):
+    samples = sorted(samples)
+    print(f"{label:>18}: p50 {statistics.median(samples) * 1000:7.3f} ms, "
+          f"p95 {samples[int(0.95 * (len(samples) - 1))] * 1000:7.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--backlog', type=int, default=100_000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--local-only', action='store_true')
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    directory = tempfile.mkdtemp()
+    store = OfflineStore(os.path.join(directory, 'offline.sqlite3'))
+    try:
+        inserts, reads, updates, filtered = [], [], [], []
+        started = time.perf_counter()
+        ids = [timed(inserts, store.insert, 'incidents', {
+            'title': f'Incident {i}', 'type': rng.choice(['Flood', 'Fire', 'Earthquake']),
+            'severity': rng.choice(['Low', 'Medium', 'High']), 'status': 'active',
+            'location': 'Nairobi', 'resources_assigned': [],
+        }) for i in range(args.backlog)]
+        print(f"{args.backlog} local inserts in {time.perf_counter() - started:.1f}s")
+        for _ in range(2000):
+            timed(reads, store.get, 'incidents', rng.choice(ids))
+            timed(updates, store.update, 'incidents', rng.choice(ids), {'$set': {'severity': 'High'}})
+        for _ in range(50):
+            timed(filtered, store.find, 'incidents', {'type': 'Flood', 'severity': 'Low'}, 50)
+        describe('insert', inserts)
+        describe('get by id', reads)
+        describe('update', updates)
+        describe('find 50 filtered', filtered)
+
+        if not args.local_only:
+            from src.utils.mongo_pool import get_database
+            db = get_database(SCRATCH_DATABASE)
+            try:
+                db.client.drop_database(SCRATCH_DATABASE)
+                sync = OfflineSync(store, db, collections=('incidents',), batch_size=args.batch_size)
+                started = time.perf_counter()
+                pushed = sync.push('incidents')['pushed']
+                elapsed = time.perf_counter() - started
+                print(f"push: {pushed} documents in {elapsed:.1f}s ({pushed / elapsed:,.0f} docs/s)")
+                sync.pull('incidents')  # sets the watermark past the pushed copies
+                db.incidents.update_many({}, {'$set': {'status': 'closed', 'updated_at': datetime.utcnow()}})
+                started = time.perf_counter()
+                pulled = sync.pull('incidents')['pulled']
+                elapsed = time.perf_counter() - started
+                print(f"pull: {pulled} documents in {elapsed:.1f}s ({pulled / elapsed:,.0f} docs/s)")
+            finally:
+                db.client.drop_database(SCRATCH_DATABASE)
+    finally:
+        store.close()
+        shutil.rmtree(directory)
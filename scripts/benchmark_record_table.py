@@ -0,0 +1,79 @@
+"""Refresh cost of the incident table: QTableWidget rebuild against RecordTable.
+
+Renders --incidents incidents (default 5k) offscreen both ways: the old
+per-row QTableWidgetItems plus a button widget, and a RecordTable. Then it
+times a refresh that changes one row, as after an edit.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication, QHBoxLayout, QPushButton, QTableWidget, QTableWidgetItem, QWidget
+
+from src.widgets.record_table import Column, RecordTable, RowAction, format_timestamp
+
+COLUMNS = ["Title", "Type", "Severity", "Location", "Time", "Actions"]
+
+
+def make_incident(i):
+    return {'id': f'inc_{i:08d}', 'title': f'Incident {i}', 'type': ['Flood', 'Fire', 'Other'][i % 3],
+            'severity': ['Low', 'Medium', 'High', 'Critical'][i % 4], 'location': 'Kisumu, Nyalenda',
+            'timestamp': '2025-11-26T11:37:27.072067'}
+
+
+def rebuild_widget_table(table, incidents):
+    table.setRowCount(0)
+    for incident in incidents:
+        row = table.rowCount()
+        table.insertRow(row)
+        for column, key in enumerate(('title', 'type', 'severity', 'location')):
+            table.setItem(row, column, QTableWidgetItem(incident[key]))
+        table.setItem(row, 4, QTableWidgetItem(format_timestamp(incident['timestamp'])))
+        action_widget = QWidget()
+        action_layout = QHBoxLayout(action_widget)
+        for label in ("Edit", "Delete"):
+            button = QPushButton(label)
+            button.clicked.connect(lambda checked, i=incident: None)
+            action_layout.addWidget(button)
+        table.setCellWidget(row, 5, action_widget)
+
+
+def timed(label, function):
+    started = time.perf_counter()
+    function()
+    app.processEvents()
+    print(f"{label:>34}: {(time.perf_counter() - started) * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--incidents', type=int, default=5_000)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    incidents = [make_incident(i) for i in range(args.incidents)]
+    edited = list(incidents)
+    edited[args.incidents // 2] = dict(edited[args.incidents // 2], severity='Critical')
+
+    widget_table = QTableWidget(0, len(COLUMNS))
+    widget_table.setHorizontalHeaderLabels(COLUMNS)
+    widget_table.resize(1200, 800)
+    widget_table.show()
+    timed("QTableWidget initial fill", lambda: rebuild_widget_table(widget_table, incidents))
+    timed("QTableWidget refresh (1 row edited)", lambda: rebuild_widget_table(widget_table, edited))
+    widget_table.close()
+
+    record_table = RecordTable([
+        Column("Title", 'title'), Column("Type", 'type'), Column("Severity", 'severity'),
+        Column("Location", 'location'), Column("Time", 'timestamp', format=format_timestamp),
+        Column("Actions", actions=[RowAction("Edit", lambda r: None), RowAction("Delete", lambda r: None)]),
+    ])
+    record_table.resize(1200, 800)
+    record_table.show()
+    timed("RecordTable initial fill", lambda: record_table.set_records(incidents))
+    timed("RecordTable refresh (1 row edited)", lambda: record_table.set_records(edited))
+    timed("RecordTable refresh (filtered to 1/3)", lambda: record_table.set_records(edited[::3]))
@@ -0,0 +1,67 @@
+"""Mutation throughput with synchronous updates vs the write-behind queue.
+
+Needs a reachable MongoDB at MONGODB_URI (default mongodb://localhost:27017/).
+Uses a scratch collection that is dropped afterwards.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.write_behind import WriteBehindQueue
+from src.utils.mongo_pool import get_database
+
+
+def mutations(ids, count, seed=7):
+    """Operator-style edits: status changes, resource assignments and notes"""
+    rng = random.Random(seed)
+    for i in range(count):
+        document_id = rng.choice(ids)
+        kind = rng.random()
+        if kind < 0.5:
+            yield document_id, {'$set': {'status': rng.choice(['active', 'contained', 'closed']), 'updated_at': i}}
+        elif kind < 0.8:
+            yield document_id, {'$addToSet': {'resources_assigned': f"res_{rng.randint(0, 50)}"}}
+        else:
+            yield document_id, {'$set': {'resolution_notes': f"note {i}", 'updated_at': i}}
+
+
+def reset(collection, documents):
+    collection.drop()
+    return collection.insert_many([{'status': 'active', 'resources_assigned': []} for _ in range(documents)]).inserted_ids
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mutations', type=int, default=5000)
+    parser.add_argument('--documents', type=int, default=200)
+    parser.add_argument('--flush-interval', type=float, default=0.25)
+    args = parser.parse_args()
+
+    collection = get_database()['benchmark_write_behind']
+    try:
+        ids = reset(collection, args.documents)
+        started = time.perf_counter()
+        for document_id, update in mutations(ids, args.mutations):
+            collection.update_one({'_id': document_id}, update)
+        sync_seconds = time.perf_counter() - started
+        print(f"synchronous : {args.mutations / sync_seconds:10.0f} mutations/s "
+              f"(caller blocked {sync_seconds:.2f}s)")
+
+        ids = reset(collection, args.documents)
+        queue = WriteBehindQueue(flush_interval=args.flush_interval)
+        started = time.perf_counter()
+        tickets = [queue.submit(collection, document_id, update)
+                   for document_id, update in mutations(ids, args.mutations)]
+        submit_seconds = time.perf_counter() - started
+        queue.close()
+        durable_seconds = time.perf_counter() - started
+        assert all(ticket.result() for ticket in tickets)
+        print(f"write-behind: {args.mutations / durable_seconds:10.0f} mutations/s "
+              f"(caller blocked {submit_seconds:.3f}s, all acknowledged after {durable_seconds:.2f}s)")
+        print(f"queue stats : {queue.stats}")
+    finally:
+        collection.drop()
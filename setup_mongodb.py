@@ -32,11 +32,20 @@ def setup_mongodb():
         db.incidents.create_index([("location", "2dsphere")])
         db.incidents.create_index("status")
         db.incidents.create_index("severity")
+        # Keyset pagination (src/models/pagination.py), unfiltered and by status
+        db.incidents.create_index([("created_at", -1), ("_id", -1)])
+        db.incidents.create_index([("status", 1), ("created_at", -1), ("_id", -1)])
+        # Covers the statistics aggregation (src/models/statistics.py): the
+        # created_at range match plus the projected breakdown fields
+        db.incidents.create_index([("created_at", -1), ("status", 1), ("severity", 1), ("type", 1)])
         
         # Resources collection
         db.resources.create_index([("location", "2dsphere")])
         db.resources.create_index("status")
         db.resources.create_index("type")
+        db.resources.create_index([("created_at", -1), ("_id", -1)])
+        db.resources.create_index([("status", 1), ("created_at", -1), ("_id", -1)])
+        db.resources.create_index([("status", 1), ("type", 1)])
         
         # Insert sample user for testing
         sample_user = {
@@ -0,0 +1,206 @@
+# src/ai/capacity_model.py
+"""
+Compiled capacity model for resource_map.json.
+
+Quantity strings such as "5-10 units", "200+ units" or "1 officer" are parsed
+once, at load time, into compact slotted records. Resources that appear under
+several event types or severity levels are merged into a single capacity
+record instead of overwriting each other. The compiled model is pickled next to
+the JSON file and reused until the JSON's modification time changes.
+"""
+import json
+import logging
+import os
+import pickle
+import re
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_SUFFIX = '.capacity.pkl'
+CACHE_VERSION = 2
+
+# "5-10 units", "200+ beds", "1 officer"; anything else is one unit of itself
+QUANTITY_PATTERN = re.compile(
+    r'^\s*(?P<min>\d+)\s*(?:(?P<open>\+)|-\s*(?P<max>\d+))?\s*(?P<unit>.*?)\s*$'
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Quantity:
+    min_units: int
+    max_units: Optional[int]  # None when open-ended ("200+ units")
+    unit: str
+
+    @property
+    def default_units(self) -> int:
+        """Stock level assumed when no inventory is recorded"""
+        return self.max_units if self.max_units is not None else self.min_units
+
+
+@dataclass(frozen=True, slots=True)
+class ResourceRequirement:
+    resource: str
+    priority: int
+    quantity: Quantity
+    raw_quantity: str
+
+    def as_dict(self) -> Dict:
+        """Recommendation entry in the resource_map.json format"""
+        return {
+            'resource': self.resource,
+            'priority': self.priority,
+            'quantity': self.raw_quantity,
+            'min_units': self.quantity.min_units,
+            'max_units': self.quantity.max_units,
+            'unit': self.quantity.unit,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class ResourceCapacity:
+    name: str
+    min_units: int
+    max_units: Optional[int]
+    unit: str
+    best_priority: int
+
+    @property
+    def default_units(self) -> int:
+        return self.max_units if self.max_units is not None else self.min_units
+
+
+@lru_cache(maxsize=1024)
+def parse_quantity(text) -> Quantity:
+    """Parse a resource_map.json quantity string"""
+    if isinstance(text, int):
+        return Quantity(text, text, 'units')
+    match = QUANTITY_PATTERN.match(str(text or ''))
+    if not match:
+        return Quantity(1, 1, str(text or 'unit'))
+    low = int(match['min'])
+    high = None if match['open'] else int(match['max'] or low)
+    return Quantity(low, max(low, high) if high is not None else None, match['unit'] or 'units')
+
+
+class CapacityModel:
+    """Typed view of resource_map.json requirements and per-resource capacity"""
+
+    __slots__ = ('requirements', 'resources', '_recommendations', '__weakref__')
+
+    def __init__(self, requirements: Dict[Tuple[str, str], Tuple[ResourceRequirement, ...]],
+                 resources: Dict[str, ResourceCapacity]):
+        # ('event', 'Flood') / ('severity', 'High') -> requirements in map order
+        self.requirements = requirements
+        self.resources = resources
+        # (event type, severity) -> merged recommendations, kept per model
+        self._recommendations: Dict[Tuple[str, str], Tuple[ResourceRequirement, ...]] = {}
+
+    @classmethod
+    def compile(cls, resource_map: Dict) -> 'CapacityModel':
+        requirements = {}
+        merged = {}
+        for section, kind in (('event_type_map', 'event'), ('severity_map', 'severity')):
+            for key, entries in resource_map.get(section, {}).items():
+                compiled = []
+                for entry in entries:
+                    raw = entry.get('quantity', '1 unit')
+                    requirement = ResourceRequirement(
+                        entry['resource'], int(entry.get('priority', 3)), parse_quantity(raw), str(raw)
+                    )
+                    compiled.append(requirement)
+                    merged.setdefault(requirement.resource, []).append(requirement)
+                requirements[(kind, key)] = tuple(compiled)
+
+        resources = {}
+        for name, seen in merged.items():
+            open_ended = any(r.quantity.max_units is None for r in seen)
+            resources[name] = ResourceCapacity(
+                name=name,
+                min_units=max(r.quantity.min_units for r in seen),
+                max_units=None if open_ended else max(r.quantity.max_units for r in seen),
+                unit=seen[0].quantity.unit,
+                best_priority=min(r.priority for r in seen),
+            )
+        return cls(requirements, resources)
+
+    def for_event(self, event_type) -> Tuple[ResourceRequirement, ...]:
+        return self.requirements.get(('event', event_type), ())
+
+    def for_severity(self, severity) -> Tuple[ResourceRequirement, ...]:
+        return self.requirements.get(('severity', severity), ())
+
+    def recommendations(self, event_type, severity) -> Tuple[ResourceRequirement, ...]:
+        """Event and severity requirements, deduplicated by highest priority"""
+        key = (event_type, severity)
+        merged = self._recommendations.get(key)
+        if merged is None:
+            best = {}
+            for requirement in self.for_event(event_type) + self.for_severity(severity):
+                current = best.get(requirement.resource)
+                if current is None or requirement.priority < current.priority:
+                    best[requirement.resource] = requirement
+            merged = self._recommendations[key] = tuple(sorted(best.values(), key=lambda r: r.priority))
+        return merged
+
+    def units_needed(self, resource: Dict) -> int:
+        """Units to allocate for a recommendation entry (the low end of its range)"""
+        quantity = resource.get('quantity', 1)
+        if isinstance(quantity, int):
+            return quantity
+        return parse_quantity(quantity).min_units
+
+    def default_stock(self, name: str) -> int:
+        capacity = self.resources.get(name)
+        return capacity.default_units if capacity else 0
+
+
+_models: Dict[str, Tuple[int, CapacityModel]] = {}
+_models_lock = threading.Lock()
+
+
+def load_capacity_model(resource_map_path: str) -> CapacityModel:
+    """Load the compiled model for a resource map, compiling it only when stale"""
+    path = os.path.abspath(resource_map_path)
+    stamp = os.stat(path).st_mtime_ns
+    with _models_lock:
+        cached = _models.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        model = _read_cache(path + CACHE_SUFFIX, stamp)
+        if model is None:
+            with open(path, 'r', encoding='utf-8') as f:
+                model = CapacityModel.compile(json.load(f))
+            _write_cache(path + CACHE_SUFFIX, stamp, model)
+        _models[path] = (stamp, model)
+        return model
+
+
+def _read_cache(cache_path, stamp):
+    try:
+        with open(cache_path, 'rb') as f:
+            version, cached_stamp, model = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable capacity cache {cache_path}: {e}")
+        return None
+    if version != CACHE_VERSION or cached_stamp != stamp:
+        return None
+    return model
+
+
+def _write_cache(cache_path, stamp, model):
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((CACHE_VERSION, stamp, model), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not write capacity cache {cache_path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -5,6 +5,8 @@ import json
 import pandas as pd
 import numpy as np
 import os
+from .capacity_model import CapacityModel, load_capacity_model
+from .routing import load_road_graph
 
 class DisasterAIPredictor:
     def __init__(self, model_path=None, resource_map_path=None):
@@ -34,12 +36,15 @@ class DisasterAIPredictor:
             try:
                 with open(resource_map_path, 'r', encoding='utf-8') as f:
                     self.resource_map = json.load(f)
+                self.capacity = load_capacity_model(resource_map_path)
                 print(f"✅ Resource map loaded successfully from {resource_map_path}")
             except Exception as e:
                 self.resource_map = {"event_type_map": {}, "severity_map": {}}
+                self.capacity = CapacityModel.compile(self.resource_map)
                 print(f"❌ Error loading resource map from {resource_map_path}: {e}")
         else:
             self.resource_map = {"event_type_map": {}, "severity_map": {}}
+            self.capacity = CapacityModel.compile(self.resource_map)
             print(f"⚠️  Warning: Resource map not found at {resource_map_path}")
     
     def predict_severity(self, incident_data):
@@ -94,25 +99,22 @@ class DisasterAIPredictor:
     
     def recommend_resources(self, event_type, severity, available_resources=None):
         """Recommend resources based on event type and severity"""
-        recommendations = []
-        
-        # Get event-specific resources
-        event_resources = self.resource_map.get("event_type_map", {}).get(event_type, [])
-        # Get severity-based resources  
-        severity_resources = self.resource_map.get("severity_map", {}).get(severity, [])
-        
-        # Combine and prioritize (remove duplicates, keep highest priority)
-        all_resources = {}
-        for resource in event_resources + severity_resources:
-            resource_name = resource["resource"]
-            if (resource_name not in all_resources or 
-                resource["priority"] < all_resources[resource_name]["priority"]):
-                all_resources[resource_name] = resource
-        
-        # Convert back to list and sort by priority
-        recommendations = sorted(all_resources.values(), key=lambda x: x["priority"])
+        # Event and severity requirements are merged once per pair by the
+        # compiled capacity model (duplicates keep their highest priority)
+        return [requirement.as_dict()
+                for requirement in self.capacity.recommendations(event_type, severity)]
+    
+    def rank_resources_by_eta(self, incident_location, resources):
+        """Rank concrete resource units by road travel time to an incident (lat, lng)
         
-        return recommendations
+        Each returned resource gets an 'eta_seconds' field; without a road
+        network extract the input order is kept and 'eta_seconds' is None.
+        """
+        road_graph = load_road_graph()
+        if road_graph is None or incident_location is None:
+            return [dict(resource, eta_seconds=None) for resource in resources]
+        return [dict(resource, eta_seconds=eta)
+                for eta, resource in road_graph.rank_by_eta(incident_location, resources)]
     
     def predict_and_recommend(self, incident_data):
         """Convenience method to predict severity and get recommendations"""
@@ -2,6 +2,8 @@
 import json
 from datetime import datetime, timedelta
 import os
+from .allocation_simulator import AvailabilityFork, Scenario, run_scenarios
+from .capacity_model import CapacityModel, load_capacity_model, parse_quantity
 
 class ResourceManager:
     def __init__(self, resource_map_path=None):
@@ -16,12 +18,15 @@ class ResourceManager:
             try:
                 with open(resource_map_path, 'r', encoding='utf-8') as f:
                     self.resource_map = json.load(f)
+                self.capacity = load_capacity_model(resource_map_path)
                 print(f"SUCCESS: Resource map loaded from {resource_map_path}")
             except Exception as e:
                 self.resource_map = {"event_type_map": {}, "severity_map": {}}
+                self.capacity = CapacityModel.compile(self.resource_map)
                 print(f"ERROR: Error loading resource map: {e}")
         else:
             self.resource_map = {"event_type_map": {}, "severity_map": {}}
+            self.capacity = CapacityModel.compile(self.resource_map)
             print(f"WARNING: Resource map not found at {resource_map_path}")
         
         self.allocated_resources = {}
@@ -31,24 +36,25 @@ class ResourceManager:
         """Initialize resource availability based on region/capacity"""
         availability = {}
         # This would typically load from a database
-        for event_type, resources in self.resource_map.get("event_type_map", {}).items():
-            for resource in resources:
-                resource_name = resource["resource"]
-                availability[resource_name] = {
-                    "total": self._get_default_quantity(resource),
-                    "allocated": 0,
-                    "maintenance": 0,
-                    "available": self._get_default_quantity(resource)
-                }
+        for (kind, _), requirements in self.capacity.requirements.items():
+            if kind != 'event':
+                continue
+            # Stock comes from event-type entries only; a resource listed under
+            # several event types gets the largest of its quantities
+            for requirement in requirements:
+                units = requirement.quantity.default_units
+                if units > availability.get(requirement.resource, {}).get("total", 0):
+                    availability[requirement.resource] = {
+                        "total": units,
+                        "allocated": 0,
+                        "maintenance": 0,
+                        "available": units
+                    }
         return availability
     
     def _get_default_quantity(self, resource):
         """Extract default quantity from resource definition"""
-        quantity_str = resource.get("quantity", "1 unit")
-        # Parse quantity string like "5-10 units" to get max
-        if "-" in quantity_str:
-            return int(quantity_str.split("-")[1].split()[0])
-        return 1
+        return parse_quantity(resource.get("quantity", "1 unit")).default_units
     
     def check_availability(self, resource_name, quantity_needed=1):
         """Check if resources are available"""
@@ -66,7 +72,7 @@ class ResourceManager:
         allocations = []
         for resource in resources_needed:
             resource_name = resource["resource"]
-            quantity = resource.get("quantity", 1)
+            quantity = self.capacity.units_needed(resource)
             
             if self.check_availability(resource_name, quantity):
                 # Mark as allocated
@@ -85,7 +91,7 @@ class ResourceManager:
         if incident_id in self.allocated_resources:
             for resource in self.allocated_resources[incident_id]["resources"]:
                 resource_name = resource["resource"]
-                quantity = resource.get("quantity", 1)
+                quantity = self.capacity.units_needed(resource)
                 
                 if resource_name in self.available_resources:
                     self.available_resources[resource_name]["allocated"] -= quantity
@@ -98,6 +104,16 @@ class ResourceManager:
         """Get current availability of all resources"""
         return {name: data["available"] for name, data in self.available_resources.items()}
     
+    def fork(self):
+        """Copy-on-write view of current availability for what-if allocations"""
+        return AvailabilityFork(self.available_resources, self.capacity)
+    
+    def simulate(self, scenarios, processes=1):
+        """Replay what-if scenarios without touching committed availability"""
+        if isinstance(scenarios, Scenario):
+            scenarios = [scenarios]
+        return run_scenarios(self, scenarios, processes=processes)
+    
     def get_resource_categories(self):
         """Get resource categories from resource map"""
         return self.resource_map.get("resource_categories", {})
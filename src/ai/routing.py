@@ -0,0 +1,302 @@
+# src/ai/routing.py
+"""
+Offline travel-time routing over a local road network extract.
+
+The road graph is held as a compact CSR adjacency structure (NumPy arrays for
+row offsets, neighbour indices and edge travel times in seconds), with a
+reversed copy for "time to reach this node" queries. One-to-many travel times
+use SciPy's compiled Dijkstra and are cached per source node; point-to-point
+ETAs use bidirectional Dijkstra. Coordinates are snapped to road nodes with a
+KD-tree over the nodes' positions on the unit sphere.
+
+Supported extract formats:
+  * ``.npz`` with ``node_lat``, ``node_lng``, ``edge_src``, ``edge_dst`` and
+    ``edge_seconds`` (optional ``edge_oneway``), as written by ``save_npz``
+  * ``.json`` with ``{"nodes": [[id, lat, lng], ...],
+    "edges": [[from_id, to_id, length_m, speed_kmh, oneway], ...]}``
+"""
+import heapq
+import json
+import logging
+import math
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra as _csgraph_dijkstra
+from scipy.spatial import cKDTree
+
+from src.utils.regions import document_coordinates
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GRAPH_PATH = os.path.join(os.path.dirname(__file__), 'models', 'road_network.npz')
+
+# Speed assumed between a location and the nearest road node
+OFFROAD_SPEED_KMH = 20.0
+EARTH_RADIUS_M = 6371000.0
+
+
+def _to_csr(n_nodes, src, dst, weights):
+    """Build CSR arrays, keeping the fastest of any parallel edges"""
+    order = np.lexsort((weights, dst, src))
+    src, dst, weights = src[order], dst[order], weights[order]
+    first = np.ones(len(src), dtype=bool)
+    first[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+    src, dst, weights = src[first], dst[first], weights[first]
+
+    indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.add.at(indptr, src + 1, 1)
+    # Zero-cost edges would read as missing entries in the sparse matrix
+    return np.cumsum(indptr), dst.astype(np.int32), np.maximum(weights, 1e-3).astype(np.float32)
+
+
+def _unit_vectors(lat, lng):
+    """Points on the unit sphere; chord length orders pairs like great-circle distance"""
+    lat, lng = np.radians(lat), np.radians(lng)
+    return np.column_stack([np.cos(lat) * np.cos(lng), np.cos(lat) * np.sin(lng), np.sin(lat)])
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """Great-circle distance in metres (vectorized over NumPy arrays)"""
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+class RoadGraph:
+    """Road network in CSR form with cached one-to-many travel times"""
+
+    def __init__(self, node_lat, node_lng, edge_src, edge_dst, edge_seconds, cache_size=256):
+        self.lat = np.asarray(node_lat, dtype=np.float64)
+        self.lng = np.asarray(node_lng, dtype=np.float64)
+        src = np.asarray(edge_src, dtype=np.int64)
+        dst = np.asarray(edge_dst, dtype=np.int64)
+        seconds = np.asarray(edge_seconds, dtype=np.float64)
+        self.n_nodes = len(self.lat)
+
+        self.indptr, self.indices, self.weights = _to_csr(self.n_nodes, src, dst, seconds)
+        self.rev_indptr, self.rev_indices, self.rev_weights = _to_csr(self.n_nodes, dst, src, seconds)
+
+        self._tree = None
+        self._matrices = {}
+        self._lists = {}
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    # ------------------------------------------------------------------ loading
+
+    @classmethod
+    def load(cls, path):
+        """Load a road network extract from an .npz or .json file"""
+        if path.endswith('.npz'):
+            data = np.load(path)
+            src, dst, seconds = data['edge_src'], data['edge_dst'], data['edge_seconds']
+            if 'edge_oneway' in data.files:
+                both = ~data['edge_oneway'].astype(bool)
+                src, dst = np.concatenate([src, dst[both]]), np.concatenate([dst, src[both]])
+                seconds = np.concatenate([seconds, seconds[both]])
+            return cls(data['node_lat'], data['node_lng'], src, dst, seconds)
+
+        with open(path, 'r', encoding='utf-8') as f:
+            extract = json.load(f)
+        index = {node[0]: i for i, node in enumerate(extract['nodes'])}
+        lat = [node[1] for node in extract['nodes']]
+        lng = [node[2] for node in extract['nodes']]
+        src, dst, seconds = [], [], []
+        for edge in extract['edges']:
+            u, v = index[edge[0]], index[edge[1]]
+            travel = float(edge[2]) / (float(edge[3]) / 3.6)
+            src.append(u)
+            dst.append(v)
+            seconds.append(travel)
+            if not (len(edge) > 4 and edge[4]):
+                src.append(v)
+                dst.append(u)
+                seconds.append(travel)
+        return cls(lat, lng, src, dst, seconds)
+
+    def save_npz(self, path):
+        """Write the graph in the compact .npz extract format"""
+        src = np.repeat(np.arange(self.n_nodes), np.diff(self.indptr))
+        np.savez_compressed(path, node_lat=self.lat, node_lng=self.lng,
+                            edge_src=src, edge_dst=self.indices, edge_seconds=self.weights)
+
+    # ------------------------------------------------------------------ queries
+
+    def nearest_nodes(self, lat, lng):
+        """Return (nodes, snap distances in metres) for arrays of coordinates"""
+        if self._tree is None:
+            self._tree = cKDTree(_unit_vectors(self.lat, self.lng))
+        chord, nodes = self._tree.query(_unit_vectors(np.atleast_1d(lat), np.atleast_1d(lng)))
+        return nodes, 2 * EARTH_RADIUS_M * np.arcsin(np.minimum(chord / 2, 1.0))
+
+    def nearest_node(self, lat, lng):
+        """Return (node, snap distance in metres) for a coordinate"""
+        nodes, distances = self.nearest_nodes(lat, lng)
+        return int(nodes[0]), float(distances[0])
+
+    def _matrix(self, reverse):
+        if reverse not in self._matrices:
+            if reverse:
+                arrays = (self.rev_weights, self.rev_indices, self.rev_indptr)
+            else:
+                arrays = (self.weights, self.indices, self.indptr)
+            self._matrices[reverse] = csr_matrix(arrays, shape=(self.n_nodes, self.n_nodes))
+        return self._matrices[reverse]
+
+    def _adjacency(self, reverse):
+        """CSR arrays as Python lists for the bidirectional search"""
+        if reverse not in self._lists:
+            if reverse:
+                arrays = (self.rev_indptr, self.rev_indices, self.rev_weights)
+            else:
+                arrays = (self.indptr, self.indices, self.weights)
+            self._lists[reverse] = tuple(a.tolist() for a in arrays)
+        return self._lists[reverse]
+
+    def one_to_many(self, source, reverse=False):
+        """Travel times in seconds from ``source`` to every node (to it when ``reverse``).
+
+        Results are cached per (source, direction); unreachable nodes are inf.
+        """
+        key = (source, reverse)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return self._cache[key]
+            self.cache_misses += 1
+
+        times = _csgraph_dijkstra(self._matrix(reverse), indices=source)
+        times.setflags(write=False)
+
+        with self._lock:
+            self._cache[key] = times
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return times
+
+    def travel_time(self, source, target):
+        """Point-to-point travel time in seconds using bidirectional Dijkstra"""
+        if source == target:
+            return 0.0
+        sides = [
+            ({source: 0.0}, [(0.0, source)], set()) + self._adjacency(False),
+            ({target: 0.0}, [(0.0, target)], set()) + self._adjacency(True),
+        ]
+        best = math.inf
+        while sides[0][1] and sides[1][1]:
+            if sides[0][1][0][0] + sides[1][1][0][0] >= best:
+                break
+            side = 0 if sides[0][1][0][0] <= sides[1][1][0][0] else 1
+            dist, heap, settled, indptr, indices, weights = sides[side]
+            other_dist = sides[1 - side][0]
+            t, u = heapq.heappop(heap)
+            if u in settled:
+                continue
+            settled.add(u)
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                candidate = t + weights[k]
+                if candidate < dist.get(v, math.inf):
+                    dist[v] = candidate
+                    heapq.heappush(heap, (candidate, v))
+                if v in other_dist:
+                    best = min(best, candidate + other_dist[v])
+        return best
+
+    def eta_seconds(self, origin, destination):
+        """Travel time in seconds between two (lat, lng) points, including off-road legs"""
+        source, snap_a = self.nearest_node(*origin)
+        target, snap_b = self.nearest_node(*destination)
+        return self.travel_time(source, target) + (snap_a + snap_b) / (OFFROAD_SPEED_KMH / 3.6)
+
+    def rank_by_eta(self, destination, resources):
+        """Sort resources by travel time to a (lat, lng) destination.
+
+        Returns (eta_seconds, resource) pairs, nearest first; resources without
+        coordinates or without a road connection are ranked last with inf.
+        """
+        target, snap_target = self.nearest_node(*destination)
+        times = self.one_to_many(target, reverse=True)
+        ranked = []
+        located = []
+        for resource in resources:
+            coords = document_coordinates(resource)
+            if coords is None:
+                ranked.append((math.inf, resource))
+            else:
+                located.append((coords, resource))
+        if located:
+            # Snap every resource in one KD-tree query
+            nodes, snaps = self.nearest_nodes([c[0] for c, _ in located], [c[1] for c, _ in located])
+            etas = times[nodes] + (snaps + snap_target) / (OFFROAD_SPEED_KMH / 3.6)
+            ranked.extend((float(eta), resource) for eta, (_, resource) in zip(etas, located))
+        ranked.sort(key=lambda pair: pair[0])
+        return ranked
+
+
+_graphs = {}
+_graphs_lock = threading.Lock()
+
+
+def load_road_graph(path=None):
+    """Load (once per process) the road graph at ``path``, ``ROAD_GRAPH_PATH`` or the default.
+
+    Returns None when no extract is available, so callers can fall back to
+    priority-only ranking.
+    """
+    path = path or os.getenv('ROAD_GRAPH_PATH') or DEFAULT_GRAPH_PATH
+    with _graphs_lock:
+        if path not in _graphs:
+            if not os.path.exists(path):
+                logger.info(f"No road network extract at {path}; ETA ranking disabled")
+                _graphs[path] = None
+            else:
+                try:
+                    _graphs[path] = RoadGraph.load(path)
+                    logger.info(f"Road network loaded from {path} ({_graphs[path].n_nodes} nodes)")
+                except Exception as e:
+                    logger.error(f"Failed to load road network {path}: {e}")
+                    _graphs[path] = None
+        return _graphs[path]
+
+
+def format_eta(seconds):
+    """Human-readable ETA for tables"""
+    if seconds is None or math.isinf(seconds):
+        return "No route"
+    minutes = int(round(seconds / 60))
+    return f"{minutes // 60}h {minutes % 60:02d}m" if minutes >= 60 else f"{minutes} min"
+
+
+# Example usage
+if __name__ == "__main__":
+    import time
+    print("TESTING: Testing road graph routing...")
+    side = 100
+    rng = np.random.default_rng(3)
+    ids = np.arange(side * side).reshape(side, side)
+    lat = 35.0 + np.repeat(np.arange(side), side) * 0.01
+    lng = 74.0 + np.tile(np.arange(side), side) * 0.01
+    src = np.concatenate([ids[:, :-1].ravel(), ids[:-1, :].ravel()])
+    dst = np.concatenate([ids[:, 1:].ravel(), ids[1:, :].ravel()])
+    seconds = rng.uniform(30, 240, len(src))
+    graph = RoadGraph(lat, lng, np.concatenate([src, dst]), np.concatenate([dst, src]),
+                      np.concatenate([seconds, seconds]))
+
+    started = time.perf_counter()
+    graph.one_to_many(0)
+    print(f"One-to-many over {graph.n_nodes} nodes: {(time.perf_counter() - started) * 1000:.1f} ms")
+    started = time.perf_counter()
+    graph.one_to_many(0)
+    print(f"Cached one-to-many: {(time.perf_counter() - started) * 1000:.3f} ms")
+    started = time.perf_counter()
+    t = graph.travel_time(0, graph.n_nodes - 1)
+    print(f"Bidirectional point-to-point: {t / 60:.1f} min in {(time.perf_counter() - started) * 1000:.1f} ms")
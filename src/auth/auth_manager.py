@@ -2,18 +2,21 @@
 """Authentication manager for Disaster_Management_System."""
 import os
 from typing import Optional, Dict
-from pymongo import MongoClient
+from ..utils.mongo_pool import get_database
 from datetime import datetime
 import hashlib
 import secrets
 import bcrypt
 
+# Accounts have always lived in their own database, apart from the
+# application data in MONGODB_DATABASE
+AUTH_DATABASE = 'disasterconnect'
+
 class AuthManager:
     """Manages user authentication, registration, and session management."""
     
     def __init__(self):
-        self.mongo_client = MongoClient(os.getenv('MONGODB_URI', 'mongodb://localhost:27017/'))
-        self.db = self.mongo_client.disasterconnect
+        self.db = get_database(os.getenv('MONGODB_AUTH_DATABASE') or AUTH_DATABASE)
         self.users = self.db.users
         self._current_user = None
         
@@ -116,6 +119,6 @@ class AuthManager:
         return self._current_user is not None
     
     def close_connection(self):
-        """Close database connection."""
-        if self.mongo_client:
-            self.mongo_client.close()
\ No newline at end of file
+        """Release this manager's database handles; the shared pool stays open."""
+        self.users = None
+        self.db = None
\ No newline at end of file
@@ -1,13 +1,35 @@
 """Alert management widget for Disaster_management_system."""
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                           QPushButton, QFrame, QTableWidget, QTableWidgetItem,
+                           QPushButton, QFrame,
                            QComboBox, QLineEdit, QDialog, QFormLayout,
                            QTextEdit, QMessageBox, QHeaderView)
 from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtGui import QIcon, QColor
+from PyQt5.QtGui import QIcon
 import os
 from datetime import datetime
 
+from src.models.hotspots import HOTSPOT_ALERT_TITLE, current_hotspots, hotspot_alert
+from src.widgets.filter_pipeline import FilterPipeline, filter_records
+from src.widgets.record_table import Column, RecordTable, RowAction, format_timestamp
+
+# Fields the search box matches against
+SEARCH_FIELDS = ('title', 'area', 'message')
+
+# Text colours for alert types and severities
+TYPE_COLORS = {
+    'Emergency': '#dc3545',
+    'Warning': '#ffc107',
+    'Advisory': '#17a2b8',
+    'Information': '#28a745'
+}
+SEVERITY_COLORS = {
+    'Critical': '#dc3545',
+    'High': '#ffc107',
+    'Medium': '#17a2b8',
+    'Low': '#28a745'
+}
+DEFAULT_COLOR = '#6c757d'
+
 class AlertDialog(QDialog):
     """Dialog for creating/editing alerts."""
     
@@ -143,6 +165,11 @@ class AlertWidget(QWidget):
         add_button.clicked.connect(self.show_alert_dialog)
         header_layout.addWidget(add_button, alignment=Qt.AlignRight)
         
+        # Alerts for current incident hotspots
+        hotspot_button = QPushButton("Hotspot Alerts")
+        hotspot_button.clicked.connect(self.add_hotspot_alerts)
+        header_layout.addWidget(hotspot_button, alignment=Qt.AlignRight)
+        
         layout.addWidget(header)
         
         # Filters
@@ -183,11 +210,18 @@ class AlertWidget(QWidget):
         layout.addWidget(filter_frame)
         
         # Alert table
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels([
-            "Title", "Type", "Severity", "Area", "Message", "Time", "Actions"
-        ])
+        self.table = RecordTable([
+            Column("Title", 'title'),
+            Column("Type", 'type', colors=lambda t: (None, TYPE_COLORS.get(t, DEFAULT_COLOR))),
+            Column("Severity", 'severity', colors=lambda s: (None, SEVERITY_COLORS.get(s, DEFAULT_COLOR))),
+            Column("Area", 'area'),
+            Column("Message", 'message'),
+            Column("Time", 'timestamp', format=format_timestamp),
+            Column("Actions", actions=[
+                RowAction("Edit", self.show_alert_dialog),
+                RowAction("Delete", self.delete_alert),
+            ]),
+        ], key='id')
         
         # Set column widths
         header = self.table.horizontalHeader()
@@ -200,6 +234,9 @@ class AlertWidget(QWidget):
         header.setSectionResizeMode(6, QHeaderView.ResizeToContents)
         
         layout.addWidget(self.table)
+        self.alerts = []
+        self.filter_pipeline = FilterPipeline(self.table, self.query_alerts,
+                                              snapshot=lambda: tuple(self.alerts), parent=self)
         
         # Set stylesheet
         self.setStyleSheet("""
@@ -219,16 +256,16 @@ class AlertWidget(QWidget):
                 border-color: #1a73e8;
                 background-color: white;
             }
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 border: none;
                 border-radius: 8px;
                 margin: 10px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #e8f0fe;
                 color: #1a73e8;
             }
@@ -262,6 +299,7 @@ class AlertWidget(QWidget):
         # For now, using dummy data
         alerts = [
             {
+                'id': 'alert_flash_flood',
                 'title': 'Flash Flood Warning',
                 'type': 'Emergency',
                 'severity': 'Critical',
@@ -270,6 +308,7 @@ class AlertWidget(QWidget):
                 'timestamp': '2024-02-20T10:30:00'
             },
             {
+                'id': 'alert_power_outage',
                 'title': 'Power Outage Advisory',
                 'type': 'Advisory',
                 'severity': 'Medium',
@@ -279,72 +318,46 @@ class AlertWidget(QWidget):
             }
         ]
         
-        self.update_table(alerts)
+        self.alerts = alerts
+        # A pending filter result is based on the old list
+        self.filter_pipeline.cancel()
+        self.update_table(self.query_alerts(self.filter_params(), alerts))
+    
+    def add_hotspot_alerts(self):
+        """Replace hotspot alerts with ones for the current incident hotspots."""
+        try:
+            hotspots = current_hotspots()
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"Failed to detect hotspots: {str(e)}")
+            return
+        alerts = [a for a in self.alerts if not a['title'].startswith(HOTSPOT_ALERT_TITLE)]
+        self.alerts = [hotspot_alert(hotspot) for hotspot in hotspots] + alerts
+        self.filter_pipeline.cancel()
+        self.update_table(self.query_alerts(self.filter_params(), self.alerts))
+        if not hotspots:
+            QMessageBox.information(self, "Hotspots", "No incident hotspots in the last 24 hours.")
     
     def update_table(self, alerts):
         """Update the alert table with data."""
-        self.table.setRowCount(0)
-        for alert in alerts:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            
-            # Add alert data
-            self.table.setItem(row, 0, QTableWidgetItem(alert['title']))
-            
-            # Type with color coding
-            type_item = QTableWidgetItem(alert['type'])
-            type_color = {
-                'Emergency': '#dc3545',
-                'Warning': '#ffc107',
-                'Advisory': '#17a2b8',
-                'Information': '#28a745'
-            }.get(alert['type'], '#6c757d')
-            type_item.setForeground(QColor(type_color))
-            self.table.setItem(row, 1, type_item)
-            
-            # Severity with color coding
-            severity_item = QTableWidgetItem(alert['severity'])
-            severity_color = {
-                'Critical': '#dc3545',
-                'High': '#ffc107',
-                'Medium': '#17a2b8',
-                'Low': '#28a745'
-            }.get(alert['severity'], '#6c757d')
-            severity_item.setForeground(QColor(severity_color))
-            self.table.setItem(row, 2, severity_item)
-            
-            self.table.setItem(row, 3, QTableWidgetItem(alert['area']))
-            self.table.setItem(row, 4, QTableWidgetItem(alert['message']))
-            
-            # Format timestamp
-            timestamp = datetime.fromisoformat(alert['timestamp'])
-            time_str = timestamp.strftime("%Y-%m-%d %H:%M")
-            self.table.setItem(row, 5, QTableWidgetItem(time_str))
-            
-            # Add action buttons
-            action_widget = QWidget()
-            action_layout = QHBoxLayout(action_widget)
-            action_layout.setContentsMargins(4, 4, 4, 4)
-            
-            edit_btn = QPushButton("Edit")
-            edit_btn.setObjectName("action-button")
-            edit_btn.clicked.connect(lambda checked, a=alert: self.show_alert_dialog(a))
-            
-            delete_btn = QPushButton("Delete")
-            delete_btn.setObjectName("action-button")
-            delete_btn.clicked.connect(lambda checked, r=row: self.delete_alert(r))
-            
-            action_layout.addWidget(edit_btn)
-            action_layout.addWidget(delete_btn)
-            
-            self.table.setCellWidget(row, 6, action_widget)
+        self.table.set_records(alerts)
     
     def filter_alerts(self):
         """Filter alerts based on search and filters."""
-        # TODO: Implement filtering logic
-        self.load_alerts()
+        self.filter_pipeline.request(self.filter_params())
+    
+    def filter_params(self):
+        return (self.search_input.text(), self.type_filter.currentText(), self.severity_filter.currentText())
+    
+    @staticmethod
+    def query_alerts(params, alerts):
+        """Alerts matching (search text, type filter, severity filter); runs off the UI thread"""
+        text, kind, severity = params
+        return filter_records(alerts, text, SEARCH_FIELDS, {
+            'type': None if kind == "All Types" else kind,
+            'severity': None if severity == "All Severities" else severity,
+        })
     
-    def delete_alert(self, row):
+    def delete_alert(self, alert):
         """Delete an alert."""
         reply = QMessageBox.question(
             self, "Confirm Delete",
@@ -354,4 +367,5 @@ class AlertWidget(QWidget):
         
         if reply == QMessageBox.Yes:
             # TODO: Implement deletion logic
-            self.table.removeRow(row)
+            self.alerts = [r for r in self.alerts if r['id'] != alert['id']]
+            self.table.table_model.remove(alert['id'])
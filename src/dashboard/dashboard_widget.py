@@ -3,15 +3,26 @@ from PyQt5.QtGui import QPixmap
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, 
                              QLabel, QPushButton, QFrame, QGroupBox, QCheckBox)
 
-from ..utils.mongodb_client import get_mongodb_client
-mongodb_client = get_mongodb_client()
 from ..utils.map_client import map_client
+from ..models.columnar import get_columnar
+from ..models.hotspots import current_hotspots, hotspot_alert
+from ..models.live_cache import get_live_cache
+from ..models.statistics import StatisticsService
+from ..widgets.live_updates import LiveCacheSignals
 
 import json
 import os
 from bson import ObjectId
 from datetime import datetime
 
+# Heatmap weight per incident severity
+HEATMAP_INTENSITY = {
+    "Critical": 1.0,
+    "High": 0.7,
+    "Medium": 0.5,
+    "Low": 0.3
+}
+
 class JSONEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, ObjectId):
@@ -20,11 +31,35 @@ class JSONEncoder(json.JSONEncoder):
             return obj.isoformat()
         return super().default(obj)
 
+# Fields the map markers need
+INCIDENT_MARKER_FIELDS = ('location', 'title', 'type', 'severity', 'status')
+RESOURCE_MARKER_FIELDS = ('location', 'name', 'type', 'status', 'capacity')
+
 class DashboardWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._statistics = None
+        # Redraw once the live cache has been seeded in the background
+        self.cache_updates = LiveCacheSignals(get_live_cache(), self)
+        self.cache_updates.changed.connect(self.on_cache_changed)
+        self._drawn_before_seed = False
         self.init_ui()
         
+    @property
+    def statistics(self):
+        """Counts maintained by the live cache, or aggregated by the server until it is seeded"""
+        cache = get_live_cache()
+        if cache.ready.is_set():
+            return cache.statistics()
+        if self._statistics is None:
+            self._statistics = StatisticsService(cache.db)
+        return self._statistics
+        
+    def on_cache_changed(self, name):
+        if self._drawn_before_seed and get_live_cache().ready.is_set():
+            self._drawn_before_seed = False
+            self.refresh_data()
+        
     def init_ui(self):
         """Initialize the dashboard UI"""
         layout = QHBoxLayout()
@@ -85,6 +120,13 @@ class DashboardWidget(QWidget):
         self.alert_radius_checkbox.stateChanged.connect(self.toggle_alert_radius)
         map_controls_layout.addWidget(self.alert_radius_checkbox)
         
+        # Hotspot toggle
+        self.hotspot_checkbox = QCheckBox("Show Hotspots")
+        self.hotspot_checkbox.setChecked(False)
+        self.hotspot_checkbox.stateChanged.connect(self.toggle_hotspots)
+        map_controls_layout.addWidget(self.hotspot_checkbox)
+        self.hotspot_circles = []
+        
         map_controls_group.setLayout(map_controls_layout)
         left_layout.addWidget(map_controls_group)
         
@@ -168,16 +210,18 @@ class DashboardWidget(QWidget):
         try:
             # Clear existing markers
             self.map_widget.clear_markers()
+            self._drawn_before_seed = not get_live_cache().ready.is_set()
             
-            # Update incidents
-            incidents = list(mongodb_client.db.incidents.find()) or []
-            active_incidents = [i for i in incidents if i.get("status") != "Resolved"]
+            # Update incident counts
+            incident_stats = self.statistics.incident_summary()
+            total_incidents = incident_stats['total']
+            active_incidents = total_incidents - incident_stats['by_status'].get("Resolved", 0)
             
-            self.total_incidents_label.setText(f"Total Incidents: {len(incidents)}")
-            self.active_incidents_label.setText(f"Active Incidents: {len(active_incidents)}")
+            self.total_incidents_label.setText(f"Total Incidents: {total_incidents}")
+            self.active_incidents_label.setText(f"Active Incidents: {active_incidents}")
             
             # Add incident markers
-            for incident in incidents:
+            for incident in get_live_cache().incidents.find(fields=INCIDENT_MARKER_FIELDS):
                 location = incident.get("location", {})
                 if location and "lat" in location and "lng" in location:
                     self.map_widget.add_incident_marker(
@@ -191,15 +235,15 @@ class DashboardWidget(QWidget):
                         }
                     )
             
-            # Update resources
-            resources = list(mongodb_client.db.resources.find()) or []
-            available_resources = [r for r in resources if r.get("status") == "Available"]
+            # Update resource counts
+            resource_stats = self.statistics.resource_summary()
+            available_resources = resource_stats['by_status'].get("Available", 0)
             
-            self.total_resources_label.setText(f"Total Resources: {len(resources)}")
-            self.available_resources_label.setText(f"Available Resources: {len(available_resources)}")
+            self.total_resources_label.setText(f"Total Resources: {resource_stats['total']}")
+            self.available_resources_label.setText(f"Available Resources: {available_resources}")
             
             # Add resource markers
-            for resource in resources:
+            for resource in get_live_cache().resources.find(fields=RESOURCE_MARKER_FIELDS):
                 location = resource.get("location", {})
                 if location and "lat" in location and "lng" in location:
                     self.map_widget.add_resource_marker(
@@ -247,38 +291,24 @@ class DashboardWidget(QWidget):
         try:
             if state == Qt.Checked:
                 print("Enabling heatmap...")
-                # Prepare heatmap data from incidents
-                heatmap_points = []
-                incidents = list(mongodb_client.db.incidents.find()) or []
+                # Prepare heatmap data from the shared columnar snapshot of incidents
+                incidents = get_columnar('incidents').snapshot()
+                located = incidents.located()
                 
-                if not incidents:
+                if not located.any():
                     print("No incidents found for heatmap")
                     self.heatmap_checkbox.setChecked(False)
                     return
                 
-                for incident in incidents:
-                    location = incident.get("location", {})
-                    severity = incident.get("severity", "Low")
-                    status = incident.get("status", "Active")
-                    
-                    if location and "lat" in location and "lng" in location:
-                        # Base intensity on severity
-                        base_intensity = {
-                            "Critical": 1.0,
-                            "High": 0.7,
-                            "Medium": 0.5,
-                            "Low": 0.3
-                        }.get(severity, 0.3)
-                        
-                        # Reduce intensity for resolved incidents
-                        if status == "Resolved":
-                            base_intensity *= 0.5
-                        
-                        heatmap_points.append({
-                            "lat": location["lat"],
-                            "lng": location["lng"],
-                            "intensity": base_intensity
-                        })
+                # Base intensity on severity, halved for resolved incidents
+                intensity = incidents.lookup('severity', HEATMAP_INTENSITY, default=0.3)
+                intensity[incidents.where(status="Resolved")] *= 0.5
+                heatmap_points = [
+                    {"lat": lat, "lng": lng, "intensity": weight}
+                    for lat, lng, weight in zip(incidents.lat[located].tolist(),
+                                                incidents.lng[located].tolist(),
+                                                intensity[located].tolist())
+                ]
                 
                 if heatmap_points:
                     print(f"Updating heatmap with {len(heatmap_points)} points")
@@ -297,7 +327,7 @@ class DashboardWidget(QWidget):
     def toggle_alert_radius(self, state):
         """Toggle alert radius circles"""
         try:
-            incidents = list(mongodb_client.db.incidents.find()) or []
+            incidents = get_live_cache().incidents.find()
             for incident in incidents:
                 location = incident.get("location", {})
                 if location and "lat" in location and "lng" in location:
@@ -330,3 +360,22 @@ class DashboardWidget(QWidget):
                         )
         except Exception as e:
             print(f"Error updating alert radius: {e}")
+    
+    def toggle_hotspots(self, state):
+        """Toggle circles around incident hotspots of the last 24 hours"""
+        try:
+            for lat, lng in self.hotspot_circles:
+                self.map_widget.update_alert_radius(lat, lng, 0, {})
+            self.hotspot_circles = []
+            if state == Qt.Checked:
+                for hotspot in current_hotspots():
+                    self.map_widget.update_alert_radius(
+                        hotspot.lat,
+                        hotspot.lng,
+                        max(hotspot.radius_m, 250),
+                        hotspot_alert(hotspot)
+                    )
+                    self.hotspot_circles.append((hotspot.lat, hotspot.lng))
+                print(f"Showing {len(self.hotspot_circles)} hotspots")
+        except Exception as e:
+            print(f"Error updating hotspots: {e}")
@@ -11,6 +11,7 @@ from src.utils.map_client import map_client
 from src.dashboard.incident_widget import IncidentWidget
 from src.dashboard.resource_widget import ResourceWidget
 from src.dashboard.alert_widget import AlertWidget
+from src.widgets.connection_status import ConnectionStatusIndicator
 
 class DashboardWindow(QMainWindow):
     """Main dashboard window for the application."""
@@ -151,6 +152,9 @@ class DashboardWindow(QMainWindow):
         title.setObjectName("page-title")
         header_layout.addWidget(title)
         
+        self.connection_status = ConnectionStatusIndicator()
+        header_layout.addWidget(self.connection_status, alignment=Qt.AlignRight)
+        
         refresh_btn = QPushButton("Refresh")
         refresh_btn.setObjectName("refresh-button")
         refresh_btn.clicked.connect(self.refresh_dashboard)
@@ -1,6 +1,6 @@
 """Incident management widget for Disaster_management_system."""
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                           QPushButton, QFrame, QTableWidget, QTableWidgetItem,
+                           QPushButton, QFrame,
                            QComboBox, QLineEdit, QDialog, QFormLayout,
                            QTextEdit, QMessageBox, QHeaderView)
 from PyQt5.QtCore import Qt, pyqtSignal
@@ -8,6 +8,12 @@ from PyQt5.QtGui import QIcon
 import os
 from datetime import datetime
 
+from src.widgets.filter_pipeline import FilterPipeline, filter_records
+from src.widgets.record_table import Column, RecordTable, RowAction, format_timestamp
+
+# Fields the search box matches against
+SEARCH_FIELDS = ('title', 'location')
+
 class IncidentDialog(QDialog):
     """Dialog for creating/editing incidents."""
     
@@ -175,11 +181,17 @@ class IncidentWidget(QWidget):
         layout.addWidget(filter_frame)
         
         # Incident table
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels([
-            "Title", "Type", "Severity", "Location", "Time", "Actions"
-        ])
+        self.table = RecordTable([
+            Column("Title", 'title'),
+            Column("Type", 'type'),
+            Column("Severity", 'severity'),
+            Column("Location", 'location'),
+            Column("Time", 'timestamp', format=format_timestamp),
+            Column("Actions", actions=[
+                RowAction("Edit", self.show_incident_dialog),
+                RowAction("Delete", self.delete_incident),
+            ]),
+        ], key='id')
         
         # Set column widths
         header = self.table.horizontalHeader()
@@ -191,6 +203,9 @@ class IncidentWidget(QWidget):
         header.setSectionResizeMode(5, QHeaderView.ResizeToContents)
         
         layout.addWidget(self.table)
+        self.incidents = []
+        self.filter_pipeline = FilterPipeline(self.table, self.query_incidents,
+                                              snapshot=lambda: tuple(self.incidents), parent=self)
         
         # Set stylesheet
         self.setStyleSheet("""
@@ -210,16 +225,16 @@ class IncidentWidget(QWidget):
                 border-color: #1a73e8;
                 background-color: white;
             }
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 border: none;
                 border-radius: 8px;
                 margin: 10px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #e8f0fe;
                 color: #1a73e8;
             }
@@ -253,6 +268,7 @@ class IncidentWidget(QWidget):
         # For now, using dummy data
         incidents = [
             {
+                'id': 'inc_flood_downtown',
                 'title': 'Flood in Downtown',
                 'type': 'Natural Disaster',
                 'severity': 'High',
@@ -260,6 +276,7 @@ class IncidentWidget(QWidget):
                 'timestamp': '2024-02-20T10:30:00'
             },
             {
+                'id': 'inc_chemical_spill',
                 'title': 'Chemical Spill',
                 'type': 'Industrial Accident',
                 'severity': 'Critical',
@@ -268,50 +285,32 @@ class IncidentWidget(QWidget):
             }
         ]
         
-        self.update_table(incidents)
+        self.incidents = incidents
+        # A pending filter result is based on the old list
+        self.filter_pipeline.cancel()
+        self.update_table(self.query_incidents(self.filter_params(), incidents))
     
     def update_table(self, incidents):
         """Update the incident table with data."""
-        self.table.setRowCount(0)
-        for incident in incidents:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            
-            # Add incident data
-            self.table.setItem(row, 0, QTableWidgetItem(incident['title']))
-            self.table.setItem(row, 1, QTableWidgetItem(incident['type']))
-            self.table.setItem(row, 2, QTableWidgetItem(incident['severity']))
-            self.table.setItem(row, 3, QTableWidgetItem(incident['location']))
-            
-            # Format timestamp
-            timestamp = datetime.fromisoformat(incident['timestamp'])
-            time_str = timestamp.strftime("%Y-%m-%d %H:%M")
-            self.table.setItem(row, 4, QTableWidgetItem(time_str))
-            
-            # Add action buttons
-            action_widget = QWidget()
-            action_layout = QHBoxLayout(action_widget)
-            action_layout.setContentsMargins(4, 4, 4, 4)
-            
-            edit_btn = QPushButton("Edit")
-            edit_btn.setObjectName("action-button")
-            edit_btn.clicked.connect(lambda checked, i=incident: self.show_incident_dialog(i))
-            
-            delete_btn = QPushButton("Delete")
-            delete_btn.setObjectName("action-button")
-            delete_btn.clicked.connect(lambda checked, r=row: self.delete_incident(r))
-            
-            action_layout.addWidget(edit_btn)
-            action_layout.addWidget(delete_btn)
-            
-            self.table.setCellWidget(row, 5, action_widget)
+        self.table.set_records(incidents)
     
     def filter_incidents(self):
         """Filter incidents based on search and filters."""
-        # TODO: Implement filtering logic
-        self.load_incidents()
+        self.filter_pipeline.request(self.filter_params())
+    
+    def filter_params(self):
+        return (self.search_input.text(), self.type_filter.currentText(), self.severity_filter.currentText())
+    
+    @staticmethod
+    def query_incidents(params, incidents):
+        """Incidents matching (search text, type filter, severity filter); runs off the UI thread"""
+        text, kind, severity = params
+        return filter_records(incidents, text, SEARCH_FIELDS, {
+            'type': None if kind == "All Types" else kind,
+            'severity': None if severity == "All Severities" else severity,
+        })
     
-    def delete_incident(self, row):
+    def delete_incident(self, incident):
         """Delete an incident."""
         reply = QMessageBox.question(
             self, "Confirm Delete",
@@ -321,4 +320,5 @@ class IncidentWidget(QWidget):
         
         if reply == QMessageBox.Yes:
             # TODO: Implement deletion logic
-            self.table.removeRow(row)
+            self.incidents = [r for r in self.incidents if r['id'] != incident['id']]
+            self.table.table_model.remove(incident['id'])
@@ -1,6 +1,6 @@
 """Resource management widget for Disaster_management_system."""
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                           QPushButton, QFrame, QTableWidget, QTableWidgetItem,
+                           QPushButton, QFrame,
                            QComboBox, QLineEdit, QDialog, QFormLayout,
                            QSpinBox, QMessageBox, QHeaderView)
 from PyQt5.QtCore import Qt, pyqtSignal
@@ -8,6 +8,13 @@ from PyQt5.QtGui import QIcon
 import os
 from datetime import datetime
 
+from src.models.resource_stats import ResourceCounters
+from src.widgets.filter_pipeline import FilterPipeline, filter_records
+from src.widgets.record_table import Column, RecordTable, RowAction, format_timestamp
+
+# Fields the search box matches against
+SEARCH_FIELDS = ('name', 'location')
+
 class ResourceDialog(QDialog):
     """Dialog for adding/editing resources."""
     
@@ -191,12 +198,24 @@ class ResourceWidget(QWidget):
         
         layout.addWidget(filter_frame)
         
+        # Status summary served from counters maintained over the loaded resources
+        self.counters = ResourceCounters()
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+        
         # Resource table
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels([
-            "Name", "Type", "Quantity", "Location", "Status", "Last Updated", "Actions"
-        ])
+        self.table = RecordTable([
+            Column("Name", 'name'),
+            Column("Type", 'type'),
+            Column("Quantity", 'quantity'),
+            Column("Location", 'location'),
+            Column("Status", 'status'),
+            Column("Last Updated", 'last_updated', format=format_timestamp),
+            Column("Actions", actions=[
+                RowAction("Edit", self.show_resource_dialog),
+                RowAction("Delete", self.delete_resource),
+            ]),
+        ], key='_id')
         
         # Set column widths
         header = self.table.horizontalHeader()
@@ -209,6 +228,9 @@ class ResourceWidget(QWidget):
         header.setSectionResizeMode(6, QHeaderView.ResizeToContents)
         
         layout.addWidget(self.table)
+        self.resources = []
+        self.filter_pipeline = FilterPipeline(self.table, self.query_resources,
+                                              snapshot=lambda: tuple(self.resources), parent=self)
         
         # Set stylesheet
         self.setStyleSheet("""
@@ -228,16 +250,16 @@ class ResourceWidget(QWidget):
                 border-color: #1a73e8;
                 background-color: white;
             }
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 border: none;
                 border-radius: 8px;
                 margin: 10px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #e8f0fe;
                 color: #1a73e8;
             }
@@ -271,6 +293,7 @@ class ResourceWidget(QWidget):
         # For now, using dummy data
         resources = [
             {
+                '_id': 'res_ambulance_a1',
                 'name': 'Ambulance A1',
                 'type': 'Transportation',
                 'quantity': 1,
@@ -279,6 +302,7 @@ class ResourceWidget(QWidget):
                 'last_updated': '2024-02-20T10:30:00'
             },
             {
+                '_id': 'res_medical_kit',
                 'name': 'Medical Supplies Kit',
                 'type': 'Medical Supplies',
                 'quantity': 50,
@@ -288,51 +312,40 @@ class ResourceWidget(QWidget):
             }
         ]
         
-        self.update_table(resources)
+        self.resources = resources
+        self.counters.load(resources)
+        self.update_summary()
+        # A pending filter result is based on the old list
+        self.filter_pipeline.cancel()
+        self.update_table(self.query_resources(self.filter_params(), resources))
+    
+    def update_summary(self):
+        """Show resource counts per status from the in-memory counters."""
+        counts = self.counters.status_counts()
+        parts = [f"{status.title()}: {n}" for status, n in sorted(counts.items())]
+        self.summary_label.setText(f"Total: {sum(counts.values())}" + "".join(f" | {p}" for p in parts))
     
     def update_table(self, resources):
         """Update the resource table with data."""
-        self.table.setRowCount(0)
-        for resource in resources:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            
-            # Add resource data
-            self.table.setItem(row, 0, QTableWidgetItem(resource['name']))
-            self.table.setItem(row, 1, QTableWidgetItem(resource['type']))
-            self.table.setItem(row, 2, QTableWidgetItem(str(resource['quantity'])))
-            self.table.setItem(row, 3, QTableWidgetItem(resource['location']))
-            self.table.setItem(row, 4, QTableWidgetItem(resource['status']))
-            
-            # Format timestamp
-            timestamp = datetime.fromisoformat(resource['last_updated'])
-            time_str = timestamp.strftime("%Y-%m-%d %H:%M")
-            self.table.setItem(row, 5, QTableWidgetItem(time_str))
-            
-            # Add action buttons
-            action_widget = QWidget()
-            action_layout = QHBoxLayout(action_widget)
-            action_layout.setContentsMargins(4, 4, 4, 4)
-            
-            edit_btn = QPushButton("Edit")
-            edit_btn.setObjectName("action-button")
-            edit_btn.clicked.connect(lambda checked, r=resource: self.show_resource_dialog(r))
-            
-            delete_btn = QPushButton("Delete")
-            delete_btn.setObjectName("action-button")
-            delete_btn.clicked.connect(lambda checked, r=row: self.delete_resource(r))
-            
-            action_layout.addWidget(edit_btn)
-            action_layout.addWidget(delete_btn)
-            
-            self.table.setCellWidget(row, 6, action_widget)
+        self.table.set_records(resources)
     
     def filter_resources(self):
         """Filter resources based on search and filters."""
-        # TODO: Implement filtering logic
-        self.load_resources()
+        self.filter_pipeline.request(self.filter_params())
+    
+    def filter_params(self):
+        return (self.search_input.text(), self.type_filter.currentText(), self.status_filter.currentText())
+    
+    @staticmethod
+    def query_resources(params, resources):
+        """Resources matching (search text, type filter, status filter); runs off the UI thread"""
+        text, kind, status = params
+        return filter_records(resources, text, SEARCH_FIELDS, {
+            'type': None if kind == "All Types" else kind,
+            'status': None if status == "All Statuses" else status,
+        })
     
-    def delete_resource(self, row):
+    def delete_resource(self, resource):
         """Delete a resource."""
         reply = QMessageBox.question(
             self, "Confirm Delete",
@@ -342,4 +355,7 @@ class ResourceWidget(QWidget):
         
         if reply == QMessageBox.Yes:
             # TODO: Implement deletion logic
-            self.table.removeRow(row)
+            self.resources = [r for r in self.resources if r['_id'] != resource['_id']]
+            self.table.table_model.remove(resource['_id'])
+            self.counters.forget(resource['_id'])
+            self.update_summary()
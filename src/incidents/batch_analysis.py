@@ -0,0 +1,136 @@
+"""Bulk AI analysis of incidents on a bounded QThreadPool.
+
+``BatchAnalyzer.start`` splits the incidents into chunks and runs each chunk
+as a QRunnable on the analyzer's own pool. Workers never touch Qt objects.
+They append ``(incident_id, resources)`` pairs to a locked buffer. A timer
+on the UI thread drains the buffer every ``flush_interval_ms`` and emits one
+``results_ready`` and one ``progress`` signal per drain. The table therefore
+repaints at most a few times per second however fast the predictor runs.
+
+``cancel`` stops every chunk, running or queued, before its next incident.
+Results already produced are still delivered, and ``finished`` then
+reports the totals and throughput.
+"""
+import logging
+import threading
+import time
+from typing import Dict, List
+
+from PyQt5.QtCore import QObject, QRunnable, QThread, QThreadPool, QTimer, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 32
+FLUSH_INTERVAL_MS = 100
+
+
+class _ChunkTask(QRunnable):
+    def __init__(self, analyzer, incidents):
+        super().__init__()
+        self.analyzer = analyzer
+        self.incidents = incidents
+
+    def run(self):
+        analyzer = self.analyzer
+        try:
+            for incident in self.incidents:
+                if analyzer._cancelled.is_set():
+                    break
+                try:
+                    resources = analyzer.predictor.recommend_resources(incident.get('type'), incident.get('severity'))
+                    analyzer._collect(incident.get('id'), resources)
+                except Exception as e:
+                    logger.error(f"AI prediction failed for {incident.get('id')}: {e}")
+                    analyzer._collect(incident.get('id'), None)
+        finally:
+            analyzer._task_done()
+
+
+class BatchAnalyzer(QObject):
+    """Runs predictor.recommend_resources over many incidents without blocking the UI"""
+
+    results_ready = pyqtSignal(dict)  # incident_id -> resources, coalesced
+    progress = pyqtSignal(int, int)  # done, total
+    finished = pyqtSignal(dict)  # totals and throughput
+
+    def __init__(self, predictor, max_threads: int = None, chunk_size: int = CHUNK_SIZE,
+                 flush_interval_ms: int = FLUSH_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self.predictor = predictor
+        self.chunk_size = chunk_size
+        self.pool = QThreadPool(self)
+        # Leave a core for the UI thread
+        self.pool.setMaxThreadCount(max_threads or max(1, min(4, QThread.idealThreadCount() - 1)))
+        self.timer = QTimer(self)
+        self.timer.setInterval(flush_interval_ms)
+        self.timer.timeout.connect(self._flush)
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._buffer: Dict = {}
+        self._pending_tasks = 0
+        self._reset_counts(0)
+
+    def _reset_counts(self, total):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self._started = self._ended = time.perf_counter()
+
+    def is_running(self) -> bool:
+        return self.timer.isActive()
+
+    def start(self, incidents: List[Dict]):
+        if self.is_running():
+            raise RuntimeError("Batch analysis is already running")
+        self._cancelled.clear()
+        self._buffer = {}
+        self._reset_counts(len(incidents))
+        chunks = [incidents[i:i + self.chunk_size] for i in range(0, len(incidents), self.chunk_size)]
+        self._pending_tasks = len(chunks)
+        self.timer.start()
+        for chunk in chunks:
+            self.pool.start(_ChunkTask(self, chunk))
+        logger.info(f"Analyzing {len(incidents)} incidents in {len(chunks)} chunks "
+                    f"on {self.pool.maxThreadCount()} threads")
+        if not chunks:
+            self._flush()
+
+    def cancel(self):
+        # Queued chunks still run, but return before their first incident
+        self._cancelled.set()
+
+    def _collect(self, incident_id, resources):
+        with self._lock:
+            self._buffer[incident_id] = resources
+
+    def _task_done(self):
+        with self._lock:
+            self._pending_tasks -= 1
+            self._ended = time.perf_counter()
+
+    def _flush(self):
+        with self._lock:
+            batch, self._buffer = self._buffer, {}
+            finished = self._pending_tasks <= 0
+        if batch:
+            results = {k: v for k, v in batch.items() if v is not None}
+            self.failed += len(batch) - len(results)
+            self.done += len(batch)
+            if results:
+                self.results_ready.emit(results)
+            self.progress.emit(self.done, self.total)
+        if finished:
+            self.timer.stop()
+            self.finished.emit(self.stats())
+
+    def stats(self) -> Dict:
+        seconds = self._ended - self._started
+        return {
+            'total': self.total,
+            'analyzed': self.done - self.failed,
+            'failed': self.failed,
+            'cancelled': self._cancelled.is_set(),
+            'seconds': seconds,
+            'per_second': self.done / seconds if seconds > 0 else 0.0,
+            'threads': self.pool.maxThreadCount(),
+        }
@@ -14,6 +14,26 @@ import json
 import logging
 from datetime import datetime
 
+from .batch_analysis import BatchAnalyzer
+from src.models.dedup import DuplicateDetector
+from .journal_store import JournalStore
+from .recommendation_store import get_recommendation_store
+from .search_index import IncidentSearchIndex
+from src.utils.ids import new_id
+from src.widgets.filter_pipeline import FilterPipeline
+from src.widgets.record_table import Column, RecordTable, RowAction, format_timestamp
+
+# Table colours: severity (background, foreground) and AI status backgrounds
+SEVERITY_COLORS = {
+    'Critical': ('#e74c3c', '#ffffff'),  # Red
+    'High': ('#e67e22', '#ffffff'),  # Orange
+    'Medium': ('#f1c40f', None),  # Yellow
+}
+LOW_SEVERITY_COLORS = ('#2ecc71', '#ffffff')  # Green
+AI_READY_COLOR = '#dcffdc'
+AI_PENDING_COLOR = '#ffffc8'
+SEVERITY_RANK = {"Low": 0, "Medium": 1, "High": 2, "Critical": 3}
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -619,88 +639,120 @@ class IncidentManager:
     
     def __init__(self):
         self.data_file = os.path.join(current_dir, "..", "data", "incidents.json")
-        self.incidents = []
+        self.store = None
+        # Set when the data file could not be read and was replaced by an empty store
+        self.load_error = None
+        self.search_index = IncidentSearchIndex()
+        self.duplicates = DuplicateDetector()
         self.load_incidents()
     
+    @property
+    def incidents(self):
+        return list(self.store.values()) if self.store is not None else []
+    
     def load_incidents(self):
-        """Load incidents from JSON file"""
+        """Load incidents from the snapshot and replay the journal"""
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    self.incidents = json.load(f)
-                print(f"✅ Loaded {len(self.incidents)} incidents from {self.data_file}")
+            existed = os.path.exists(self.data_file)
+            if self.store is None:
+                self.store = JournalStore(self.data_file)
+            else:
+                self.store.load()
+            self.search_index = IncidentSearchIndex(self.store.values())
+            self.duplicates = DuplicateDetector()
+            self.duplicates.load(self.store.values())
+            if existed:
+                print(f"✅ Loaded {len(self.store)} incidents from {self.data_file}")
             else:
-                self.incidents = []
                 print("ℹ️ No existing incident data found. Starting fresh.")
         except Exception as e:
             logger.error(f"Error loading incidents: {e}")
-            self.incidents = []
+            # Keep the unreadable files for recovery and start empty, so new
+            # incidents are still saved instead of failing on a missing store
+            if self.store is not None:
+                self.store.close()
+            moved = JournalStore.set_aside(self.data_file)
+            self.store = JournalStore(self.data_file)
+            self.search_index = IncidentSearchIndex()
+            self.duplicates = DuplicateDetector()
+            self.load_error = f"{e} (moved to {', '.join(moved)})" if moved else str(e)
     
     def save_incidents(self):
-        """Save incidents to JSON file"""
+        """Compact the journal into data/incidents.json"""
         try:
-            os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
-            with open(self.data_file, 'w') as f:
-                json.dump(self.incidents, f, indent=2)
-            logger.info(f"Saved {len(self.incidents)} incidents to {self.data_file}")
+            self.store.compact()
+            logger.info(f"Saved {len(self.store)} incidents to {self.data_file}")
         except Exception as e:
             logger.error(f"Error saving incidents: {e}")
             raise
     
     def add_incident(self, incident_data):
-        """Add new incident"""
-        incident_id = f"inc_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        """Add new incident, flagged with ``duplicate_of`` if it repeats a recent one"""
+        incident_id = new_id('inc_')
         incident_data['id'] = incident_id
         incident_data['created_at'] = datetime.now().isoformat()
-        self.incidents.append(incident_data)
-        self.save_incidents()
+        duplicate = self.duplicates.observe(incident_data)
+        if duplicate is not None:
+            incident_data['duplicate_of'] = duplicate.incident_id
+            logger.info(f"Incident {incident_id} looks like a duplicate of {duplicate.incident_id} "
+                        f"(similarity {duplicate.similarity:.2f})")
+        self.store.put(incident_data)
+        self.search_index.add(self.store.get(incident_id))
         return incident_id
     
+    def find_duplicate(self, incident_data):
+        """The recent incident a new report most likely repeats, or None"""
+        return self.duplicates.find(dict(incident_data, created_at=datetime.now().isoformat()))
+    
+    def merge_incident(self, incident_id, report):
+        """Fold a duplicate report into an existing incident instead of creating one"""
+        incident = self.store.get(incident_id)
+        if incident is None:
+            return False
+        reports = list(incident.get('merged_reports', []))
+        reports.append(dict({field: report.get(field) for field in ('title', 'description', 'location', 'severity')},
+                            reported_at=datetime.now().isoformat()))
+        updates = {'merged_reports': reports}
+        # The incident is as severe as its worst report
+        if SEVERITY_RANK.get(report.get('severity'), 0) > SEVERITY_RANK.get(incident.get('severity'), 0):
+            updates['severity'] = report['severity']
+        return self.update_incident(incident_id, updates)
+    
     def update_incident(self, incident_id, updated_data):
         """Update existing incident"""
-        for incident in self.incidents:
-            if incident.get('id') == incident_id:
-                incident.update(updated_data)
-                incident['updated_at'] = datetime.now().isoformat()
-                self.save_incidents()
-                return True
-        return False
+        incident = self.store.get(incident_id)
+        if incident is None:
+            return False
+        incident = dict(incident, **updated_data)
+        incident['updated_at'] = datetime.now().isoformat()
+        self.store.put(incident)
+        self.search_index.update(self.store.get(incident_id))
+        self.duplicates.add(self.store.get(incident_id))
+        return True
     
     def delete_incident(self, incident_id):
         """Delete incident by ID"""
-        initial_count = len(self.incidents)
-        self.incidents = [inc for inc in self.incidents if inc.get('id') != incident_id]
-        if len(self.incidents) < initial_count:
-            self.save_incidents()
-            return True
-        return False
+        if not self.store.delete(incident_id):
+            return False
+        self.search_index.remove(incident_id)
+        self.duplicates.remove(incident_id)
+        return True
     
     def get_all_incidents(self):
         """Get all incidents"""
         return self.incidents
     
+    def get_incident(self, incident_id):
+        """Get incident by ID"""
+        return self.store.get(incident_id) if self.store is not None else None
+    
     def search_incidents(self, search_text, type_filter, severity_filter):
         """Search and filter incidents"""
-        filtered_incidents = []
-        
-        for incident in self.incidents:
-            # Search filter
-            if search_text and search_text.lower() not in incident.get('title', '').lower() and \
-               search_text.lower() not in incident.get('description', '').lower() and \
-               search_text.lower() not in incident.get('location', '').lower():
-                continue
-            
-            # Type filter
-            if type_filter != "All Types" and incident.get('type') != type_filter:
-                continue
-            
-            # Severity filter
-            if severity_filter != "All Severities" and incident.get('severity') != severity_filter:
-                continue
-            
-            filtered_incidents.append(incident)
-        
-        return filtered_incidents
+        return self.search_index.search(
+            search_text,
+            type=None if type_filter == "All Types" else type_filter,
+            severity=None if severity_filter == "All Severities" else severity_filter,
+        )
 
 class IncidentWidget(QWidget):
     """Widget for managing incidents with AI predictions."""
@@ -718,7 +770,10 @@ class IncidentWidget(QWidget):
         # Initialize AI predictor with enhanced diagnostics
         self.ai_predictor = None
         self.ai_available = AI_AVAILABLE
-        self.predicted_resources = {}  # Cache for predictions
+        self.recommendations = get_recommendation_store()  # Persistent predictions
+        self.batch_analyzer = None
+        self.batch_incidents = {}
+        self.batch_progress = None
         
         print(f"\n🎯 INITIALIZING INCIDENT WIDGET WITH AI: {'✅ ONLINE' if self.ai_available else '❌ OFFLINE'}")
         
@@ -775,12 +830,11 @@ class IncidentWidget(QWidget):
         """Refresh incident data - called by main window after login"""
         print("🔄 Refreshing incident data...")
         
-        # Clear AI predictions cache
-        self.predicted_resources = {}
-        
         # Reload incidents
         self.incident_manager.load_incidents()
         self.load_incidents()
+        self.table.table_model.refresh()
+        logger.info(f"AI recommendation cache: {self.recommendations.stats()}")
         
         # Hide AI section
         if hasattr(self, 'ai_section'):
@@ -792,11 +846,15 @@ class IncidentWidget(QWidget):
         """Clear all data - useful for logout"""
         print("🧹 Clearing incident data...")
         
+        # Stop any bulk analysis still running
+        if self.batch_analyzer is not None:
+            self.batch_analyzer.cancel()
+        
         # Clear table
-        self.table.setRowCount(0)
+        self.table.set_records([])
         
-        # Clear AI predictions cache
-        self.predicted_resources = {}
+        # Drop cached predictions from memory; they stay on disk
+        self.recommendations.clear_cache()
         
         # Hide AI section
         if hasattr(self, 'ai_section'):
@@ -841,6 +899,13 @@ class IncidentWidget(QWidget):
         
         header_layout.addStretch()
         
+        # Bulk AI analysis of every incident without predictions
+        self.analyze_all_btn = QPushButton("🤖 Analyze All")
+        self.analyze_all_btn.setObjectName("secondary-button")
+        self.analyze_all_btn.setEnabled(self.ai_predictor is not None)
+        self.analyze_all_btn.clicked.connect(self.analyze_all_incidents)
+        header_layout.addWidget(self.analyze_all_btn)
+        
         # Add incident button
         add_button = QPushButton("📝 Report New Incident")
         add_button.setObjectName("primary-button")
@@ -883,11 +948,22 @@ class IncidentWidget(QWidget):
         layout.addWidget(filter_frame)
         
         # Incident table
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)  # Added AI column
-        self.table.setHorizontalHeaderLabels([
-            "Title", "Type", "Severity", "Location", "Time", "AI Status", "Actions"
+        self.table = RecordTable([
+            Column("Title", 'title', default='N/A'),
+            Column("Type", 'type', default='N/A'),
+            Column("Severity", 'severity', default='Medium',
+                   colors=lambda severity: SEVERITY_COLORS.get(severity, LOW_SEVERITY_COLORS)),
+            Column("Location", 'location', default='N/A'),
+            Column("Time", 'timestamp', format=format_timestamp),
+            Column("AI Status", 'id', format=self.ai_status_text, colors=self.ai_status_colors),
+            Column("Actions", actions=[
+                RowAction("✏️ Edit", self.show_incident_dialog),
+                RowAction("🗑️ Delete", self.delete_incident),
+            ]),
         ])
+        # The search index is locked internally, so queries can run off the UI thread
+        self.filter_pipeline = FilterPipeline(
+            self.table, lambda params, _: self.incident_manager.search_incidents(*params), parent=self)
         
         # Set column widths
         header = self.table.horizontalHeader()
@@ -1017,7 +1093,7 @@ class IncidentWidget(QWidget):
         layout.addWidget(self.ai_section)
         
         # Connect table selection
-        self.table.itemSelectionChanged.connect(self.on_incident_selected)
+        self.table.selectionModel().selectionChanged.connect(self.on_incident_selected)
         
         # Set stylesheet
         self.setStyleSheet("""
@@ -1044,17 +1120,17 @@ class IncidentWidget(QWidget):
                 border-color: #3498db;
                 background-color: white;
             }
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 border: 1px solid #bdc3c7;
                 border-radius: 8px;
                 margin: 5px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 10px;
                 border-bottom: 1px solid #ecf0f1;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #3498db;
                 color: white;
             }
@@ -1127,32 +1203,20 @@ class IncidentWidget(QWidget):
     
     def on_incident_selected(self):
         """Handle incident selection in table"""
-        selected_items = self.table.selectedItems()
-        if not selected_items:
+        incident = self.table.selected_record()
+        if incident is None:
             self.ai_section.setVisible(False)
             return
-            
-        row = selected_items[0].row()
-        
-        # Get incident data from table
-        incident_title = self.table.item(row, 0).text()
-        incident_type = self.table.item(row, 1).text()
-        incident_severity = self.table.item(row, 2).text()
-        incident_location = self.table.item(row, 3).text()
-        
-        # Find the actual incident data
-        incident_id = None
-        for incident in self.incident_manager.get_all_incidents():
-            if (incident.get('title') == incident_title and 
-                incident.get('type') == incident_type and
-                incident.get('location') == incident_location):
-                incident_id = incident.get('id')
-                break
+        
+        incident_id = incident.get('id')
+        incident_title = incident.get('title', 'N/A')
+        incident_type = incident.get('type', 'N/A')
+        incident_severity = incident.get('severity', 'Medium')
+        incident_location = incident.get('location', 'N/A')
         
         # Store selected incident data
         self.selected_incident = {
             'id': incident_id,
-            'row': row,
             'title': incident_title,
             'type': incident_type,
             'severity': incident_severity,
@@ -1165,9 +1229,11 @@ class IncidentWidget(QWidget):
             f"<b>Type:</b> {incident_type} | <b>Severity:</b> {incident_severity} | <b>Location:</b> {incident_location}"
         )
         
-        # Check if we already have AI predictions
-        if incident_id and incident_id in self.predicted_resources:
-            self.show_ai_predictions(incident_id)
+        # Check if we already have AI predictions for this revision of the incident
+        # (or, for a flagged duplicate, of its original)
+        resources = self.stored_recommendations(incident_id)
+        if resources is not None:
+            self.show_ai_predictions(resources)
             self.analyze_btn.setVisible(False)
             self.view_details_btn.setVisible(True)
         else:
@@ -1233,21 +1299,82 @@ class IncidentWidget(QWidget):
         
         # Store predictions
         if incident_id:
-            self.predicted_resources[incident_id] = resources
+            incident = self.incident_manager.get_incident(incident_id) or self.selected_incident
+            self.recommendations.put(incident, resources)
             
             # Update AI status in main table
-            ai_status_item = QTableWidgetItem("✅ AI Ready")
-            ai_status_item.setBackground(QColor(220, 255, 220))
-            self.table.setItem(self.selected_incident['row'], 5, ai_status_item)
+            self.table.table_model.refresh([incident_id])
             
             # Show predictions
-            self.show_ai_predictions(incident_id)
+            self.show_ai_predictions(resources)
             self.analyze_btn.setVisible(False)
             self.view_details_btn.setVisible(True)
     
-    def show_ai_predictions(self, incident_id):
+    def analyze_all_incidents(self):
+        """Analyze every incident without predictions on a background thread pool"""
+        if self.ai_predictor is None:
+            QMessageBox.warning(self, "AI Not Available", 
+                              "AI analysis is not available. Please check if AI models are properly installed.")
+            return
+        # Flagged duplicates share their original's recommendations, so they are
+        # only analyzed when the original is gone
+        pending = self.recommendations.unanalyzed(
+            incident for incident in self.incident_manager.get_all_incidents()
+            if not (incident.get('duplicate_of') and self.incident_manager.get_incident(incident['duplicate_of'])))
+        if not pending:
+            QMessageBox.information(self, "AI Analysis", "All incidents have already been analyzed.")
+            return
+        
+        if self.batch_analyzer is None:
+            self.batch_analyzer = BatchAnalyzer(self.ai_predictor, parent=self)
+            self.batch_analyzer.results_ready.connect(self.on_batch_results)
+            self.batch_analyzer.progress.connect(self.on_batch_progress)
+            self.batch_analyzer.finished.connect(self.on_batch_finished)
+        
+        self.batch_progress = QProgressDialog("AI is analyzing incidents...", "Cancel", 0, len(pending), self)
+        self.batch_progress.setWindowTitle("AI Analysis")
+        self.batch_progress.setMinimumDuration(0)
+        self.batch_progress.canceled.connect(self.batch_analyzer.cancel)
+        self.batch_progress.show()
+        self.analyze_all_btn.setEnabled(False)
+        self.batch_incidents = {incident['id']: incident for incident in pending}
+        self.batch_analyzer.start(pending)
+    
+    def on_batch_results(self, results):
+        """Store a coalesced batch of predictions and repaint their rows"""
+        self.recommendations.put_many((self.batch_incidents[incident_id], resources)
+                                      for incident_id, resources in results.items())
+        self.table.table_model.refresh(results.keys())
+        selected = getattr(self, 'selected_incident', None)
+        if selected and selected['id'] in results and self.ai_section.isVisible():
+            self.show_ai_predictions(results[selected['id']])
+            self.analyze_btn.setVisible(False)
+            self.view_details_btn.setVisible(True)
+    
+    def on_batch_progress(self, done, total):
+        if self.batch_progress is not None and not self.batch_progress.wasCanceled():
+            self.batch_progress.setValue(done)
+    
+    def on_batch_finished(self, stats):
+        """Report how many incidents were analyzed and how fast"""
+        if self.batch_progress is not None:
+            self.batch_progress.canceled.disconnect(self.batch_analyzer.cancel)
+            self.batch_progress.close()
+            self.batch_progress = None
+        self.analyze_all_btn.setEnabled(True)
+        self.batch_incidents = {}
+        logger.info(f"AI recommendation cache: {self.recommendations.stats()}")
+        summary = (f"Analyzed {stats['analyzed']} of {stats['total']} incidents in {stats['seconds']:.2f}s "
+                   f"({stats['per_second']:.0f}/s on {stats['threads']} threads)")
+        if stats['failed']:
+            summary += f", {stats['failed']} failed"
+        if stats['cancelled']:
+            summary += " - cancelled"
+        logger.info(summary)
+        QMessageBox.information(self, "AI Analysis", summary)
+    
+    def show_ai_predictions(self, resources):
         """Show AI predictions in the table with enhanced display"""
-        resources = self.predicted_resources[incident_id]
         self.ai_predictions_table.setRowCount(len(resources))
         
         for row, resource in enumerate(resources):
@@ -1334,8 +1461,10 @@ class IncidentWidget(QWidget):
     
     def show_ai_details(self):
         """Show detailed AI recommendations dialog"""
-        if hasattr(self, 'selected_incident') and self.selected_incident['id'] in self.predicted_resources:
-            resources = self.predicted_resources[self.selected_incident['id']]
+        resources = None
+        if hasattr(self, 'selected_incident'):
+            resources = self.stored_recommendations(self.selected_incident['id'])
+        if resources is not None:
             dialog = AIRecommendationsDialog(resources, self)
             dialog.exec_()
         else:
@@ -1357,10 +1486,16 @@ class IncidentWidget(QWidget):
                 success = self.incident_manager.update_incident(incident_data['id'], incident_data)
                 action = "updated"
             else:
-                # Create new incident
-                incident_id = self.incident_manager.add_incident(incident_data)
-                success = bool(incident_id)
-                action = "created"
+                duplicate = self.incident_manager.find_duplicate(incident_data)
+                if duplicate is not None and self.confirm_merge(duplicate):
+                    # Same event reported again: one incident, one demand
+                    success = self.incident_manager.merge_incident(duplicate.incident_id, incident_data)
+                    action = "merged"
+                else:
+                    # Create new incident
+                    incident_id = self.incident_manager.add_incident(incident_data)
+                    success = bool(incident_id)
+                    action = "created"
             
             if success:
                 QMessageBox.information(self, "Success", f"Incident {action} successfully!")
@@ -1372,122 +1507,80 @@ class IncidentWidget(QWidget):
             logger.error(f"Error saving incident: {e}")
             QMessageBox.critical(self, "Error", f"Failed to save incident: {str(e)}")
     
+    def confirm_merge(self, duplicate):
+        """Ask whether a likely duplicate report should be merged into the existing incident"""
+        original = self.incident_manager.get_incident(duplicate.incident_id) or {}
+        reply = QMessageBox.question(
+            self, "Possible Duplicate",
+            f"This report looks like a duplicate of \"{original.get('title', duplicate.incident_id)}\" "
+            f"({original.get('location', 'unknown location')}, "
+            f"{duplicate.seconds_apart / 60:.0f} min earlier, {duplicate.similarity:.0%} similar).\n\n"
+            f"Merge it into that incident? Choose No to create a separate incident marked as a possible duplicate.",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes
+        )
+        return reply == QMessageBox.Yes
+    
     def load_incidents(self):
         """Load incidents from the backend"""
         try:
             incidents = self.incident_manager.get_all_incidents()
+            # A pending search must not overwrite the full list
+            self.filter_pipeline.cancel()
             self.update_table(incidents)
+            if self.incident_manager.load_error:
+                error, self.incident_manager.load_error = self.incident_manager.load_error, None
+                QMessageBox.warning(self, "Incident Data Unreadable",
+                                    f"Saved incidents could not be loaded: {error}. Starting with an empty list.")
         except Exception as e:
             logger.error(f"Error loading incidents: {e}")
             QMessageBox.critical(self, "Error", f"Failed to load incidents: {str(e)}")
     
     def update_table(self, incidents):
         """Update the incident table with data"""
-        self.table.setRowCount(0)
-        for incident in incidents:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            
-            # Add incident data
-            self.table.setItem(row, 0, QTableWidgetItem(incident.get('title', 'N/A')))
-            self.table.setItem(row, 1, QTableWidgetItem(incident.get('type', 'N/A')))
-            
-            # Severity with color coding
-            severity_item = QTableWidgetItem(incident.get('severity', 'Medium'))
-            severity = incident.get('severity', 'Medium')
-            if severity == 'Critical':
-                severity_item.setBackground(QColor(231, 76, 60))  # Red
-                severity_item.setForeground(QBrush(QColor(255, 255, 255)))
-            elif severity == 'High':
-                severity_item.setBackground(QColor(230, 126, 34))  # Orange
-                severity_item.setForeground(QBrush(QColor(255, 255, 255)))
-            elif severity == 'Medium':
-                severity_item.setBackground(QColor(241, 196, 15))  # Yellow
-            else:  # Low
-                severity_item.setBackground(QColor(46, 204, 113))  # Green
-                severity_item.setForeground(QBrush(QColor(255, 255, 255)))
-            self.table.setItem(row, 2, severity_item)
-            
-            self.table.setItem(row, 3, QTableWidgetItem(incident.get('location', 'N/A')))
-            
-            # Format timestamp
-            timestamp = incident.get('timestamp', '')
-            if timestamp:
-                try:
-                    dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                    time_str = dt.strftime("%Y-%m-%d %H:%M")
-                except:
-                    time_str = timestamp
-            else:
-                time_str = "Unknown"
-            self.table.setItem(row, 4, QTableWidgetItem(time_str))
-            
-            # AI Status column
-            incident_id = incident.get('id')
-            if incident_id and incident_id in self.predicted_resources:
-                ai_status_item = QTableWidgetItem("✅ AI Ready")
-                ai_status_item.setBackground(QColor(220, 255, 220))
-            else:
-                ai_status_item = QTableWidgetItem("🤖 Click to analyze")
-                ai_status_item.setBackground(QColor(255, 255, 200))
-            self.table.setItem(row, 5, ai_status_item)
-            
-            # Add action buttons
-            action_widget = QWidget()
-            action_layout = QHBoxLayout(action_widget)
-            action_layout.setContentsMargins(4, 4, 4, 4)
-            
-            edit_btn = QPushButton("✏️ Edit")
-            edit_btn.setObjectName("action-button")
-            edit_btn.clicked.connect(lambda checked, i=incident: self.show_incident_dialog(i))
-            
-            delete_btn = QPushButton("🗑️ Delete")
-            delete_btn.setObjectName("action-button")
-            delete_btn.clicked.connect(lambda checked, r=row: self.delete_incident(r))
-            
-            action_layout.addWidget(edit_btn)
-            action_layout.addWidget(delete_btn)
-            
-            self.table.setCellWidget(row, 6, action_widget)
+        self.table.set_records(incidents)
+    
+    def stored_recommendations(self, incident_id, count=True):
+        """Current recommendations for an incident, loaded on first use; a flagged
+        duplicate shows its original's"""
+        incident = self.incident_manager.get_incident(incident_id) if incident_id else None
+        if incident is None:
+            return None
+        original = self.incident_manager.get_incident(incident['duplicate_of']) if incident.get('duplicate_of') else None
+        if original is not None:
+            shared = self.recommendations.get(original, count=count)
+            if shared is not None:
+                return shared
+        return self.recommendations.get(incident, count=count)
+    
+    def ai_status_text(self, incident_id):
+        if self.stored_recommendations(incident_id) is not None:
+            return "✅ AI Ready"
+        return "🤖 Click to analyze"
+    
+    def ai_status_colors(self, incident_id):
+        # Same lookup as ai_status_text for the same cell, so it is not counted twice
+        if self.stored_recommendations(incident_id, count=False) is not None:
+            return (AI_READY_COLOR, None)
+        return (AI_PENDING_COLOR, None)
     
     def filter_incidents(self):
-        """Filter incidents based on search and filters"""
-        search_text = self.search_input.text()
-        type_filter = self.type_filter.currentText()
-        severity_filter = self.severity_filter.currentText()
-        
-        filtered_incidents = self.incident_manager.search_incidents(
-            search_text, type_filter, severity_filter
-        )
-        
-        self.update_table(filtered_incidents)
+        """Filter incidents based on search and filters (debounced, off the UI thread)"""
+        self.filter_pipeline.request(self.filter_params())
+    
+    def filter_params(self):
+        return (self.search_input.text(), self.type_filter.currentText(), self.severity_filter.currentText())
     
     def clear_filters(self):
         """Clear all filters"""
         self.search_input.clear()
         self.type_filter.setCurrentIndex(0)
         self.severity_filter.setCurrentIndex(0)
-        self.filter_incidents()
+        self.filter_pipeline.request(self.filter_params(), immediate=True)
     
-    def delete_incident(self, row):
+    def delete_incident(self, incident):
         """Delete an incident"""
-        # Get incident ID from the table
-        incident_title = self.table.item(row, 0).text()
-        incident_type = self.table.item(row, 1).text()
-        incident_location = self.table.item(row, 3).text()
-        
-        # Find the incident in the manager
-        incident_id = None
-        for incident in self.incident_manager.get_all_incidents():
-            if (incident.get('title') == incident_title and 
-                incident.get('type') == incident_type and
-                incident.get('location') == incident_location):
-                incident_id = incident.get('id')
-                break
-        
-        if not incident_id:
-            QMessageBox.warning(self, "Error", "Could not find incident to delete.")
-            return
+        incident_id = incident.get('id')
+        incident_title = incident.get('title', 'N/A')
         
         reply = QMessageBox.question(
             self, "Confirm Delete",
@@ -1499,9 +1592,8 @@ class IncidentWidget(QWidget):
         if reply == QMessageBox.Yes:
             try:
                 if self.incident_manager.delete_incident(incident_id):
-                    # Remove from AI predictions cache
-                    if incident_id in self.predicted_resources:
-                        del self.predicted_resources[incident_id]
+                    # Remove stored AI predictions
+                    self.recommendations.delete(incident_id)
                     
                     self.load_incidents()
                     QMessageBox.information(self, "Success", "Incident deleted successfully!")
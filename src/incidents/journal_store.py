@@ -0,0 +1,158 @@
+"""Journaled JSON store for the incident list kept in data/incidents.json.
+
+Mutations are appended to ``<snapshot>.journal`` as length-prefixed records:
+
+    [4-byte big-endian payload length][4-byte CRC32 of payload][payload]
+
+Each payload is a JSON ``{"op": "put", "doc": {...}}`` or ``{"op": "delete",
+"id": ...}``, so a write costs O(size of one incident) no matter how many
+incidents exist. Loading reads the snapshot (the same JSON list as before)
+and replays the journal over it. A torn or corrupt tail left by a crash fails
+its length or CRC check and is truncated away.
+
+Compaction writes the current state to a temporary file, fsyncs it and
+renames it over the snapshot, then empties the journal. Replaying records
+is idempotent, so a crash between those two steps loses nothing.
+"""
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HEADER = struct.Struct('>II')
+COMPACT_MIN_RECORDS = 1000
+
+
+class JournalStore:
+    """Documents keyed by ``id``, persisted as snapshot plus append-only journal"""
+
+    def __init__(self, snapshot_path: str, key: str = 'id', fsync: bool = False,
+                 compact_min_records: int = COMPACT_MIN_RECORDS):
+        self.snapshot_path = snapshot_path
+        self.journal_path = snapshot_path + '.journal'
+        self.key = key
+        self.fsync = fsync
+        self.compact_min_records = compact_min_records
+        self._documents: Dict[str, Dict] = {}
+        self._journal = None
+        self._journal_records = 0
+        self._lock = threading.RLock()
+        self.load()
+
+    def load(self):
+        """Read the snapshot and replay the journal"""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+            documents = {}
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    for document in json.load(f):
+                        documents[document[self.key]] = document
+            self._documents = documents
+            self._journal_records = self._replay()
+            os.makedirs(os.path.dirname(os.path.abspath(self.journal_path)), exist_ok=True)
+            self._journal = open(self.journal_path, 'ab')
+
+    def _replay(self) -> int:
+        if not os.path.exists(self.journal_path):
+            return 0
+        records = 0
+        with open(self.journal_path, 'rb') as f:
+            data = f.read()
+        offset = 0
+        while offset + HEADER.size <= len(data):
+            length, checksum = HEADER.unpack_from(data, offset)
+            payload = data[offset + HEADER.size:offset + HEADER.size + length]
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                break
+            self._apply(json.loads(payload))
+            offset += HEADER.size + length
+            records += 1
+        if offset < len(data):
+            logger.warning(f"Truncating {len(data) - offset} bytes of incomplete journal in {self.journal_path}")
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(offset)
+        return records
+
+    def _apply(self, record: Dict):
+        if record['op'] == 'put':
+            self._documents[record['doc'][self.key]] = record['doc']
+        else:
+            self._documents.pop(record['id'], None)
+
+    def _append(self, record: Dict):
+        payload = json.dumps(record, separators=(',', ':')).encode('utf-8')
+        self._journal.write(HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        self._apply(record)
+        self._journal_records += 1
+        # Amortized: a rewrite at most every max(N, minimum) mutations keeps writes O(1)
+        if self._journal_records >= max(self.compact_min_records, len(self._documents)):
+            self.compact()
+
+    def put(self, document: Dict):
+        """Insert or replace a document"""
+        with self._lock:
+            self._append({'op': 'put', 'doc': dict(document)})
+
+    def delete(self, document_id) -> bool:
+        with self._lock:
+            if document_id not in self._documents:
+                return False
+            self._append({'op': 'delete', 'id': document_id})
+            return True
+
+    def get(self, document_id) -> Optional[Dict]:
+        with self._lock:
+            return self._documents.get(document_id)
+
+    def values(self) -> Iterator[Dict]:
+        """Documents in insertion order"""
+        with self._lock:
+            return iter(list(self._documents.values()))
+
+    def __len__(self):
+        return len(self._documents)
+
+    def __contains__(self, document_id):
+        return document_id in self._documents
+
+    def compact(self):
+        """Atomically replace the snapshot with the current state and empty the journal"""
+        with self._lock:
+            temporary = self.snapshot_path + '.tmp'
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump(list(self._documents.values()), f, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, self.snapshot_path)
+            self._journal.close()
+            self._journal = open(self.journal_path, 'wb')
+            self._journal_records = 0
+            logger.info(f"Compacted {len(self._documents)} documents into {self.snapshot_path}")
+
+    def close(self):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    @staticmethod
+    def set_aside(snapshot_path: str) -> List[str]:
+        """Rename an unreadable snapshot and its journal out of the way; returns the new paths"""
+        suffix = datetime.now().strftime('.unreadable-%Y%m%d%H%M%S')
+        moved = []
+        for path in (snapshot_path, snapshot_path + '.journal'):
+            if os.path.exists(path):
+                os.replace(path, path + suffix)
+                moved.append(path + suffix)
+        return moved
@@ -0,0 +1,186 @@
+"""Persistent AI resource recommendations for the incidents widget.
+
+Recommendations are stored in SQLite, one row per incident. Each row keeps
+the incident's *revision*: a hash of the fields the predictor reads
+(``MODEL_INPUT_FIELDS``). A lookup whose stored revision differs from the
+incident's current one is stale and counts as a miss. An incident therefore
+needs re-analysis only after its type or severity changes. Edits to title,
+location and the like keep the stored result.
+
+Rows are read on demand through a bounded LRU. Opening the widget reads
+nothing, and the table's AI Status column fetches only the rows it paints.
+Incidents known to have no row are cached too, so repaints of unanalyzed
+rows do not go back to disk. ``stats()`` reports hits, misses, stale rows
+and disk reads.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  'data', 'recommendations.sqlite3')
+MODEL_INPUT_FIELDS = ('type', 'severity')
+CACHE_SIZE = 4096
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recommendations (
+    incident_id TEXT PRIMARY KEY,
+    revision TEXT NOT NULL,
+    resources TEXT NOT NULL,
+    computed_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def revision(incident: Dict) -> str:
+    """Hash of the incident fields that feed the predictor"""
+    inputs = json.dumps([incident.get(field) for field in MODEL_INPUT_FIELDS], default=str)
+    return hashlib.sha1(inputs.encode('utf-8')).hexdigest()[:16]
+
+
+class RecommendationStore:
+    """Recommendations by incident id, valid while the incident's revision is unchanged"""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, cache_size: int = CACHE_SIZE):
+        self.path = path
+        self.cache_size = cache_size
+        self._lock = threading.RLock()
+        self._connection = None
+        # incident id -> (revision, resources), or (None, None) when there is no row
+        self._cache: 'OrderedDict[str, Tuple[Optional[str], Optional[List]]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.loads = 0
+        self.writes = 0
+
+    def _db(self):
+        if self._connection is None:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def _remember(self, incident_id, entry):
+        self._cache[incident_id] = entry
+        self._cache.move_to_end(incident_id)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _entry(self, incident_id):
+        entry = self._cache.get(incident_id)
+        if entry is not None:
+            self._cache.move_to_end(incident_id)
+            return entry
+        self.loads += 1
+        row = self._db().execute('SELECT revision, resources FROM recommendations WHERE incident_id = ?',
+                                 (incident_id,)).fetchone()
+        entry = (row[0], json.loads(row[1])) if row else (None, None)
+        self._remember(incident_id, entry)
+        return entry
+
+    def get(self, incident: Dict, count: bool = True) -> Optional[List[Dict]]:
+        """Stored recommendations for the incident, or None if missing or stale.
+
+        ``count=False`` leaves the hit/miss counters alone, for repeat lookups
+        of the same incident.
+        """
+        incident_id = incident.get('id')
+        if not incident_id:
+            return None
+        with self._lock:
+            stored_revision, resources = self._entry(incident_id)
+            current = stored_revision is not None and stored_revision == revision(incident)
+            if count:
+                if current:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+                    self.stale += stored_revision is not None
+            return resources if current else None
+
+    def unanalyzed(self, incidents: Iterable[Dict]) -> List[Dict]:
+        """Incidents with no stored recommendations for their current revision"""
+        incidents = list(incidents)
+        with self._lock:
+            # One scan of the (id, revision) pairs beats a lookup per incident
+            stored = dict(self._db().execute('SELECT incident_id, revision FROM recommendations'))
+        return [incident for incident in incidents if stored.get(incident.get('id')) != revision(incident)]
+
+    def put(self, incident: Dict, resources: List[Dict]):
+        self.put_many([(incident, resources)])
+
+    def put_many(self, results: Iterable[Tuple[Dict, List[Dict]]]):
+        """Store several incidents' recommendations in one transaction"""
+        rows = [(incident['id'], revision(incident), resources) for incident, resources in results]
+        if not rows:
+            return
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute('BEGIN')
+            try:
+                db.executemany(
+                    'INSERT OR REPLACE INTO recommendations (incident_id, revision, resources, computed_at) '
+                    'VALUES (?, ?, ?, ?)',
+                    [(incident_id, rev, json.dumps(resources, default=str), now) for incident_id, rev, resources in rows])
+                db.execute('COMMIT')
+            except Exception:
+                db.execute('ROLLBACK')
+                raise
+            for incident_id, rev, resources in rows:
+                self._remember(incident_id, (rev, resources))
+            self.writes += len(rows)
+
+    def delete(self, incident_id: str):
+        with self._lock:
+            self._db().execute('DELETE FROM recommendations WHERE incident_id = ?', (incident_id,))
+            self._remember(incident_id, (None, None))
+
+    def clear_cache(self):
+        """Forget the in-memory rows; the next lookups read from disk again"""
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'disk_reads': self.loads,
+                'writes': self.writes,
+                'cached': len(self._cache),
+            }
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_recommendation_store() -> RecommendationStore:
+    """Process-wide store at RECOMMENDATION_STORE_PATH (default src/data/recommendations.sqlite3)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = RecommendationStore(os.getenv('RECOMMENDATION_STORE_PATH') or DEFAULT_STORE_PATH)
+        return _store
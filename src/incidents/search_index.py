@@ -0,0 +1,244 @@
+"""Incrementally maintained search index for the incidents widget.
+
+Search keeps the widget's semantics: the text must occur, case-insensitively,
+as a substring of the title, description or location, and type and severity
+must match exactly. Three structures answer a query without scanning every
+incident:
+
+* token postings: each word of the indexed fields maps to the set of
+  incident slots that contain it. Words found in more than 1/64 of the
+  incidents also keep the postings as a bitset, which is then smaller than
+  the set;
+* trigram postings over the vocabulary: each 3-character gram maps to the
+  words containing it, so a query word is expanded to the indexed words it
+  is a substring of;
+* facet bitsets: for each type and severity value, a Python int with bit
+  ``slot`` set for every incident that has that value.
+
+Postings are combined per query word and intersected across words and
+with the facet bitsets. Multi-word or punctuated queries are then checked
+against the exact substring rule, so results match a full scan.
+"""
+import itertools
+import re
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+SEARCH_FIELDS = ('title', 'description', 'location')
+FACET_FIELDS = ('type', 'severity')
+TOKEN_PATTERN = re.compile(r'\w+')
+GRAM = 3
+SHORT_WORD_CACHE = 256
+INITIAL_CAPACITY = 1024
+
+
+def trigrams(word: str):
+    return {word[i:i + GRAM] for i in range(len(word) - GRAM + 1)}
+
+
+def searchable_text(document: Dict) -> str:
+    # Newline-separated so a query cannot match across two fields
+    return '\n'.join(str(document.get(field) or '') for field in SEARCH_FIELDS).lower()
+
+
+def slots_bitset(slot_sets: Iterable[set], size: int) -> int:
+    """Bitset with the bits of every slot in ``slot_sets`` set"""
+    flags = np.zeros(size, dtype=bool)
+    flags[np.fromiter(itertools.chain.from_iterable(slot_sets), dtype=np.int64)] = True
+    return int.from_bytes(np.packbits(flags, bitorder='little').tobytes(), 'little')
+
+
+def bitset_slots(bits: int) -> np.ndarray:
+    """Indices of the set bits of ``bits``, ascending"""
+    if not bits:
+        return np.empty(0, dtype=np.int64)
+    raw = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, 'little'), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder='little'))
+
+
+class IncidentSearchIndex:
+    """Token, trigram and facet-bitset index over incident documents keyed by ``id``"""
+
+    def __init__(self, documents: Iterable[Dict] = (), key: str = 'id'):
+        self.key = key
+        self._lock = threading.RLock()
+        self._clear()
+        for document in documents:
+            self.add(document)
+
+    def _clear(self):
+        # By slot, None once deleted; an object array so results are gathered in one call
+        self._documents = np.empty(INITIAL_CAPACITY, dtype=object)
+        self._texts: List[Optional[str]] = []
+        self._slots: Dict[str, int] = {}
+        self._postings: Dict[str, set] = {}  # token -> slots
+        self._dense: Dict[str, int] = {}  # token -> bitset, for frequent tokens
+        self._vocabulary: Dict[str, set] = {}  # trigram -> tokens
+        self._facets: Dict[str, Dict[str, int]] = {field: {} for field in FACET_FIELDS}
+        self._live = 0
+        self._vocabulary_version = 0
+        self._short_words: Dict = {}
+
+    def __len__(self):
+        return len(self._slots)
+
+    def add(self, document: Dict):
+        """Index a new document, or re-index one whose id is already present"""
+        with self._lock:
+            document_id = document[self.key]
+            slot = self._slots.get(document_id)
+            if slot is not None:
+                self._unindex(slot)
+            else:
+                slot = len(self._texts)
+                if slot == len(self._documents):
+                    self._documents = np.concatenate([self._documents, np.empty(slot, dtype=object)])
+                self._texts.append(None)
+                self._slots[document_id] = slot
+            self._index(slot, document)
+
+    update = add
+
+    def remove(self, document_id) -> bool:
+        with self._lock:
+            slot = self._slots.pop(document_id, None)
+            if slot is None:
+                return False
+            self._unindex(slot)
+            self._documents[slot] = self._texts[slot] = None
+            # Slots are never reused so results stay in insertion order; repack when sparse
+            if len(self._texts) > 1024 and len(self._slots) * 2 < len(self._texts):
+                self._rebuild()
+            return True
+
+    def _index(self, slot, document):
+        text = searchable_text(document)
+        self._documents[slot] = document
+        self._texts[slot] = text
+        bit = 1 << slot
+        self._live |= bit
+        for field in FACET_FIELDS:
+            values = self._facets[field]
+            value = document.get(field)
+            values[value] = values.get(value, 0) | bit
+        for token in set(TOKEN_PATTERN.findall(text)):
+            slots = self._postings.get(token)
+            if slots is None:
+                slots = self._postings[token] = set()
+                for gram in trigrams(token):
+                    self._vocabulary.setdefault(gram, set()).add(token)
+                self._vocabulary_version += 1
+            slots.add(slot)
+            dense = self._dense.get(token)
+            if dense is not None:
+                self._dense[token] = dense | bit
+            elif len(slots) * 64 > len(self._texts) and len(slots) >= 64:
+                self._dense[token] = slots_bitset([slots], len(self._texts))
+
+    def _unindex(self, slot):
+        document = self._documents[slot]
+        mask = ~(1 << slot)
+        self._live &= mask
+        for field in FACET_FIELDS:
+            values = self._facets[field]
+            value = document.get(field)
+            remaining = values.get(value, 0) & mask
+            if remaining:
+                values[value] = remaining
+            else:
+                values.pop(value, None)
+        for token in set(TOKEN_PATTERN.findall(self._texts[slot])):
+            slots = self._postings[token]
+            slots.discard(slot)
+            dense = self._dense.get(token)
+            if dense is not None:
+                if len(slots) * 128 < len(self._texts):
+                    del self._dense[token]
+                else:
+                    self._dense[token] = dense & mask
+            if not slots:
+                del self._postings[token]
+                for gram in trigrams(token):
+                    tokens = self._vocabulary[gram]
+                    tokens.discard(token)
+                    if not tokens:
+                        del self._vocabulary[gram]
+                self._vocabulary_version += 1
+
+    def _rebuild(self):
+        # In place, under the caller's lock; replacing the lock would let searches in
+        documents = [d for d in self._documents[:len(self._texts)] if d is not None]
+        self._clear()
+        for document in documents:
+            self.add(document)
+
+    def _tokens_containing(self, word: str) -> List[str]:
+        if len(word) >= GRAM:
+            grams = sorted((self._vocabulary.get(g, ()) for g in trigrams(word)), key=len)
+            if not grams[0]:
+                return []
+            return [token for token in grams[0] if word in token and all(token in g for g in grams[1:])]
+        # One or two characters: scan the vocabulary once per vocabulary version
+        key = (word, self._vocabulary_version)
+        tokens = self._short_words.get(key)
+        if tokens is None:
+            if len(self._short_words) >= SHORT_WORD_CACHE:
+                self._short_words.clear()
+            tokens = self._short_words[key] = [token for token in self._postings if word in token]
+        return tokens
+
+    def _facet_mask(self, facets: Dict[str, Optional[str]]) -> int:
+        mask = self._live
+        for field, value in facets.items():
+            if value is not None:
+                mask &= self._facets[field].get(value, 0)
+        return mask
+
+    def _word_matches(self, word: str):
+        """Slots with an indexed word containing ``word``: a set if small, else a bitset"""
+        bits = 0
+        sparse, total = [], 0
+        for token in self._tokens_containing(word):
+            dense = self._dense.get(token)
+            if dense is not None:
+                bits |= dense
+            else:
+                slots = self._postings[token]
+                sparse.append(slots)
+                total += len(slots)
+        if not bits and total * 64 <= len(self._texts):
+            return set().union(*sparse)
+        if sparse:
+            bits |= slots_bitset(sparse, len(self._texts))
+        return bits
+
+    def search(self, text: str = '', type: Optional[str] = None, severity: Optional[str] = None) -> List[Dict]:
+        """Documents matching all given filters, in insertion order"""
+        with self._lock:
+            facets = {'type': type, 'severity': severity}
+            bits = facet_bits = self._facet_mask(facets)
+            small = None
+            query = (text or '').lower()
+            words = TOKEN_PATTERN.findall(query)
+            for word in set(words):
+                matched = self._word_matches(word)
+                if isinstance(matched, set):
+                    small = matched if small is None else small & matched
+                else:
+                    bits &= matched
+                if not small and small is not None or not bits:
+                    return []
+            if small is None:
+                slots = bitset_slots(bits)
+            elif bits == facet_bits and len(small) * 64 <= len(self._texts):
+                # Few candidates: comparing their fields beats building a bitset
+                wanted = [(f, v) for f, v in facets.items() if v is not None]
+                slots = sorted(s for s in small if all(self._documents[s].get(f) == v for f, v in wanted))
+            else:
+                slots = bitset_slots(bits & slots_bitset([small], len(self._texts)))
+            if query and not (len(words) == 1 and words[0] == query):
+                texts = self._texts
+                slots = [s for s in np.asarray(slots).tolist() if query in texts[s]]
+            return self._documents[np.asarray(slots, dtype=np.int64)].tolist()
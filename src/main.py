@@ -12,6 +12,11 @@ from src.auth.login_window import LoginWindow
 from src.dashboard.dashboard_window import DashboardWindow
 from src.widgets.splash_screen import SplashScreen
 from src.styles import get_app_stylesheet
+from src.models.query_profiler import start_report_job
+from src.models.write_behind import close_write_behind_queue
+from src.models.offline_store import get_offline_store, offline_mode, stop_offline_sync
+from src.models.resource import ResourceManager
+from src.utils.mongo_pool import close_mongo_clients, get_database
 
 # Load environment variables
 load_dotenv()
@@ -86,6 +91,20 @@ def main():
     # Create and setup main window
     window = MainWindow()
     
+    # Log slow query shapes and index suggestions periodically
+    start_report_job(get_database())
+    
+    # Repair resource counter drift from other processes (or offline sync) periodically
+    resource_manager = ResourceManager(offline=get_offline_store() if offline_mode() else None)
+    reconciliation = resource_manager.start_counter_reconciliation()
+    app.aboutToQuit.connect(reconciliation.stop)
+    
+    # Shared MongoDB clients are only closed once the application exits,
+    # after queued writes are flushed and the offline sync has stopped
+    app.aboutToQuit.connect(close_write_behind_queue)
+    app.aboutToQuit.connect(stop_offline_sync)
+    app.aboutToQuit.connect(close_mongo_clients)
+    
     # Close splash and show main window after 4 seconds
     def show_main_window():
         splash.finish(window)
@@ -0,0 +1,308 @@
+"""Asyncio data access for headless services (ingestion workers, HTTP APIs).
+
+``AsyncIncidentManager`` and ``AsyncResourceManager`` mirror the blocking
+managers method for method, as coroutines. Single-document and paged reads
+go through Motor when it is installed. Everything else, and every read when
+Motor is missing, runs the blocking manager method on a thread pool. That
+keeps counters, write-behind and query profiling in one place.
+
+Concurrency is bounded: at most ``max_concurrency`` calls are in flight, and
+the rest queue on an asyncio semaphore instead of in the driver's wait queue.
+The default bound is the pool's maxPoolSize. Each call finishes within the
+innermost ``deadline()`` block or the manager's ``timeout``, whichever is
+sooner, or raises ``asyncio.TimeoutError``. Offloaded calls also run under
+``pymongo.timeout`` with the remaining time, and Motor reads send it as
+``maxTimeMS``, so the server abandons the operation instead of finishing it
+in the background. The Motor client is the shared one from ``mongo_pool``.
+Managers can be used from several event loops (one semaphore per loop).
+
+    incidents = AsyncIncidentManager(max_concurrency=50, timeout=2.0)
+    with deadline(0.5):
+        incident = await incidents.get_incident(incident_id)
+"""
+import asyncio
+import logging
+import math
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+import pymongo
+from bson import ObjectId
+
+from src.utils.mongo_pool import AsyncIOMotorClient, database_name, get_motor_client, pool_options
+from .incident import IncidentManager
+from .pagination import (DEFAULT_BATCH_SIZE, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, SORT_KEY, Page,
+                         after_cursor, encode_cursor, projection_for)
+from .resource import ResourceManager
+
+logger = logging.getLogger(__name__)
+
+# Absolute time.monotonic() by which the current task's calls must finish
+_deadline: ContextVar[Optional[float]] = ContextVar('async_data_deadline', default=None)
+
+
+@contextmanager
+def deadline(seconds: float):
+    """Bound every call made inside the block; nested blocks can only shorten it"""
+    until = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(until if outer is None else min(outer, until))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def _run_with_timeout(remaining, function, args, kwargs):
+    if remaining is None:
+        return function(*args, **kwargs)
+    if remaining <= 0:
+        raise asyncio.TimeoutError()
+    with pymongo.timeout(remaining):
+        return function(*args, **kwargs)
+
+
+def _max_time_ms(remaining: Optional[float]) -> Optional[int]:
+    """Server-side time limit for a Motor operation with ``remaining`` seconds left"""
+    if remaining is None:
+        return None
+    if remaining <= 0:
+        raise asyncio.TimeoutError()
+    return max(1, math.ceil(remaining * 1000))
+
+
+class AsyncExecutor:
+    """Semaphore-bounded, deadline-bounded execution of blocking and async calls"""
+
+    def __init__(self, max_concurrency: Optional[int] = None, timeout: Optional[float] = None):
+        self.max_concurrency = max_concurrency or pool_options()['maxPoolSize']
+        self.timeout = timeout
+        self._threads = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='async-data')
+        # asyncio primitives belong to one loop; created on first use in each
+        self._semaphores = weakref.WeakKeyDictionary()
+        self.calls = 0
+        self.timeouts = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _expiry(self) -> Optional[float]:
+        limits = [d for d in (_deadline.get(),) if d is not None]
+        if self.timeout is not None:
+            limits.append(time.monotonic() + self.timeout)
+        return min(limits) if limits else None
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def _bounded(self, expiry, make_awaitable):
+        async with self._semaphore():
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                return await make_awaitable(None if expiry is None else expiry - time.monotonic())
+            finally:
+                self.in_flight -= 1
+
+    async def _run(self, make_awaitable):
+        self.calls += 1
+        expiry = self._expiry()
+        try:
+            if expiry is None:
+                return await self._bounded(None, make_awaitable)
+            return await asyncio.wait_for(self._bounded(expiry, make_awaitable), expiry - time.monotonic())
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+
+    async def blocking(self, function, *args, **kwargs):
+        """Run a blocking call on the pool"""
+        loop = asyncio.get_running_loop()
+        return await self._run(lambda remaining: loop.run_in_executor(
+            self._threads, _run_with_timeout, remaining, function, args, kwargs))
+
+    async def coroutine(self, make_coroutine):
+        """Run ``make_coroutine(max_time_ms)`` under the same bounds; ``max_time_ms``
+        (None without a deadline) is meant for the server"""
+        return await self._run(lambda remaining: make_coroutine(_max_time_ms(remaining)))
+
+    def stats(self) -> Dict:
+        return {
+            'max_concurrency': self.max_concurrency,
+            'calls': self.calls,
+            'timeouts': self.timeouts,
+            'in_flight': self.in_flight,
+            'peak_in_flight': self.peak_in_flight,
+        }
+
+    def close(self):
+        self._threads.shutdown(wait=False)
+
+
+async def fetch_page_async(collection, query: Dict = None, limit: int = DEFAULT_PAGE_SIZE,
+                           cursor: Optional[str] = None, fields: Optional[Sequence[str]] = None,
+                           max_time_ms: Optional[int] = None) -> Page:
+    """``pagination.fetch_page`` for a Motor collection"""
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    find = collection.find(after_cursor(query or {}, cursor), projection_for(fields)).sort(SORT_KEY).limit(limit + 1)
+    if max_time_ms is not None:
+        find = find.max_time_ms(max_time_ms)
+    rows = await find.to_list(limit + 1)
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    items = rows[:limit]
+    for row in items:
+        row['_id'] = str(row['_id'])
+    return Page(items, next_cursor)
+
+
+def _offloaded(manager_class, name):
+    async def method(self, *args, **kwargs):
+        return await self.executor.blocking(getattr(self.sync, name), *args, **kwargs)
+    method.__name__ = name
+    method.__doc__ = getattr(manager_class, name).__doc__
+    return method
+
+
+class _AsyncManager:
+    collection_name = None
+
+    def __init__(self, sync, max_concurrency: Optional[int] = None, timeout: Optional[float] = None,
+                 use_motor: Optional[bool] = None):
+        self.sync = sync
+        self.executor = AsyncExecutor(max_concurrency, timeout)
+        if use_motor is None:
+            use_motor = AsyncIOMotorClient is not None
+        elif use_motor and AsyncIOMotorClient is None:
+            raise ValueError("Motor is not installed")
+        self.motor = None
+        if use_motor:
+            self.motor = get_motor_client()[database_name()][self.collection_name]
+        logger.info(f"Async {self.collection_name} access via "
+                    f"{'Motor' if self.motor is not None else 'thread pool'}, "
+                    f"max {self.executor.max_concurrency} concurrent calls")
+
+    async def _get(self, document_id: str) -> Optional[Dict]:
+        if self.motor is None:
+            return await self.executor.blocking(self._sync_get, document_id)
+        document = await self.executor.coroutine(
+            lambda max_time_ms: self.motor.find_one({'_id': ObjectId(document_id)}, max_time_ms=max_time_ms))
+        if document:
+            document['_id'] = str(document['_id'])
+        return document
+
+    async def _page(self, filters, limit, cursor, fields) -> Page:
+        if self.motor is None:
+            return await self.executor.blocking(self._sync_page, filters, limit, cursor, fields)
+        return await self.executor.coroutine(
+            lambda max_time_ms: fetch_page_async(self.motor, filters, limit, cursor, fields, max_time_ms))
+
+    async def _iter(self, filters, batch_size, fields) -> AsyncIterator[List[Dict]]:
+        cursor = None
+        while True:
+            page = await self._page(filters, batch_size, cursor, fields)
+            if page.items:
+                yield page.items
+            if page.next_cursor is None:
+                return
+            cursor = page.next_cursor
+
+    async def _list(self, filters, fields) -> List[Dict]:
+        return [document async for batch in self._iter(filters, DEFAULT_BATCH_SIZE, fields) for document in batch]
+
+    def stats(self) -> Dict:
+        return self.executor.stats()
+
+    def close(self):
+        """Stop the thread pool; the shared clients are closed at shutdown"""
+        self.executor.close()
+
+
+class AsyncIncidentManager(_AsyncManager):
+    """Coroutine version of IncidentManager"""
+
+    collection_name = 'incidents'
+
+    def __init__(self, sync: IncidentManager = None, max_concurrency: Optional[int] = None,
+                 timeout: Optional[float] = None, use_motor: Optional[bool] = None):
+        sync = sync if sync is not None else IncidentManager()
+        self._sync_get = sync.get_incident
+        self._sync_page = sync.page_incidents
+        super().__init__(sync, max_concurrency, timeout, use_motor)
+
+    async def get_incident(self, incident_id: str) -> Optional[Dict]:
+        """Get incident by ID"""
+        return await self._get(incident_id)
+
+    async def page_incidents(self, filters: Dict = None, limit: int = DEFAULT_PAGE_SIZE,
+                             cursor: str = None, fields: Sequence[str] = None) -> Page:
+        """Get one page of incidents after ``cursor`` (from the previous page's next_cursor)"""
+        return await self._page(filters, limit, cursor, fields)
+
+    def iter_incidents(self, filters: Dict = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                       fields: Sequence[str] = None) -> AsyncIterator[List[Dict]]:
+        """Stream incidents in batches (``async for``)"""
+        return self._iter(filters, batch_size, fields)
+
+    async def list_incidents(self, filters: Dict = None, fields: Sequence[str] = None) -> List[Dict]:
+        """List all incidents with optional filters, newest first"""
+        return await self._list(filters, fields)
+
+    create_incident = _offloaded(IncidentManager, 'create_incident')
+    update_incident = _offloaded(IncidentManager, 'update_incident')
+    assign_resource = _offloaded(IncidentManager, 'assign_resource')
+    unassign_resource = _offloaded(IncidentManager, 'unassign_resource')
+    close_incident = _offloaded(IncidentManager, 'close_incident')
+    find_incidents_in_box = _offloaded(IncidentManager, 'find_incidents_in_box')
+    find_incidents_near = _offloaded(IncidentManager, 'find_incidents_near')
+    find_incidents_in_polygon = _offloaded(IncidentManager, 'find_incidents_in_polygon')
+
+
+class AsyncResourceManager(_AsyncManager):
+    """Coroutine version of ResourceManager"""
+
+    collection_name = 'resources'
+
+    def __init__(self, sync: ResourceManager = None, max_concurrency: Optional[int] = None,
+                 timeout: Optional[float] = None, use_motor: Optional[bool] = None):
+        sync = sync if sync is not None else ResourceManager()
+        self._sync_get = sync.get_resource
+        self._sync_page = sync.page_resources
+        super().__init__(sync, max_concurrency, timeout, use_motor)
+
+    async def get_resource(self, resource_id: str) -> Optional[Dict]:
+        """Get resource by ID"""
+        return await self._get(resource_id)
+
+    async def page_resources(self, filters: Dict = None, limit: int = DEFAULT_PAGE_SIZE,
+                             cursor: str = None, fields: Sequence[str] = None) -> Page:
+        """Get one page of resources after ``cursor`` (from the previous page's next_cursor)"""
+        return await self._page(filters, limit, cursor, fields)
+
+    def iter_resources(self, filters: Dict = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                       fields: Sequence[str] = None) -> AsyncIterator[List[Dict]]:
+        """Stream resources in batches (``async for``)"""
+        return self._iter(filters, batch_size, fields)
+
+    async def list_resources(self, filters: Dict = None, fields: Sequence[str] = None) -> List[Dict]:
+        """List all resources with optional filters, newest first"""
+        return await self._list(filters, fields)
+
+    create_resource = _offloaded(ResourceManager, 'create_resource')
+    update_resource = _offloaded(ResourceManager, 'update_resource')
+    assign_to_incident = _offloaded(ResourceManager, 'assign_to_incident')
+    release_from_incident = _offloaded(ResourceManager, 'release_from_incident')
+    mark_maintenance = _offloaded(ResourceManager, 'mark_maintenance')
+    complete_maintenance = _offloaded(ResourceManager, 'complete_maintenance')
+    reconcile_counters = _offloaded(ResourceManager, 'reconcile_counters')
+    get_status_counts = _offloaded(ResourceManager, 'get_status_counts')
+    count_resources = _offloaded(ResourceManager, 'count_resources')
+    find_resources_in_box = _offloaded(ResourceManager, 'find_resources_in_box')
+    find_resources_near = _offloaded(ResourceManager, 'find_resources_near')
+    find_resources_in_polygon = _offloaded(ResourceManager, 'find_resources_in_polygon')
@@ -0,0 +1,324 @@
+"""Columnar NumPy copy of the cached incidents and resources for analytics.
+
+``ColumnarTable`` keeps one array per field instead of one dict per
+document:
+
+* categorical fields (status, severity, type) are int16 codes into a
+  per-field list of categories that only grows, so codes stay valid;
+* ``lat``/``lng`` are float64, NaN for documents without coordinates;
+* timestamp fields are ``datetime64[ms]`` (naive UTC), NaT when missing.
+
+The table registers as an observer of a live-cache ``CollectionCache`` and
+applies each change in O(1) on the cache's sync thread. A deleted row is
+filled with the last row, so the arrays stay dense and row order is
+arbitrary.
+
+``snapshot()`` returns read-only copies of the live rows, cached until the
+next change. The copy is made by the reader that first asks for a new
+version, so writers never copy, readers on any thread see a consistent
+table, and a burst of changes between two snapshots costs a single copy.
+"""
+import logging
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from src.utils.regions import document_coordinates
+from .statistics import INCIDENT_BREAKDOWNS, RESOURCE_BREAKDOWNS
+
+logger = logging.getLogger(__name__)
+
+# Categorical and timestamp columns per cached collection
+COLUMN_SCHEMAS = {
+    'incidents': (INCIDENT_BREAKDOWNS, ('created_at', 'updated_at')),
+    'resources': (RESOURCE_BREAKDOWNS, ('created_at', 'updated_at')),
+}
+INITIAL_CAPACITY = 1024
+NAT = np.datetime64('NaT', 'ms')
+EPOCH = datetime(1970, 1, 1)
+ONE_MS = timedelta(milliseconds=1)
+
+
+def to_datetime64(value) -> np.datetime64:
+    """``datetime64[ms]`` (naive UTC) for datetimes and ISO strings; NaT otherwise"""
+    if isinstance(value, str) and value:
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return NAT
+    if not isinstance(value, datetime):
+        return NAT
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(value, 'ms')
+
+
+def datetime_column(values: Iterable) -> np.ndarray:
+    """``to_datetime64`` over many values; naive datetimes take integer arithmetic,
+    which is an order of magnitude faster than NumPy's datetime object conversion"""
+    millis = [(v - EPOCH) // ONE_MS if type(v) is datetime and v.tzinfo is None
+              else int(to_datetime64(v).astype(np.int64)) for v in values]
+    return np.array(millis, dtype=np.int64).view('datetime64[ms]')
+
+
+class ColumnarSnapshot:
+    """Read-only columns of a ColumnarTable at one version"""
+
+    def __init__(self, version, ids, codes, categories, lat, lng, times):
+        self.version = version
+        self.ids = ids
+        self.codes = codes
+        self.categories = categories
+        self.lat = lat
+        self.lng = lng
+        self.times = times
+
+    def __len__(self):
+        return len(self.ids)
+
+    def code_of(self, field: str, value) -> int:
+        """Code of ``value`` in a categorical field, -1 if no row ever had it"""
+        try:
+            return self.categories[field].index(value)
+        except ValueError:
+            return -1
+
+    def where(self, **equals) -> np.ndarray:
+        """Boolean mask of rows whose categorical fields equal the given values"""
+        mask = np.ones(len(self), dtype=bool)
+        for field, value in equals.items():
+            mask &= self.codes[field] == self.code_of(field, value)
+        return mask
+
+    def between(self, field: str, start=None, end=None) -> np.ndarray:
+        """Boolean mask of rows with ``start <= field <= end``; NaT never matches"""
+        times = self.times[field]
+        mask = ~np.isnat(times)
+        if start is not None:
+            mask &= times >= to_datetime64(start)
+        if end is not None:
+            mask &= times <= to_datetime64(end)
+        return mask
+
+    def located(self) -> np.ndarray:
+        """Boolean mask of rows with coordinates"""
+        return ~np.isnan(self.lat)
+
+    def counts_by(self, field: str, mask: Optional[np.ndarray] = None) -> Dict:
+        """Counts per value of a categorical field, over all rows or a mask"""
+        codes = self.codes[field] if mask is None else self.codes[field][mask]
+        counts = np.bincount(codes, minlength=len(self.categories[field]))
+        return {self.categories[field][code]: int(n) for code, n in enumerate(counts) if n}
+
+    def lookup(self, field: str, values: Dict, default=0.0) -> np.ndarray:
+        """Per-row float from a {category: value} table, e.g. severity weights"""
+        table = np.array([values.get(category, default) for category in self.categories[field]] or [default])
+        return table[self.codes[field]]
+
+    def to_dataframe(self):
+        """pandas DataFrame with categorical columns, built without touching any dict"""
+        import pandas as pd
+        columns = {'_id': self.ids}
+        for field, codes in self.codes.items():
+            categories = self.categories[field]
+            # pandas categories must be unique and non-null; None rows become NaN
+            present = [i for i, c in enumerate(categories) if c is not None]
+            remap = np.full(len(categories) or 1, -1, dtype=np.int32)
+            remap[present] = np.arange(len(present))
+            columns[field] = pd.Categorical.from_codes(remap[codes], [categories[i] for i in present])
+        columns['lat'] = self.lat
+        columns['lng'] = self.lng
+        columns.update(self.times)
+        return pd.DataFrame(columns)
+
+
+class ColumnarTable:
+    """Columns for one collection, kept in step with document changes"""
+
+    def __init__(self, categorical: Sequence[str], timestamps: Sequence[str] = (),
+                 capacity: int = INITIAL_CAPACITY):
+        self.categorical = tuple(categorical)
+        self.timestamps = tuple(timestamps)
+        self._lock = threading.RLock()
+        self._rows: Dict[str, int] = {}
+        self._count = 0
+        self._categories: Dict[str, List] = {field: [] for field in self.categorical}
+        self._code_of: Dict[str, Dict] = {field: {} for field in self.categorical}
+        self._allocate(max(capacity, 1))
+        self.version = 0
+        self.copies = 0
+        self._snapshot: Optional[ColumnarSnapshot] = None
+
+    def _allocate(self, capacity):
+        self._ids = np.empty(capacity, dtype=object)
+        self._codes = {field: np.zeros(capacity, dtype=np.int16) for field in self.categorical}
+        self._lat = np.full(capacity, np.nan)
+        self._lng = np.full(capacity, np.nan)
+        self._times = {field: np.full(capacity, NAT) for field in self.timestamps}
+
+    def _arrays(self):
+        return [self._ids, self._lat, self._lng, *self._codes.values(), *self._times.values()]
+
+    def _replace_arrays(self, resize):
+        """Copy (and optionally resize) every array: ``resize(array) -> array``"""
+        self._ids = resize(self._ids)
+        self._lat = resize(self._lat)
+        self._lng = resize(self._lng)
+        self._codes = {field: resize(a) for field, a in self._codes.items()}
+        self._times = {field: resize(a) for field, a in self._times.items()}
+
+    def _reserve(self, rows_needed):
+        """Grow the arrays (amortized doubling) to hold ``rows_needed`` rows"""
+        capacity = len(self._ids)
+        if rows_needed <= capacity:
+            return
+        capacity = max(rows_needed, capacity * 2)
+        fill = {np.dtype(object): None, np.dtype(np.float64): np.nan, np.dtype('<M8[ms]'): NAT}
+
+        def grow(array):
+            grown = np.full(capacity, fill.get(array.dtype, 0), dtype=array.dtype)
+            grown[:self._count] = array[:self._count]
+            return grown
+        self._replace_arrays(grow)
+
+    def _code(self, field, value):
+        codes = self._code_of[field]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self._categories[field])
+            self._categories[field].append(value)
+            if code > np.iinfo(self._codes[field].dtype).max:
+                self._codes[field] = self._codes[field].astype(np.int32)
+        return code
+
+    def _encode(self, field, values):
+        codes = self._code_of[field]
+        missing = {value for value in values if value not in codes}
+        for value in missing:
+            self._code(field, value)
+        return [codes[value] for value in values]
+
+    def _write(self, row, document_id, document):
+        self._ids[row] = document_id
+        for field in self.categorical:
+            self._codes[field][row] = self._code(field, document.get(field))
+        coordinates = document_coordinates(document)
+        self._lat[row], self._lng[row] = coordinates if coordinates else (np.nan, np.nan)
+        for field in self.timestamps:
+            self._times[field][row] = to_datetime64(document.get(field))
+
+    def upsert(self, document_id: str, document: Dict):
+        with self._lock:
+            row = self._rows.get(document_id)
+            if row is None:
+                self._reserve(self._count + 1)
+                row = self._rows[document_id] = self._count
+                self._count += 1
+            self._write(row, document_id, document)
+            self.version += 1
+
+    def delete(self, document_id: str) -> bool:
+        with self._lock:
+            row = self._rows.pop(document_id, None)
+            if row is None:
+                return False
+            last = self._count - 1
+            if row != last:
+                for array in self._arrays():
+                    array[row] = array[last]
+                self._rows[self._ids[row]] = row
+            self._ids[last] = None
+            self._count = last
+            self.version += 1
+            return True
+
+    def on_change(self, document_id, document):
+        """CollectionCache observer"""
+        if document is None:
+            self.delete(document_id)
+        else:
+            self.upsert(document_id, document)
+
+    def load(self, documents: Iterable[Dict], key: str = '_id'):
+        """Replace the contents with ``documents``, column by column"""
+        documents = list(documents)
+        with self._lock:
+            ids = [str(d[key]) for d in documents]
+            self._allocate(max(len(documents), INITIAL_CAPACITY))
+            self._rows = {document_id: row for row, document_id in enumerate(ids)}
+            self._count = len(documents)
+            self._ids[:self._count] = ids
+            for field in self.categorical:
+                if self._count:
+                    self._codes[field][:self._count] = self._encode(field, [d.get(field) for d in documents])
+            coordinates = [document_coordinates(d) or (np.nan, np.nan) for d in documents]
+            if coordinates:
+                lat_lng = np.array(coordinates, dtype=np.float64)
+                self._lat[:self._count] = lat_lng[:, 0]
+                self._lng[:self._count] = lat_lng[:, 1]
+            for field in self.timestamps:
+                if self._count:
+                    self._times[field][:self._count] = datetime_column(d.get(field) for d in documents)
+            self._snapshot = None
+            self.version += 1
+
+    def __len__(self):
+        return self._count
+
+    def snapshot(self) -> ColumnarSnapshot:
+        """Read-only copy of the current rows; valid for as long as the caller keeps it"""
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version != self.version:
+                n = self._count
+
+                def frozen(array):
+                    array = array[:n].copy()
+                    array.flags.writeable = False
+                    return array
+                self._snapshot = ColumnarSnapshot(
+                    self.version, frozen(self._ids),
+                    {field: frozen(a) for field, a in self._codes.items()},
+                    {field: tuple(c) for field, c in self._categories.items()},
+                    frozen(self._lat), frozen(self._lng),
+                    {field: frozen(a) for field, a in self._times.items()})
+                self.copies += 1
+            return self._snapshot
+
+    def stats(self) -> Dict:
+        """Rows, capacity and bytes held by the arrays and the id -> row map (id strings are shared)"""
+        with self._lock:
+            nbytes = sum(array.nbytes for array in self._arrays())
+            return {
+                'rows': self._count,
+                'capacity': len(self._ids),
+                'array_bytes': nbytes,
+                'bytes_per_row': nbytes / len(self._ids),
+                'index_bytes': sys.getsizeof(self._rows),
+                'copies': self.copies,
+                'version': self.version,
+            }
+
+
+def attach(collection_cache, categorical: Sequence[str], timestamps: Sequence[str] = ()) -> ColumnarTable:
+    """Build a table from a CollectionCache and keep it current with its changes"""
+    table = ColumnarTable(categorical, timestamps)
+    collection_cache.observe(table.on_change, table.load)
+    return table
+
+
+_tables: Dict[str, ColumnarTable] = {}
+_tables_lock = threading.Lock()
+
+
+def get_columnar(name: str) -> ColumnarTable:
+    """Process-wide columnar table over the live cache's ``incidents`` or ``resources``"""
+    from src.models.live_cache import get_live_cache
+    with _tables_lock:
+        if name not in _tables:
+            categorical, timestamps = COLUMN_SCHEMAS[name]
+            _tables[name] = attach(get_live_cache().collections[name], categorical, timestamps)
+            logger.info(f"Columnar {name}: {len(_tables[name])} rows")
+        return _tables[name]
@@ -0,0 +1,288 @@
+"""Near-duplicate detection for newly reported incidents.
+
+During a large event many callers report the same flood or collapse. An
+incident is a likely duplicate of an earlier one when all of these hold:
+
+* its text is similar: the MinHash estimate of the Jaccard similarity of
+  the word sets of title and description is at least ``threshold``;
+* it is close in space: within ``radius_m`` of each other when they have
+  coordinates, or the same normalized location text when they do not;
+* it is close in time: ``created_at`` values at most ``window_hours`` apart.
+
+Candidates are found with LSH: the signature is cut into ``bands`` bands,
+and each band is hashed together with a coarse place key (a grid cell, or
+the location text). Only incidents sharing a band bucket in the cells
+around the new one are compared. Incidents older than the window, relative
+to the newest one seen, are evicted. The cost of a check therefore depends
+on how many similar reports arrived nearby recently, not on how many
+incidents exist.
+
+``get_duplicate_detector()`` is a process-wide detector over the live
+cache's incidents (keyed by ``_id``), so it knows about incidents created by
+any console.
+"""
+import logging
+import math
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from src.utils.regions import document_coordinates
+from src.utils.spatial_index import EARTH_RADIUS_M, haversine_m
+
+logger = logging.getLogger(__name__)
+
+TEXT_FIELDS = ('title', 'description')
+WORD_PATTERN = re.compile(r'\w{3,}')
+NUM_PERM = 64
+BANDS = 16  # 4 rows per band: candidates from a Jaccard similarity of about 0.5
+THRESHOLD = 0.5
+RADIUS_M = 1000.0
+WINDOW_HOURS = 6.0
+CELL_DEGREES = 0.05
+
+
+@dataclass
+class Duplicate:
+    """The earlier incident a new one most likely repeats"""
+
+    incident_id: str
+    similarity: float  # estimated Jaccard similarity of the word sets
+    distance_m: Optional[float]  # None when matched by location text
+    seconds_apart: float
+
+
+class _Entry:
+    __slots__ = ('incident_id', 'signature', 'keys', 'seconds', 'point', 'place')
+
+    def __init__(self, incident_id, signature, keys, seconds, point, place):
+        self.incident_id = incident_id
+        self.signature = signature
+        self.keys = keys
+        self.seconds = seconds
+        self.point = point
+        self.place = place
+
+
+def incident_seconds(incident: Dict) -> float:
+    """``created_at`` (datetime or ISO string) as epoch seconds; now if missing"""
+    value = incident.get('created_at') or incident.get('timestamp')
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            value = None
+    return value.timestamp() if isinstance(value, datetime) else time.time()
+
+
+def place_text(incident: Dict) -> str:
+    location = incident.get('location')
+    text = location if isinstance(location, str) else ''
+    return ' '.join(re.findall(r'\w+', text.lower()))
+
+
+class DuplicateDetector:
+    """MinHash/LSH over report text, bucketed by place, over a sliding time window"""
+
+    def __init__(self, threshold: float = THRESHOLD, radius_m: float = RADIUS_M,
+                 window_hours: float = WINDOW_HOURS, num_perm: int = NUM_PERM, bands: int = BANDS,
+                 key: str = 'id', seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.radius_m = radius_m
+        self.window = window_hours * 3600
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.key = key
+        # Multiply-shift hash family: (a * x + b) mod 2**64, top 32 bits
+        rng = np.random.default_rng(seed)
+        self._a = (rng.integers(1, 2 ** 63, size=(num_perm, 1), dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=(num_perm, 1), dtype=np.uint64)
+        self.cell_degrees = max(CELL_DEGREES, math.degrees(radius_m / EARTH_RADIUS_M))
+        self._lock = threading.RLock()
+        self._buckets: Dict[tuple, set] = {}
+        self._entries: Dict[str, _Entry] = {}
+        self._order = deque()  # (seconds, incident_id) in arrival order
+        self._newest = float('-inf')
+        self.checks = 0
+        self.flagged = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of the word set of ``text``; None if it has no words"""
+        words = set(WORD_PATTERN.findall(text.lower()))
+        if not words:
+            return None
+        hashes = np.fromiter((zlib.crc32(w.encode('utf-8')) for w in words), dtype=np.uint64, count=len(words))
+        # Array arithmetic wraps silently, which is the intended mod 2**64
+        return ((self._a * hashes + self._b) >> np.uint64(32)).min(axis=1).astype(np.uint32)
+
+    def _cell(self, lat, lng):
+        return int(math.floor(lat / self.cell_degrees)), int(math.floor(lng / self.cell_degrees))
+
+    def _places(self, point, place, nearby):
+        """Place keys to bucket under (``nearby=False``) or to search (``nearby=True``)"""
+        if point is None:
+            return [('text', place)] if place else []
+        if not nearby:
+            return [self._cell(*point)]
+        lat, lng = point
+        dlat = math.degrees(self.radius_m / EARTH_RADIUS_M)
+        coslat = math.cos(math.radians(min(89.9, abs(lat) + dlat)))
+        dlng = min(180.0, dlat / coslat)
+        row0, col0 = self._cell(lat - dlat, lng - dlng)
+        row1, col1 = self._cell(lat + dlat, lng + dlng)
+        return [(row, col) for row in range(row0, row1 + 1) for col in range(col0, col1 + 1)]
+
+    def _band_keys(self, signature, places):
+        raw, width = signature.tobytes(), self.rows * signature.itemsize
+        bands = [(i, raw[i * width:(i + 1) * width]) for i in range(self.bands)]
+        return [(i, band, place) for place in places for i, band in bands]
+
+    def _describe(self, incident):
+        text = ' '.join(str(incident.get(field) or '') for field in TEXT_FIELDS)
+        signature = self.signature(text)
+        point = document_coordinates(incident)
+        return signature, point, place_text(incident), incident_seconds(incident)
+
+    def _best(self, signature, point, place, seconds, exclude=None) -> Optional[Duplicate]:
+        seen, best = set(), None
+        for key in self._band_keys(signature, self._places(point, place, nearby=True)):
+            for incident_id in self._buckets.get(key, ()):
+                if incident_id in seen or incident_id == exclude:
+                    continue
+                seen.add(incident_id)
+                entry = self._entries[incident_id]
+                apart = abs(seconds - entry.seconds)
+                if apart > self.window:
+                    continue
+                if point is not None and entry.point is not None:
+                    distance = haversine_m(point[0], point[1], *entry.point)
+                    if distance > self.radius_m:
+                        continue
+                elif place == entry.place:
+                    distance = None
+                else:
+                    continue
+                similarity = float(np.count_nonzero(signature == entry.signature)) / len(signature)
+                if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                    best = Duplicate(incident_id, similarity, distance, apart)
+        return best
+
+    def find(self, incident: Dict) -> Optional[Duplicate]:
+        """Most similar earlier incident that ``incident`` likely repeats, if any"""
+        return self._find(incident.get(self.key), self._describe(incident))
+
+    def _find(self, incident_id, described):
+        signature, point, place, seconds = described
+        if signature is None:
+            return None
+        with self._lock:
+            self.checks += 1
+            match = self._best(signature, point, place, seconds, exclude=incident_id)
+            self.flagged += match is not None
+            return match
+
+    def add(self, incident: Dict):
+        """Remember ``incident`` (by its id) for later checks"""
+        self._add(incident[self.key], self._describe(incident))
+
+    def _add(self, incident_id, described):
+        signature, point, place, seconds = described
+        with self._lock:
+            self.remove(incident_id)
+            if signature is None or seconds < self._newest - self.window:
+                return
+            # Bucketed under its own cell only; searches look at the cells around them
+            keys = self._band_keys(signature, self._places(point, place, nearby=False))
+            for key in keys:
+                self._buckets.setdefault(key, set()).add(incident_id)
+            self._entries[incident_id] = _Entry(incident_id, signature, keys, seconds, point, place)
+            self._order.append((seconds, incident_id))
+            self._newest = max(self._newest, seconds)
+            self._evict()
+
+    def observe(self, incident: Dict) -> Optional[Duplicate]:
+        """``find`` then ``add``: the check to run as each new incident is created"""
+        incident_id, described = incident[self.key], self._describe(incident)
+        match = self._find(incident_id, described)
+        self._add(incident_id, described)
+        return match
+
+    def remove(self, incident_id: str) -> bool:
+        with self._lock:
+            entry = self._entries.pop(incident_id, None)
+            if entry is None:
+                return False
+            for key in entry.keys:
+                bucket = self._buckets[key]
+                bucket.discard(incident_id)
+                if not bucket:
+                    del self._buckets[key]
+            return True
+
+    def _evict(self):
+        horizon = self._newest - self.window
+        order = self._order
+        while order and order[0][0] < horizon:
+            seconds, incident_id = order.popleft()
+            entry = self._entries.get(incident_id)
+            # Skip stale order records of incidents re-added since
+            if entry is not None and entry.seconds == seconds:
+                self.remove(incident_id)
+
+    def load(self, incidents: Iterable[Dict]):
+        """Add existing incidents oldest first; only those inside the window are kept"""
+        incidents = sorted(incidents, key=incident_seconds)
+        if incidents:
+            horizon = incident_seconds(incidents[-1]) - self.window
+            for incident in incidents:
+                if incident_seconds(incident) >= horizon:
+                    self.add(incident)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'tracked': len(self._entries),
+                'buckets': len(self._buckets),
+                'checks': self.checks,
+                'flagged': self.flagged,
+            }
+
+
+def attach(collection_cache, **options) -> DuplicateDetector:
+    """Detector over a CollectionCache of incidents, kept current with its changes"""
+    detector = DuplicateDetector(key='_id', **options)
+
+    def on_change(document_id, document):
+        if document is None:
+            detector.remove(document_id)
+        else:
+            detector.add(document)
+    collection_cache.observe(on_change, detector.load)
+    return detector
+
+
+_detector = None
+_detector_lock = threading.Lock()
+
+
+def get_duplicate_detector() -> DuplicateDetector:
+    """Process-wide duplicate detector over the live cache's incidents"""
+    global _detector
+    from src.models.live_cache import get_live_cache
+    with _detector_lock:
+        if _detector is None:
+            _detector = attach(get_live_cache().incidents)
+            logger.info(f"Duplicate detector: {len(_detector)} recent incidents")
+        return _detector
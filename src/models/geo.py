@@ -0,0 +1,150 @@
+"""Spatial queries against the 2dsphere indexes on ``incidents.location`` and
+``resources.location`` (GeoJSON points, see setup_mongodb.py).
+
+Each query runs on the server first. When the server cannot answer, because
+it is unreachable (or the circuit breaker is open) or the 2dsphere index is
+missing, the same query is answered from a ``GridIndex`` built over the live
+cache, provided the cache is already running and seeded; otherwise
+``GeoQueryUnavailable`` is raised. The local answer treats
+polygon edges as straight lines in lat/lng, while MongoDB treats them as
+geodesics, so results near long edges can differ slightly.
+"""
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pymongo.errors import ConnectionFailure, OperationFailure, PyMongoError
+
+from src.models.live_cache import running_live_cache
+from src.utils.regions import document_coordinates
+from src.utils.spatial_index import GridIndex
+from .pagination import projection_for
+from .statistics import matches
+
+logger = logging.getLogger(__name__)
+
+GEO_FIELD = 'location'
+DEFAULT_GEO_LIMIT = 500
+
+
+class GeoQueryUnavailable(PyMongoError):
+    """The server could not answer a geo query and there is no live cache to answer it locally"""
+
+
+def box_ring(south: float, west: float, north: float, east: float) -> List[Tuple[float, float]]:
+    """Closed (lng, lat) ring for a bounding box"""
+    return [(west, south), (east, south), (east, north), (west, north), (west, south)]
+
+
+def closed_ring(points: Sequence[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    ring = [tuple(p) for p in points]
+    if ring[0] != ring[-1]:
+        ring.append(ring[0])
+    return ring
+
+
+def within_query(ring: Sequence[Tuple[float, float]]) -> Dict:
+    return {GEO_FIELD: {'$geoWithin': {'$geometry': {
+        'type': 'Polygon', 'coordinates': [[list(p) for p in ring]]}}}}
+
+
+def near_query(lat: float, lng: float, radius_m: float) -> Dict:
+    return {GEO_FIELD: {'$nearSphere': {
+        '$geometry': {'type': 'Point', 'coordinates': [lng, lat]},
+        '$maxDistance': radius_m}}}
+
+
+class LocalGeoIndex:
+    """Grid index over cached documents, updated with every cache change"""
+
+    def __init__(self, collection_cache):
+        self.collection_cache = collection_cache
+        self.grid = GridIndex()
+        collection_cache.observe(self.on_change, self.load)
+
+    def load(self, documents):
+        for document in documents:
+            self.on_change(document['_id'], document)
+
+    def on_change(self, document_id, document):
+        coordinates = document_coordinates(document) if document is not None else None
+        if coordinates is None:
+            self.grid.remove(document_id)
+        else:
+            self.grid.insert(document_id, *coordinates)
+
+    def documents(self, keys, filters: Optional[Dict] = None) -> List[Dict]:
+        get = self.collection_cache.get
+        result = [get(key) for key in keys]
+        return [d for d in result if d is not None and matches(d, filters)]
+
+
+class GeoQueries:
+    """Box, radius and polygon queries for one collection"""
+
+    def __init__(self, collection, cache_name: str):
+        self.collection = collection
+        self.cache_name = cache_name
+        self._local = None
+
+    @property
+    def local(self) -> Optional[LocalGeoIndex]:
+        """Index over the live cache, or None while the cache is not running"""
+        if self._local is None:
+            # Never start the cache here: seeding would hit the server that just failed
+            cache = running_live_cache()
+            if cache is not None:
+                self._local = LocalGeoIndex(cache.collections[self.cache_name])
+        return self._local
+
+    def _server(self, geo_filter, filters, fields, limit):
+        query = dict(filters or {}, **geo_filter)
+        rows = list(self.collection.find(query, projection_for(fields)).limit(limit))
+        for row in rows:
+            row['_id'] = str(row['_id'])
+        return rows
+
+    def _project(self, documents, fields):
+        if not fields:
+            return documents
+        keep = set(fields) | {'_id', 'created_at'}
+        return [{k: v for k, v in d.items() if k in keep} for d in documents]
+
+    def _query(self, geo_filter, local_keys, filters, fields, limit):
+        try:
+            return self._server(geo_filter, filters, fields, limit)
+        except (OperationFailure, ConnectionFailure) as e:
+            local = self.local
+            if local is None:
+                raise GeoQueryUnavailable(
+                    f"Geo query on {self.cache_name} failed and the live cache is not running: {e}") from e
+            logger.warning(f"Geo query on {self.cache_name} answered locally: {e}")
+        # Filters are applied after the spatial test, so over-fetch
+        keys = local_keys(local.grid, None if filters else limit)
+        return self._project(local.documents(keys, filters)[:limit], fields)
+
+    def in_box(self, south: float, west: float, north: float, east: float,
+               filters: Optional[Dict] = None, fields: Optional[Sequence[str]] = None,
+               limit: int = DEFAULT_GEO_LIMIT) -> List[Dict]:
+        return self._query(
+            within_query(box_ring(south, west, north, east)),
+            lambda grid, n: grid.within_box(south, west, north, east, n),
+            filters, fields, limit)
+
+    def near(self, lat: float, lng: float, radius_m: float,
+             filters: Optional[Dict] = None, fields: Optional[Sequence[str]] = None,
+             limit: int = DEFAULT_GEO_LIMIT) -> List[Dict]:
+        """Documents within ``radius_m`` meters, nearest first"""
+        return self._query(
+            near_query(lat, lng, radius_m),
+            lambda grid, n: [key for _, key in grid.within_radius(lat, lng, radius_m, n)],
+            filters, fields, limit)
+
+    def in_polygon(self, points: Sequence[Tuple[float, float]],
+                   filters: Optional[Dict] = None, fields: Optional[Sequence[str]] = None,
+                   limit: int = DEFAULT_GEO_LIMIT) -> List[Dict]:
+        """Documents inside a polygon of (lng, lat) vertices"""
+        ring = closed_ring(points)
+        return self._query(
+            within_query(ring),
+            lambda grid, n: grid.within_polygon(ring, n),
+            filters, fields, limit)
@@ -0,0 +1,546 @@
+"""Incident hotspots: incremental grid DBSCAN over a sliding time window.
+
+A hotspot is a DBSCAN cluster of incident locations. A point is *core*
+when at least ``min_points`` incidents (itself included) lie within
+``eps_m`` of it. Core points within ``eps_m`` of each other are in the same
+cluster, and a non-core point within ``eps_m`` of a core point joins as a
+border point. Only incidents created within ``window_hours`` of the newest
+one, or of the time last passed to ``advance()``, take part. Older ones are
+evicted as time advances; ``current_hotspots()`` advances the shared engine
+to now before every query.
+
+Points are projected to meters (equirectangular around ``ref_lat``) and
+bucketed into square cells of side ``eps_m / sqrt(2)``. Any two points in
+one cell are therefore within ``eps_m``: a cell holding ``min_points`` or
+more points is all core, and only points in sparser cells need their
+neighbors counted. The neighbors of a point can only be in the 21 cells
+around its own.
+
+Updates are local. Adding or evicting a point re-checks only the core
+status of points in sparse cells around it. Two core cells are linked
+when some pair of their core points is within ``eps_m``, and each link is
+cached until either cell's core points change. ``hotspots()`` then works
+from the cells changed since the last call:
+
+* a cell that gained core points can only join clusters;
+* a cell that lost core points splits its cluster only if the cells its
+  links connected are no longer connected around it, and only then is
+  that cluster walked again;
+* hotspots within reach of any changed cell are recomputed, others kept.
+
+The cost of an update therefore depends on the density around it, and the
+cost of a query on how much changed, not on how many points the window
+holds.
+
+A border point near two hotspots is counted in both.
+"""
+import heapq
+import logging
+import math
+import threading
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.regions import document_coordinates
+from src.utils.spatial_index import EARTH_RADIUS_M
+
+logger = logging.getLogger(__name__)
+
+EPS_M = 500.0
+MIN_POINTS = 5
+WINDOW_HOURS = 24.0
+# Cells that can hold a point within eps of a point in cell (0, 0), for side eps/sqrt(2)
+NEIGHBOR_OFFSETS = [(di, dj) for di in range(-2, 3) for dj in range(-2, 3) if abs(di) + abs(dj) < 4]
+SEVERITY_ORDER = ('Critical', 'High', 'Medium', 'Low')
+HOTSPOT_ALERT_TITLE = 'Incident hotspot'
+
+
+@dataclass
+class Hotspot:
+    """One cluster of recent incidents"""
+
+    lat: float
+    lng: float
+    radius_m: float  # farthest member from the centroid
+    count: int
+    severity_mix: Dict[str, int]
+    first_seen: datetime
+    last_seen: datetime
+    incident_ids: List[str] = field(repr=False, default_factory=list)
+    core_ids: List[str] = field(repr=False, default_factory=list)
+
+    @property
+    def severity(self) -> str:
+        """The most severe level present in the hotspot"""
+        return next((level for level in SEVERITY_ORDER if self.severity_mix.get(level)), 'Low')
+
+
+def hotspot_alert(hotspot: Hotspot) -> Dict:
+    """Alert record (AlertWidget format) announcing a hotspot"""
+    mix = ', '.join(f"{n} {level}" for level, n in sorted(hotspot.severity_mix.items(), key=lambda item: -item[1]))
+    return {
+        # A border member can sit in two hotspots but a core member only in
+        # one, so the oldest core id identifies it
+        'id': f"hotspot_{min(hotspot.core_ids, default=f'{hotspot.lat:.4f},{hotspot.lng:.4f}')}",
+        'title': f"{HOTSPOT_ALERT_TITLE} at {hotspot.lat:.4f}, {hotspot.lng:.4f}",
+        'type': 'Emergency' if hotspot.severity == 'Critical' else 'Warning',
+        'severity': hotspot.severity,
+        'area': f"Within {hotspot.radius_m / 1000:.1f} km",
+        'message': f"{hotspot.count} incidents since {hotspot.first_seen:%Y-%m-%d %H:%M}: {mix}.",
+        'timestamp': hotspot.last_seen.isoformat(),
+    }
+
+
+class _Point:
+    __slots__ = ('id', 'x', 'y', 'lat', 'lng', 'seconds', 'severity', 'cell', 'core')
+
+    def __init__(self, point_id, x, y, lat, lng, seconds, severity, cell):
+        self.id = point_id
+        self.x = x
+        self.y = y
+        self.lat = lat
+        self.lng = lng
+        self.seconds = seconds
+        self.severity = severity
+        self.cell = cell
+        self.core = False
+
+
+class _Cell:
+    __slots__ = ('points', 'core', 'version')
+
+    def __init__(self):
+        self.points: Dict[str, _Point] = {}
+        self.core: Dict[str, _Point] = {}
+        self.version = 0
+
+
+def _seconds(value) -> Optional[float]:
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    return value.timestamp() if isinstance(value, datetime) else None
+
+
+class HotspotEngine:
+    """Incrementally maintained DBSCAN clusters of incident locations"""
+
+    def __init__(self, eps_m: float = EPS_M, min_points: int = MIN_POINTS,
+                 window_hours: float = WINDOW_HOURS, ref_lat: float = 0.0):
+        self.eps_m = eps_m
+        self.min_points = min_points
+        self.window = window_hours * 3600
+        self._eps2 = eps_m * eps_m
+        self._side = eps_m / math.sqrt(2)
+        self._x_scale = EARTH_RADIUS_M * math.cos(math.radians(ref_lat)) * math.pi / 180
+        self._y_scale = EARTH_RADIUS_M * math.pi / 180
+        self._lock = threading.RLock()
+        self._cells: Dict[Tuple[int, int], _Cell] = {}
+        self._points: Dict[str, _Point] = {}
+        self._expiry: List[Tuple[float, str]] = []  # heap of (seconds, id)
+        self._newest = float('-inf')
+        self._dirty = set()  # cells whose points changed
+        self._grown = set()  # cells that gained core points
+        self._shrunk = set()  # cells that lost core points
+        self._label: Dict[Tuple[int, int], int] = {}
+        self._clusters: Dict[int, set] = {}
+        self._hotspots: Dict[int, Hotspot] = {}
+        self._links: Dict[Tuple, Tuple[int, int, bool]] = {}
+        self._next_label = 0
+        self._version = 0
+        self.core_checks = 0
+
+    def __len__(self):
+        return len(self._points)
+
+    # Core status
+
+    def _within(self, p, q):
+        dx, dy = p.x - q.x, p.y - q.y
+        return dx * dx + dy * dy <= self._eps2
+
+    def _neighbor_cells(self, key):
+        cells, i, j = self._cells, key[0], key[1]
+        for di, dj in NEIGHBOR_OFFSETS:
+            cell = cells.get((i + di, j + dj))
+            if cell is not None:
+                yield cell
+
+    def _is_core(self, p) -> bool:
+        """At least min_points points within eps of ``p``, counting itself"""
+        self.core_checks += 1
+        own = self._cells[p.cell]
+        found = len(own.points)
+        if found >= self.min_points:
+            return True
+        (i, j), x, y, eps2 = p.cell, p.x, p.y, self._eps2
+        for di, dj in NEIGHBOR_OFFSETS:
+            if di or dj:
+                cell = self._cells.get((i + di, j + dj))
+                if cell is None:
+                    continue
+                for q in cell.points.values():
+                    if (q.x - x) ** 2 + (q.y - y) ** 2 <= eps2:
+                        found += 1
+                        if found >= self.min_points:
+                            return True
+        return False
+
+    def _touch(self, cell):
+        # Versions are unique across cells, so a recreated cell never matches a stale link
+        self._version += 1
+        cell.version = self._version
+
+    def _set_core(self, p, core):
+        if p.core == core:
+            return
+        p.core = core
+        cell = self._cells[p.cell]
+        if core:
+            cell.core[p.id] = p
+            self._grown.add(p.cell)
+        else:
+            cell.core.pop(p.id, None)
+            self._shrunk.add(p.cell)
+        self._touch(cell)
+        self._dirty.add(p.cell)
+
+    def _recheck_near(self, p, only_core):
+        """Re-evaluate points in sparse cells within eps of ``p`` (core ones or non-core ones)"""
+        x, y, eps2 = p.x, p.y, self._eps2
+        for cell in list(self._neighbor_cells(p.cell)):
+            if len(cell.points) >= self.min_points:
+                continue
+            for q in [q for q in cell.points.values() if q.core == only_core and q is not p
+                      and (q.x - x) ** 2 + (q.y - y) ** 2 <= eps2]:
+                self._set_core(q, self._is_core(q))
+
+    # Updates
+
+    def add(self, point_id: str, lat: float, lng: float, when, severity: Optional[str] = None):
+        """Add or move one incident; ``when`` is its creation time (datetime, ISO string or epoch seconds)"""
+        seconds = when if isinstance(when, (int, float)) else _seconds(when)
+        if seconds is None:
+            return
+        with self._lock:
+            self._discard(point_id)
+            if seconds < self._newest - self.window:
+                return
+            x, y = lng * self._x_scale, lat * self._y_scale
+            key = (math.floor(x / self._side), math.floor(y / self._side))
+            p = _Point(point_id, x, y, lat, lng, seconds, severity, key)
+            cell = self._cells.get(key)
+            if cell is None:
+                cell = self._cells[key] = _Cell()
+            cell.points[point_id] = p
+            self._points[point_id] = p
+            self._dirty.add(key)
+            if len(cell.points) == self.min_points:
+                for q in list(cell.points.values()):
+                    self._set_core(q, True)
+            else:
+                self._set_core(p, self._is_core(p))
+            # New neighbors can only turn non-core points core
+            self._recheck_near(p, only_core=False)
+            heapq.heappush(self._expiry, (seconds, point_id))
+            if seconds > self._newest:
+                self._newest = seconds
+                self._evict()
+
+    def remove(self, point_id: str) -> bool:
+        with self._lock:
+            return self._discard(point_id)
+
+    def _discard(self, point_id):
+        p = self._points.pop(point_id, None)
+        if p is None:
+            return False
+        cell = self._cells[p.cell]
+        del cell.points[point_id]
+        if p.core:
+            del cell.core[point_id]
+            self._shrunk.add(p.cell)
+            self._touch(cell)
+        self._dirty.add(p.cell)
+        if not cell.points:
+            del self._cells[p.cell]
+        elif len(cell.points) == self.min_points - 1:
+            # No longer dense: every point needs counting again
+            for q in list(cell.points.values()):
+                self._set_core(q, self._is_core(q))
+        # Losing a neighbor can only turn core points non-core
+        self._recheck_near(p, only_core=True)
+        return True
+
+    def _evict(self):
+        horizon = self._newest - self.window
+        expiry = self._expiry
+        while expiry and expiry[0][0] < horizon:
+            seconds, point_id = heapq.heappop(expiry)
+            p = self._points.get(point_id)
+            # Skip heap entries of points moved or re-added since
+            if p is not None and p.seconds == seconds:
+                self._discard(point_id)
+
+    def advance(self, now):
+        """Evict incidents older than the window as of ``now`` (datetime or epoch seconds)"""
+        seconds = now if isinstance(now, (int, float)) else _seconds(now)
+        with self._lock:
+            if seconds is not None and seconds > self._newest:
+                self._newest = seconds
+                self._evict()
+
+    def on_change(self, document_id, document):
+        """CollectionCache observer for the incidents collection"""
+        coordinates = document_coordinates(document) if document is not None else None
+        if coordinates is None:
+            self.remove(document_id)
+        else:
+            self.add(document_id, coordinates[0], coordinates[1], document.get('created_at'),
+                     document.get('severity'))
+
+    # Clusters
+
+    def _linked(self, a, b):
+        """Some core point of cell ``a`` is within eps of one of cell ``b``"""
+        cell_a, cell_b = self._cells.get(a), self._cells.get(b)
+        if cell_a is None or cell_b is None:
+            return False
+        pair = (a, b) if a < b else (b, a)
+        cached = self._links.get(pair)
+        versions = (cell_a.version, cell_b.version) if a < b else (cell_b.version, cell_a.version)
+        if cached is not None and cached[:2] == versions:
+            return cached[2]
+        if len(cell_a.core) * len(cell_b.core) > 256:
+            pa = np.array([(p.x, p.y) for p in cell_a.core.values()])
+            pb = np.array([(p.x, p.y) for p in cell_b.core.values()])
+            linked = bool((((pa[:, None, :] - pb[None, :, :]) ** 2).sum(axis=2) <= self._eps2).any())
+        else:
+            linked = any(self._within(p, q) for p in cell_a.core.values() for q in cell_b.core.values())
+        self._links[pair] = versions + (linked,)
+        return linked
+
+    def _union(self, a, b) -> int:
+        """Merge clusters ``a`` and ``b``, relabeling the smaller; returns the surviving label"""
+        clusters = self._clusters
+        if len(clusters[a]) < len(clusters[b]):
+            a, b = b, a
+        for key in clusters[b]:
+            self._label[key] = a
+        clusters[a] |= clusters.pop(b)
+        self._hotspots.pop(b, None)
+        return a
+
+    def _broken(self, key, label) -> bool:
+        """Cell ``key`` lost core points: may cluster ``label`` have split there?"""
+        labels, links = self._label, self._links
+        i, j = key
+        local = [(i + di, j + dj) for di, dj in NEIGHBOR_OFFSETS
+                 if (di or dj) and labels.get((i + di, j + dj)) == label]
+        # Cells the cluster may have been connected through ``key`` by
+        ends = []
+        for other in local:
+            cached = links.get((key, other) if key < other else (other, key))
+            if cached is not None and cached[2]:
+                ends.append(other)
+        cell = self._cells.get(key)
+        if cell is not None and cell.core:
+            if all(self._linked(key, other) for other in ends):
+                return False
+            local.append(key)
+            ends.append(key)
+        if len(ends) < 2:
+            return False
+        # It still holds together if those cells are connected nearby
+        reached, stack = {ends[0]}, [ends[0]]
+        while stack:
+            a = stack.pop()
+            for b in local:
+                if (b not in reached and abs(a[0] - b[0]) <= 2 and abs(a[1] - b[1]) <= 2
+                        and abs(a[0] - b[0]) + abs(a[1] - b[1]) < 4 and self._linked(a, b)):
+                    reached.add(b)
+                    stack.append(b)
+        return not reached.issuperset(ends)
+
+    def _walk(self, seed) -> int:
+        """Label the core cells reachable from ``seed``, joining clusters it reaches"""
+        cells, labels = self._cells, self._label
+        label, self._next_label = self._next_label, self._next_label + 1
+        labels[seed] = label
+        members = self._clusters[label] = {seed}
+        queue = deque([seed])
+        while queue:
+            key = queue.popleft()
+            i, j = key
+            for di, dj in NEIGHBOR_OFFSETS:
+                other = (i + di, j + dj)
+                if other in members:
+                    continue
+                cell = cells.get(other)
+                if cell is None or not cell.core or not self._linked(key, other):
+                    continue
+                previous = labels.get(other)
+                if previous is not None:
+                    # An intact cluster is already connected: join it whole
+                    label = self._union(label, previous)
+                    members = self._clusters[label]
+                    continue
+                labels[other] = label
+                members.add(other)
+                queue.append(other)
+        return label
+
+    def _relabel(self):
+        dirty, self._dirty = self._dirty, set()
+        grown, self._grown = self._grown, set()
+        shrunk, self._shrunk = self._shrunk, set()
+        cells, labels, clusters = self._cells, self._label, self._clusters
+        broken = set()
+        for key in shrunk:
+            label = labels.get(key)
+            if label is not None and label not in broken and self._broken(key, label):
+                broken.add(label)
+        for key in shrunk:
+            cell = cells.get(key)
+            label = labels.get(key)
+            if label is not None and label not in broken and (cell is None or not cell.core):
+                # A cell that is no longer core leaves its intact cluster
+                del labels[key]
+                members = clusters[label]
+                members.discard(key)
+                if not members:
+                    del clusters[label]
+                    self._hotspots.pop(label, None)
+        seeds = set(grown)
+        for label in broken:
+            self._hotspots.pop(label, None)
+            for key in clusters.pop(label):
+                del labels[key]
+                seeds.add(key)
+        for seed in seeds:
+            cell = cells.get(seed)
+            if cell is None or not cell.core:
+                continue
+            label = labels.get(seed)
+            if label is None:
+                self._walk(seed)
+                continue
+            # Gained core points can only join clusters
+            i, j = seed
+            for di, dj in NEIGHBOR_OFFSETS:
+                other = labels.get((i + di, j + dj))
+                if other is not None and other != label and self._linked(seed, (i + di, j + dj)):
+                    label = self._union(label, other)
+        # Border points change around any changed cell
+        changed = {labels[key] for key in seeds if key in labels}
+        for i, j in dirty:
+            for di, dj in NEIGHBOR_OFFSETS:
+                label = labels.get((i + di, j + dj))
+                if label is not None:
+                    changed.add(label)
+        for label in changed:
+            self._hotspots[label] = self._build(clusters[label])
+        # Drop cached links of cells that no longer exist
+        if len(self._links) > 4 * len(cells) + 1024:
+            self._links = {pair: link for pair, link in self._links.items()
+                           if pair[0] in cells and pair[1] in cells}
+
+    def _build(self, keys) -> Hotspot:
+        cells = self._cells
+        core, candidates, seen = [], [], set(keys)
+        for key in keys:
+            cell = cells[key]
+            core.extend(cell.core.values())
+            if len(cell.core) < len(cell.points):
+                candidates.extend(q for q in cell.points.values() if not q.core)
+            i, j = key
+            for di, dj in NEIGHBOR_OFFSETS:
+                other = (i + di, j + dj)
+                if other not in seen:
+                    seen.add(other)
+                    cell = cells.get(other)
+                    if cell is not None and len(cell.core) < len(cell.points):
+                        candidates.extend(q for q in cell.points.values() if not q.core)
+        members = core
+        if candidates:
+            # Border points: non-core points within eps of a core point of this cluster
+            cxy = np.array([(p.x, p.y) for p in core])
+            bxy = np.array([(q.x, q.y) for q in candidates])
+            near = (((bxy[:, None, :] - cxy[None, :, :]) ** 2).sum(axis=2) <= self._eps2).any(axis=1)
+            members = core + [q for q, border in zip(candidates, near) if border]
+        lats = np.fromiter((p.lat for p in members), dtype=float, count=len(members))
+        lngs = np.fromiter((p.lng for p in members), dtype=float, count=len(members))
+        lat, lng = float(lats.mean()), float(lngs.mean())
+        # Haversine distance to the centroid, vectorized
+        a = (np.sin(np.radians(lats - lat) / 2) ** 2
+             + np.cos(math.radians(lat)) * np.cos(np.radians(lats)) * np.sin(np.radians(lngs - lng) / 2) ** 2)
+        seconds = [p.seconds for p in members]
+        return Hotspot(
+            lat=lat, lng=lng,
+            radius_m=float(2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a.max()))),
+            count=len(members),
+            severity_mix=dict(Counter(p.severity or 'Unknown' for p in members)),
+            first_seen=datetime.fromtimestamp(min(seconds)),
+            last_seen=datetime.fromtimestamp(max(seconds)),
+            incident_ids=[p.id for p in members],
+            core_ids=[p.id for p in core],
+        )
+
+    def hotspots(self, min_count: int = 0) -> List[Hotspot]:
+        """Current hotspots, largest first"""
+        with self._lock:
+            if self._dirty or self._grown or self._shrunk:
+                self._relabel()
+            return sorted((h for h in self._hotspots.values() if h.count >= min_count),
+                          key=lambda h: h.count, reverse=True)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'points': len(self._points),
+                'cells': len(self._cells),
+                'hotspots': len(self._clusters),
+                'dirty_cells': len(self._dirty),
+                'core_checks': self.core_checks,
+            }
+
+
+def attach(collection_cache, **options) -> HotspotEngine:
+    """Engine over a CollectionCache of incidents, kept current with its changes"""
+    engine = HotspotEngine(**options)
+
+    def load(documents):
+        for document in sorted(documents, key=lambda d: _seconds(d.get('created_at')) or 0.0):
+            engine.on_change(document['_id'], document)
+    collection_cache.observe(engine.on_change, load)
+    return engine
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_hotspot_engine() -> HotspotEngine:
+    """Process-wide hotspot engine over the live cache's incidents"""
+    global _engine
+    from src.models.live_cache import get_live_cache
+    with _engine_lock:
+        if _engine is None:
+            _engine = attach(get_live_cache().incidents)
+            logger.info(f"Hotspot engine: {len(_engine)} incidents in window, "
+                        f"{len(_engine.hotspots())} hotspots")
+        return _engine
+
+
+def current_hotspots(min_count: int = 0) -> List[Hotspot]:
+    """Hotspots of the process-wide engine over the window ending now"""
+    engine = get_hotspot_engine()
+    # Otherwise the window ends at the newest incident, however long ago that was
+    engine.advance(datetime.utcnow())
+    return engine.hotspots(min_count)
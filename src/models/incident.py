@@ -1,14 +1,33 @@
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Sequence, Tuple
+from concurrent.futures import Future
 from bson import ObjectId
-from pymongo import MongoClient
-import os
+from src.utils.mongo_pool import get_database
+from src.utils.resilience import resilient_collection
+from .dedup import DuplicateDetector
+from .geo import DEFAULT_GEO_LIMIT, GeoQueries
+from .offline_store import OfflineStore
+from .pagination import DEFAULT_BATCH_SIZE, DEFAULT_PAGE_SIZE, Page, fetch_page, iter_batches
+from .query_profiler import profile_collection
+from .write_behind import WriteBehindQueue
+
+# Columns shown by the incident tables
+INCIDENT_TABLE_FIELDS = ('title', 'type', 'severity', 'location', 'status')
 
 class IncidentManager:
-    def __init__(self):
-        self.mongo_client = MongoClient(os.getenv('MONGODB_URI'))
-        self.db = self.mongo_client.Disaster_Management_System
-        self.incidents = self.db.incidents
+    def __init__(self, write_behind: WriteBehindQueue = None, duplicates: DuplicateDetector = None,
+                 offline: OfflineStore = None):
+        self.db = get_database()
+        self.incidents = profile_collection(resilient_collection(self.db.incidents))
+        self.geo = GeoQueries(self.incidents, 'incidents')
+        # Needed by the queue_* methods, which return a ticket (Future) instead of a bool
+        self.write_behind = write_behind
+        # When set (a DuplicateDetector keyed by '_id'), new incidents that repeat
+        # a recent one are stored with 'duplicate_of'
+        self.duplicates = duplicates
+        # When set, incidents are read from and written to the local store
+        # and OfflineSync reconciles them with the server
+        self.offline = offline
         
     def create_incident(self, data: Dict) -> str:
         """Create a new incident"""
@@ -26,59 +45,120 @@ class IncidentManager:
             'coordinates': data.get('coordinates', None)
         }
         
-        result = self.incidents.insert_one(incident)
-        return str(result.inserted_id)
+        duplicate = self.duplicates.find(incident) if self.duplicates is not None else None
+        if duplicate is not None:
+            incident['duplicate_of'] = duplicate.incident_id
+        
+        if self.offline is not None:
+            incident_id = self.offline.insert('incidents', incident)
+        else:
+            incident_id = str(self.incidents.insert_one(incident).inserted_id)
+        if self.duplicates is not None:
+            self.duplicates.add(dict(incident, _id=incident_id))
+        return incident_id
         
     def update_incident(self, incident_id: str, data: Dict) -> bool:
         """Update an existing incident"""
-        data['updated_at'] = datetime.utcnow()
-        result = self.incidents.update_one(
-            {'_id': ObjectId(incident_id)},
-            {'$set': data}
-        )
-        return result.modified_count > 0
+        return self._update(incident_id, {'$set': data})
+        
+    def queue_update_incident(self, incident_id: str, data: Dict) -> Future:
+        """Queue an incident update on the write-behind queue"""
+        return self._queue(incident_id, {'$set': data})
         
     def get_incident(self, incident_id: str) -> Optional[Dict]:
         """Get incident by ID"""
+        if self.offline is not None:
+            return self.offline.get('incidents', incident_id)
         incident = self.incidents.find_one({'_id': ObjectId(incident_id)})
         if incident:
             incident['_id'] = str(incident['_id'])
         return incident
         
-    def list_incidents(self, filters: Dict = None) -> List[Dict]:
-        """List all incidents with optional filters"""
-        query = filters or {}
-        incidents = list(self.incidents.find(query).sort('created_at', -1))
-        for incident in incidents:
-            incident['_id'] = str(incident['_id'])
-        return incidents
+    def list_incidents(self, filters: Dict = None, fields: Sequence[str] = None) -> List[Dict]:
+        """List all incidents with optional filters, newest first"""
+        if self.offline is not None:
+            return self.offline.find('incidents', filters, fields=fields)
+        return [incident for batch in self.iter_incidents(filters, fields=fields) for incident in batch]
+        
+    def page_incidents(self, filters: Dict = None, limit: int = DEFAULT_PAGE_SIZE,
+                       cursor: str = None, fields: Sequence[str] = None) -> Page:
+        """Get one page of incidents after ``cursor`` (from the previous page's next_cursor)"""
+        return fetch_page(self.incidents, filters, limit, cursor, fields)
+        
+    def iter_incidents(self, filters: Dict = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                       fields: Sequence[str] = None) -> Iterator[List[Dict]]:
+        """Stream incidents in batches without loading the whole collection"""
+        return iter_batches(self.incidents, filters, batch_size, fields)
+        
+    def find_incidents_in_box(self, south: float, west: float, north: float, east: float,
+                           filters: Dict = None, fields: Sequence[str] = None,
+                           limit: int = DEFAULT_GEO_LIMIT) -> List[Dict]:
+        """Incidents located inside a lat/lng bounding box"""
+        return self.geo.in_box(south, west, north, east, filters, fields, limit)
+        
+    def find_incidents_near(self, lat: float, lng: float, radius_m: float,
+                        filters: Dict = None, fields: Sequence[str] = None,
+                        limit: int = DEFAULT_GEO_LIMIT) -> List[Dict]:
+        """Incidents within radius_m meters of a point, nearest first"""
+        return self.geo.near(lat, lng, radius_m, filters, fields, limit)
+        
+    def find_incidents_in_polygon(self, points: Sequence[Tuple[float, float]],
+                               filters: Dict = None, fields: Sequence[str] = None,
+                               limit: int = DEFAULT_GEO_LIMIT) -> List[Dict]:
+        """Incidents inside a polygon of (lng, lat) vertices"""
+        return self.geo.in_polygon(points, filters, fields, limit)
         
     def assign_resource(self, incident_id: str, resource_id: str) -> bool:
         """Assign a resource to an incident"""
-        result = self.incidents.update_one(
-            {'_id': ObjectId(incident_id)},
-            {'$addToSet': {'resources_assigned': resource_id}}
-        )
-        return result.modified_count > 0
+        return self._update(incident_id, {'$addToSet': {'resources_assigned': resource_id}})
+        
+    def queue_assign_resource(self, incident_id: str, resource_id: str) -> Future:
+        """Queue a resource assignment on the write-behind queue"""
+        return self._queue(incident_id, {'$addToSet': {'resources_assigned': resource_id}})
         
     def unassign_resource(self, incident_id: str, resource_id: str) -> bool:
         """Remove a resource from an incident"""
-        result = self.incidents.update_one(
-            {'_id': ObjectId(incident_id)},
-            {'$pull': {'resources_assigned': resource_id}}
-        )
-        return result.modified_count > 0
+        return self._update(incident_id, {'$pull': {'resources_assigned': resource_id}})
         
     def close_incident(self, incident_id: str, resolution_notes: str) -> bool:
         """Close an incident"""
-        result = self.incidents.update_one(
-            {'_id': ObjectId(incident_id)},
-            {
-                '$set': {
-                    'status': 'closed',
-                    'closed_at': datetime.utcnow(),
-                    'resolution_notes': resolution_notes
-                }
+        return self._update(incident_id, self._close_update(resolution_notes))
+        
+    def queue_close_incident(self, incident_id: str, resolution_notes: str) -> Future:
+        """Queue closing an incident on the write-behind queue"""
+        return self._queue(incident_id, self._close_update(resolution_notes))
+        
+    @staticmethod
+    def _close_update(resolution_notes: str) -> Dict:
+        return {
+            '$set': {
+                'status': 'closed',
+                'closed_at': datetime.utcnow(),
+                'resolution_notes': resolution_notes
             }
-        )
-        return result.modified_count > 0
+        }
+        
+    @staticmethod
+    def _stamped(update: Dict) -> Dict:
+        """``update`` also setting updated_at, which polling and offline sync rely on"""
+        return {**update, '$set': dict(update.get('$set', {}), updated_at=datetime.utcnow())}
+        
+    def _update(self, incident_id: str, update: Dict) -> bool:
+        """Apply an update now"""
+        update = self._stamped(update)
+        if self.offline is not None:
+            return self.offline.update('incidents', incident_id, update)
+        result = self.incidents.update_one({'_id': ObjectId(incident_id)}, update)
+        # A spooled write is not acknowledged yet
+        return result.acknowledged and result.modified_count > 0
+        
+    def _queue(self, incident_id: str, update: Dict) -> Future:
+        """Queue an update; the ticket resolves to whether the incident was found"""
+        if self.offline is not None:
+            # Local writes are durable at once
+            ticket = Future()
+            ticket.set_result(self._update(incident_id, update))
+            return ticket
+        if self.write_behind is None:
+            raise RuntimeError("IncidentManager was created without a write-behind queue")
+        return self.write_behind.submit(self.incidents, incident_id, self._stamped(update))
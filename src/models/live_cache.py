@@ -0,0 +1,421 @@
+"""In-memory replica of the incidents and resources collections.
+
+The cache is seeded in the background with one read of each collection and
+then kept current from a change stream; until seeding finishes views see an
+empty (or partially filled) cache and ``ready`` is unset. On deployments without change streams (standalone
+servers) it polls for documents whose ``updated_at`` is past the last one it
+saw, and periodically compares ``_id`` sets to pick up deletions and writes
+that did not touch ``updated_at``. Hash indexes on status, severity, type and
+id are updated incrementally with every change, so views filter and count
+without a round trip. Reads return copies, so callers cannot corrupt the
+cached documents or their indexes. Replication lag (commit or update time to
+apply time) is sampled for every change applied.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from bson import ObjectId
+from pymongo.errors import OperationFailure, PyMongoError
+
+from src.utils.mongo_pool import get_database
+from .statistics import INCIDENT_BREAKDOWNS, RESOURCE_BREAKDOWNS
+
+logger = logging.getLogger(__name__)
+
+CACHED_COLLECTIONS = {
+    'incidents': INCIDENT_BREAKDOWNS,
+    'resources': RESOURCE_BREAKDOWNS,
+}
+DEFAULT_POLL_INTERVAL = 2.0  # seconds
+RECONCILE_EVERY = 15  # polls between _id set comparisons
+SEED_RETRY_INTERVAL = 5.0  # seconds between seed attempts while the server is unreachable
+LAG_SAMPLES = 1000
+
+
+class CollectionCache:
+    """Documents of one collection keyed by string id, with equality indexes"""
+
+    def __init__(self, name: str, indexed_fields: Iterable[str]):
+        self.name = name
+        self.indexed_fields = tuple(indexed_fields)
+        self._lock = threading.RLock()
+        self._documents: Dict[str, Dict] = {}
+        self._indexes: Dict[str, Dict] = {field: {} for field in self.indexed_fields}
+        self.version = 0
+        # Secondary structures kept in step with every change: called with
+        # (document_id, document), document None on delete
+        self.observers: List[Callable[[str, Optional[Dict]], None]] = []
+
+    def _index(self, document_id, document):
+        for field in self.indexed_fields:
+            self._indexes[field].setdefault(document.get(field), set()).add(document_id)
+
+    def _unindex(self, document_id, document):
+        for field in self.indexed_fields:
+            bucket = self._indexes[field].get(document.get(field))
+            if bucket is not None:
+                bucket.discard(document_id)
+                if not bucket:
+                    del self._indexes[field][document.get(field)]
+
+    def upsert(self, document: Dict) -> bool:
+        """Insert or replace a document; returns False if it was already current"""
+        document = dict(document, _id=str(document['_id']))
+        document_id = document['_id']
+        with self._lock:
+            previous = self._documents.get(document_id)
+            if previous == document:
+                return False
+            if previous is not None:
+                self._unindex(document_id, previous)
+            self._documents[document_id] = document
+            self._index(document_id, document)
+            self.version += 1
+            for observer in self.observers:
+                observer(document_id, document)
+            return True
+
+    def delete(self, document_id):
+        document_id = str(document_id)
+        with self._lock:
+            previous = self._documents.pop(document_id, None)
+            if previous is not None:
+                self._unindex(document_id, previous)
+                self.version += 1
+                for observer in self.observers:
+                    observer(document_id, None)
+
+    def replace_all(self, documents: Iterable[Dict]):
+        with self._lock:
+            self._documents = {}
+            self._indexes = {field: {} for field in self.indexed_fields}
+            for document in documents:
+                self.upsert(document)
+
+    def observe(self, observer: Callable[[str, Optional[Dict]], None],
+                load: Optional[Callable[[List[Dict]], None]] = None):
+        """Register ``observer`` for every later change, first passing the current
+        documents to ``load``; no change falls between the two. ``load`` gets the
+        cached documents themselves and must not modify them"""
+        with self._lock:
+            if load is not None:
+                load(list(self._documents.values()))
+            self.observers.append(observer)
+
+    def ids(self):
+        with self._lock:
+            return set(self._documents)
+
+    def get(self, document_id, fields: Optional[Sequence[str]] = None) -> Optional[Dict]:
+        """Copy of one document, limited to ``fields`` (plus _id) if given"""
+        with self._lock:
+            document = self._documents.get(str(document_id))
+            return None if document is None else _copy(document, fields)
+
+    def find(self, fields: Optional[Sequence[str]] = None, **equals) -> List[Dict]:
+        """Copies of the documents whose fields equal the given values, newest
+        first, limited to ``fields`` (plus _id and created_at) if given"""
+        with self._lock:
+            indexed = [field for field in equals if field in self._indexes]
+            if indexed:
+                buckets = sorted((self._indexes[f].get(equals[f], ()) for f in indexed), key=len)
+                candidates = (self._documents[i] for i in set(buckets[0]).intersection(*buckets[1:]))
+            else:
+                candidates = self._documents.values()
+            rest = [(f, v) for f, v in equals.items() if f not in self._indexes]
+            result = [d for d in candidates if all(d.get(f) == v for f, v in rest)]
+        result.sort(key=_newest_first, reverse=True)
+        if fields:
+            fields = tuple(fields) + ('created_at',)
+        return [_copy(d, fields) for d in result]
+
+    def count(self, **equals) -> int:
+        with self._lock:
+            if len(equals) == 1 and next(iter(equals)) in self._indexes:
+                field, value = next(iter(equals.items()))
+                return len(self._indexes[field].get(value, ()))
+            if not equals:
+                return len(self._documents)
+        return len(self.find(**equals))
+
+    def counts_by(self, field: str) -> Dict:
+        """Counts per value of an indexed field"""
+        with self._lock:
+            return {value: len(ids) for value, ids in self._indexes[field].items()}
+
+    def summary(self) -> Dict:
+        """Counts in the StatisticsService format"""
+        with self._lock:
+            summary = {'total': len(self._documents)}
+            summary.update({f'by_{field}': self.counts_by(field) for field in self.indexed_fields})
+            return summary
+
+
+def _copy(document: Dict, fields: Optional[Sequence[str]]) -> Dict:
+    # Cached documents are replaced, never mutated, so a shallow copy is enough
+    if not fields:
+        return dict(document)
+    copy = {field: document[field] for field in fields if field in document}
+    copy['_id'] = document['_id']
+    return copy
+
+
+def _newest_first(document):
+    created_at = document.get('created_at')
+    return created_at if isinstance(created_at, datetime) else datetime.min, document['_id']
+
+
+class LagMonitor:
+    """Rolling sample of replication lag in seconds"""
+
+    def __init__(self, size: int = LAG_SAMPLES):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(max(0.0, seconds))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {'samples': 0, 'avg_ms': None, 'p95_ms': None, 'max_ms': None}
+        return {
+            'samples': len(samples),
+            'avg_ms': round(sum(samples) / len(samples) * 1000, 1),
+            'p95_ms': round(samples[int(0.95 * (len(samples) - 1))] * 1000, 1),
+            'max_ms': round(samples[-1] * 1000, 1),
+        }
+
+
+class LiveCache:
+    """Seeded replica of incidents and resources kept current in the background"""
+
+    def __init__(self, db=None, poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.db = db if db is not None else get_database()
+        self.poll_interval = poll_interval
+        self.collections = {name: CollectionCache(name, fields) for name, fields in CACHED_COLLECTIONS.items()}
+        self.lag = LagMonitor()
+        self.mode = None  # 'change_stream' or 'polling' once started
+        self._watermarks: Dict[str, Optional[datetime]] = {}
+        self._listeners: List[Callable[[str], None]] = []
+        # Set once both collections have been seeded
+        self.ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def incidents(self) -> CollectionCache:
+        return self.collections['incidents']
+
+    @property
+    def resources(self) -> CollectionCache:
+        return self.collections['resources']
+
+    def subscribe(self, callback: Callable[[str], None]):
+        """Call ``callback(collection_name)`` from the sync thread after seeding
+        and after each change"""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback: Callable[[str], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def start(self):
+        """Seed the cache and follow changes on a background thread"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='live-cache', daemon=True)
+        self._thread.start()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the cache is seeded; returns False if ``timeout`` expired first"""
+        return self.ready.wait(timeout)
+
+    def _run(self):
+        stream = self._open_change_stream()
+        while not self._stop.is_set():
+            try:
+                self.seed()
+                break
+            except PyMongoError as e:
+                logger.error(f"Live cache seed failed: {e}; retrying in {SEED_RETRY_INTERVAL:.0f}s")
+                self._stop.wait(SEED_RETRY_INTERVAL)
+        else:
+            return
+        self.mode = 'change_stream' if stream is not None else 'polling'
+        self.ready.set()
+        logger.info(f"Live cache seeded ({self.incidents.count()} incidents, "
+                    f"{self.resources.count()} resources), following changes by {self.mode}")
+        for name in self.collections:
+            self._notify(name)
+        if stream is not None:
+            self._follow_stream(stream)
+        else:
+            self._poll()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def seed(self):
+        for name, cache in self.collections.items():
+            documents = list(self.db[name].find())
+            cache.replace_all(documents)
+            self._watermarks[name] = max((d['updated_at'] for d in documents
+                                          if isinstance(d.get('updated_at'), datetime)), default=None)
+
+    def _open_change_stream(self):
+        # Opened before seeding so nothing committed in between is missed;
+        # replaying those events over the seeded state is idempotent
+        try:
+            return self.db.watch([{'$match': {'ns.coll': {'$in': list(self.collections)}}}],
+                                 full_document='updateLookup')
+        except OperationFailure as e:
+            logger.info(f"Change streams unavailable ({e.code}); live cache will poll")
+        except PyMongoError as e:
+            logger.warning(f"Could not open change stream: {e}; live cache will poll")
+        return None
+
+    def _notify(self, name):
+        for callback in list(self._listeners):
+            try:
+                callback(name)
+            except Exception as e:
+                logger.error(f"Live cache listener failed: {e}")
+
+    def _follow_stream(self, stream):
+        with stream:
+            while not self._stop.is_set():
+                try:
+                    event = stream.try_next()
+                except PyMongoError as e:
+                    logger.error(f"Change stream failed: {e}; falling back to polling")
+                    self.mode = 'polling'
+                    self._poll()
+                    return
+                if event is None:
+                    self._stop.wait(0.1)
+                    continue
+                self.apply_change(event)
+
+    def apply_change(self, event: Dict):
+        """Apply one change stream event"""
+        name = event.get('ns', {}).get('coll')
+        cache = self.collections.get(name)
+        if cache is None:
+            return
+        operation = event.get('operationType')
+        if operation in ('insert', 'update', 'replace') and event.get('fullDocument'):
+            cache.upsert(event['fullDocument'])
+        elif operation == 'delete' or (operation == 'update' and not event.get('fullDocument')):
+            cache.delete(event['documentKey']['_id'])
+        else:
+            return
+        cluster_time = event.get('clusterTime')
+        if cluster_time is not None:
+            self.lag.record(time.time() - cluster_time.time)
+        self._notify(name)
+
+    def _poll(self):
+        polls = 0
+        while not self._stop.wait(self.poll_interval):
+            polls += 1
+            for name, cache in self.collections.items():
+                try:
+                    changed = self._poll_collection(name, cache)
+                    if polls % RECONCILE_EVERY == 0:
+                        changed |= self._reconcile_ids(name, cache)
+                except PyMongoError as e:
+                    logger.error(f"Live cache poll of {name} failed: {e}")
+                    continue
+                if changed:
+                    self._notify(name)
+
+    def _poll_collection(self, name, cache) -> bool:
+        watermark = self._watermarks.get(name)
+        # $gte: writes sharing the watermark's timestamp may land after it was read
+        query = {'updated_at': {'$gte': watermark}} if watermark else {'updated_at': {'$type': 'date'}}
+        changed = False
+        now = datetime.utcnow()
+        for document in self.db[name].find(query).sort('updated_at', 1):
+            self._watermarks[name] = document['updated_at']
+            if cache.upsert(document):
+                self.lag.record((now - document['updated_at']).total_seconds())
+                changed = True
+        return changed
+
+    def _reconcile_ids(self, name, cache) -> bool:
+        server_ids = {str(d['_id']): d['_id'] for d in self.db[name].find({}, {'_id': 1})}
+        cached_ids = cache.ids()
+        for document_id in cached_ids - set(server_ids):
+            cache.delete(document_id)
+        missing = [server_ids[i] for i in set(server_ids) - cached_ids]
+        for document in self.db[name].find({'_id': {'$in': missing}}) if missing else ():
+            cache.upsert(document)
+        return bool(missing) or bool(cached_ids - set(server_ids))
+
+    def refresh(self, name: str, document_id):
+        """Re-read one document now, so a view sees its own write without waiting for sync"""
+        document = self.db[name].find_one({'_id': ObjectId(document_id) if isinstance(document_id, str) else document_id})
+        cache = self.collections[name]
+        if document is None:
+            cache.delete(document_id)
+        else:
+            cache.upsert(document)
+
+    def stats(self) -> Dict:
+        """Sync mode, cached document counts and replication lag"""
+        return {
+            'mode': self.mode,
+            'ready': self.ready.is_set(),
+            'documents': {name: cache.count() for name, cache in self.collections.items()},
+            'lag': self.lag.stats(),
+        }
+
+    def statistics(self) -> 'CachedStatistics':
+        return CachedStatistics(self)
+
+
+class CachedStatistics:
+    """StatisticsService-compatible counts served from the live cache (unfiltered only)"""
+
+    def __init__(self, cache: LiveCache):
+        self.cache = cache
+
+    def incident_summary(self, match: Optional[Dict] = None) -> Dict:
+        if match:
+            raise ValueError("Cached statistics do not support filters; use StatisticsService")
+        return self.cache.incidents.summary()
+
+    def resource_summary(self, match: Optional[Dict] = None) -> Dict:
+        if match:
+            raise ValueError("Cached statistics do not support filters; use StatisticsService")
+        return self.cache.resources.summary()
+
+
+_live_cache = None
+_live_cache_lock = threading.Lock()
+
+
+def running_live_cache() -> Optional[LiveCache]:
+    """The process-wide live cache if it has been started and seeded, else None"""
+    cache = _live_cache
+    return cache if cache is not None and cache.ready.is_set() else None
+
+
+def get_live_cache() -> LiveCache:
+    """Process-wide live cache, started on first use; it seeds in the background"""
+    global _live_cache
+    with _live_cache_lock:
+        if _live_cache is None:
+            cache = LiveCache()
+            cache.start()
+            _live_cache = cache
+        return _live_cache
@@ -0,0 +1,493 @@
+"""Offline-first SQLite mirror of the incidents and resources collections.
+
+Field consoles read and write the local store, so they keep working without
+a reachable server. ``OfflineSync`` reconciles with MongoDB in the
+background:
+
+* push: rows changed locally (``dirty``) are written with ``ReplaceOne``
+  (upsert) or ``DeleteOne`` in unordered bulk batches;
+* pull: server documents whose ``updated_at`` is at or past the collection's
+  watermark are merged into the store;
+* every few cycles, clean local rows missing on the server are dropped,
+  because server-side deletes leave nothing for the watermark to find.
+
+Conflicts are resolved last-writer-wins on ``updated_at`` (millisecond
+precision, as stored by MongoDB), and ties go to the server. A local delete is
+a tombstone with its own ``updated_at``, so it loses to a later server edit.
+This relies on every server-side mutation stamping ``updated_at``, as the
+managers do.
+
+With OFFLINE_STORE=1 the incident and resource views use managers built on
+the process-wide store and refresh on the process-wide sync's notifications.
+"""
+import calendar
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bson import ObjectId, json_util
+from pymongo import DeleteOne, ReplaceOne
+from pymongo.errors import PyMongoError
+
+from .statistics import matches
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  'data', 'offline_store.sqlite3')
+MIRRORED_COLLECTIONS = ('incidents', 'resources')
+# json_extract expression indexes back equality filters on these fields
+INDEXED_FIELDS = ('status', 'severity', 'type')
+SYNC_BATCH_SIZE = 500
+RECONCILE_EVERY = 20  # sync cycles between deletion checks
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    collection TEXT NOT NULL,
+    id TEXT NOT NULL,
+    doc TEXT NOT NULL,
+    created_at INTEGER,
+    updated_at INTEGER NOT NULL,
+    dirty INTEGER NOT NULL DEFAULT 0,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (collection, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS documents_dirty ON documents (collection, dirty) WHERE dirty = 1;
+CREATE INDEX IF NOT EXISTS documents_newest ON documents (collection, created_at DESC);
+CREATE TABLE IF NOT EXISTS sync_state (
+    collection TEXT PRIMARY KEY,
+    watermark INTEGER
+);
+""" + "".join(
+    f"CREATE INDEX IF NOT EXISTS documents_{field} ON documents "
+    f"(collection, json_extract(doc, '$.{field}'));\n" for field in INDEXED_FIELDS
+)
+
+
+def to_millis(value: Optional[datetime]) -> Optional[int]:
+    if not isinstance(value, datetime):
+        return None
+    return calendar.timegm(value.utctimetuple()) * 1000 + value.microsecond // 1000
+
+
+def from_millis(millis: int) -> datetime:
+    return datetime.utcfromtimestamp(millis // 1000).replace(microsecond=millis % 1000 * 1000)
+
+
+def now_millis() -> int:
+    return to_millis(datetime.utcnow())
+
+
+def to_object_id(document_id):
+    return ObjectId(document_id) if isinstance(document_id, str) and ObjectId.is_valid(document_id) else document_id
+
+
+def apply_update(document: Dict, update: Dict) -> Dict:
+    """Apply the top-level update operators the managers use to a document copy"""
+    document = dict(document)
+    for operator, fields in update.items():
+        for field, value in fields.items():
+            if operator == '$set':
+                document[field] = value
+            elif operator == '$unset':
+                document.pop(field, None)
+            elif operator == '$inc':
+                document[field] = document.get(field, 0) + value
+            elif operator == '$addToSet':
+                current = list(document.get(field) or [])
+                if value not in current:
+                    current.append(value)
+                document[field] = current
+            elif operator == '$push':
+                document[field] = list(document.get(field) or []) + [value]
+            elif operator == '$pull':
+                document[field] = [item for item in document.get(field) or [] if item != value]
+            else:
+                raise ValueError(f"Unsupported update operator for the offline store: {operator}")
+    return document
+
+
+class OfflineStore:
+    """Local documents with dirty flags and per-collection pull watermarks"""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    # Local reads and writes
+
+    def get(self, collection: str, document_id) -> Optional[Dict]:
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT doc FROM documents WHERE collection = ? AND id = ? AND deleted = 0',
+                (collection, str(document_id))).fetchone()
+        return self._decode(row[0]) if row else None
+
+    def find(self, collection: str, filters: Dict = None, limit: Optional[int] = None,
+             fields: Optional[Sequence[str]] = None) -> List[Dict]:
+        """Documents matching ``filters``, newest first, limited to ``fields``
+        (plus _id) if given.
+
+        Scalar equality conditions run in SQLite; operator conditions are
+        checked in Python with the statistics matcher.
+        """
+        sql = ['SELECT doc FROM documents WHERE collection = ? AND deleted = 0']
+        params = [collection]
+        rest = {}
+        for field, condition in (filters or {}).items():
+            if isinstance(condition, (str, int, float, bool)) and not field.startswith('$') and '.' not in field:
+                sql.append(f"AND json_extract(doc, '$.{field}') = ?")
+                params.append(condition)
+            else:
+                rest[field] = condition
+        sql.append('ORDER BY created_at DESC, id DESC')
+        if limit is not None and not rest:
+            sql.append('LIMIT ?')
+            params.append(limit)
+        with self._lock:
+            rows = self._connection.execute(' '.join(sql), params).fetchall()
+        documents = (self._decode(row[0]) for row in rows)
+        if rest:
+            documents = (d for d in documents if matches(d, rest))
+        result = []
+        for document in documents:
+            if fields:
+                document = {k: document[k] for k in ('_id',) + tuple(fields) if k in document}
+            result.append(document)
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+
+    def count(self, collection: str) -> int:
+        with self._lock:
+            return self._connection.execute(
+                'SELECT COUNT(*) FROM documents WHERE collection = ? AND deleted = 0', (collection,)).fetchone()[0]
+
+    def insert(self, collection: str, document: Dict) -> str:
+        """Insert a new document (assigning an ObjectId if needed); returns its id"""
+        document = dict(document)
+        document.setdefault('_id', ObjectId())
+        document.setdefault('created_at', datetime.utcnow())
+        updated = now_millis()
+        document['updated_at'] = from_millis(updated)
+        with self._lock:
+            self._write(collection, document, updated, dirty=1)
+        return str(document['_id'])
+
+    def update(self, collection: str, document_id, update: Dict) -> bool:
+        """Apply a MongoDB-style update locally; returns False if the document is unknown"""
+        with self._lock:
+            document = self.get(collection, document_id)
+            if document is None:
+                return False
+            # Strictly increasing, so a push of this edit never ties with the server copy
+            updated = max(now_millis(), (to_millis(document.get('updated_at')) or 0) + 1)
+            document = apply_update(document, update)
+            document['updated_at'] = from_millis(updated)
+            self._write(collection, document, updated, dirty=1)
+            return True
+
+    def delete(self, collection: str, document_id) -> bool:
+        """Leave a tombstone that the next push turns into a server delete"""
+        with self._lock:
+            cursor = self._connection.execute(
+                'UPDATE documents SET deleted = 1, dirty = 1, updated_at = MAX(?, updated_at + 1) '
+                'WHERE collection = ? AND id = ? AND deleted = 0',
+                (now_millis(), collection, str(document_id)))
+            return cursor.rowcount > 0
+
+    def pending(self, collection: Optional[str] = None) -> int:
+        """Local changes not yet pushed"""
+        with self._lock:
+            if collection is None:
+                return self._connection.execute('SELECT COUNT(*) FROM documents WHERE dirty = 1').fetchone()[0]
+            return self._connection.execute(
+                'SELECT COUNT(*) FROM documents WHERE collection = ? AND dirty = 1', (collection,)).fetchone()[0]
+
+    # Sync support
+
+    def dirty_batch(self, collection: str, limit: int = SYNC_BATCH_SIZE) -> List[Tuple[str, Dict, int, bool]]:
+        """(id, document, updated_at ms, deleted) of local changes, oldest first"""
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT id, doc, updated_at, deleted FROM documents '
+                'WHERE collection = ? AND dirty = 1 ORDER BY updated_at LIMIT ?', (collection, limit)).fetchall()
+        return [(row[0], self._decode(row[1]), row[2], bool(row[3])) for row in rows]
+
+    def mark_pushed(self, collection: str, versions: Iterable[Tuple[str, int]]):
+        """Clear dirty flags for rows not changed again since they were read for the push"""
+        versions = list(versions)
+        with self._lock, self._transaction():
+            self._connection.executemany(
+                'DELETE FROM documents WHERE collection = ? AND id = ? AND updated_at = ? AND deleted = 1',
+                [(collection, document_id, updated) for document_id, updated in versions])
+            self._connection.executemany(
+                'UPDATE documents SET dirty = 0 WHERE collection = ? AND id = ? AND updated_at = ?',
+                [(collection, document_id, updated) for document_id, updated in versions])
+
+    def apply_remote(self, collection: str, documents: List[Dict]) -> Dict[str, int]:
+        """Merge server documents: newer local changes are kept, everything else is replaced"""
+        applied = kept_local = 0
+        with self._lock, self._transaction():
+            for offset in range(0, len(documents), SYNC_BATCH_SIZE):
+                chunk = documents[offset:offset + SYNC_BATCH_SIZE]
+                ids = [str(d['_id']) for d in chunk]
+                local = {row[0]: (row[1], row[2]) for row in self._connection.execute(
+                    f"SELECT id, updated_at, dirty FROM documents WHERE collection = ? "
+                    f"AND id IN ({','.join('?' * len(ids))})", [collection] + ids)}
+                rows = []
+                for document_id, document in zip(ids, chunk):
+                    remote_updated = to_millis(document.get('updated_at')) or 0
+                    local_updated, dirty = local.get(document_id, (None, 0))
+                    if dirty and local_updated > remote_updated:
+                        kept_local += 1
+                        continue
+                    rows.append(self._row(collection, document, remote_updated, dirty=0))
+                self._connection.executemany(
+                    'INSERT OR REPLACE INTO documents (collection, id, doc, created_at, updated_at, dirty, deleted) '
+                    'VALUES (?, ?, ?, ?, ?, ?, 0)', rows)
+                applied += len(rows)
+        return {'applied': applied, 'kept_local': kept_local}
+
+    def drop_clean(self, collection: str, keep_ids: set) -> int:
+        """Remove clean rows whose ids are not in ``keep_ids`` (deleted on the server)"""
+        with self._lock:
+            stale = [row[0] for row in self._connection.execute(
+                'SELECT id FROM documents WHERE collection = ? AND dirty = 0', (collection,))
+                if row[0] not in keep_ids]
+            with self._transaction():
+                self._connection.executemany('DELETE FROM documents WHERE collection = ? AND id = ?',
+                                             [(collection, document_id) for document_id in stale])
+        return len(stale)
+
+    def watermark(self, collection: str) -> Optional[int]:
+        with self._lock:
+            row = self._connection.execute('SELECT watermark FROM sync_state WHERE collection = ?',
+                                           (collection,)).fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, collection: str, millis: int):
+        with self._lock:
+            self._connection.execute('INSERT OR REPLACE INTO sync_state (collection, watermark) VALUES (?, ?)',
+                                     (collection, millis))
+
+    # Internals
+
+    def _transaction(self):
+        connection = self._connection
+
+        class Transaction:
+            def __enter__(self):
+                connection.execute('BEGIN')
+
+            def __exit__(self, exc_type, *exc):
+                connection.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return Transaction()
+
+    @staticmethod
+    def _decode(text: str) -> Dict:
+        document = json_util.loads(text)
+        document['_id'] = str(document['_id'])
+        return document
+
+    @staticmethod
+    def _row(collection, document, updated, dirty):
+        return (collection, str(document['_id']), json_util.dumps(document),
+                to_millis(document.get('created_at')), updated, dirty)
+
+    def _write(self, collection, document, updated, dirty):
+        document = dict(document, _id=to_object_id(document['_id']))
+        self._connection.execute(
+            'INSERT OR REPLACE INTO documents (collection, id, doc, created_at, updated_at, dirty, deleted) '
+            'VALUES (?, ?, ?, ?, ?, ?, 0)', self._row(collection, document, updated, dirty))
+
+
+class OfflineSync:
+    """Background push/pull between an OfflineStore and MongoDB"""
+
+    def __init__(self, store: OfflineStore, db=None, interval: float = 5.0,
+                 collections: Iterable[str] = MIRRORED_COLLECTIONS, batch_size: int = SYNC_BATCH_SIZE):
+        if db is None:
+            from src.utils.mongo_pool import get_database
+            db = get_database()
+        self.store = store
+        self.db = db
+        self.interval = interval
+        self.collections = tuple(collections)
+        self.batch_size = batch_size
+        self.cycles = 0
+        self.last_sync = None
+        self.last_error = None
+        self.stats = {'pushed': 0, 'pulled': 0, 'kept_local': 0, 'server_won': 0, 'dropped': 0}
+        self._listeners: List[Callable[[str], None]] = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, callback: Callable[[str], None]):
+        """Call ``callback(collection_name)`` from the sync thread when a cycle
+        changed the local copy of that collection"""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback: Callable[[str], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='offline-sync', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            try:
+                self.sync_once()
+            except PyMongoError as e:
+                self.last_error = str(e)
+                logger.warning(f"Offline sync deferred: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+    def sync_once(self) -> Dict[str, int]:
+        """One push and pull of every collection; returns this cycle's counts"""
+        cycle = dict.fromkeys(self.stats, 0)
+        self.cycles += 1
+        for name in self.collections:
+            counts = dict(self.push(name), **self.pull(name))
+            if self.cycles % RECONCILE_EVERY == 0:
+                counts['dropped'] = self.reconcile_deletions(name)
+            for key, value in counts.items():
+                cycle[key] += value
+            # Pushed rows were already visible locally
+            if counts['server_won'] or counts['pulled'] or counts.get('dropped'):
+                self._notify(name)
+        for key, value in cycle.items():
+            self.stats[key] += value
+        self.last_sync = datetime.utcnow()
+        self.last_error = None
+        return cycle
+
+    def push(self, name: str) -> Dict[str, int]:
+        collection = self.db[name]
+        pushed = server_won = 0
+        while True:
+            batch = self.store.dirty_batch(name, self.batch_size)
+            if not batch:
+                break
+            object_ids = [to_object_id(document_id) for document_id, _, _, _ in batch]
+            server = {str(d['_id']): to_millis(d.get('updated_at')) or 0
+                      for d in collection.find({'_id': {'$in': object_ids}}, {'updated_at': 1})}
+            operations, versions, newer_on_server = [], [], []
+            for (document_id, document, updated, deleted), object_id in zip(batch, object_ids):
+                if server.get(document_id, -1) >= updated:
+                    newer_on_server.append(object_id)
+                    continue
+                if deleted:
+                    operations.append(DeleteOne({'_id': object_id}))
+                else:
+                    operations.append(ReplaceOne({'_id': object_id}, dict(document, _id=object_id), upsert=True))
+                versions.append((document_id, updated))
+            if operations:
+                collection.bulk_write(operations, ordered=False)
+            self.store.mark_pushed(name, versions)
+            if newer_on_server:
+                # Replaces the losing local rows (tombstones included) with clean server copies
+                self.store.apply_remote(name, list(collection.find({'_id': {'$in': newer_on_server}})))
+            pushed += len(operations)
+            server_won += len(newer_on_server)
+        return {'pushed': pushed, 'server_won': server_won}
+
+    def pull(self, name: str) -> Dict[str, int]:
+        watermark = self.store.watermark(name)
+        query = {'updated_at': {'$gte': from_millis(watermark)}} if watermark is not None \
+            else {'updated_at': {'$type': 'date'}}
+        pulled = kept_local = 0
+        batch = []
+        cursor = self.db[name].find(query).sort('updated_at', 1).batch_size(self.batch_size)
+        for document in cursor:
+            batch.append(document)
+            if len(batch) >= self.batch_size:
+                result = self._apply(name, batch)
+                pulled, kept_local = pulled + result['applied'], kept_local + result['kept_local']
+                batch = []
+        if batch:
+            result = self._apply(name, batch)
+            pulled, kept_local = pulled + result['applied'], kept_local + result['kept_local']
+        return {'pulled': pulled, 'kept_local': kept_local}
+
+    def _apply(self, name, batch):
+        result = self.store.apply_remote(name, batch)
+        self.store.set_watermark(name, to_millis(batch[-1]['updated_at']))
+        return result
+
+    def reconcile_deletions(self, name: str) -> int:
+        server_ids = {str(d['_id']) for d in self.db[name].find({}, {'_id': 1})}
+        return self.store.drop_clean(name, server_ids)
+
+    def status(self) -> Dict:
+        return dict(self.stats, pending=self.store.pending(), last_sync=self.last_sync, last_error=self.last_error)
+
+    def _notify(self, name):
+        for callback in list(self._listeners):
+            try:
+                callback(name)
+            except Exception as e:
+                logger.error(f"Offline sync listener failed: {e}")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_offline_store() -> OfflineStore:
+    """Process-wide store at OFFLINE_STORE_PATH (default src/data/offline_store.sqlite3)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = OfflineStore(os.getenv('OFFLINE_STORE_PATH') or DEFAULT_STORE_PATH)
+        return _store
+
+
+def offline_mode() -> bool:
+    """Whether views read and write the offline store (OFFLINE_STORE=1)"""
+    return os.getenv('OFFLINE_STORE', '0') == '1'
+
+
+_sync = None
+_sync_lock = threading.Lock()
+
+
+def get_offline_sync() -> OfflineSync:
+    """Process-wide sync of the process-wide store, started on first use"""
+    global _sync
+    with _sync_lock:
+        if _sync is None:
+            _sync = OfflineSync(get_offline_store(), interval=float(os.getenv('OFFLINE_SYNC_INTERVAL', 5.0)))
+            _sync.start()
+        return _sync
+
+
+def stop_offline_sync(timeout: Optional[float] = None):
+    """Stop the process-wide sync if it was ever started"""
+    global _sync
+    with _sync_lock:
+        sync, _sync = _sync, None
+    if sync is not None:
+        sync.stop(timeout)
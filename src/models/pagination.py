@@ -0,0 +1,95 @@
+"""Keyset pagination over (created_at, _id), newest first.
+
+Pages are fetched with a range predicate on the sort key instead of
+``skip()``, so the cost of a page and the time to its first row stay the same
+however deep the listing goes. Cursors are opaque strings encoding the key of
+the last row returned.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from bson import ObjectId
+
+SORT_KEY = [('created_at', -1), ('_id', -1)]
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+DEFAULT_BATCH_SIZE = 500
+
+
+class Page(NamedTuple):
+    items: List[Dict]
+    next_cursor: Optional[str]  # None on the last page
+
+
+def encode_cursor(document: Dict) -> str:
+    """Cursor pointing just past ``document``"""
+    created_at = document.get('created_at')
+    stamp = '' if created_at is None else str(int(created_at.replace(tzinfo=timezone.utc).timestamp() * 1000000))
+    return f"{stamp}.{document['_id']}"
+
+
+def decode_cursor(cursor: str):
+    """Return (created_at or None, ObjectId); raises ValueError on malformed cursors"""
+    try:
+        stamp, oid = cursor.split('.', 1)
+        created_at = None
+        if stamp:
+            created_at = datetime.fromtimestamp(int(stamp) / 1000000, tz=timezone.utc).replace(tzinfo=None)
+        return created_at, ObjectId(oid)
+    except Exception as e:
+        raise ValueError(f"Invalid page cursor: {cursor!r}") from e
+
+
+def after_cursor(query: Dict, cursor: Optional[str]) -> Dict:
+    """Add the keyset predicate for rows that sort after ``cursor``"""
+    if not cursor:
+        return query
+    created_at, oid = decode_cursor(cursor)
+    if created_at is None:
+        # Documents without created_at sort last; only _id orders them
+        keyset = {'created_at': None, '_id': {'$lt': oid}}
+    else:
+        keyset = {'$or': [
+            {'created_at': {'$lt': created_at}},
+            {'created_at': created_at, '_id': {'$lt': oid}},
+            {'created_at': None},
+        ]}
+    return {'$and': [query, keyset]} if query else keyset
+
+
+def projection_for(fields: Optional[Sequence[str]]) -> Optional[Dict]:
+    """Projection for ``fields``, always keeping the sort key"""
+    if not fields:
+        return None
+    projection = {field: 1 for field in fields}
+    projection['created_at'] = 1
+    return projection
+
+
+def fetch_page(collection, query: Dict = None, limit: int = DEFAULT_PAGE_SIZE,
+               cursor: Optional[str] = None, fields: Optional[Sequence[str]] = None) -> Page:
+    """Fetch one page; ``_id`` values are returned as strings"""
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    rows = list(
+        collection.find(after_cursor(query or {}, cursor), projection_for(fields))
+        .sort(SORT_KEY)
+        .limit(limit + 1)
+    )
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    items = rows[:limit]
+    for row in items:
+        row['_id'] = str(row['_id'])
+    return Page(items, next_cursor)
+
+
+def iter_batches(collection, query: Dict = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 fields: Optional[Sequence[str]] = None) -> Iterator[List[Dict]]:
+    """Stream the whole result set in pages of ``batch_size``"""
+    cursor = None
+    while True:
+        page = fetch_page(collection, query, batch_size, cursor, fields)
+        if page.items:
+            yield page.items
+        if page.next_cursor is None:
+            return
+        cursor = page.next_cursor
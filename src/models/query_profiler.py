@@ -0,0 +1,439 @@
+"""Query profiler and index advisor for the manager collections.
+
+``profile_collection`` wraps a collection so that every read and write is
+timed and grouped by query shape: the filter and sort with their values
+replaced by 1, so ``{'status': 'active'}`` and ``{'status': 'closed'}`` count
+as one shape. A small sample of finds is explained on a background thread to
+learn documents examined and whether the plan was a collection scan. The
+report ranks shapes by total time and proposes a compound index for each
+unindexed shape, ordered by the equality-sort-range rule.
+
+Overhead is bounded by environment settings:
+
+    QUERY_PROFILER             0 disables wrapping entirely (default 1)
+    QUERY_PROFILER_SAMPLE      fraction of operations timed (default 1.0)
+    QUERY_PROFILER_EXPLAIN     fraction of finds explained (default 0.01)
+    QUERY_PROFILER_MAX_SHAPES  distinct shapes tracked (default 200)
+    QUERY_PROFILER_REPORT      seconds between logged reports, 0 for none (default 600)
+"""
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+RANGE_OPERATORS = {'$gt', '$gte', '$lt', '$lte', '$ne', '$nin', '$regex', '$exists', '$type'}
+EQUALITY_OPERATORS = {'$eq', '$in'}
+GEO_OPERATORS = {'$near', '$nearSphere', '$geoWithin', '$geoIntersects'}
+LATENCY_SAMPLES = 200
+EXPLAIN_QUEUE_SIZE = 32
+OTHER_SHAPE = '<other shapes>'
+
+
+def shape_of(value):
+    """Replace literal values with 1, keeping field names and operators"""
+    if isinstance(value, dict):
+        return {k: shape_of(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)) and value and isinstance(value[0], dict):
+        return [shape_of(v) for v in value]
+    return 1
+
+
+def normalize_sort(key_or_list, direction=None) -> List[Tuple[str, int]]:
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction if direction is not None else 1)]
+    return [(key, d) for key, d in (key_or_list or [])]
+
+
+def classify_fields(query: Optional[Dict], sort_fields=()):
+    """Split a filter's fields into (equality, range, geo) for index advice.
+
+    Inside ``$and``/``$or``/``$nor`` a field compared for equality counts as a
+    range when another clause compares it by range or it is a sort field, as
+    in a keyset cursor predicate.
+    """
+    equality, ranges, geo = [], [], []
+    for field, condition in (query or {}).items():
+        if field in ('$and', '$or', '$nor'):
+            clauses = [classify_fields(clause, sort_fields) for clause in condition]
+            demoted = {f for _, r, _ in clauses for f in r} | set(sort_fields)
+            for e, r, g in clauses:
+                for f in e:
+                    target = ranges if f in demoted else equality
+                    if f not in target:
+                        target.append(f)
+                ranges += [f for f in r if f not in ranges]
+                geo += g
+            continue
+        if field.startswith('$'):
+            continue
+        operators = set(condition) if isinstance(condition, dict) else set()
+        if operators & GEO_OPERATORS:
+            geo.append(field)
+        elif operators & RANGE_OPERATORS:
+            ranges.append(field)
+        elif field not in equality:
+            equality.append(field)
+    return equality, [f for f in ranges if f not in equality], geo
+
+
+def suggest_index(query: Optional[Dict], sort: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+    """Compound index key following the equality, sort, range ordering"""
+    directions = dict(sort)
+    equality, ranges, geo = classify_fields(query, directions)
+    if geo:
+        return []
+    # The direction of an equality key does not matter; the sort's lets an
+    # index that also serves the sort cover it
+    keys = [(f, directions.get(f, 1)) for f in equality]
+    keys += [(f, d) for f, d in sort if f not in equality]
+    keys += [(f, 1) for f in ranges if f not in dict(keys)]
+    return keys
+
+
+def index_covers(existing: List[Tuple[str, int]], wanted: List[Tuple[str, int]]) -> bool:
+    """True if ``wanted`` is a prefix of ``existing`` (sort directions may all be flipped)"""
+    if len(existing) < len(wanted):
+        return False
+    prefix = existing[:len(wanted)]
+    fields_match = [f for f, _ in prefix] == [f for f, _ in wanted]
+    same = all(int(a) == int(b) for (_, a), (_, b) in zip(prefix, wanted)) if fields_match else False
+    flipped = all(int(a) == -int(b) for (_, a), (_, b) in zip(prefix, wanted)) if fields_match else False
+    return same or flipped
+
+
+class ShapeStats:
+    __slots__ = ('collection', 'operation', 'query', 'sort', 'count', 'total', 'max',
+                 'samples', 'docs_examined', 'keys_examined', 'returned', 'explained', 'collscan')
+
+    def __init__(self, collection, operation, query, sort):
+        self.collection = collection
+        self.operation = operation
+        self.query = query
+        self.sort = sort
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=LATENCY_SAMPLES)
+        self.docs_examined = self.keys_examined = self.returned = self.explained = 0
+        self.collscan = False
+
+
+class QueryProfiler:
+    """Latency and plan statistics per query shape"""
+
+    def __init__(self, sample_rate: float = 1.0, explain_rate: float = 0.01, max_shapes: int = 200):
+        self.sample_rate = sample_rate
+        self.explain_rate = explain_rate
+        self.max_shapes = max_shapes
+        self._lock = threading.Lock()
+        self._shapes: Dict[str, ShapeStats] = {}
+        self._explains = queue.Queue(maxsize=EXPLAIN_QUEUE_SIZE)
+        self._explainer = None
+
+    @classmethod
+    def from_env(cls) -> 'QueryProfiler':
+        return cls(
+            sample_rate=float(os.getenv('QUERY_PROFILER_SAMPLE', 1.0)),
+            explain_rate=float(os.getenv('QUERY_PROFILER_EXPLAIN', 0.01)),
+            max_shapes=int(os.getenv('QUERY_PROFILER_MAX_SHAPES', 200)),
+        )
+
+    def sampled(self) -> bool:
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def record(self, collection, operation, query, sort, seconds, returned=None):
+        sort = sort or []
+        key = json.dumps([collection.name, operation, shape_of(query or {}), sort], sort_keys=True, default=str)
+        with self._lock:
+            stats = self._shapes.get(key)
+            if stats is None:
+                if len(self._shapes) >= self.max_shapes:
+                    key = OTHER_SHAPE
+                    stats = self._shapes.setdefault(key, ShapeStats(collection.name, operation, None, []))
+                else:
+                    stats = self._shapes[key] = ShapeStats(collection.name, operation, shape_of(query or {}), sort)
+            stats.count += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            stats.samples.append(seconds)
+        if operation == 'find' and key != OTHER_SHAPE and random.random() < self.explain_rate:
+            self._queue_explain(key, collection, query, sort)
+
+    def _queue_explain(self, key, collection, query, sort):
+        if self._explainer is None:
+            self._explainer = threading.Thread(target=self._explain_loop, name='query-explain', daemon=True)
+            self._explainer.start()
+        try:
+            self._explains.put_nowait((key, collection, query, sort))
+        except queue.Full:
+            pass  # dropping samples keeps the overhead bounded
+
+    def _explain_loop(self):
+        while True:
+            key, collection, query, sort = self._explains.get()
+            try:
+                cursor = collection.find(query or {})
+                if sort:
+                    cursor = cursor.sort(sort)
+                plan = cursor.explain()
+            except PyMongoError as e:
+                logger.debug(f"Explain failed for {key}: {e}")
+                continue
+            execution = plan.get('executionStats', {})
+            collscan = 'COLLSCAN' in json.dumps(plan.get('queryPlanner', {}).get('winningPlan', {}))
+            with self._lock:
+                stats = self._shapes.get(key)
+                if stats is not None:
+                    stats.explained += 1
+                    stats.docs_examined += execution.get('totalDocsExamined', 0)
+                    stats.keys_examined += execution.get('totalKeysExamined', 0)
+                    stats.returned += execution.get('nReturned', 0)
+                    stats.collscan = stats.collscan or collscan
+
+    def report(self, top: int = 10, index_information: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+        """Shapes ranked by total time, each with an index suggestion where one would help.
+
+        ``index_information`` maps collection names to ``index_information()``
+        results; suggestions already covered by an existing index are dropped.
+        """
+        with self._lock:
+            shapes = sorted(self._shapes.values(), key=lambda s: s.total, reverse=True)[:top]
+            rows = []
+            for stats in shapes:
+                samples = sorted(stats.samples)
+                row = {
+                    'collection': stats.collection,
+                    'operation': stats.operation,
+                    'query': stats.query,
+                    'sort': stats.sort,
+                    'count': stats.count,
+                    'total_ms': round(stats.total * 1000, 2),
+                    'avg_ms': round(stats.total / stats.count * 1000, 3),
+                    'p95_ms': round(samples[int(0.95 * (len(samples) - 1))] * 1000, 3) if samples else None,
+                    'max_ms': round(stats.max * 1000, 3),
+                    'collscan': stats.collscan,
+                    'examined_per_returned': (round(stats.docs_examined / max(1, stats.returned), 1)
+                                              if stats.explained else None),
+                    'suggested_index': None,
+                }
+                rows.append(row)
+        for row in rows:
+            if row['query'] is None or row['operation'] not in ('find', 'count'):
+                continue
+            wanted = suggest_index(row['query'], row['sort'])
+            if not wanted or wanted == [('_id', 1)]:
+                continue
+            existing = (index_information or {}).get(row['collection'], {})
+            if not any(index_covers(list(info['key']), wanted) for info in existing.values()):
+                row['suggested_index'] = wanted
+        return rows
+
+    def format_report(self, top: int = 10, index_information: Optional[Dict[str, Dict]] = None) -> str:
+        lines = ["Query shapes by total time:"]
+        for row in self.report(top, index_information):
+            lines.append(
+                f"  {row['collection']}.{row['operation']} {json.dumps(row['query'])} sort={row['sort']}: "
+                f"{row['count']} calls, {row['total_ms']} ms total, avg {row['avg_ms']} ms, p95 {row['p95_ms']} ms"
+                + (" COLLSCAN" if row['collscan'] else "")
+                + (f", {row['examined_per_returned']} examined/returned" if row['examined_per_returned'] else "")
+            )
+            if row['suggested_index']:
+                lines.append(f"    suggest: db.{row['collection']}.create_index({row['suggested_index']})")
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+
+
+class ProfiledCursor:
+    """Cursor proxy that times iteration and learns the sort applied to it"""
+
+    CHAINABLE = {'limit', 'skip', 'batch_size', 'hint', 'max_time_ms', 'comment', 'collation', 'allow_disk_use'}
+
+    def __init__(self, cursor, profiler, collection, operation, query):
+        self._cursor = cursor
+        self._profiler = profiler
+        self._collection = collection
+        self._operation = operation
+        self._query = query
+        self._sort = []
+        self._elapsed = 0.0
+        self._returned = 0
+        self._recorded = False
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = normalize_sort(key_or_list, direction)
+        self._cursor = self._cursor.sort(key_or_list, direction) if direction is not None \
+            else self._cursor.sort(key_or_list)
+        return self
+
+    def __getattr__(self, name):
+        attribute = getattr(self._cursor, name)
+        if name in self.CHAINABLE and callable(attribute):
+            def chained(*args, **kwargs):
+                self._cursor = attribute(*args, **kwargs)
+                return self
+            return chained
+        return attribute
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            document = next(self._cursor)
+        except StopIteration:
+            self._elapsed += time.perf_counter() - started
+            self._finish()
+            raise
+        self._elapsed += time.perf_counter() - started
+        self._returned += 1
+        return document
+
+    next = __next__
+
+    def _finish(self):
+        if not self._recorded:
+            self._recorded = True
+            self._profiler.record(self._collection, self._operation, self._query, self._sort,
+                                  self._elapsed, self._returned)
+
+    def close(self):
+        self._finish()
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        # Cursors abandoned before exhaustion (find(...).limit(1), next(aggregate(...)))
+        if not self.__dict__.get('_recorded', True) and self._elapsed:
+            self._finish()
+
+
+class ProfiledCollection:
+    """Collection proxy that reports every operation to a QueryProfiler"""
+
+    CURSOR_METHODS = ('find', 'aggregate')
+    TIMED_METHODS = ('find_one', 'count_documents', 'insert_one', 'insert_many', 'update_one',
+                     'update_many', 'delete_one', 'delete_many', 'replace_one', 'find_one_and_update',
+                     'bulk_write', 'distinct')
+    UNFILTERED_METHODS = ('insert_one', 'insert_many', 'bulk_write')
+
+    def __init__(self, collection, profiler: QueryProfiler):
+        self._collection = collection
+        self._profiler = profiler
+
+    @property
+    def unwrapped(self):
+        return self._collection
+
+    def find(self, filter=None, *args, **kwargs):
+        cursor = self._collection.find(filter, *args, **kwargs)
+        if not self._profiler.sampled():
+            return cursor
+        return ProfiledCursor(cursor, self._profiler, self._collection, 'find', filter)
+
+    def aggregate(self, pipeline, *args, **kwargs):
+        cursor = self._collection.aggregate(pipeline, *args, **kwargs)
+        if not self._profiler.sampled():
+            return cursor
+        match = next((stage['$match'] for stage in pipeline if '$match' in stage), None)
+        return ProfiledCursor(cursor, self._profiler, self._collection, 'aggregate', match)
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if name not in self.TIMED_METHODS:
+            return attribute
+
+        def timed(*args, **kwargs):
+            if not self._profiler.sampled():
+                return attribute(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return attribute(*args, **kwargs)
+            finally:
+                query = None
+                if name not in self.UNFILTERED_METHODS:
+                    query = args[0] if args and isinstance(args[0], dict) else kwargs.get('filter')
+                operation = 'count' if name == 'count_documents' else name
+                self._profiler.record(self._collection, operation, query, [], time.perf_counter() - started)
+        return timed
+
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def get_query_profiler() -> QueryProfiler:
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = QueryProfiler.from_env()
+        return _profiler
+
+
+def profile_collection(collection):
+    """Wrap ``collection`` with the process-wide profiler unless QUERY_PROFILER=0"""
+    if os.getenv('QUERY_PROFILER', '1') == '0':
+        return collection
+    return ProfiledCollection(collection, get_query_profiler())
+
+
+def index_information(db, names) -> Dict[str, Dict]:
+    """Existing indexes per collection, for QueryProfiler.report"""
+    info = {}
+    for name in names:
+        try:
+            info[name] = db[name].index_information()
+        except PyMongoError as e:
+            logger.warning(f"Could not read indexes of {name}: {e}")
+    return info
+
+
+class ProfilerReportJob(threading.Thread):
+    """Logs the profiler report every ``interval`` seconds"""
+
+    def __init__(self, profiler: QueryProfiler, db, collections=('incidents', 'resources'),
+                 interval: float = 600.0, top: int = 10):
+        super().__init__(name='query-profiler-report', daemon=True)
+        self.profiler = profiler
+        self.db = db
+        self.collections = collections
+        self.interval = interval
+        self.top = top
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                logger.info(self.profiler.format_report(self.top, index_information(self.db, self.collections)))
+            except Exception as e:
+                logger.error(f"Query profiler report failed: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def start_report_job(db) -> Optional[ProfilerReportJob]:
+    """Start logging the process-wide report every QUERY_PROFILER_REPORT seconds"""
+    interval = float(os.getenv('QUERY_PROFILER_REPORT', 600))
+    if os.getenv('QUERY_PROFILER', '1') == '0' or interval <= 0:
+        return None
+    job = ProfilerReportJob(get_query_profiler(), db, interval=interval)
+    job.start()
+    return job
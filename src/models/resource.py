@@ -1,14 +1,33 @@
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Sequence, Tuple
+from concurrent.futures import Future
 from bson import ObjectId
-from pymongo import MongoClient
-import os
+from src.utils.mongo_pool import get_database
+from src.utils.resilience import resilient_collection
+from .geo import DEFAULT_GEO_LIMIT, GeoQueries
+from .offline_store import OfflineStore
+from .pagination import DEFAULT_BATCH_SIZE, DEFAULT_PAGE_SIZE, Page, fetch_page, iter_batches
+from .query_profiler import profile_collection
+from .resource_stats import ReconciliationJob, get_resource_counters
+from .write_behind import WriteBehindQueue
+
+# Fields whose changes move a resource between counter buckets
+COUNTED_FIELDS = ('type', 'status', 'location')
+
+# Columns shown by the resource tables
+RESOURCE_TABLE_FIELDS = ('name', 'type', 'location', 'status', 'maintenance_status', 'current_incident')
 
 class ResourceManager:
-    def __init__(self):
-        self.mongo_client = MongoClient(os.getenv('MONGODB_URI'))
-        self.db = self.mongo_client.Disaster_Management_System
-        self.resources = self.db.resources
+    def __init__(self, write_behind: WriteBehindQueue = None, offline: OfflineStore = None):
+        self.db = get_database()
+        self.resources = profile_collection(resilient_collection(self.db.resources))
+        self.geo = GeoQueries(self.resources, 'resources')
+        self.counters = get_resource_counters()
+        # Needed by the queue_* methods, which return a ticket (Future) instead of a bool
+        self.write_behind = write_behind
+        # When set, resources are read from and written to the local store
+        # and OfflineSync reconciles them with the server
+        self.offline = offline
         
     def create_resource(self, data: Dict) -> str:
         """Create a new resource"""
@@ -27,60 +46,89 @@ class ResourceManager:
             'maintenance_status': 'operational'
         }
         
-        result = self.resources.insert_one(resource)
-        return str(result.inserted_id)
+        if self.offline is not None:
+            resource_id = self.offline.insert('resources', resource)
+        else:
+            resource_id = str(self.resources.insert_one(resource).inserted_id)
+        self.counters.track(resource_id, resource)
+        return resource_id
         
     def update_resource(self, resource_id: str, data: Dict) -> bool:
         """Update an existing resource"""
         data['updated_at'] = datetime.utcnow()
-        result = self.resources.update_one(
-            {'_id': ObjectId(resource_id)},
-            {'$set': data}
-        )
-        return result.modified_count > 0
+        changes = {k: data[k] for k in COUNTED_FIELDS if k in data}
+        return self._update(resource_id, {'$set': data}, changes)
         
     def get_resource(self, resource_id: str) -> Optional[Dict]:
         """Get resource by ID"""
+        if self.offline is not None:
+            return self.offline.get('resources', resource_id)
         resource = self.resources.find_one({'_id': ObjectId(resource_id)})
         if resource:
             resource['_id'] = str(resource['_id'])
         return resource
         
-    def list_resources(self, filters: Dict = None) -> List[Dict]:
-        """List all resources with optional filters"""
-        query = filters or {}
-        resources = list(self.resources.find(query))
-        for resource in resources:
-            resource['_id'] = str(resource['_id'])
-        return resources
+    def list_resources(self, filters: Dict = None, fields: Sequence[str] = None) -> List[Dict]:
+        """List all resources with optional filters, newest first"""
+        if self.offline is not None:
+            return self.offline.find('resources', filters, fields=fields)
+        return [resource for batch in self.iter_resources(filters, fields=fields) for resource in batch]
+        
+    def page_resources(self, filters: Dict = None, limit: int = DEFAULT_PAGE_SIZE,
+                       cursor: str = None, fields: Sequence[str] = None) -> Page:
+        """Get one page of resources after ``cursor`` (from the previous page's next_cursor)"""
+        return fetch_page(self.resources, filters, limit, cursor, fields)
+        
+    def iter_resources(self, filters: Dict = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                       fields: Sequence[str] = None) -> Iterator[List[Dict]]:
+        """Stream resources in batches without loading the whole collection"""
+        return iter_batches(self.resources, filters, batch_size, fields)
+        
+    def find_resources_in_box(self, south: float, west: float, north: float, east: float,
+                           filters: Dict = None, fields: Sequence[str] = None,
+                           limit: int = DEFAULT_GEO_LIMIT) -> List[Dict]:
+        """Resources located inside a lat/lng bounding box"""
+        return self.geo.in_box(south, west, north, east, filters, fields, limit)
+        
+    def find_resources_near(self, lat: float, lng: float, radius_m: float,
+                        filters: Dict = None, fields: Sequence[str] = None,
+                        limit: int = DEFAULT_GEO_LIMIT) -> List[Dict]:
+        """Resources within radius_m meters of a point, nearest first"""
+        return self.geo.near(lat, lng, radius_m, filters, fields, limit)
+        
+    def find_resources_in_polygon(self, points: Sequence[Tuple[float, float]],
+                               filters: Dict = None, fields: Sequence[str] = None,
+                               limit: int = DEFAULT_GEO_LIMIT) -> List[Dict]:
+        """Resources inside a polygon of (lng, lat) vertices"""
+        return self.geo.in_polygon(points, filters, fields, limit)
         
     def assign_to_incident(self, resource_id: str, incident_id: str) -> bool:
         """Assign resource to an incident"""
-        result = self.resources.update_one(
-            {'_id': ObjectId(resource_id)},
-            {
-                '$set': {
-                    'status': 'assigned',
-                    'current_incident': incident_id,
-                    'updated_at': datetime.utcnow()
-                }
+        return self._update(resource_id, self._assign_update(incident_id), {'status': 'assigned'})
+        
+    def queue_assign_to_incident(self, resource_id: str, incident_id: str) -> Future:
+        """Queue assigning the resource to an incident on the write-behind queue"""
+        return self._queue(resource_id, self._assign_update(incident_id), {'status': 'assigned'})
+        
+    @staticmethod
+    def _assign_update(incident_id: str) -> Dict:
+        return {
+            '$set': {
+                'status': 'assigned',
+                'current_incident': incident_id,
+                'updated_at': datetime.utcnow()
             }
-        )
-        return result.modified_count > 0
+        }
         
     def release_from_incident(self, resource_id: str) -> bool:
         """Release resource from current incident"""
-        result = self.resources.update_one(
-            {'_id': ObjectId(resource_id)},
-            {
-                '$set': {
-                    'status': 'available',
-                    'current_incident': None,
-                    'updated_at': datetime.utcnow()
-                }
+        return self._update(resource_id, {
+            '$set': {
+                'status': 'available',
+                'current_incident': None,
+                'updated_at': datetime.utcnow()
             }
-        )
-        return result.modified_count > 0
+        }, {'status': 'available'})
         
     def mark_maintenance(self, resource_id: str, status: str, notes: str = None) -> bool:
         """Mark resource for maintenance"""
@@ -92,11 +140,7 @@ class ResourceManager:
             'updated_at': datetime.utcnow()
         }
         
-        result = self.resources.update_one(
-            {'_id': ObjectId(resource_id)},
-            {'$set': update_data}
-        )
-        return result.modified_count > 0
+        return self._update(resource_id, {'$set': update_data}, {'status': 'maintenance'})
         
     def complete_maintenance(self, resource_id: str) -> bool:
         """Complete maintenance and mark resource as available"""
@@ -107,8 +151,61 @@ class ResourceManager:
             'updated_at': datetime.utcnow()
         }
         
-        result = self.resources.update_one(
-            {'_id': ObjectId(resource_id)},
-            {'$set': update_data}
-        )
-        return result.modified_count > 0
+        return self._update(resource_id, {'$set': update_data}, {'status': 'available'})
+        
+    def _update(self, resource_id: str, update: Dict, changes: Dict = None) -> bool:
+        """Apply an update now.
+        
+        ``changes`` (counted fields) are applied to the counters once the
+        write succeeds.
+        """
+        if self.offline is not None:
+            modified = self.offline.update('resources', resource_id, update)
+        else:
+            result = self.resources.update_one({'_id': ObjectId(resource_id)}, update)
+            # A spooled write is not acknowledged yet; reconciliation counts it once applied
+            modified = result.acknowledged and result.modified_count > 0
+        if modified and changes:
+            self.counters.transition(resource_id, **changes)
+        return modified
+        
+    def _queue(self, resource_id: str, update: Dict, changes: Dict = None) -> Future:
+        """Queue an update; the ticket resolves to whether the resource was found"""
+        if self.offline is not None:
+            # Local writes are durable at once
+            ticket = Future()
+            ticket.set_result(self._update(resource_id, update, changes))
+            return ticket
+        if self.write_behind is None:
+            raise RuntimeError("ResourceManager was created without a write-behind queue")
+        ticket = self.write_behind.submit(self.resources, resource_id, update)
+        if changes:
+            ticket.add_done_callback(
+                lambda t: t.exception() is None and t.result() and self.counters.transition(resource_id, **changes))
+        return ticket
+        
+    def reconcile_counters(self) -> Dict:
+        """Recount resources from the database (or the local store) and repair counter drift"""
+        if self.offline is not None:
+            # The store is what this manager reads and writes, including writes not yet pushed
+            return self.counters.recount(lambda: self.offline.find('resources', fields=COUNTED_FIELDS))
+        return self.counters.reconcile(self.resources)
+        
+    def get_status_counts(self) -> Dict[str, int]:
+        """Get resource counts per status, served from memory"""
+        if not self.counters.seeded:
+            self.reconcile_counters()
+        return self.counters.status_counts()
+        
+    def count_resources(self, resource_type: str = None, status: str = None,
+                        region: str = None) -> int:
+        """Count resources by type, status and region, served from memory"""
+        if not self.counters.seeded:
+            self.reconcile_counters()
+        return self.counters.count(resource_type, status, region)
+        
+    def start_counter_reconciliation(self, interval: float = 300.0) -> ReconciliationJob:
+        """Start a background job that reconciles the counters every interval seconds"""
+        job = ReconciliationJob(self.reconcile_counters, interval)
+        job.start()
+        return job
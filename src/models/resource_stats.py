@@ -0,0 +1,221 @@
+"""In-memory resource availability counters.
+
+Counts are kept per (type, status, region) and rolled up per dimension so the
+dashboards and reports can read them without scanning the ``resources``
+collection. ``ResourceManager`` applies every status transition in O(1); a
+reconciliation pass recounts from the database and repairs any drift caused by
+writes from other processes.
+"""
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from src.utils.regions import region_of
+
+logger = logging.getLogger(__name__)
+
+CounterKey = Tuple[str, str, str]
+
+# Fields needed to place a resource document in the counters
+COUNTER_PROJECTION = {'type': 1, 'status': 1, 'location': 1}
+
+
+def _normalize_status(status) -> str:
+    return str(status or 'unknown').strip().lower()
+
+
+def counter_key(resource: Dict) -> CounterKey:
+    """Build the (type, status, region) key for a resource document"""
+    return (
+        str(resource.get('type') or 'Other'),
+        _normalize_status(resource.get('status')),
+        region_of(resource.get('location')),
+    )
+
+
+class ResourceCounters:
+    """Maintained resource counts per type, status and region"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys: Dict[str, CounterKey] = {}
+        self._counts: Counter = Counter()
+        self._by_type: Counter = Counter()
+        self._by_status: Counter = Counter()
+        self._by_region: Counter = Counter()
+        self.seeded = False
+        self.last_reconciled: Optional[datetime] = None
+        # Ids changed while a reconciliation is reading the database
+        self._touched: Optional[set] = None
+
+    def _touch(self, resource_id: str) -> None:
+        if self._touched is not None:
+            self._touched.add(resource_id)
+
+    def _apply(self, key: CounterKey, delta: int) -> None:
+        resource_type, status, region = key
+        for counter, k in ((self._counts, key), (self._by_type, resource_type),
+                           (self._by_status, status), (self._by_region, region)):
+            counter[k] += delta
+            if counter[k] <= 0:
+                del counter[k]
+
+    def track(self, resource_id: str, resource: Dict) -> None:
+        """Add a resource, replacing any previously tracked state for it"""
+        key = counter_key(resource)
+        with self._lock:
+            self._touch(resource_id)
+            previous = self._keys.get(resource_id)
+            if previous is not None:
+                self._apply(previous, -1)
+            self._keys[resource_id] = key
+            self._apply(key, 1)
+
+    def transition(self, resource_id: str, **changes) -> bool:
+        """Move a tracked resource to a new type, status or location.
+
+        Returns False when the resource is not tracked yet; the next
+        reconciliation picks it up from the database.
+        """
+        with self._lock:
+            previous = self._keys.get(resource_id)
+            if previous is None:
+                return False
+            self._touch(resource_id)
+            resource_type, status, region = previous
+            if 'type' in changes:
+                resource_type = str(changes['type'] or 'Other')
+            if 'status' in changes:
+                status = _normalize_status(changes['status'])
+            if 'location' in changes:
+                region = region_of(changes['location'])
+            key = (resource_type, status, region)
+            if key != previous:
+                self._apply(previous, -1)
+                self._apply(key, 1)
+                self._keys[resource_id] = key
+            return True
+
+    def forget(self, resource_id: str) -> None:
+        """Stop tracking a deleted resource"""
+        with self._lock:
+            self._touch(resource_id)
+            previous = self._keys.pop(resource_id, None)
+            if previous is not None:
+                self._apply(previous, -1)
+
+    def count(self, resource_type: str = None, status: str = None, region: str = None) -> int:
+        """Count resources matching any combination of type, status and region"""
+        if status is not None:
+            status = _normalize_status(status)
+        with self._lock:
+            given = [v is not None for v in (resource_type, status, region)]
+            if not any(given):
+                return len(self._keys)
+            if given == [True, True, True]:
+                return self._counts.get((resource_type, status, region), 0)
+            if given == [True, False, False]:
+                return self._by_type.get(resource_type, 0)
+            if given == [False, True, False]:
+                return self._by_status.get(status, 0)
+            if given == [False, False, True]:
+                return self._by_region.get(region, 0)
+            wanted = (resource_type, status, region)
+            return sum(
+                n for key, n in self._counts.items()
+                if all(w is None or w == k for w, k in zip(wanted, key))
+            )
+
+    def status_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._by_status)
+
+    def type_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._by_type)
+
+    def region_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._by_region)
+
+    def snapshot(self) -> Dict[CounterKey, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def load(self, resources: Iterable[Dict]) -> Dict[CounterKey, int]:
+        """Replace all counts from an iterable of resource documents.
+
+        Returns the drift between the previous and the new counts, keyed by
+        (type, status, region); an empty dict means nothing had drifted.
+        Resources changed since ``reconcile`` started reading keep their
+        current state, as the documents read may predate the change.
+        """
+        resources = list(resources)
+        with self._lock:
+            keys = {str(r['_id']): counter_key(r) for r in resources}
+            for resource_id in self._touched or ():
+                if resource_id in self._keys:
+                    keys[resource_id] = self._keys[resource_id]
+                else:
+                    keys.pop(resource_id, None)
+            self._touched = None
+            fresh = Counter(keys.values())
+            drift = {
+                key: fresh.get(key, 0) - self._counts.get(key, 0)
+                for key in set(fresh) | set(self._counts)
+                if fresh.get(key, 0) != self._counts.get(key, 0)
+            }
+            self._keys = keys
+            self._counts = Counter()
+            self._by_type = Counter()
+            self._by_status = Counter()
+            self._by_region = Counter()
+            for key, n in fresh.items():
+                self._apply(key, n)
+            had_seed = self.seeded
+            self.seeded = True
+            self.last_reconciled = datetime.utcnow()
+        if drift and had_seed:
+            logger.warning(f"Resource counters drifted from database, repaired {len(drift)} keys")
+        return drift
+
+    def reconcile(self, collection) -> Dict[CounterKey, int]:
+        """Recount from a ``resources`` collection and repair any drift"""
+        return self.recount(lambda: collection.find({}, COUNTER_PROJECTION))
+
+    def recount(self, read: Callable[[], Iterable[Dict]]) -> Dict[CounterKey, int]:
+        """Recount from the resource documents ``read()`` returns and repair any drift"""
+        with self._lock:
+            self._touched = set()
+        return self.load(read())
+
+
+class ReconciliationJob(threading.Thread):
+    """Background thread that calls ``reconcile`` every ``interval`` seconds"""
+
+    def __init__(self, reconcile: Callable[[], Dict], interval: float = 300.0):
+        super().__init__(name='resource-counter-reconciliation', daemon=True)
+        self.reconcile = reconcile
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.reconcile()
+            except Exception as e:
+                logger.error(f"Resource counter reconciliation failed: {e}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_resource_counters = ResourceCounters()
+
+
+def get_resource_counters() -> ResourceCounters:
+    """Get the process-wide resource counters."""
+    return _resource_counters
@@ -0,0 +1,119 @@
+"""Incident and resource counts for the dashboard and reports.
+
+``StatisticsService`` computes every breakdown in a single server-side
+aggregation: a ``$match`` and ``$project`` that the compound indexes created
+by setup_mongodb.py can cover, followed by one ``$group`` per breakdown inside
+a ``$facet``. Only the compact count structures cross the wire.
+``InMemoryStatistics`` returns the same structures from plain document lists
+so tests and benchmarks can run without a server.
+"""
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from src.utils.mongo_pool import get_database
+
+INCIDENT_BREAKDOWNS = ('status', 'severity', 'type')
+RESOURCE_BREAKDOWNS = ('status', 'type')
+
+RANGE_OPERATORS = {
+    '$gt': lambda value, bound: value > bound,
+    '$gte': lambda value, bound: value >= bound,
+    '$lt': lambda value, bound: value < bound,
+    '$lte': lambda value, bound: value <= bound,
+}
+
+
+def _empty_summary(breakdowns) -> Dict:
+    summary = {'total': 0}
+    summary.update({f'by_{field}': {} for field in breakdowns})
+    return summary
+
+
+def summary_pipeline(breakdowns, match: Optional[Dict] = None) -> List[Dict]:
+    """Aggregation pipeline returning one document with a facet per breakdown"""
+    facets = {'total': [{'$count': 'n'}]}
+    for field in breakdowns:
+        facets[f'by_{field}'] = [{'$group': {'_id': f'${field}', 'n': {'$sum': 1}}}]
+    pipeline = [{'$match': match}] if match else []
+    pipeline.append({'$project': {'_id': 0, **{field: 1 for field in breakdowns}}})
+    pipeline.append({'$facet': facets})
+    return pipeline
+
+
+def summary_from_facets(result: Optional[Dict], breakdowns) -> Dict:
+    """Convert the $facet output document into the compact summary structure"""
+    summary = _empty_summary(breakdowns)
+    if not result:
+        return summary
+    total = result.get('total') or []
+    summary['total'] = total[0]['n'] if total else 0
+    for field in breakdowns:
+        summary[f'by_{field}'] = {row['_id']: row['n'] for row in result.get(f'by_{field}', [])}
+    return summary
+
+
+class StatisticsService:
+    """Counts by status, severity and type computed by MongoDB"""
+
+    def __init__(self, db=None):
+        self.db = db if db is not None else get_database()
+
+    def _summary(self, collection, breakdowns, match):
+        result = next(collection.aggregate(summary_pipeline(breakdowns, match)), None)
+        return summary_from_facets(result, breakdowns)
+
+    def incident_summary(self, match: Optional[Dict] = None) -> Dict:
+        return self._summary(self.db.incidents, INCIDENT_BREAKDOWNS, match)
+
+    def resource_summary(self, match: Optional[Dict] = None) -> Dict:
+        return self._summary(self.db.resources, RESOURCE_BREAKDOWNS, match)
+
+
+def matches(document: Dict, query: Optional[Dict]) -> bool:
+    """Evaluate the subset of MongoDB filters the statistics queries use"""
+    for field, condition in (query or {}).items():
+        value = document.get(field)
+        if isinstance(condition, dict) and any(op.startswith('$') for op in condition):
+            for op, operand in condition.items():
+                if op == '$in':
+                    if value not in operand:
+                        return False
+                elif op == '$ne':
+                    if value == operand:
+                        return False
+                elif op in RANGE_OPERATORS:
+                    if value is None or not RANGE_OPERATORS[op](value, operand):
+                        return False
+                else:
+                    raise ValueError(f"Unsupported operator in statistics query: {op}")
+        elif value != condition:
+            return False
+    return True
+
+
+class InMemoryStatistics:
+    """Stand-in for StatisticsService over in-memory document lists"""
+
+    def __init__(self, incidents: Iterable[Dict] = (), resources: Iterable[Dict] = ()):
+        self.incidents = list(incidents)
+        self.resources = list(resources)
+
+    @staticmethod
+    def _summary(documents, breakdowns, match):
+        counters = {field: Counter() for field in breakdowns}
+        total = 0
+        for document in documents:
+            if match and not matches(document, match):
+                continue
+            total += 1
+            for field in breakdowns:
+                counters[field][document.get(field)] += 1
+        summary = {'total': total}
+        summary.update({f'by_{field}': dict(counters[field]) for field in breakdowns})
+        return summary
+
+    def incident_summary(self, match: Optional[Dict] = None) -> Dict:
+        return self._summary(self.incidents, INCIDENT_BREAKDOWNS, match)
+
+    def resource_summary(self, match: Optional[Dict] = None) -> Dict:
+        return self._summary(self.resources, RESOURCE_BREAKDOWNS, match)
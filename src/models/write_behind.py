@@ -0,0 +1,226 @@
+"""Write-behind queue for incident and resource updates.
+
+Callers submit ``update_one`` style mutations and get a ``Future`` back
+immediately; a background thread flushes the queue every ``flush_interval``
+seconds (or sooner once ``max_batch`` operations are pending) as one ordered
+``bulk_write`` per collection. Mutations to the same document are merged
+while they wait, as long as merging cannot change the outcome, and are always
+applied in submission order. Once MongoDB has acknowledged its write a ticket
+resolves to whether the document was found (``False`` if it no longer
+exists), or raises the error that prevented the write.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 0.25  # seconds
+DEFAULT_MAX_BATCH = 500
+
+# Operators whose values for the same field can be combined into one update
+MERGEABLE_OPERATORS = ('$set', '$unset', '$inc')
+
+
+def _overlaps(field: str, other: str) -> bool:
+    """True when two update paths touch the same value ("a" and "a.b" do)"""
+    return field == other or field.startswith(other + '.') or other.startswith(field + '.')
+
+
+def merge_update(pending: Dict, update: Dict) -> bool:
+    """Fold ``update`` into ``pending`` in place if the result is equivalent to
+    applying both in order; returns False (leaving ``pending`` untouched) otherwise."""
+    for operator, fields in update.items():
+        for field in fields:
+            for other_operator, other_fields in pending.items():
+                for other in other_fields:
+                    if not _overlaps(field, other):
+                        continue
+                    if field != other or other_operator != operator or operator not in MERGEABLE_OPERATORS:
+                        return False
+    for operator, fields in update.items():
+        target = pending.setdefault(operator, {})
+        for field, value in fields.items():
+            if operator == '$inc' and field in target:
+                target[field] += value
+            else:
+                target[field] = value
+    return True
+
+
+class _Stage:
+    """One update on its way to the server and the tickets waiting on it"""
+
+    __slots__ = ('update', 'tickets')
+
+    def __init__(self, update: Dict, ticket: Future):
+        self.update = {operator: dict(fields) for operator, fields in update.items()}
+        self.tickets = [ticket]
+
+
+class WriteBehindQueue:
+    """Merges per-document mutations and flushes them in background bulk writes"""
+
+    def __init__(self, flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 max_batch: int = DEFAULT_MAX_BATCH):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._idle = threading.Condition(self._lock)
+        self._collections = {}
+        # (collection name, _id) -> stages in submission order; dicts keep
+        # first-submission order across documents as well
+        self._pending: Dict[tuple, List[_Stage]] = {}
+        self._pending_ops = 0
+        self._in_flight = False
+        self._closed = False
+        self.stats = {'submitted': 0, 'merged': 0, 'written': 0, 'unmatched': 0, 'batches': 0,
+                      'failed': 0, 'last_flush_ms': 0.0}
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+
+    def submit(self, collection, document_id, update: Dict) -> Future:
+        """Queue ``update`` for the document with ``document_id``; returns its ticket"""
+        ticket = Future()
+        key = (collection.full_name, ObjectId(document_id) if isinstance(document_id, str) else document_id)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Write-behind queue is closed")
+            self._collections[collection.full_name] = collection
+            self.stats['submitted'] += 1
+            stages = self._pending.setdefault(key, [])
+            if stages and merge_update(stages[-1].update, update):
+                stages[-1].tickets.append(ticket)
+                self.stats['merged'] += 1
+            else:
+                stages.append(_Stage(update, ticket))
+                self._pending_ops += 1
+            if self._pending_ops >= self.max_batch:
+                self._wake.set()
+        return ticket
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything queued so far; returns False if ``timeout`` expired first"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            self._wake.set()
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None):
+        """Flush pending writes and stop the background thread"""
+        self.flush(timeout)
+        with self._lock:
+            self._closed = True
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending_ops
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            with self._lock:
+                if self._closed and not self._pending:
+                    return
+                batch, self._pending = self._pending, {}
+                self._pending_ops = 0
+                self._in_flight = bool(batch)
+            if batch:
+                try:
+                    self._write(batch)
+                finally:
+                    with self._lock:
+                        self._in_flight = False
+                        self._idle.notify_all()
+
+    def _write(self, batch):
+        started = time.perf_counter()
+        by_collection = {}
+        for (name, document_id), stages in batch.items():
+            operations, owners = by_collection.setdefault(name, ([], []))
+            for stage in stages:
+                operations.append(UpdateOne({'_id': document_id}, stage.update))
+                owners.append((document_id, stage))
+
+        for name, (operations, owners) in by_collection.items():
+            collection = self._collections[name]
+            try:
+                result = collection.bulk_write(operations, ordered=True)
+                failed_at, error, matched = len(owners), None, result.matched_count
+            except BulkWriteError as e:
+                write_errors = e.details.get('writeErrors') or [{}]
+                failed_at, error, matched = write_errors[0].get('index', 0), e, e.details.get('nMatched', 0)
+            except Exception as e:
+                failed_at, error, matched = 0, e, 0
+            if error is not None:
+                logger.error(f"Write-behind flush to {name} failed at operation {failed_at}: {error}")
+            found = self._found(collection, owners[:failed_at], matched)
+            for index, (document_id, stage) in enumerate(owners):
+                for ticket in stage.tickets:
+                    # Ordered bulk writes stop at the first error; later operations were not applied
+                    if index < failed_at:
+                        ticket.set_result(found is None or document_id in found)
+                    else:
+                        ticket.set_exception(error)
+            with self._lock:
+                self.stats['written'] += failed_at
+                self.stats['unmatched'] += 0 if found is None else sum(
+                    document_id not in found for document_id, _ in owners[:failed_at])
+                self.stats['failed'] += len(owners) - failed_at
+                self.stats['batches'] += 1
+
+        with self._lock:
+            self.stats['last_flush_ms'] = round((time.perf_counter() - started) * 1000, 3)
+
+    @staticmethod
+    def _found(collection, applied, matched):
+        """Ids of the applied operations' documents that exist, or None if all matched.
+
+        bulk_write only reports a total, but every filter is on ``_id``, so an
+        operation matched exactly when its document exists.
+        """
+        if matched >= len(applied):
+            return None
+        ids = list({document_id for document_id, _ in applied})
+        try:
+            return {document['_id'] for document in collection.find({'_id': {'$in': ids}}, {'_id': 1})}
+        except Exception as e:
+            logger.warning(f"Write-behind could not check which documents matched: {e}")
+            return None
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_write_behind_queue() -> WriteBehindQueue:
+    """Process-wide write-behind queue"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = WriteBehindQueue()
+        return _queue
+
+
+def close_write_behind_queue(timeout: Optional[float] = None):
+    """Flush and stop the process-wide queue if anything ever used it"""
+    global _queue
+    with _queue_lock:
+        queue, _queue = _queue, None
+    if queue is not None:
+        queue.close(timeout)
@@ -7,12 +7,17 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 import matplotlib.pyplot as plt
 import pandas as pd
 from models.incident import IncidentManager
-from models.resource import ResourceManager
+from models.resource import RESOURCE_TABLE_FIELDS, ResourceManager
+from models.statistics import StatisticsService
+
+# Columns of the incident details table
+INCIDENT_REPORT_FIELDS = ('title', 'type', 'severity', 'status', 'created_at')
 
 class ReportGenerator:
     def __init__(self):
         self.incident_manager = IncidentManager()
         self.resource_manager = ResourceManager()
+        self.statistics = StatisticsService(self.incident_manager.db)
         self.styles = getSampleStyleSheet()
         
     def generate_incident_report(self, start_date, end_date, output_path):
@@ -34,16 +39,17 @@ class ReportGenerator:
         ))
         elements.append(Spacer(1, 20))
         
-        # Summary statistics
-        incidents = self.incident_manager.list_incidents({
+        # Summary statistics (server-side aggregation)
+        period = {
             'created_at': {
                 '$gte': start_date,
                 '$lte': end_date
             }
-        })
+        }
+        incident_stats = self.statistics.incident_summary(period)
         
-        total_incidents = len(incidents)
-        active_incidents = sum(1 for i in incidents if i['status'] == 'active')
+        total_incidents = incident_stats['total']
+        active_incidents = incident_stats['by_status'].get('active', 0)
         closed_incidents = total_incidents - active_incidents
         
         summary_data = [
@@ -66,6 +72,7 @@ class ReportGenerator:
         elements.append(Spacer(1, 20))
         
         # Incident details table
+        incidents = self.incident_manager.list_incidents(period, fields=INCIDENT_REPORT_FIELDS)
         if incidents:
             incident_data = [["Title", "Type", "Severity", "Status", "Created"]]
             for incident in incidents:
@@ -112,14 +119,12 @@ class ReportGenerator:
         ))
         elements.append(Spacer(1, 20))
         
-        # Get resources
-        resources = self.resource_manager.list_resources()
-        
-        # Summary statistics
-        total_resources = len(resources)
-        available_resources = sum(1 for r in resources if r['status'] == 'available')
-        assigned_resources = sum(1 for r in resources if r['status'] == 'assigned')
-        maintenance_resources = sum(1 for r in resources if r['status'] == 'maintenance')
+        # Summary statistics (maintained counters, no collection scan)
+        status_counts = self.resource_manager.get_status_counts()
+        total_resources = sum(status_counts.values())
+        available_resources = status_counts.get('available', 0)
+        assigned_resources = status_counts.get('assigned', 0)
+        maintenance_resources = status_counts.get('maintenance', 0)
         
         summary_data = [
             ["Total Resources", str(total_resources)],
@@ -142,6 +147,7 @@ class ReportGenerator:
         elements.append(Spacer(1, 20))
         
         # Resource details table
+        resources = self.resource_manager.list_resources(fields=RESOURCE_TABLE_FIELDS)
         if resources:
             resource_data = [["Name", "Type", "Location", "Status", "Current Incident"]]
             for resource in resources:
@@ -174,17 +180,16 @@ class ReportGenerator:
         # Ensure output directory exists
         os.makedirs(output_dir, exist_ok=True)
         
-        # Get data
-        incidents = self.incident_manager.list_incidents()
-        resources = self.resource_manager.list_resources()
+        # Get counts
+        incident_stats = self.statistics.incident_summary()
+        resource_stats = self.statistics.resource_summary()
         
-        # Convert to pandas DataFrames
-        incidents_df = pd.DataFrame(incidents)
-        resources_df = pd.DataFrame(resources)
+        def counts(summary, field):
+            return pd.Series(summary[f'by_{field}'], dtype='int64').sort_values(ascending=False)
         
         # 1. Incident Type Distribution
         plt.figure(figsize=(10, 6))
-        incidents_df['type'].value_counts().plot(kind='bar')
+        counts(incident_stats, 'type').plot(kind='bar')
         plt.title('Incident Distribution by Type')
         plt.xlabel('Incident Type')
         plt.ylabel('Count')
@@ -194,7 +199,7 @@ class ReportGenerator:
         
         # 2. Incident Status
         plt.figure(figsize=(8, 8))
-        incidents_df['status'].value_counts().plot(kind='pie', autopct='%1.1f%%')
+        counts(incident_stats, 'status').plot(kind='pie', autopct='%1.1f%%')
         plt.title('Incident Status Distribution')
         plt.axis('equal')
         plt.savefig(os.path.join(output_dir, 'incident_status.png'))
@@ -202,7 +207,7 @@ class ReportGenerator:
         
         # 3. Resource Status
         plt.figure(figsize=(8, 8))
-        resources_df['status'].value_counts().plot(kind='pie', autopct='%1.1f%%')
+        counts(resource_stats, 'status').plot(kind='pie', autopct='%1.1f%%')
         plt.title('Resource Status Distribution')
         plt.axis('equal')
         plt.savefig(os.path.join(output_dir, 'resource_status.png'))
@@ -210,7 +215,7 @@ class ReportGenerator:
         
         # 4. Resource Types
         plt.figure(figsize=(10, 6))
-        resources_df['type'].value_counts().plot(kind='bar')
+        counts(resource_stats, 'type').plot(kind='bar')
         plt.title('Resource Distribution by Type')
         plt.xlabel('Resource Type')
         plt.ylabel('Count')
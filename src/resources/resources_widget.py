@@ -5,9 +5,14 @@ from PyQt5.QtCore import Qt, pyqtSignal
 from ..utils.map_client import map_client
 from ..utils.mongodb_client import mongodb_client
 from ..utils.location_picker import pick_location
+from ..models.live_cache import get_live_cache
+from ..models.resource_stats import get_resource_counters
 from datetime import datetime
 from bson import ObjectId
 
+# Columns shown by the resources table
+TABLE_FIELDS = ('name', 'type', 'status', 'location', 'capacity')
+
 class ResourceDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -127,6 +132,11 @@ class ResourcesWidget(QWidget):
         self.add_button.clicked.connect(self.add_resource)
         layout.addWidget(self.add_button)
         
+        # Status summary served from the maintained counters
+        self.counters = get_resource_counters()
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+        
         # Resources table
         self.table = QTableWidget()
         self.table.setColumnCount(7)
@@ -148,6 +158,8 @@ class ResourcesWidget(QWidget):
                 # Save to database
                 result = mongodb_client.db.resources.insert_one(resource_data)
                 if result.inserted_id:
+                    self.counters.track(str(result.inserted_id), resource_data)
+                    get_live_cache().refresh('resources', result.inserted_id)
                     self.refresh_table()
                 
     def refresh_table(self):
@@ -156,8 +168,8 @@ class ResourcesWidget(QWidget):
             # Clear the table
             self.table.setRowCount(0)
             
-            # Get all resources
-            resources = mongodb_client.db.resources.find()
+            # Get all resources from the live cache, only the columns the table shows
+            resources = get_live_cache().resources.find(fields=TABLE_FIELDS)
             
             for resource in resources:
                 row = self.table.rowCount()
@@ -195,8 +207,18 @@ class ResourcesWidget(QWidget):
                 self.table.setItem(row, 5, QTableWidgetItem(str(resource.get('capacity', ''))))
                 self.table.setCellWidget(row, 6, delete_btn)
                 
+            self.update_summary()
+                
         except Exception as e:
             print(f"Error refreshing resources table: {e}")
+    
+    def update_summary(self):
+        """Show resource counts per status from the in-memory counters"""
+        if not self.counters.seeded:
+            self.counters.reconcile(mongodb_client.db.resources)
+        counts = self.counters.status_counts()
+        parts = [f"{status.title()}: {n}" for status, n in sorted(counts.items())]
+        self.summary_label.setText(f"Total: {sum(counts.values())}" + "".join(f" | {p}" for p in parts))
 
     def refresh_data(self):
         """Compatibility method that refreshes both table and map"""
@@ -208,7 +230,7 @@ class ResourcesWidget(QWidget):
             self.refresh_table()
             
             # Update map markers
-            resources = mongodb_client.db.resources.find()
+            resources = get_live_cache().resources.find()
             for resource in resources:
                 location = resource.get("location", {})
                 if location and "lat" in location and "lng" in location:
@@ -241,6 +263,8 @@ class ResourcesWidget(QWidget):
                 result = mongodb_client.db.resources.delete_one({'_id': ObjectId(resource_id)})
                 if result.deleted_count > 0:
                     print(f"Successfully deleted resource {resource_id}")
+                    self.counters.forget(resource_id)
+                    get_live_cache().refresh('resources', resource_id)
                     self.refresh_table()
                     # Emit signal to refresh map
                     self.resource_deleted.emit()
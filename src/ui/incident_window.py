@@ -1,16 +1,38 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QPushButton, QComboBox, QLineEdit, QTextEdit, 
-                             QTableWidget, QTableWidgetItem, QMessageBox)
+                             QMessageBox)
 from PyQt5.QtCore import Qt
-from models.incident import IncidentManager
-from models.resource import ResourceManager
-from ui.resource_assignment_dialog import ResourceAssignmentDialog
+from src.models.dedup import DuplicateDetector, get_duplicate_detector
+from src.models.incident import INCIDENT_TABLE_FIELDS, IncidentManager
+from src.models.offline_store import get_offline_store, get_offline_sync, offline_mode
+from src.models.resource import ResourceManager
+from src.models.write_behind import get_write_behind_queue
+from src.ui.resource_assignment_dialog import ResourceAssignmentDialog
+from src.ui.write_acknowledger import WriteAcknowledger
+from src.models.live_cache import get_live_cache
+from src.widgets.live_updates import LiveCacheSignals
+from src.widgets.record_table import Column, RecordTable, RowAction
 
 class IncidentWindow(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.incident_manager = IncidentManager()
-        self.resource_manager = ResourceManager()
+        # Closing is queued and written in the background, or written to the
+        # offline store (which syncs in the background) with OFFLINE_STORE=1
+        self.offline = get_offline_store() if offline_mode() else None
+        # New incidents repeating a recent one are stored with 'duplicate_of'
+        if self.offline is not None:
+            duplicates = DuplicateDetector(key='_id')
+            duplicates.load(self.offline.find('incidents'))
+        else:
+            duplicates = get_duplicate_detector()
+        self.incident_manager = IncidentManager(get_write_behind_queue(), duplicates, self.offline)
+        self.resource_manager = ResourceManager(offline=self.offline)
+        self.acknowledger = WriteAcknowledger(self)
+        self.acknowledger.acknowledged.connect(self.on_incident_closed)
+        self.acknowledger.failed.connect(self.on_close_failed)
+        self.cache_updates = LiveCacheSignals(
+            get_offline_sync() if self.offline is not None else get_live_cache(), self)
+        self.cache_updates.changed.connect(lambda name: name == 'incidents' and self.load_incidents())
         self.setup_ui()
         self.load_incidents()
         
@@ -54,11 +76,18 @@ class IncidentWindow(QWidget):
         create_group.addWidget(self.create_button)
         
         # Incidents table
-        self.incidents_table = QTableWidget()
-        self.incidents_table.setColumnCount(7)
-        self.incidents_table.setHorizontalHeaderLabels([
-            "ID", "Title", "Type", "Severity", "Location", "Status", "Actions"
-        ])
+        self.incidents_table = RecordTable([
+            Column("ID", '_id'),
+            Column("Title", 'title'),
+            Column("Type", 'type'),
+            Column("Severity", 'severity'),
+            Column("Location", 'location'),
+            Column("Status", 'status'),
+            Column("Actions", actions=[
+                RowAction("Assign", lambda incident: self.show_resource_dialog(incident['_id'])),
+                RowAction("Close", lambda incident: self.close_incident(incident['_id'])),
+            ]),
+        ], key='_id')
         self.incidents_table.horizontalHeader().setStretchLastSection(True)
         
         layout.addLayout(create_group)
@@ -83,7 +112,8 @@ class IncidentWindow(QWidget):
             return
             
         try:
-            self.incident_manager.create_incident(data)
+            incident_id = self.incident_manager.create_incident(data)
+            self.refresh_cached(incident_id)
             self.clear_inputs()
             self.load_incidents()
             QMessageBox.information(self, "Success", 
@@ -93,41 +123,16 @@ class IncidentWindow(QWidget):
                                f"Failed to create incident: {str(e)}")
             
     def load_incidents(self):
-        incidents = self.incident_manager.list_incidents({'status': 'active'})
-        self.incidents_table.setRowCount(len(incidents))
-        
-        for row, incident in enumerate(incidents):
-            self.incidents_table.setItem(row, 0, 
-                QTableWidgetItem(incident['_id']))
-            self.incidents_table.setItem(row, 1, 
-                QTableWidgetItem(incident['title']))
-            self.incidents_table.setItem(row, 2, 
-                QTableWidgetItem(incident['type']))
-            self.incidents_table.setItem(row, 3, 
-                QTableWidgetItem(incident['severity']))
-            self.incidents_table.setItem(row, 4, 
-                QTableWidgetItem(incident['location']))
-            self.incidents_table.setItem(row, 5, 
-                QTableWidgetItem(incident['status']))
-            
-            # Action buttons
-            actions_widget = QWidget()
-            actions_layout = QHBoxLayout()
-            actions_layout.setContentsMargins(0, 0, 0, 0)
-            
-            assign_btn = QPushButton("Assign")
-            assign_btn.clicked.connect(
-                lambda checked, id=incident['_id']: self.show_resource_dialog(id))
-            
-            close_btn = QPushButton("Close")
-            close_btn.clicked.connect(
-                lambda checked, id=incident['_id']: self.close_incident(id))
-            
-            actions_layout.addWidget(assign_btn)
-            actions_layout.addWidget(close_btn)
-            actions_widget.setLayout(actions_layout)
-            
-            self.incidents_table.setCellWidget(row, 6, actions_widget)
+        if self.offline is not None:
+            incidents = self.incident_manager.list_incidents({'status': 'active'}, INCIDENT_TABLE_FIELDS)
+        else:
+            incidents = get_live_cache().incidents.find(fields=INCIDENT_TABLE_FIELDS, status='active')
+        self.incidents_table.set_records(incidents)
+        
+    def refresh_cached(self, incident_id):
+        # Offline store reads already include local writes
+        if self.offline is None:
+            get_live_cache().refresh('incidents', incident_id)
             
     def clear_inputs(self):
         self.title_input.clear()
@@ -150,11 +155,18 @@ class IncidentWindow(QWidget):
         
         if reply == QMessageBox.Yes:
             try:
-                self.incident_manager.close_incident(
-                    incident_id, "Incident resolved")
-                self.load_incidents()
-                QMessageBox.information(
-                    self, "Success", "Incident closed successfully!")
+                self.acknowledger.watch(self.incident_manager.queue_close_incident(
+                    incident_id, "Incident resolved"), incident_id)
             except Exception as e:
                 QMessageBox.critical(
                     self, "Error", f"Failed to close incident: {str(e)}")
+                
+    def on_incident_closed(self, incident_id):
+        self.refresh_cached(incident_id)
+        self.load_incidents()
+        QMessageBox.information(
+            self, "Success", "Incident closed successfully!")
+        
+    def on_close_failed(self, incident_id, error):
+        QMessageBox.critical(
+            self, "Error", f"Failed to close incident: {error}")
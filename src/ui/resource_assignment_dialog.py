@@ -1,14 +1,33 @@
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
-                             QPushButton, QTableWidget, QTableWidgetItem)
-from models.resource import ResourceManager
-from models.incident import IncidentManager
+                             QPushButton, QTableWidget, QTableWidgetItem, QMessageBox)
+from src.models.resource import ResourceManager
+from src.models.incident import IncidentManager
+from src.models.offline_store import get_offline_store, offline_mode
+from src.models.write_behind import get_write_behind_queue
+from src.ui.write_acknowledger import WriteAcknowledger
+from src.ai.routing import format_eta, load_road_graph
+from src.models.live_cache import get_live_cache
+from src.utils.regions import document_coordinates
 
 class ResourceAssignmentDialog(QDialog):
     def __init__(self, incident_id, parent=None):
         super().__init__(parent)
         self.incident_id = incident_id
-        self.resource_manager = ResourceManager()
-        self.incident_manager = IncidentManager()
+        # Assignments are queued and written in the background; the table
+        # refreshes once both writes of an assignment are acknowledged.
+        # With OFFLINE_STORE=1 they go to the offline store instead
+        write_behind = get_write_behind_queue()
+        self.offline = get_offline_store() if offline_mode() else None
+        self.resource_manager = ResourceManager(write_behind, offline=self.offline)
+        self.incident_manager = IncidentManager(write_behind, offline=self.offline)
+        self.acknowledger = WriteAcknowledger(self)
+        self.acknowledger.acknowledged.connect(self.on_assignment_saved)
+        self.acknowledger.failed.connect(self.on_assignment_failed)
+        self.saving = {}
+        self.road_graph = load_road_graph()
+        self.incident_coordinates = document_coordinates(
+            self.incident_manager.get_incident(incident_id) if self.offline is not None
+            else get_live_cache().incidents.get(incident_id)) if self.road_graph else None
         
         self.setWindowTitle("Assign Resources")
         self.setup_ui()
@@ -19,14 +38,17 @@ class ResourceAssignmentDialog(QDialog):
         
         # Resources table
         self.resources_table = QTableWidget()
-        self.resources_table.setColumnCount(6)
+        self.resources_table.setColumnCount(7)
         self.resources_table.setHorizontalHeaderLabels([
-            "ID", "Name", "Type", "Location", "Status", "Action"
+            "ID", "Name", "Type", "Location", "Status", "ETA", "Action"
         ])
         self.resources_table.horizontalHeader().setStretchLastSection(True)
         
         # Buttons
         button_layout = QHBoxLayout()
+        self.save_status = QLabel("")
+        button_layout.addWidget(self.save_status)
+        button_layout.addStretch()
         self.close_button = QPushButton("Close")
         self.close_button.clicked.connect(self.reject)
         button_layout.addWidget(self.close_button)
@@ -40,14 +62,22 @@ class ResourceAssignmentDialog(QDialog):
         
     def load_available_resources(self):
         # Get available resources (not in maintenance or assigned)
-        resources = self.resource_manager.list_resources({
-            'status': 'available',
-            'maintenance_status': 'operational'
-        })
+        if self.offline is not None:
+            resources = self.resource_manager.list_resources(
+                {'status': 'available', 'maintenance_status': 'operational'})
+        else:
+            resources = get_live_cache().resources.find(
+                status='available', maintenance_status='operational')
         
-        self.resources_table.setRowCount(len(resources))
+        # Nearest first by road travel time when a road network is available
+        if self.incident_coordinates:
+            ranked = self.road_graph.rank_by_eta(self.incident_coordinates, resources)
+        else:
+            ranked = [(None, resource) for resource in resources]
         
-        for row, resource in enumerate(resources):
+        self.resources_table.setRowCount(len(ranked))
+        
+        for row, (eta, resource) in enumerate(ranked):
             self.resources_table.setItem(row, 0, 
                 QTableWidgetItem(resource['_id']))
             self.resources_table.setItem(row, 1, 
@@ -58,28 +88,58 @@ class ResourceAssignmentDialog(QDialog):
                 QTableWidgetItem(resource['location']))
             self.resources_table.setItem(row, 4, 
                 QTableWidgetItem(resource['status']))
+            self.resources_table.setItem(row, 5, 
+                QTableWidgetItem(format_eta(eta) if eta is not None else "-"))
             
             # Assign button
-            assign_btn = QPushButton("Assign")
+            assign_btn = QPushButton("Saving..." if resource['_id'] in self.saving else "Assign")
+            assign_btn.setEnabled(resource['_id'] not in self.saving)
             assign_btn.clicked.connect(
                 lambda checked, rid=resource['_id']: 
                 self.assign_resource(rid))
             
-            self.resources_table.setCellWidget(row, 5, assign_btn)
+            self.resources_table.setCellWidget(row, 6, assign_btn)
             
     def assign_resource(self, resource_id):
         try:
             # Assign resource to incident
-            self.incident_manager.assign_resource(
-                self.incident_id, resource_id)
+            self.acknowledger.watch(self.incident_manager.queue_assign_resource(
+                self.incident_id, resource_id), resource_id)
             
             # Update resource status
-            self.resource_manager.assign_to_incident(
-                resource_id, self.incident_id)
+            self.acknowledger.watch(self.resource_manager.queue_assign_to_incident(
+                resource_id, self.incident_id), resource_id)
             
-            # Refresh the table
-            self.load_available_resources()
+            self.saving[resource_id] = 2
+            self.update_save_status()
+            sender = self.sender()
+            if isinstance(sender, QPushButton):
+                sender.setText("Saving...")
+                sender.setEnabled(False)
         except Exception as e:
-            from PyQt5.QtWidgets import QMessageBox
             QMessageBox.critical(
                 self, "Error", f"Failed to assign resource: {str(e)}")
+            
+    def on_assignment_saved(self, resource_id):
+        if resource_id not in self.saving:
+            return
+        self.saving[resource_id] -= 1
+        if self.saving[resource_id] == 0:
+            del self.saving[resource_id]
+            if self.offline is None:
+                cache = get_live_cache()
+                cache.refresh('resources', resource_id)
+                cache.refresh('incidents', self.incident_id)
+            self.update_save_status()
+            self.load_available_resources()
+            
+    def on_assignment_failed(self, resource_id, error):
+        if self.saving.pop(resource_id, None) is None:
+            return
+        self.update_save_status()
+        self.load_available_resources()
+        QMessageBox.critical(
+            self, "Error", f"Failed to assign resource: {error}")
+            
+    def update_save_status(self):
+        self.save_status.setText(f"Saving {len(self.saving)} assignment(s)..." if self.saving else "All changes saved")
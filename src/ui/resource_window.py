@@ -1,13 +1,23 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QPushButton, QComboBox, QLineEdit, QTextEdit, 
-                             QTableWidget, QTableWidgetItem, QMessageBox)
+                             QMessageBox)
 from PyQt5.QtCore import Qt
-from models.resource import ResourceManager
+from src.models.offline_store import get_offline_store, get_offline_sync, offline_mode
+from src.models.resource import RESOURCE_TABLE_FIELDS, ResourceManager
+from src.models.live_cache import get_live_cache
+from src.widgets.live_updates import LiveCacheSignals
+from src.widgets.record_table import Column, RecordTable, RowAction
 
 class ResourceWindow(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.resource_manager = ResourceManager()
+        # With OFFLINE_STORE=1 resources are read from and written to the
+        # offline store, which syncs in the background
+        self.offline = get_offline_store() if offline_mode() else None
+        self.resource_manager = ResourceManager(offline=self.offline)
+        self.cache_updates = LiveCacheSignals(
+            get_offline_sync() if self.offline is not None else get_live_cache(), self)
+        self.cache_updates.changed.connect(lambda name: name == 'resources' and self.load_resources())
         self.setup_ui()
         self.load_resources()
         
@@ -61,12 +71,21 @@ class ResourceWindow(QWidget):
         create_group.addWidget(self.create_button)
         
         # Resources table
-        self.resources_table = QTableWidget()
-        self.resources_table.setColumnCount(8)
-        self.resources_table.setHorizontalHeaderLabels([
-            "ID", "Name", "Type", "Location", "Status", 
-            "Maintenance Status", "Current Incident", "Actions"
-        ])
+        self.resources_table = RecordTable([
+            Column("ID", '_id'),
+            Column("Name", 'name'),
+            Column("Type", 'type'),
+            Column("Location", 'location'),
+            Column("Status", 'status'),
+            Column("Maintenance Status", 'maintenance_status'),
+            Column("Current Incident", 'current_incident', default='None'),
+            Column("Actions", actions=[
+                RowAction("Maintenance", lambda resource: self.start_maintenance(resource['_id']),
+                          visible=lambda resource: resource['status'] != 'maintenance'),
+                RowAction("Complete", lambda resource: self.complete_maintenance(resource['_id']),
+                          visible=lambda resource: resource['status'] == 'maintenance'),
+            ]),
+        ], key='_id')
         self.resources_table.horizontalHeader().setStretchLastSection(True)
         
         layout.addLayout(create_group)
@@ -92,7 +111,8 @@ class ResourceWindow(QWidget):
             return
             
         try:
-            self.resource_manager.create_resource(data)
+            resource_id = self.resource_manager.create_resource(data)
+            self.refresh_cached(resource_id)
             self.clear_inputs()
             self.load_resources()
             QMessageBox.information(self, "Success", 
@@ -102,45 +122,16 @@ class ResourceWindow(QWidget):
                                f"Failed to add resource: {str(e)}")
             
     def load_resources(self):
-        resources = self.resource_manager.list_resources()
-        self.resources_table.setRowCount(len(resources))
-        
-        for row, resource in enumerate(resources):
-            self.resources_table.setItem(row, 0, 
-                QTableWidgetItem(resource['_id']))
-            self.resources_table.setItem(row, 1, 
-                QTableWidgetItem(resource['name']))
-            self.resources_table.setItem(row, 2, 
-                QTableWidgetItem(resource['type']))
-            self.resources_table.setItem(row, 3, 
-                QTableWidgetItem(resource['location']))
-            self.resources_table.setItem(row, 4, 
-                QTableWidgetItem(resource['status']))
-            self.resources_table.setItem(row, 5, 
-                QTableWidgetItem(resource['maintenance_status']))
-            self.resources_table.setItem(row, 6, 
-                QTableWidgetItem(resource.get('current_incident', 'None')))
-            
-            # Action buttons
-            actions_widget = QWidget()
-            actions_layout = QHBoxLayout()
-            actions_layout.setContentsMargins(0, 0, 0, 0)
-            
-            if resource['status'] != 'maintenance':
-                maintenance_btn = QPushButton("Maintenance")
-                maintenance_btn.clicked.connect(
-                    lambda checked, id=resource['_id']: 
-                    self.start_maintenance(id))
-                actions_layout.addWidget(maintenance_btn)
-            else:
-                complete_btn = QPushButton("Complete")
-                complete_btn.clicked.connect(
-                    lambda checked, id=resource['_id']: 
-                    self.complete_maintenance(id))
-                actions_layout.addWidget(complete_btn)
-            
-            actions_widget.setLayout(actions_layout)
-            self.resources_table.setCellWidget(row, 7, actions_widget)
+        if self.offline is not None:
+            resources = self.resource_manager.list_resources(fields=RESOURCE_TABLE_FIELDS)
+        else:
+            resources = get_live_cache().resources.find(fields=RESOURCE_TABLE_FIELDS)
+        self.resources_table.set_records(resources)
+        
+    def refresh_cached(self, resource_id):
+        # Offline store reads already include local writes
+        if self.offline is None:
+            get_live_cache().refresh('resources', resource_id)
             
     def clear_inputs(self):
         self.name_input.clear()
@@ -155,6 +146,7 @@ class ResourceWindow(QWidget):
             self.resource_manager.mark_maintenance(
                 resource_id, "under_maintenance", 
                 "Scheduled maintenance started")
+            self.refresh_cached(resource_id)
             self.load_resources()
             QMessageBox.information(
                 self, "Success", "Resource marked for maintenance!")
@@ -165,6 +157,7 @@ class ResourceWindow(QWidget):
     def complete_maintenance(self, resource_id):
         try:
             self.resource_manager.complete_maintenance(resource_id)
+            self.refresh_cached(resource_id)
             self.load_resources()
             QMessageBox.information(
                 self, "Success", "Maintenance completed successfully!")
@@ -0,0 +1,21 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+class WriteAcknowledger(QObject):
+    """Re-emits write-behind ticket outcomes as Qt signals on the receiver's thread"""
+    # Reported when a ticket resolves False: the document no longer exists
+    NOT_FOUND = "The record no longer exists"
+    acknowledged = pyqtSignal(str)
+    failed = pyqtSignal(str, str)
+
+    def watch(self, ticket, label):
+        """Emit ``acknowledged(label)`` or ``failed(label, error)`` when the ticket resolves"""
+        def done(future):
+            error = future.exception()
+            if error is not None:
+                self.failed.emit(label, str(error))
+            elif not future.result():
+                self.failed.emit(label, self.NOT_FOUND)
+            else:
+                self.acknowledged.emit(label)
+        ticket.add_done_callback(done)
+        return ticket
@@ -0,0 +1,99 @@
+"""Monotonic, time-sortable identifiers (ULID layout) for locally created records.
+
+An id is ``prefix`` followed by 26 Crockford base32 characters:
+
+    10 chars  milliseconds since the Unix epoch (48 bits)
+     8 chars  node: random per thread, re-drawn in a forked child (40 bits)
+     8 chars  counter within the millisecond (40 bits)
+
+Ids sort by creation time across threads and processes. Ids from one thread
+sort in creation order, even if the clock steps back, because the last
+timestamp is kept until the clock passes it. Each thread has its own node
+and counter, so minting takes no lock. Two threads or processes can only
+collide if they draw the same 40-bit node in the same millisecond.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+DECODE = {c: i for i, c in enumerate(ALPHABET)}
+MAX_COUNTER = (1 << 40) - 1
+# Every 10-bit value as two characters, so the counter encodes in four lookups
+_PAIRS = [ALPHABET[i >> 5] + ALPHABET[i & 31] for i in range(1024)]
+
+
+def encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        chars.append(ALPHABET[value & 31])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+
+class _ThreadState(threading.local):
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.node = encode(int.from_bytes(os.urandom(5), 'big'), 8)
+        self.millis = -1
+        self.counter = 0
+        self.head = ''
+
+
+_state = _ThreadState()
+
+if hasattr(os, 'register_at_fork'):
+    # The forking thread is the only one left in the child; give it a fresh node
+    os.register_at_fork(after_in_child=_state.reset)
+
+
+def _advance(state, count):
+    """Reserve ``count`` counter values; returns the first"""
+    now = time.time_ns() // 1_000_000
+    if now > state.millis:
+        state.millis = now
+        state.counter = -1
+        state.head = encode(now, 10) + state.node
+    if state.counter + count > MAX_COUNTER:
+        # Counter exhausted within one millisecond: borrow the next one
+        state.millis += 1
+        state.counter = -1
+        state.head = encode(state.millis, 10) + state.node
+    first = state.counter + 1
+    state.counter += count
+    return first
+
+
+def _tail(c):
+    return _PAIRS[c >> 30] + _PAIRS[(c >> 20) & 1023] + _PAIRS[(c >> 10) & 1023] + _PAIRS[c & 1023]
+
+
+def new_id(prefix: str = '') -> str:
+    """A new id, greater than every id previously returned on this thread"""
+    state = _state
+    c = state.counter + 1
+    # Fast path: same millisecond, counter not exhausted (what _advance(state, 1) would do)
+    if c > MAX_COUNTER or time.time_ns() // 1_000_000 > state.millis:
+        c = _advance(state, 1)
+    else:
+        state.counter = c
+    return prefix + state.head + _PAIRS[c >> 30] + _PAIRS[(c >> 20) & 1023] + _PAIRS[(c >> 10) & 1023] + _PAIRS[c & 1023]
+
+
+def new_ids(count: int, prefix: str = '') -> list:
+    """``count`` ascending ids in one call, for bulk imports"""
+    state = _state
+    first = _advance(state, count)
+    head = prefix + state.head
+    return [head + _tail(c) for c in range(first, first + count)]
+
+
+def id_timestamp(identifier: str, prefix: str = '') -> datetime:
+    """Creation time encoded in an id from ``new_id``"""
+    value = 0
+    for char in identifier[len(prefix):len(prefix) + 10]:
+        value = value * 32 + DECODE[char]
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
@@ -0,0 +1,181 @@
+"""Process-wide MongoDB client shared by every manager and widget.
+
+pymongo clients are thread-safe and each one owns a connection pool (plus
+monitor threads), so the application keeps exactly one per URI. Pool
+behaviour is configured from the environment:
+
+    MONGODB_MAX_POOL_SIZE             maxPoolSize (default 20)
+    MONGODB_MIN_POOL_SIZE             minPoolSize (default 0)
+    MONGODB_MAX_IDLE_TIME_MS          maxIdleTimeMS (default 60000)
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS  serverSelectionTimeoutMS (default 5000)
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS     waitQueueTimeoutMS (default 2000)
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from pymongo import MongoClient, monitoring
+
+try:
+    from motor.motor_asyncio import AsyncIOMotorClient
+except ImportError:
+    AsyncIOMotorClient = None
+
+from .resilience import HeartbeatListener, get_connection_guard
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_URI = 'mongodb://localhost:27017/'
+DEFAULT_DATABASE = 'Disaster_Management_System'
+
+POOL_SETTINGS = {
+    # client option: (environment variable, default)
+    'maxPoolSize': ('MONGODB_MAX_POOL_SIZE', 20),
+    'minPoolSize': ('MONGODB_MIN_POOL_SIZE', 0),
+    'maxIdleTimeMS': ('MONGODB_MAX_IDLE_TIME_MS', 60000),
+    'serverSelectionTimeoutMS': ('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 5000),
+    'waitQueueTimeoutMS': ('MONGODB_WAIT_QUEUE_TIMEOUT_MS', 2000),
+}
+
+
+def pool_options() -> Dict[str, int]:
+    """Client keyword arguments for the configured pool"""
+    return {option: int(os.getenv(env, default)) for option, (env, default) in POOL_SETTINGS.items()}
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Counts pool connections and measures how long checkouts wait"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        waited = self._elapsed()
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def connection_check_out_failed(self, event):
+        waited = self._elapsed()
+        with self._lock:
+            self.checkout_failures += 1
+        logger.warning(f"MongoDB pool checkout failed after {waited * 1000:.1f} ms: {event.reason}")
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    def _elapsed(self):
+        started = getattr(self._local, 'started', None)
+        self._local.started = None
+        return time.perf_counter() - started if started is not None else 0.0
+
+    # Events the statistics don't need
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'open_connections': self.connections_created - self.connections_closed,
+                'connections_created': self.connections_created,
+                'checkouts': self.checkouts,
+                'checkout_failures': self.checkout_failures,
+                'avg_checkout_wait_ms': round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'max_checkout_wait_ms': round(self.max_wait * 1000, 3),
+            }
+
+
+pool_monitor = PoolMonitor()
+
+_clients: Dict[str, MongoClient] = {}
+_motor_clients: Dict[str, 'AsyncIOMotorClient'] = {}
+_clients_lock = threading.Lock()
+
+
+def database_uri(uri: Optional[str] = None) -> str:
+    return uri or os.getenv('MONGODB_URI') or DEFAULT_URI
+
+
+def database_name(name: Optional[str] = None) -> str:
+    return name or os.getenv('MONGODB_DATABASE') or DEFAULT_DATABASE
+
+
+def get_mongo_client(uri: Optional[str] = None) -> MongoClient:
+    """Return the shared client for ``uri`` (default: MONGODB_URI)"""
+    uri = database_uri(uri)
+    client = _clients.get(uri)
+    if client is not None:
+        return client
+    with _clients_lock:
+        client = _clients.get(uri)
+        if client is None:
+            client = MongoClient(uri, event_listeners=[pool_monitor, HeartbeatListener(get_connection_guard())],
+                                     **pool_options())
+            _clients[uri] = client
+        return client
+
+
+def get_motor_client(uri: Optional[str] = None) -> 'AsyncIOMotorClient':
+    """Return the shared Motor client for ``uri``, with the same pool settings and monitoring"""
+    if AsyncIOMotorClient is None:
+        raise RuntimeError("Motor is not installed")
+    uri = database_uri(uri)
+    with _clients_lock:
+        client = _motor_clients.get(uri)
+        if client is None:
+            client = AsyncIOMotorClient(uri, event_listeners=[pool_monitor, HeartbeatListener(get_connection_guard())],
+                                        **pool_options())
+            _motor_clients[uri] = client
+        return client
+
+
+def get_database(name: Optional[str] = None, uri: Optional[str] = None):
+    """Return the application database (default: MONGODB_DATABASE) on the shared client"""
+    return get_mongo_client(uri)[database_name(name)]
+
+
+def pool_stats() -> Dict:
+    """Connection counts and checkout wait times for all shared clients"""
+    return dict(pool_monitor.stats(), clients=len(_clients) + len(_motor_clients))
+
+
+def close_mongo_clients() -> None:
+    """Close every shared client at application shutdown; the next get_mongo_client() reconnects"""
+    with _clients_lock:
+        for client in list(_clients.values()) + list(_motor_clients.values()):
+            client.close()
+        _clients.clear()
+        _motor_clients.clear()
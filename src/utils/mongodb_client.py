@@ -1,8 +1,9 @@
 import os
 from typing import Any, Dict, List, Optional
-from pymongo import MongoClient
 from pymongo.collection import Collection
 from pymongo.errors import ConnectionFailure
+from .mongo_pool import get_mongo_client
+from .resilience import get_connection_guard
 
 class MongoDBClient:
     _instance = None
@@ -27,8 +28,8 @@ class MongoDBClient:
             raise ValueError("MongoDB connection details not found in environment variables")
 
         try:
-            self._client = MongoClient(mongodb_uri)
-            self._client.admin.command('ping')  # Test connection
+            self._client = get_mongo_client(mongodb_uri)
+            get_connection_guard().call(self._client.admin.command, 'ping')  # Test connection, fails fast while the circuit is open
             self._db = self._client[database_name]
             self.initialized = True
 
@@ -87,8 +88,8 @@ class MongoDBClient:
         return result.deleted_count
 
     def close(self) -> None:
+        """Drop this client's handles; the shared pool is closed at shutdown."""
         if self._client is not None:
-            self._client.close()
             self._client = None
             self._db = None
             self.initialized = False
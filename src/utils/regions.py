@@ -0,0 +1,43 @@
+"""Helpers for reading stored location values: region keys and coordinates."""
+from typing import Any, Optional, Tuple
+
+UNKNOWN_REGION = 'Unknown'
+
+
+def region_of(location: Any) -> str:
+    """Return the region key for a stored location value.
+
+    Locations are stored either as free text ("Kisumu,Nyalenda") or as a
+    GeoJSON point carrying an ``area`` label (see scripts/insert_dummy_data.py).
+    """
+    if isinstance(location, dict):
+        area = location.get('area') or location.get('region')
+        return str(area) if area else UNKNOWN_REGION
+    if isinstance(location, str) and location.strip():
+        return location.strip()
+    return UNKNOWN_REGION
+
+
+def coordinates_of(location: Any) -> Optional[Tuple[float, float]]:
+    """Return (lat, lng) for a stored location, or None for free-text locations.
+
+    Accepts ``{'lat', 'lng'}`` dicts, GeoJSON points (``coordinates`` are
+    ``[lng, lat]``) and whole ``models.incident`` documents, whose
+    ``coordinates`` field sits next to a free-text ``location``.
+    """
+    if isinstance(location, dict):
+        if 'lat' in location and 'lng' in location:
+            return float(location['lat']), float(location['lng'])
+        coords = location.get('coordinates')
+        if isinstance(coords, (list, tuple)) and len(coords) == 2:
+            return float(coords[1]), float(coords[0])
+        if isinstance(coords, dict):
+            return coordinates_of(coords)
+    return None
+
+
+def document_coordinates(document: Any) -> Optional[Tuple[float, float]]:
+    """Return (lat, lng) for an incident or resource document, if it has any"""
+    if not isinstance(document, dict):
+        return None
+    return coordinates_of(document.get('location')) or coordinates_of(document)
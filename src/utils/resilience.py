@@ -0,0 +1,438 @@
+"""Fail-fast MongoDB access for flaky networks.
+
+A ``CircuitBreaker`` opens after consecutive connection failures, whether
+from operations or from the driver's server heartbeats, and at once on a
+server-selection timeout (the driver has already waited out its own
+timeout, so retrying only blocks callers again). While it is open,
+calls raise ``CircuitOpenError`` at once instead of blocking for the
+server-selection timeout. After ``reset_timeout`` one probe call is let
+through, and a success (or a successful heartbeat) closes the breaker again.
+
+Reads are retried with full-jitter exponential backoff. Retries draw on a
+``RetryBudget`` that refills as a fraction of request volume, so an outage
+does not multiply the load. Deferrable writes (``insert_one`` and
+``update_one`` with idempotent operators only, so a replay of a write that
+did reach the server is harmless) that cannot reach the server are appended
+to a local ``Spool`` and replayed in order once the breaker closes. While
+the spool holds writes, new writes wait for it to drain, or queue behind it
+if the server is still down, so an old write never overwrites a newer one.
+A spooled write returns a ``SpooledResult`` with ``acknowledged=False``.
+
+Settings come from the environment:
+
+    MONGODB_BREAKER_FAILURES  consecutive failures before opening (default 5)
+    MONGODB_BREAKER_RESET_S   seconds open before a probe (default 10)
+    MONGODB_RETRIES           read retries per call (default 2)
+    MONGODB_RETRY_RATIO       retry tokens earned per request (default 0.2)
+    MONGODB_SPOOL_PATH        spool file (default src/data/mongodb_spool.jsonl)
+"""
+import json
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from bson import ObjectId, json_util
+from pymongo import monitoring
+from pymongo.errors import (ConnectionFailure, DuplicateKeyError, InvalidOperation, PyMongoError,
+                            ServerSelectionTimeoutError)
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+DEFAULT_SPOOL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  'data', 'mongodb_spool.jsonl')
+# AutoReconnect, NetworkTimeout and ServerSelectionTimeoutError all derive from ConnectionFailure
+TRANSIENT_ERRORS = (ConnectionFailure,)
+BACKOFF_BASE = 0.05  # seconds
+BACKOFF_CAP = 1.0
+# Update operators that give the same result when applied twice
+IDEMPOTENT_UPDATE_OPERATORS = frozenset({'$set', '$unset', '$setOnInsert', '$addToSet', '$pull',
+                                         '$pullAll', '$min', '$max'})
+
+
+class CircuitOpenError(ConnectionFailure):
+    """Raised without contacting the server while the breaker is open"""
+
+
+class SpoolBacklogError(ConnectionFailure):
+    """Raised for a write that cannot be spooled while earlier writes wait for the server"""
+
+
+def is_idempotent_update(update) -> bool:
+    """True for operator updates that can safely be replayed (not pipelines, $inc or $push)"""
+    return isinstance(update, dict) and bool(update) and all(op in IDEMPOTENT_UPDATE_OPERATORS for op in update)
+
+
+def jittered_backoff(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    """Full-jitter delay before retry number ``attempt`` (0-based)"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Closed -> open after ``failure_threshold`` consecutive failures -> half-open probe"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self._probing = False
+        self._lock = threading.Lock()
+        # Called with the new state after every transition
+        self.listeners: List[Callable[[str], None]] = []
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != CLOSED:
+                self.last_error = None
+                self._set_state(CLOSED)
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            self.last_error = str(error) if error is not None else self.last_error
+            unreachable = isinstance(error, ServerSelectionTimeoutError)
+            if self.state == HALF_OPEN or (
+                    self.state == CLOSED and (unreachable or self.failures >= self.failure_threshold)):
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def _set_state(self, state):
+        previous, self.state = self.state, state
+        logger.warning(f"MongoDB circuit {previous} -> {state}" + (f": {self.last_error}" if state == OPEN else ""))
+        for listener in list(self.listeners):
+            try:
+                listener(state)
+            except Exception as e:
+                logger.error(f"Circuit listener failed: {e}")
+
+
+class RetryBudget:
+    """Token bucket: each request earns ``ratio`` tokens, each retry costs one"""
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, capacity: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.exhausted = 0
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self._refilled) * self.min_per_second)
+            self._refilled = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            self.exhausted += 1
+            return False
+
+
+class Spool:
+    """Append-only JSON-lines file of writes waiting for the server"""
+
+    def __init__(self, path: str = DEFAULT_SPOOL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._databases = {}
+        self._count = None
+
+    def bind(self, database):
+        """Register a database that spooled writes may target"""
+        self._databases.setdefault(database.name, database)
+
+    def append(self, database: str, collection: str, operation: str, args: List):
+        entry = {'database': database, 'collection': collection, 'op': operation,
+                 'args': args, 'spooled_at': datetime.utcnow()}
+        with self._lock:
+            count = self.size()
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json_util.dumps(entry) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._count = count + 1
+        logger.info(f"Spooled {operation} on {collection} for replay")
+
+    def _entries(self) -> List[Dict]:
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json_util.loads(line))
+                except (ValueError, json.JSONDecodeError):
+                    logger.error("Skipping unreadable spool line (partial write?)")
+        return entries
+
+    def size(self) -> int:
+        if self._count is None:
+            self._count = len(self._entries())
+        return self._count
+
+    def replay(self) -> Dict[str, int]:
+        """Apply spooled writes in order, stopping at the first connection error"""
+        applied = dropped = 0
+        with self._lock:
+            entries = self._entries()
+            for index, entry in enumerate(entries):
+                database = self._databases.get(entry['database'])
+                if database is None:
+                    logger.error(f"No database bound for spooled write to {entry['database']}; keeping it")
+                    remaining = entries[index:]
+                    break
+                collection = database[entry['collection']]
+                try:
+                    getattr(collection, entry['op'])(*entry['args'])
+                    applied += 1
+                except DuplicateKeyError:
+                    applied += 1  # insert already reached the server before the connection dropped
+                except TRANSIENT_ERRORS as e:
+                    logger.warning(f"Spool replay paused after {applied} writes: {e}")
+                    remaining = entries[index:]
+                    break
+                except PyMongoError as e:
+                    logger.error(f"Dropping spooled {entry['op']} on {entry['collection']}: {e}")
+                    dropped += 1
+            else:
+                remaining = []
+            self._rewrite(remaining)
+            self._count = len(remaining)
+        if applied or dropped:
+            logger.info(f"Replayed {applied} spooled writes ({dropped} dropped, {self._count} left)")
+        return {'applied': applied, 'dropped': dropped, 'remaining': self._count}
+
+    def _rewrite(self, entries):
+        if not entries:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json_util.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+
+
+class ConnectionGuard:
+    """Breaker, retry budget and spool shared by every wrapped collection"""
+
+    def __init__(self, breaker: CircuitBreaker = None, budget: RetryBudget = None,
+                 spool: Spool = None, retries: int = 2):
+        self.breaker = breaker or CircuitBreaker()
+        self.budget = budget or RetryBudget()
+        self.spool = spool or Spool()
+        self.retries = retries
+        self.breaker.listeners.append(self._on_state)
+        self._replaying = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'ConnectionGuard':
+        return cls(
+            CircuitBreaker(int(os.getenv('MONGODB_BREAKER_FAILURES', 5)),
+                           float(os.getenv('MONGODB_BREAKER_RESET_S', 10))),
+            RetryBudget(float(os.getenv('MONGODB_RETRY_RATIO', 0.2))),
+            Spool(os.getenv('MONGODB_SPOOL_PATH') or DEFAULT_SPOOL_PATH),
+            int(os.getenv('MONGODB_RETRIES', 2)),
+        )
+
+    def call(self, function, *args, retries: Optional[int] = None, **kwargs):
+        """Run ``function`` unless the breaker is open, retrying connection errors within budget"""
+        retries = self.retries if retries is None else retries
+        self.budget.record_request()
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"MongoDB unavailable (circuit open): {self.breaker.last_error}")
+            try:
+                result = function(*args, **kwargs)
+            except TRANSIENT_ERRORS as e:
+                self.breaker.record_failure(e)
+                if isinstance(e, ServerSelectionTimeoutError) or attempt >= retries or not self.budget.withdraw():
+                    raise
+                time.sleep(jittered_backoff(attempt))
+                attempt += 1
+                continue
+            except PyMongoError:
+                self.breaker.record_success()  # the server answered
+                raise
+            self.breaker.record_success()
+            return result
+
+    def _on_state(self, state):
+        if state == CLOSED and self.spool.size():
+            threading.Thread(target=self.replay_spool, name='mongodb-spool-replay', daemon=True).start()
+
+    def replay_spool(self) -> Optional[Dict[str, int]]:
+        if not self._replaying.acquire(blocking=False):
+            return None
+        try:
+            return self.spool.replay()
+        finally:
+            self._replaying.release()
+
+    def drain_spool(self) -> bool:
+        """Replay spooled writes now, waiting for a replay in progress; True once the spool is empty"""
+        if self.spool.size() and self.breaker.state == CLOSED:
+            with self._replaying:
+                if self.spool.size():
+                    self.spool.replay()
+        return not self.spool.size()
+
+    def health(self) -> Dict:
+        """State for status displays"""
+        return {
+            'state': self.breaker.state,
+            'healthy': self.breaker.state == CLOSED,
+            'consecutive_failures': self.breaker.failures,
+            'last_error': self.breaker.last_error,
+            'spooled_writes': self.spool.size(),
+            'retry_tokens': round(self.budget.tokens, 1),
+        }
+
+
+class HeartbeatListener(monitoring.ServerHeartbeatListener):
+    """Feeds driver heartbeats into the breaker so it tracks the server without traffic"""
+
+    def __init__(self, guard: ConnectionGuard):
+        self.guard = guard
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.guard.breaker.record_success()
+
+    def failed(self, event):
+        self.guard.breaker.record_failure(event.reply)
+
+
+class SpooledResult:
+    """Stand-in for InsertOneResult/UpdateResult of a write waiting in the spool.
+
+    Like pymongo's results for unacknowledged writes, the counts are not
+    known and reading them raises InvalidOperation; check ``acknowledged``.
+    """
+
+    acknowledged = False
+    spooled = True
+
+    def __init__(self, inserted_id=None):
+        self.inserted_id = inserted_id
+
+    @property
+    def matched_count(self):
+        raise InvalidOperation("The write is spooled; matched_count is not known until it is replayed")
+
+    @property
+    def modified_count(self):
+        raise InvalidOperation("The write is spooled; modified_count is not known until it is replayed")
+
+
+class ResilientCollection:
+    """Collection proxy that routes calls through a ConnectionGuard"""
+
+    READ_METHODS = ('find_one', 'count_documents', 'estimated_document_count', 'distinct',
+                    'aggregate', 'index_information')
+    GUARDED_METHODS = ('update_many', 'delete_one', 'delete_many', 'replace_one',
+                       'find_one_and_update', 'insert_many', 'bulk_write')
+
+    def __init__(self, collection, guard: ConnectionGuard):
+        self._collection = collection
+        self._guard = guard
+        guard.spool.bind(collection.database)
+
+    @property
+    def unwrapped(self):
+        return self._collection
+
+    def find(self, *args, **kwargs):
+        # Cursors run lazily, so only the fail-fast check applies
+        if not self._guard.breaker.allow():
+            raise CircuitOpenError(f"MongoDB unavailable (circuit open): {self._guard.breaker.last_error}")
+        return self._collection.find(*args, **kwargs)
+
+    def insert_one(self, document, *args, **kwargs):
+        document.setdefault('_id', ObjectId())
+        return self._deferrable('insert_one', [document], args, kwargs)
+
+    def update_one(self, filter, update, *args, **kwargs):
+        return self._deferrable('update_one', [filter, update], args, kwargs)
+
+    def _deferrable(self, operation, spooled_args, args, kwargs):
+        # Inserts carry their _id, so a replayed duplicate is detected
+        replayable = operation == 'insert_one' or is_idempotent_update(spooled_args[1])
+        # Earlier spooled writes go first; write directly only once they are applied
+        if self._guard.drain_spool():
+            try:
+                return self._guard.call(getattr(self._collection, operation), *spooled_args, *args,
+                                        retries=0, **kwargs)
+            except TRANSIENT_ERRORS as e:
+                if not replayable:
+                    raise
+                logger.warning(f"{operation} on {self._collection.name} deferred: {e}")
+        elif not replayable:
+            raise SpoolBacklogError(f"{operation} on {self._collection.name} cannot be deferred and "
+                                    f"{self._guard.spool.size()} earlier writes are waiting for the server")
+        self._guard.spool.append(self._collection.database.name, self._collection.name,
+                                 operation, spooled_args)
+        return SpooledResult(spooled_args[0]['_id'] if operation == 'insert_one' else None)
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if name in self.READ_METHODS:
+            return lambda *args, **kwargs: self._guard.call(attribute, *args, **kwargs)
+        if name in self.GUARDED_METHODS:
+            return lambda *args, **kwargs: self._guard.call(attribute, *args, retries=0, **kwargs)
+        return attribute
+
+
+_guard = None
+_guard_lock = threading.Lock()
+
+
+def get_connection_guard() -> ConnectionGuard:
+    """Process-wide guard shared by every client and wrapped collection"""
+    global _guard
+    with _guard_lock:
+        if _guard is None:
+            _guard = ConnectionGuard.from_env()
+        return _guard
+
+
+def resilient_collection(collection):
+    return ResilientCollection(collection, get_connection_guard())
+
+
+def connection_health() -> Dict:
+    return get_connection_guard().health()
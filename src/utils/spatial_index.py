@@ -0,0 +1,139 @@
+"""Pure-Python grid index for points, used when MongoDB's 2dsphere index is unavailable.
+
+Points are bucketed into fixed-size lat/lng cells. A query visits only the
+cells its bounding box overlaps and then applies the exact test (box,
+great-circle distance or point-in-polygon) to the points in those cells.
+Updates and queries may come from different threads.
+"""
+import math
+import threading
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+EARTH_RADIUS_M = 6371008.8
+DEFAULT_CELL_DEGREES = 0.05  # about 5.5 km of latitude
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in meters"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def point_in_polygon(lat: float, lng: float, ring: Sequence[Tuple[float, float]]) -> bool:
+    """Even-odd test; ``ring`` is a list of (lng, lat) vertices as in GeoJSON"""
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i]
+        xj, yj = ring[j]
+        if (yi > lat) != (yj > lat) and lng < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+class GridIndex:
+    """Uniform lat/lng grid of point ids"""
+
+    def __init__(self, cell_degrees: float = DEFAULT_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self._lock = threading.RLock()
+        self._cells: Dict[Tuple[int, int], Dict[Hashable, Tuple[float, float]]] = {}
+        self._points: Dict[Hashable, Tuple[float, float]] = {}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._points)
+
+    def _cell(self, lat, lng):
+        return int(math.floor(lat / self.cell_degrees)), int(math.floor(lng / self.cell_degrees))
+
+    def insert(self, key: Hashable, lat: float, lng: float):
+        with self._lock:
+            if key in self._points:
+                self.remove(key)
+            self._points[key] = (lat, lng)
+            self._cells.setdefault(self._cell(lat, lng), {})[key] = (lat, lng)
+
+    def bulk_load(self, points: Iterable[Tuple[Hashable, float, float]]):
+        cells, known, size, floor = self._cells, self._points, self.cell_degrees, math.floor
+        with self._lock:
+            for key, lat, lng in points:
+                if key in known:
+                    self.remove(key)
+                point = known[key] = (lat, lng)
+                cell = (int(floor(lat / size)), int(floor(lng / size)))
+                bucket = cells.get(cell)
+                if bucket is None:
+                    bucket = cells[cell] = {}
+                bucket[key] = point
+
+    def remove(self, key: Hashable):
+        with self._lock:
+            point = self._points.pop(key, None)
+            if point is not None:
+                cell = self._cell(*point)
+                bucket = self._cells[cell]
+                del bucket[key]
+                if not bucket:
+                    del self._cells[cell]
+
+    def _candidates(self, south, west, north, east):
+        """Points in the cells overlapping the box; iterate while holding the lock"""
+        row0, col0 = self._cell(south, west)
+        row1, col1 = self._cell(north, east)
+        cells = self._cells
+        if (row1 - row0 + 1) * (col1 - col0 + 1) > len(cells):
+            # Query spans more cells than exist: scan the occupied ones
+            for (row, col), bucket in cells.items():
+                if row0 <= row <= row1 and col0 <= col <= col1:
+                    yield from bucket.items()
+            return
+        for row in range(row0, row1 + 1):
+            for col in range(col0, col1 + 1):
+                bucket = cells.get((row, col))
+                if bucket:
+                    yield from bucket.items()
+
+    def within_box(self, south: float, west: float, north: float, east: float,
+                   limit: Optional[int] = None) -> List[Hashable]:
+        result = []
+        with self._lock:
+            for key, (lat, lng) in self._candidates(south, west, north, east):
+                if south <= lat <= north and west <= lng <= east:
+                    result.append(key)
+                    if limit is not None and len(result) >= limit:
+                        break
+        return result
+
+    def within_radius(self, lat: float, lng: float, radius_m: float,
+                      limit: Optional[int] = None) -> List[Tuple[float, Hashable]]:
+        """(distance in meters, key) pairs within ``radius_m``, nearest first"""
+        dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+        coslat = math.cos(math.radians(min(89.9, abs(lat) + dlat)))
+        dlng = 180.0 if coslat <= 0 else min(180.0, dlat / coslat)
+        hits = []
+        with self._lock:
+            for key, (plat, plng) in self._candidates(lat - dlat, lng - dlng, lat + dlat, lng + dlng):
+                distance = haversine_m(lat, lng, plat, plng)
+                if distance <= radius_m:
+                    hits.append((distance, key))
+        hits.sort(key=lambda hit: hit[0])
+        return hits[:limit] if limit is not None else hits
+
+    def within_polygon(self, ring: Sequence[Tuple[float, float]],
+                       limit: Optional[int] = None) -> List[Hashable]:
+        """Keys inside a polygon given as (lng, lat) vertices"""
+        lngs = [p[0] for p in ring]
+        lats = [p[1] for p in ring]
+        result = []
+        with self._lock:
+            for key, (lat, lng) in self._candidates(min(lats), min(lngs), max(lats), max(lngs)):
+                if point_in_polygon(lat, lng, ring):
+                    result.append(key)
+                    if limit is not None and len(result) >= limit:
+                        break
+        return result
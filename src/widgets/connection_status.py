@@ -0,0 +1,33 @@
+"""Database connection indicator for Disaster_Management_System."""
+from PyQt5.QtWidgets import QLabel
+from PyQt5.QtCore import QTimer
+
+from src.utils.resilience import CLOSED, HALF_OPEN, connection_health
+
+STATE_STYLES = {
+    CLOSED: ("Database connected", "#2e7d32"),
+    HALF_OPEN: ("Reconnecting to database...", "#f9a825"),
+}
+OFFLINE_STYLE = ("Database offline", "#c62828")
+
+
+class ConnectionStatusIndicator(QLabel):
+    """Shows the circuit breaker state and how many writes are waiting to sync"""
+
+    def __init__(self, parent=None, interval_ms: int = 1000):
+        super().__init__(parent)
+        self.setObjectName("connection-status")
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.update_status)
+        self.timer.start(interval_ms)
+        self.update_status()
+
+    def update_status(self):
+        # Polled because breaker transitions happen on driver threads
+        health = connection_health()
+        text, color = STATE_STYLES.get(health['state'], OFFLINE_STYLE)
+        if health['spooled_writes']:
+            text += f" - {health['spooled_writes']} change(s) waiting to sync"
+        self.setText(f"● {text}")
+        self.setStyleSheet(f"color: {color}; font-weight: bold; padding: 0 12px;")
+        self.setToolTip(health['last_error'] or "")
@@ -0,0 +1,138 @@
+"""Debounced, off-thread filtering for RecordTable list views.
+
+A search box wired straight to a filter function runs a full query on the
+UI thread for every keystroke. ``FilterPipeline`` does the following
+instead:
+
+* Debounce: ``request(params)`` restarts a single-shot timer, so a burst of
+  typing sends only the last parameters.
+* Snapshot: when a query is dispatched, ``snapshot()`` runs on the UI
+  thread. It should return data the widget will not mutate afterwards,
+  such as a tuple of records or a thread-safe index. The worker then reads
+  that snapshot while the UI keeps changing.
+* Off thread: ``query(params, snapshot)`` runs on a one-thread pool.
+* Cancellation: every dispatch bumps a generation number. A query that
+  has not started yet is dropped from the pool. A result from an older
+  generation is discarded instead of being applied.
+* Model diff: the newest result goes through ``RecordTable.set_records``,
+  so rows that still match keep their place and selection.
+
+``latencies`` records, per applied result, the time from the last
+``request`` to the rows being in the model.
+"""
+import logging
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+DEBOUNCE_MS = 150
+LATENCY_SAMPLES = 256
+
+
+def filter_records(records: Iterable[Dict], text: str = '', text_fields: Sequence[str] = (),
+                   equals: Optional[Dict] = None) -> List[Dict]:
+    """Records containing ``text`` (case-insensitive) in a text field and matching ``equals``"""
+    text = (text or '').lower()
+    wanted = [(field, value) for field, value in (equals or {}).items() if value is not None]
+    return [record for record in records
+            if all(record.get(field) == value for field, value in wanted)
+            and (not text or any(text in str(record.get(field) or '').lower() for field in text_fields))]
+
+
+class _QueryTask(QRunnable):
+    def __init__(self, pipeline, generation, params, snapshot):
+        super().__init__()
+        self.pipeline = pipeline
+        self.generation = generation
+        self.params = params
+        self.snapshot = snapshot
+
+    def run(self):
+        pipeline = self.pipeline
+        if self.generation != pipeline.generation:
+            return
+        try:
+            records = list(pipeline.query(self.params, self.snapshot))
+        except Exception as e:
+            logger.error(f"Filter query failed: {e}")
+            return
+        # Queued to the UI thread, which owns the table
+        pipeline.result_ready.emit(self.generation, records)
+
+
+class FilterPipeline(QObject):
+    """Runs a table's filter query debounced, off the UI thread, newest result wins"""
+
+    # generation, records (worker -> UI thread). ``object`` hands the list
+    # across as a reference; a ``list`` signal converts every record to a
+    # QVariant and back on the UI thread, which stalls it on broad queries
+    result_ready = pyqtSignal(int, object)
+    applied = pyqtSignal(int)  # rows shown
+
+    def __init__(self, table, query: Callable, snapshot: Callable = lambda: None,
+                 debounce_ms: int = DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+        self.table = table
+        self.query = query
+        self.snapshot = snapshot
+        self.generation = 0
+        self.params = None
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(debounce_ms)
+        self.timer.timeout.connect(self._dispatch)
+        self.result_ready.connect(self._apply)
+        self._requested_at = 0.0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.dispatched = 0
+        self.discarded = 0
+
+    def request(self, params, immediate: bool = False):
+        """Filter with ``params`` once input settles (at once for ``immediate``)"""
+        self.params = params
+        self._requested_at = time.perf_counter()
+        if immediate:
+            self.timer.stop()
+            self._dispatch()
+        else:
+            self.timer.start()
+
+    def cancel(self):
+        """Drop pending and running queries, e.g. before showing rows directly"""
+        self.timer.stop()
+        self.generation += 1
+        self.pool.clear()
+
+    def _dispatch(self):
+        self.generation += 1
+        self.dispatched += 1
+        # Queued queries are stale now that newer parameters exist
+        self.pool.clear()
+        self.pool.start(_QueryTask(self, self.generation, self.params, self.snapshot()))
+
+    def _apply(self, generation, records):
+        if generation != self.generation:
+            self.discarded += 1
+            return
+        self.table.set_records(records)
+        self.latencies.append(time.perf_counter() - self._requested_at)
+        self.applied.emit(len(records))
+
+    def wait(self, msecs: int = -1) -> bool:
+        """Block until the worker is idle; queued results still need the event loop"""
+        return self.pool.waitForDone(msecs)
+
+    def stats(self) -> Dict:
+        latencies = sorted(self.latencies)
+        return {
+            'dispatched': self.dispatched,
+            'discarded': self.discarded,
+            'latency_p50': latencies[len(latencies) // 2] if latencies else None,
+            'latency_max': latencies[-1] if latencies else None,
+        }
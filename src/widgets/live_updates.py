@@ -0,0 +1,15 @@
+"""Live cache notifications for Disaster_Management_System views."""
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class LiveCacheSignals(QObject):
+    """Re-emits live cache (or offline sync) notifications as Qt signals on the receiver's thread"""
+    changed = pyqtSignal(str)
+
+    def __init__(self, cache, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        # Listeners run on the cache's sync thread; the signal is queued to ours
+        emit = self.changed.emit
+        cache.subscribe(emit)
+        self.destroyed.connect(lambda: cache.unsubscribe(emit))
@@ -0,0 +1,303 @@
+"""Model/view table over lists of records for Disaster_Management_System.
+
+``RecordTable`` replaces the QTableWidget pattern of clearing the table and
+creating items plus a widget with buttons for every row. Records are kept
+column by column in ``RecordTableModel``. Text and colours are produced in
+``data()``, so only rows scrolled into view are ever formatted. Action
+buttons are painted by ``ActionDelegate`` rather than being real widgets.
+
+``set_records`` diffs the new list against the current rows by key. Changed
+rows emit ``dataChanged``, and removed or added runs emit row
+removals/insertions, so selection and scroll position survive a refresh.
+A reordering, or a diff with too many runs, falls back to a model reset.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+from PyQt5.QtWidgets import (QAbstractItemView, QApplication, QHeaderView, QStyle,
+                             QStyledItemDelegate, QStyleOptionButton, QTableView)
+from PyQt5.QtCore import QAbstractTableModel, QEvent, QModelIndex, QRect, QSize, Qt, QTimer
+from PyQt5.QtGui import QBrush, QColor
+
+# Beyond this many inserted/removed runs a reset is cheaper than the diff
+MAX_DIFF_RUNS = 64
+BUTTON_PADDING = 16
+BUTTON_SPACING = 4
+CELL_MARGIN = 4
+
+
+def format_timestamp(value) -> str:
+    """``YYYY-MM-DD HH:MM`` for ISO strings and datetimes; anything else as is"""
+    if not value:
+        return "Unknown"
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M")
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).strftime("%Y-%m-%d %H:%M")
+    except ValueError:
+        return str(value)
+
+
+def _brush(color) -> Optional[QBrush]:
+    return QBrush(QColor(color)) if color else None
+
+
+@dataclass
+class RowAction:
+    """A painted button calling ``callback(record)``; hidden where ``visible(record)`` is false"""
+
+    label: str
+    callback: Callable[[Dict], None]
+    visible: Optional[Callable[[Dict], bool]] = None
+
+
+@dataclass
+class Column:
+    """One table column.
+
+    ``colors`` maps a value to ``(background, foreground)``, or is a function
+    of the value returning that pair. A column with ``actions`` shows buttons.
+    """
+
+    title: str
+    key: Optional[str] = None
+    format: Callable = str
+    default: object = ''
+    colors: object = None
+    actions: List[RowAction] = field(default_factory=list)
+
+    def __post_init__(self):
+        if isinstance(self.colors, dict):
+            self.colors = {value: (_brush(bg), _brush(fg)) for value, (bg, fg) in self.colors.items()}
+
+    def brushes(self, value):
+        if self.colors is None:
+            return None, None
+        if callable(self.colors):
+            background, foreground = self.colors(value) or (None, None)
+            return _brush(background), _brush(foreground)
+        return self.colors.get(value, (None, None))
+
+
+class RecordTableModel(QAbstractTableModel):
+    """Columnar table model over dict records identified by ``key``"""
+
+    def __init__(self, columns: Sequence[Column], key='id', parent=None):
+        super().__init__(parent)
+        self.columns = list(columns)
+        self.key = key if callable(key) else (lambda record, field=key: record.get(field))
+        self._keys: List = []
+        self._records: List[Dict] = []
+        self._values: List[list] = [[] for _ in self.columns]
+        self._rows: Optional[Dict] = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._keys)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section].title
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        column = self.columns[index.column()]
+        if column.key is None:
+            return None
+        value = self._values[index.column()][index.row()]
+        if role == Qt.DisplayRole:
+            return column.format(value)
+        if role == Qt.BackgroundRole:
+            return column.brushes(value)[0]
+        if role == Qt.ForegroundRole:
+            return column.brushes(value)[1]
+        return None
+
+    def record(self, row: int) -> Dict:
+        return self._records[row]
+
+    def records(self) -> List[Dict]:
+        return list(self._records)
+
+    def row_of(self, key) -> Optional[int]:
+        if self._rows is None:
+            self._rows = {k: row for row, k in enumerate(self._keys)}
+        return self._rows.get(key)
+
+    def _row_values(self, record):
+        return [record.get(column.key, column.default) if column.key else None for column in self.columns]
+
+    def _replace(self, row, record):
+        self._records[row] = record
+        for values, value in zip(self._values, self._row_values(record)):
+            values[row] = value
+
+    def _splice(self, start, stop, keys, records):
+        self._keys[start:stop] = keys
+        self._records[start:stop] = records
+        rows = [self._row_values(record) for record in records]
+        for c, values in enumerate(self._values):
+            values[start:stop] = [row[c] for row in rows]
+        self._rows = None
+
+    def set_records(self, records: Sequence[Dict]):
+        """Show ``records``, applying only the differences to the current rows"""
+        records = list(records)
+        keys = [self.key(record) for record in records]
+        positions = {k: i for i, k in enumerate(keys)}
+        if len(positions) < len(keys):
+            return self._reset(keys, records)
+        kept = [row for row, k in enumerate(self._keys) if k in positions]
+        order = [positions[self._keys[row]] for row in kept]
+        removed_runs = _runs(sorted(set(range(len(self._keys))) - set(kept)))
+        inserted_runs = _runs(sorted(set(range(len(keys))) - set(order)))
+        if (any(a >= b for a, b in zip(order, order[1:]))
+                or len(removed_runs) + len(inserted_runs) > MAX_DIFF_RUNS):
+            return self._reset(keys, records)
+
+        # Removals bottom-up so the row numbers of earlier runs stay valid
+        for first, last in reversed(removed_runs):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            self._splice(first, last + 1, [], [])
+            self.endRemoveRows()
+        # The kept rows are now in their final relative order; insert in new positions top-down
+        for first, last in inserted_runs:
+            self.beginInsertRows(QModelIndex(), first, last)
+            self._splice(first, first, keys[first:last + 1], records[first:last + 1])
+            self.endInsertRows()
+
+        changed = [row for row, record in enumerate(records)
+                   if self._records[row] is not record and self._records[row] != record]
+        for row in changed:
+            self._replace(row, records[row])
+        for first, last in _runs(changed):
+            self.dataChanged.emit(self.index(first, 0), self.index(last, len(self.columns) - 1))
+
+    def _reset(self, keys, records):
+        self.beginResetModel()
+        self._keys, self._records = [], []
+        self._values = [[] for _ in self.columns]
+        self._splice(0, 0, keys, records)
+        self.endResetModel()
+
+    def refresh(self, keys=None):
+        """Repaint rows (all, or those with the given keys) whose text depends on outside state"""
+        if not self._keys:
+            return
+        if keys is None:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._keys) - 1, len(self.columns) - 1))
+            return
+        rows = sorted(row for row in map(self.row_of, keys) if row is not None)
+        for first, last in _runs(rows):
+            self.dataChanged.emit(self.index(first, 0), self.index(last, len(self.columns) - 1))
+
+    def remove(self, key) -> bool:
+        row = self.row_of(key)
+        if row is None:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self._splice(row, row + 1, [], [])
+        self.endRemoveRows()
+        return True
+
+
+def _runs(rows):
+    """Group ascending row numbers into inclusive (first, last) runs"""
+    runs = []
+    for row in rows:
+        if runs and runs[-1][1] == row - 1:
+            runs[-1][1] = row
+        else:
+            runs.append([row, row])
+    return [tuple(run) for run in runs]
+
+
+class ActionDelegate(QStyledItemDelegate):
+    """Paints a column's RowActions as push buttons and dispatches clicks to them"""
+
+    def __init__(self, column: Column, parent=None):
+        super().__init__(parent)
+        self.column = column
+        self._pressed = None  # (row, action index)
+
+    def _actions(self, index):
+        record = index.model().record(index.row())
+        return record, [a for a in self.column.actions if a.visible is None or a.visible(record)]
+
+    def _button_rects(self, rect, actions, metrics):
+        rects, x = [], rect.left() + CELL_MARGIN
+        height = rect.height() - 2 * CELL_MARGIN
+        for action in actions:
+            width = metrics.horizontalAdvance(action.label) + BUTTON_PADDING
+            rects.append(QRect(x, rect.top() + CELL_MARGIN, width, height))
+            x += width + BUTTON_SPACING
+        return rects
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        _, actions = self._actions(index)
+        widget = option.widget
+        style = widget.style() if widget is not None else QApplication.style()
+        painter.save()
+        painter.setClipRect(option.rect)
+        for i, (action, rect) in enumerate(zip(actions, self._button_rects(option.rect, actions, option.fontMetrics))):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = action.label
+            button.state = QStyle.State_Enabled | (
+                QStyle.State_Sunken if self._pressed == (index.row(), i) else QStyle.State_Raised)
+            style.drawControl(QStyle.CE_PushButton, button, painter, widget)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        _, actions = self._actions(index)
+        metrics = option.fontMetrics
+        width = sum(metrics.horizontalAdvance(a.label) + BUTTON_PADDING for a in actions)
+        width += BUTTON_SPACING * max(len(actions) - 1, 0) + 2 * CELL_MARGIN
+        return super().sizeHint(option, index).expandedTo(QSize(width, metrics.height() + 4 * CELL_MARGIN))
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease):
+            return False
+        record, actions = self._actions(index)
+        hit = next((i for i, rect in enumerate(self._button_rects(option.rect, actions, option.fontMetrics))
+                    if rect.contains(event.pos())), None)
+        if event.type() == QEvent.MouseButtonPress:
+            self._pressed = None if hit is None else (index.row(), hit)
+            return hit is not None
+        pressed, self._pressed = self._pressed, None
+        if hit is None or pressed != (index.row(), hit):
+            return False
+        # Deferred: the callback may open a dialog or remove this very row
+        QTimer.singleShot(0, lambda: actions[hit].callback(record))
+        return True
+
+
+class RecordTable(QTableView):
+    """Table view for a RecordTableModel, with painted action buttons"""
+
+    def __init__(self, columns: Sequence[Column], key='id', parent=None):
+        super().__init__(parent)
+        self.table_model = RecordTableModel(columns, key, self)
+        self.setModel(self.table_model)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        # Uniform rows and visible-only measuring keep layout cost independent of row count
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 4 * CELL_MARGIN)
+        self.horizontalHeader().setResizeContentsPrecision(0)
+        for i, column in enumerate(self.table_model.columns):
+            if column.actions:
+                self.setItemDelegateForColumn(i, ActionDelegate(column, self))
+
+    def set_records(self, records: Sequence[Dict]):
+        self.table_model.set_records(records)
+
+    def selected_record(self) -> Optional[Dict]:
+        rows = self.selectionModel().selectedRows()
+        return self.table_model.record(rows[0].row()) if rows else None
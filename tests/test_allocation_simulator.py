@@ -0,0 +1,59 @@
+import json
+
+from src.ai.allocation_simulator import AvailabilityFork, Scenario, run_scenarios, simulate
+from src.ai.capacity_model import CapacityModel
+from src.ai.resource_availability import ResourceManager
+
+RESOURCE_MAP = {
+    "event_type_map": {
+        "Flood": [{"resource": "Rescue Boats", "priority": 1, "quantity": "5-10 units"},
+                  {"resource": "Medical Kits", "priority": 2, "quantity": "20-40 kits"}],
+    },
+    "severity_map": {},
+}
+
+def availability(**stock):
+    return {name: {"total": units, "allocated": 0, "maintenance": 0, "available": units}
+            for name, units in stock.items()}
+
+def test_fork_writes_stay_in_the_fork():
+    """Test that allocations on a fork and a nested fork never reach their parents."""
+    base = availability(**{"Rescue Boats": 10, "Medical Kits": 30})
+    fork = AvailabilityFork(base, None)
+    assert fork.allocate("Rescue Boats", 4) == 4
+    nested = fork.fork()
+    assert nested.allocate("Rescue Boats", 20) == 6
+    nested.release("Medical Kits", 0)
+
+    assert base["Rescue Boats"] == {"total": 10, "allocated": 0, "maintenance": 0, "available": 10}
+    assert fork.available("Rescue Boats") == 6 and nested.available("Rescue Boats") == 0
+    assert fork.touched() == {"Rescue Boats"}
+    assert nested.touched() == {"Rescue Boats", "Medical Kits"}
+    assert fork.get_available_resources() == {"Rescue Boats": 6, "Medical Kits": 30}
+    assert not fork.check_availability("Helicopters")
+
+def test_simulate_reports_shortfall_and_delay():
+    """Test that a scenario's unmet units and added response time follow the recommendation priorities."""
+    capacity = CapacityModel.compile(RESOURCE_MAP)
+    base = availability(**{"Rescue Boats": 12, "Medical Kits": 50})
+    scenario = Scenario(name="two floods", incidents=[{"type": "Flood", "severity": "High"}] * 2,
+                        allocations={"inc-1": [{"resource": "Rescue Boats", "priority": 1, "quantity": 3}]})
+    result = simulate(base, capacity, scenario)
+
+    # 3 + 5 boats leave 4 for the second flood, which is then 30 minutes late
+    assert (result.requested_units, result.allocated_units) == (53, 52)
+    assert result.unmet_by_resource == {"Rescue Boats": 1}
+    assert (result.incidents_total, result.incidents_fully_covered) == (3, 2)
+    assert result.added_response_minutes == 30
+    assert base["Rescue Boats"]["available"] == 12
+
+def test_run_scenarios_in_process_by_default(tmp_path):
+    """Test that small batches run in the calling process even when more workers are requested."""
+    path = tmp_path / "resource_map.json"
+    path.write_text(json.dumps(RESOURCE_MAP))
+    manager = ResourceManager(str(path))
+    scenarios = [Scenario(name=str(i), incidents=[{"type": "Flood", "severity": "Low"}] * i) for i in range(5)]
+    results, stats = run_scenarios(manager, scenarios, processes=4)
+    assert stats["processes"] == 1
+    assert [r.incidents_total for r in results] == list(range(5))
+    assert manager.get_available_resources() == {"Rescue Boats": 10, "Medical Kits": 40}
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+import pytest
+from src.models.async_data import AsyncIncidentManager, deadline
+
+def make_manager(sync, **kwargs):
+    return AsyncIncidentManager(sync=sync, use_motor=False, **kwargs)
+
+def test_calls_are_bounded_by_max_concurrency():
+    """Test that no more than max_concurrency blocking calls run at once."""
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def get_incident(incident_id):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return {'_id': incident_id}
+
+    sync = MagicMock()
+    sync.get_incident.side_effect = get_incident
+    manager = make_manager(sync, max_concurrency=3)
+
+    async def main():
+        return await asyncio.gather(*(manager.get_incident(str(i)) for i in range(20)))
+
+    results = asyncio.run(main())
+    assert [r['_id'] for r in results] == [str(i) for i in range(20)]
+    assert peak[0] <= 3
+    assert manager.stats()['calls'] == 20
+
+def test_deadline_raises_timeout():
+    """Test that a call still queued or running past its deadline raises asyncio.TimeoutError."""
+    sync = MagicMock()
+    sync.get_incident.side_effect = lambda incident_id: time.sleep(0.2)
+    manager = make_manager(sync, max_concurrency=1)
+
+    async def main():
+        with deadline(0.05):
+            await manager.get_incident('1')
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(main())
+    assert manager.stats()['timeouts'] == 1
+
+def test_manager_works_across_event_loops():
+    """Test that one manager can be used from successive event loops."""
+    sync = MagicMock()
+    sync.get_incident.side_effect = lambda incident_id: {'_id': incident_id}
+    manager = make_manager(sync, max_concurrency=2)
+
+    async def main():
+        return await asyncio.gather(*(manager.get_incident(str(i)) for i in range(4)))
+
+    assert len(asyncio.run(main())) == 4
+    assert len(asyncio.run(main())) == 4
+
+def test_motor_reads_send_remaining_time_to_server():
+    """Test that Motor reads carry the deadline as maxTimeMS."""
+    seen = []
+
+    async def find_one(query, max_time_ms=None):
+        seen.append(max_time_ms)
+        return {'_id': query['_id']}
+
+    manager = make_manager(MagicMock(), timeout=2.0)
+    manager.motor = MagicMock()
+    manager.motor.find_one.side_effect = find_one
+    document_id = '64b7f0000000000000000000'
+
+    async def main():
+        with deadline(0.5):
+            return await manager.get_incident(document_id)
+
+    assert asyncio.run(main()) == {'_id': document_id}
+    assert 0 < seen[0] <= 500
@@ -0,0 +1,58 @@
+import os
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+import threading
+
+from PyQt5.QtCore import QEventLoop, QTimer
+from PyQt5.QtWidgets import QApplication
+
+from src.incidents.batch_analysis import BatchAnalyzer
+
+app = QApplication.instance() or QApplication([])
+
+class SlowPredictor:
+    def __init__(self, delay=0.0, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def recommend_resources(self, event_type, severity):
+        with self.lock:
+            self.calls += 1
+        threading.Event().wait(self.delay)
+        if severity == self.fail_on:
+            raise ValueError("model error")
+        return [{'resource': f'{event_type} team', 'priority': 1}]
+
+def run_until_finished(analyzer, incidents, after=None, timeout_ms=10000):
+    emitted, outcome = [], {}
+    analyzer.results_ready.connect(lambda results: emitted.append(results))
+    loop = QEventLoop()
+    analyzer.finished.connect(lambda stats: (outcome.update(stats), loop.quit()))
+    QTimer.singleShot(timeout_ms, loop.quit)
+    analyzer.start(incidents)
+    if after:
+        QTimer.singleShot(0, after)
+    loop.exec_()
+    return emitted, outcome
+
+def test_results_are_coalesced_and_counted():
+    """Test that every incident is analyzed and results arrive in a few merged batches."""
+    incidents = [{'id': f'inc_{i}', 'type': 'Flood', 'severity': 'Low' if i % 50 else 'High'} for i in range(500)]
+    analyzer = BatchAnalyzer(SlowPredictor(fail_on='High'), max_threads=4, chunk_size=16, flush_interval_ms=50)
+    emitted, stats = run_until_finished(analyzer, incidents)
+    results = {k: v for batch in emitted for k, v in batch.items()}
+    assert len(results) == 490 and stats['analyzed'] == 490 and stats['failed'] == 10
+    assert len(emitted) < 50  # far fewer signals than incidents
+    assert not stats['cancelled'] and stats['per_second'] > 0
+
+def test_cancel_stops_remaining_chunks():
+    """Test that cancelling skips queued work and still reports what was done."""
+    predictor = SlowPredictor(delay=0.01)
+    incidents = [{'id': f'inc_{i}', 'type': 'Fire', 'severity': 'High'} for i in range(400)]
+    analyzer = BatchAnalyzer(predictor, max_threads=2, chunk_size=8, flush_interval_ms=20)
+    emitted, stats = run_until_finished(analyzer, incidents, after=analyzer.cancel)
+    assert stats['cancelled']
+    assert predictor.calls < 40
+    assert stats['analyzed'] == predictor.calls == sum(len(batch) for batch in emitted)
+    assert not analyzer.is_running()
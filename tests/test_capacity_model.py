@@ -0,0 +1,64 @@
+import gc
+import json
+import os
+import weakref
+from src.ai.capacity_model import CACHE_SUFFIX, CapacityModel, load_capacity_model, parse_quantity
+from src.ai.resource_availability import ResourceManager
+
+RESOURCE_MAP = {
+    "event_type_map": {
+        "Flood": [{"resource": "Rescue Boats", "priority": 1, "quantity": "5-10 units"}],
+        "Tsunami": [{"resource": "Rescue Boats", "priority": 2, "quantity": "15-25 units"}],
+    },
+    "severity_map": {
+        "High": [{"resource": "Field Team", "priority": 1, "quantity": "Company-sized element"}],
+    },
+}
+
+def test_parse_quantity_formats():
+    """Test parsing of ranges, open-ended and free-text quantities."""
+    assert (parse_quantity("5-10 units").min_units, parse_quantity("5-10 units").max_units) == (5, 10)
+    assert parse_quantity("200+ beds").max_units is None
+    assert parse_quantity("200+ beds").default_units == 200
+    assert parse_quantity("1 officer").unit == "officer"
+    assert parse_quantity("Company-sized element").default_units == 1
+
+def test_duplicate_resources_are_merged(tmp_path):
+    """Test that a resource listed under several event types keeps one merged record."""
+    path = tmp_path / "resource_map.json"
+    path.write_text(json.dumps(RESOURCE_MAP))
+    model = load_capacity_model(str(path))
+    boats = model.resources["Rescue Boats"]
+    assert (boats.min_units, boats.max_units, boats.best_priority) == (15, 25, 1)
+    assert [r.resource for r in model.recommendations("Flood", "High")] == ["Rescue Boats", "Field Team"]
+
+def test_cache_invalidated_when_json_changes(tmp_path):
+    """Test that the on-disk cache is rebuilt when the JSON's mtime changes."""
+    path = tmp_path / "resource_map.json"
+    path.write_text(json.dumps(RESOURCE_MAP))
+    load_capacity_model(str(path))
+    assert os.path.exists(str(path) + CACHE_SUFFIX)
+
+    changed = dict(RESOURCE_MAP, severity_map={})
+    path.write_text(json.dumps(changed))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert "Field Team" not in load_capacity_model(str(path)).resources
+
+def test_recommendations_cached_per_model():
+    """Test that merged recommendations are cached on the model and do not keep it alive."""
+    model = CapacityModel.compile(RESOURCE_MAP)
+    assert model.recommendations("Flood", "High") is model.recommendations("Flood", "High")
+    other = CapacityModel.compile(dict(RESOURCE_MAP, severity_map={}))
+    assert [r.resource for r in other.recommendations("Flood", "High")] == ["Rescue Boats"]
+    ref = weakref.ref(model)
+    del model
+    gc.collect()
+    assert ref() is None
+
+def test_availability_covers_event_type_resources(tmp_path):
+    """Test that stock is initialized from event-type entries only, merged across event types."""
+    path = tmp_path / "resource_map.json"
+    path.write_text(json.dumps(RESOURCE_MAP))
+    available = ResourceManager(str(path)).get_available_resources()
+    assert available == {"Rescue Boats": 25}
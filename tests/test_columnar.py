@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from src.models.columnar import ColumnarTable, attach
+from src.models.live_cache import CollectionCache
+
+def incident(i, **fields):
+    document = {'_id': f'inc_{i}', 'status': 'active', 'severity': 'High', 'type': 'Flood',
+                'location': {'lat': -0.1 * i, 'lng': 34.7}, 'created_at': datetime(2025, 1, 1 + i)}
+    document.update(fields)
+    return document
+
+def test_follows_cache_changes():
+    """Test that upserts and deletes on the cache reach the columns incrementally."""
+    cache = CollectionCache('incidents', ('status', 'severity', 'type'))
+    cache.upsert(incident(1))
+    table = attach(cache, ('status', 'severity', 'type'), ('created_at',))
+    cache.upsert(incident(2, severity='Low', location='Kisumu'))
+    cache.upsert(incident(3, status='closed'))
+    cache.upsert(incident(1, severity='Critical'))
+    cache.delete('inc_2')
+    snapshot = table.snapshot()
+    assert sorted(snapshot.ids) == ['inc_1', 'inc_3']
+    assert snapshot.counts_by('severity') == cache.counts_by('severity') == {'Critical': 1, 'High': 1}
+    assert snapshot.counts_by('status', snapshot.where(severity='High')) == {'closed': 1}
+    assert int(snapshot.located().sum()) == 2
+    assert snapshot.where(type='Fire').sum() == 0
+
+def test_snapshot_is_read_only_and_isolated():
+    """Test that a snapshot cannot be written and does not see later changes."""
+    table = ColumnarTable(('status',))
+    table.load([incident(1), incident(2)])
+    before = table.snapshot()
+    assert table.snapshot() is before
+    with pytest.raises(ValueError):
+        before.lat[0] = 0.0
+    table.upsert('inc_1', incident(1, status='closed'))
+    table.upsert('inc_9', incident(9))
+    table.delete('inc_2')
+    assert table.copies == 1  # writes never copy
+    assert before.counts_by('status') == {'active': 2} and len(before) == 2
+    after = table.snapshot()
+    assert after.counts_by('status') == {'closed': 1, 'active': 1}
+    assert table.snapshot() is after and table.copies == 2  # one copy for the whole burst
+
+def test_timestamps_and_dataframe():
+    """Test datetime64 columns, range masks and the pandas view."""
+    table = ColumnarTable(('severity',), ('created_at',))
+    table.load([incident(1), incident(2, created_at='2025-01-05T12:00:00Z'),
+                incident(3, created_at=None, severity=None)])
+    snapshot = table.snapshot()
+    assert snapshot.times['created_at'].dtype == np.dtype('datetime64[ms]')
+    assert snapshot.between('created_at', datetime(2025, 1, 3), datetime(2025, 1, 6, tzinfo=timezone.utc)).sum() == 1
+    frame = snapshot.to_dataframe()
+    assert frame['severity'].value_counts().to_dict() == {'High': 2}
+    assert frame['created_at'].isna().sum() == 1
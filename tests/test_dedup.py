@@ -0,0 +1,58 @@
+from datetime import datetime
+from unittest.mock import patch
+import mongomock
+from src.models.dedup import DuplicateDetector, attach
+from src.models.incident import IncidentManager
+from src.models.live_cache import CollectionCache
+
+def report(incident_id, minutes, description, location='Kisumu, Nyalenda', **fields):
+    incident = {'id': incident_id, 'title': 'Flooding', 'description': description, 'location': location,
+                'created_at': f'2025-05-01T{10 + minutes // 60:02d}:{minutes % 60:02d}:00'}
+    incident.update(fields)
+    return incident
+
+ORIGINAL = 'River overflowing at Nyalenda bridge, families trapped near the market'
+REPEAT = 'Families trapped near Nyalenda market as the river is overflowing at the bridge'
+
+def test_flags_repeat_report_nearby_and_recent():
+    """Test that a reworded report of the same place and time is matched to the first one."""
+    detector = DuplicateDetector()
+    assert detector.observe(report('a', 0, ORIGINAL)) is None
+    match = detector.observe(report('b', 40, REPEAT, location='kisumu  nyalenda'))
+    assert match.incident_id == 'a' and match.similarity >= 0.5 and match.seconds_apart == 2400
+    assert detector.stats()['flagged'] == 1
+
+def test_ignores_other_place_time_or_text():
+    """Test that similar text elsewhere, much later, or unrelated text nearby is not flagged."""
+    detector = DuplicateDetector(window_hours=6)
+    detector.add(report('a', 0, ORIGINAL))
+    assert detector.find(report('b', 10, REPEAT, location='Nairobi, CBD')) is None
+    assert detector.find(report('c', 10, 'Bus overturned on the highway, several passengers injured')) is None
+    assert detector.find(report('d', 7 * 60, REPEAT)) is None
+
+def test_coordinates_use_radius_and_window_evicts():
+    """Test the distance rule for coordinates and eviction of incidents older than the window."""
+    detector = DuplicateDetector(radius_m=1000, window_hours=1)
+    detector.add(report('a', 0, ORIGINAL, location={'lat': -0.1000, 'lng': 34.7500}))
+    near = detector.find(report('b', 5, REPEAT, location={'lat': -0.1050, 'lng': 34.7520}))
+    assert near.incident_id == 'a' and 500 < near.distance_m < 700
+    assert detector.find(report('c', 5, REPEAT, location={'lat': -0.1200, 'lng': 34.7500})) is None
+    detector.add(report('e', 2 * 60, 'Unrelated later report', location={'lat': 1.0, 'lng': 36.0}))
+    assert len(detector) == 1 and detector.stats()['buckets'] == 16
+    detector.remove('e')
+    assert len(detector) == 0 and detector.stats()['buckets'] == 0
+
+def test_manager_flags_repeats_of_cached_incidents():
+    """Test that a detector attached to the cache knows existing incidents and flags a new repeat."""
+    cache = CollectionCache('incidents', ('status',))
+    cache.upsert({'_id': 'a', 'title': 'Flooding', 'description': ORIGINAL, 'location': 'Kisumu, Nyalenda',
+                  'created_at': datetime.utcnow()})
+    detector = attach(cache)
+    db = mongomock.MongoClient().db
+    with patch('src.models.incident.get_database', return_value=db):
+        manager = IncidentManager(duplicates=detector)
+    incident_id = manager.create_incident({'title': 'Flooding', 'type': 'Flood', 'severity': 'High',
+                                           'location': 'Kisumu, Nyalenda', 'description': REPEAT, 'created_by': 'u'})
+    assert manager.get_incident(incident_id)['duplicate_of'] == 'a'
+    cache.delete('a')
+    assert len(detector) == 1
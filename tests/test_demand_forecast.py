@@ -0,0 +1,70 @@
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.ai.demand_forecast import ALPHAS, BETAS, DemandForecaster, fit_holt
+from src.ai.resource_availability import ResourceManager
+
+RESOURCE_MAP = {
+    "event_type_map": {
+        "Flood": [{"resource": "Rescue Boats", "priority": 1, "quantity": "5-10 units"},
+                  {"resource": "Medical Kits", "priority": 2, "quantity": "20-40 kits"}],
+    },
+    "severity_map": {
+        "High": [{"resource": "Medical Kits", "priority": 1, "quantity": "30-50 kits"}],
+    },
+}
+NOW = datetime(2025, 6, 1)
+
+def holt_sse(series, alpha, beta):
+    level, trend, sse = series[0], 0.0, 0.0
+    for observed in series[1:]:
+        sse += (observed - level - trend) ** 2
+        new_level = alpha * observed + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        level = new_level
+    return sse, level, trend
+
+def forecaster(tmp_path):
+    path = tmp_path / "resource_map.json"
+    path.write_text(json.dumps(RESOURCE_MAP))
+    return DemandForecaster(ResourceManager(str(path)), bin_hours=6, history_days=7)
+
+def test_fit_holt_picks_lowest_error_grid_point():
+    """Test that each series gets the level and trend of the grid parameters with the lowest error."""
+    rng = np.random.default_rng(1)
+    series = np.vstack([np.arange(30.0), np.full(30, 4.0), rng.poisson(3, 30).astype(float)])
+    level, trend = fit_holt(series)
+    for row, expected_level, expected_trend in zip(series, level, trend):
+        _, best_level, best_trend = min(holt_sse(row, a, b) for a in ALPHAS for b in BETAS)
+        assert np.isclose(expected_level, best_level) and np.isclose(expected_trend, best_trend)
+    assert np.isclose(level[1], 4.0) and trend[1] == 0.0
+    assert 0.9 < trend[0] <= 1.0
+
+def test_each_incident_counted_once_with_merged_units(tmp_path):
+    """Test that a Flood/High incident needs the merged recommendation units, not type plus severity."""
+    demand = forecaster(tmp_path)
+    assert dict(zip(demand.resources, demand.units_per_incident("Flood", "High"))) == {
+        "Medical Kits": 30, "Rescue Boats": 5}
+    # Two Flood/High incidents in every 6-hour bin of the last week in one region
+    history = [{'type': 'Flood', 'severity': 'High', 'location': 'Kisumu',
+                'created_at': NOW - timedelta(hours=6 * b + 1 + i)} for b in range(28) for i in range(2)]
+    history.append({'type': 'Earthquake', 'severity': 'Low', 'location': 'Kisumu',
+                    'created_at': NOW - timedelta(hours=2)})  # nothing mapped: not counted
+    demand.fit(history, now=NOW)
+    assert demand.keys == [("Flood", "High")]
+    assert demand.forecast(horizon_hours=24) == {"Kisumu": {"Medical Kits": 240.0, "Rescue Boats": 40.0}}
+
+def test_suggestions_split_stock_by_regional_demand(tmp_path):
+    """Test that available stock is shared in proportion to demand and the rest reported as shortfall."""
+    demand = forecaster(tmp_path)
+    history = [{'type': 'Flood', 'severity': 'Low', 'location': region,
+                'created_at': NOW - timedelta(hours=6 * b + 1)}
+               for b in range(28) for region, n in (("Kisumu", 3), ("Busia", 1)) for _ in range(n)]
+    demand.fit(history, now=NOW)
+    suggestions = demand.suggest_prepositioning(horizon_hours=6, available={"Rescue Boats": 10, "Medical Kits": 500})
+    assert suggestions == [
+        {'resource': 'Rescue Boats', 'region': 'Kisumu', 'forecast_demand': 15.0, 'suggested_units': 7, 'shortfall': 7.5},
+        {'resource': 'Rescue Boats', 'region': 'Busia', 'forecast_demand': 5.0, 'suggested_units': 2, 'shortfall': 2.5},
+    ]
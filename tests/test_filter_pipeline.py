@@ -0,0 +1,77 @@
+import os
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+import threading
+
+from PyQt5.QtCore import QEventLoop, QTimer
+from PyQt5.QtWidgets import QApplication
+
+from src.widgets.filter_pipeline import FilterPipeline, filter_records
+from src.widgets.record_table import Column, RecordTable
+
+app = QApplication.instance() or QApplication([])
+
+RECORDS = [
+    {'id': '1', 'title': 'Flood in Kisumu', 'type': 'Flood', 'severity': 'High'},
+    {'id': '2', 'title': 'Fire at market', 'type': 'Fire', 'severity': 'High'},
+    {'id': '3', 'title': 'Flash flood', 'type': 'Flood', 'severity': 'Low'},
+]
+
+def make_pipeline(query, debounce_ms=30):
+    table = RecordTable([Column("Title", 'title')])
+    return table, FilterPipeline(table, query, snapshot=lambda: tuple(RECORDS), debounce_ms=debounce_ms)
+
+def run_until_applied(pipeline, timeout_ms=5000):
+    loop = QEventLoop()
+    pipeline.applied.connect(loop.quit)
+    QTimer.singleShot(timeout_ms, loop.quit)
+    loop.exec_()
+    pipeline.applied.disconnect(loop.quit)
+
+def test_filter_records_matches_text_and_fields():
+    """Test that filter_records matches text case-insensitively and skips None filters."""
+    assert [r['id'] for r in filter_records(RECORDS, 'FLOOD', ('title',))] == ['1', '3']
+    assert [r['id'] for r in filter_records(RECORDS, 'flood', ('title',), {'severity': 'Low'})] == ['3']
+    assert len(filter_records(RECORDS, '', ('title',), {'type': None})) == 3
+
+def test_burst_of_requests_runs_one_query():
+    """Test that requests within the debounce interval are coalesced into the last one."""
+    calls = []
+    table, pipeline = make_pipeline(lambda text, snapshot: (calls.append(text),
+                                                            filter_records(snapshot, text, ('title',)))[1])
+    for text in ('f', 'fl', 'flo', 'floo', 'flood'):
+        pipeline.request(text)
+    run_until_applied(pipeline)
+    assert calls == ['flood'] and pipeline.dispatched == 1
+    assert [r['id'] for r in table.table_model.records()] == ['1', '3']
+    assert pipeline.stats()['latency_max'] is not None
+
+def test_stale_result_is_discarded():
+    """Test that a slow query finishing after a newer request never reaches the table."""
+    started, release = threading.Event(), threading.Event()
+
+    def query(text, snapshot):
+        if text == 'slow':
+            started.set()
+            release.wait(5)
+        return filter_records(snapshot, text, ('title',))
+
+    table, pipeline = make_pipeline(query)
+    pipeline.request('slow', immediate=True)
+    assert started.wait(5)
+    pipeline.request('fire', immediate=True)
+    release.set()
+    run_until_applied(pipeline)
+    pipeline.wait(5000)
+    app.processEvents()
+    assert [r['id'] for r in table.table_model.records()] == ['2']
+    assert pipeline.discarded == 1
+
+def test_cancel_drops_pending_request():
+    """Test that cancel stops a debounced request from being dispatched."""
+    table, pipeline = make_pipeline(lambda text, snapshot: list(snapshot), debounce_ms=10)
+    pipeline.request('flood')
+    pipeline.cancel()
+    loop = QEventLoop()
+    QTimer.singleShot(100, loop.quit)
+    loop.exec_()
+    assert pipeline.dispatched == 0 and table.table_model.rowCount() == 0
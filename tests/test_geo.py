@@ -0,0 +1,68 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from bson import ObjectId
+
+from src.models.geo import GeoQueries, GeoQueryUnavailable
+from src.models.live_cache import LiveCache
+from src.utils.resilience import CircuitOpenError
+from src.utils.spatial_index import GridIndex, haversine_m, point_in_polygon
+
+# Concave "L" shape as (lng, lat) vertices
+L_RING = [(0, 0), (2, 0), (2, 1), (1, 1), (1, 2), (0, 2), (0, 0)]
+
+def test_point_in_polygon_handles_concave_rings():
+    """Test the even-odd test inside, outside and in the notch of a concave ring."""
+    assert point_in_polygon(0.5, 0.5, L_RING)
+    assert point_in_polygon(1.5, 0.5, L_RING)
+    assert not point_in_polygon(1.5, 1.5, L_RING)
+    assert not point_in_polygon(-0.5, 0.5, L_RING)
+
+def test_grid_index_queries_match_brute_force():
+    """Test box, radius and polygon queries across cells against a scan of every point."""
+    grid = GridIndex(cell_degrees=0.25)
+    points = {f"p{i}": (-0.4 + 0.037 * (i % 70), -0.4 + 0.041 * (i // 70)) for i in range(4200)}
+    grid.bulk_load((key, lat, lng) for key, (lat, lng) in points.items())
+    grid.insert("p0", 5.0, 5.0)  # moved
+    grid.remove("p1")
+    points["p0"] = (5.0, 5.0)
+    del points["p1"]
+    assert len(grid) == len(points)
+
+    assert set(grid.within_box(0.2, 0.1, 0.9, 0.6)) == {
+        k for k, (lat, lng) in points.items() if 0.2 <= lat <= 0.9 and 0.1 <= lng <= 0.6}
+    hits = grid.within_radius(0.5, 0.5, 30000)
+    assert {k for _, k in hits} == {k for k, p in points.items() if haversine_m(0.5, 0.5, *p) <= 30000}
+    assert [d for d, _ in hits] == sorted(d for d, _ in hits)
+    assert set(grid.within_polygon(L_RING)) == {k for k, (lat, lng) in points.items()
+                                                if point_in_polygon(lat, lng, L_RING)}
+    assert len(grid.within_box(0.2, 0.1, 0.9, 0.6, limit=3)) == 3
+
+def offline_collection():
+    collection = MagicMock()
+    collection.find.side_effect = CircuitOpenError("Database offline")
+    return collection
+
+def test_offline_query_answered_from_running_cache():
+    """Test that a query failing with the breaker open is answered from the seeded live cache."""
+    cache = LiveCache(db=MagicMock())
+    inside, outside = ObjectId(), ObjectId()
+    cache.incidents.upsert({'_id': inside, 'status': 'active', 'title': 'Flood',
+                            'location': {'type': 'Point', 'coordinates': [0.5, 0.5]}})
+    cache.incidents.upsert({'_id': outside, 'status': 'active', 'title': 'Fire',
+                            'location': {'type': 'Point', 'coordinates': [1.5, 1.5]}})
+    cache.ready.set()
+    geo = GeoQueries(offline_collection(), 'incidents')
+    with patch('src.models.geo.running_live_cache', return_value=cache):
+        found = geo.in_polygon(L_RING, filters={'status': 'active'}, fields=('title',))
+        assert geo.in_box(0, 0, 2, 2, filters={'status': {'$in': ['active', 'pending']}}, fields=('title',)) == [
+            {'_id': str(inside), 'title': 'Flood'}, {'_id': str(outside), 'title': 'Fire'}]
+        assert geo.in_box(0, 0, 2, 2, filters={'status': {'$ne': 'active'}}) == []
+    assert found == [{'_id': str(inside), 'title': 'Flood'}]
+
+def test_offline_query_without_cache_raises_clear_error():
+    """Test that without a running cache the failure is reported instead of seeding from a dead server."""
+    geo = GeoQueries(offline_collection(), 'incidents')
+    with patch('src.models.geo.running_live_cache', return_value=None):
+        with pytest.raises(GeoQueryUnavailable, match="live cache is not running"):
+            geo.near(0.5, 0.5, 1000)
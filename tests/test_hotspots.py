@@ -0,0 +1,104 @@
+import random
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from src.models.hotspots import HotspotEngine, current_hotspots, hotspot_alert
+from src.utils.spatial_index import haversine_m
+
+def brute_force(points, eps_m, min_points):
+    """Core-point clusters and their border points by plain DBSCAN, as sets of ids"""
+    ids = list(points)
+    near = {a: [b for b in ids if haversine_m(*points[a], *points[b]) <= eps_m] for a in ids}
+    core = {a for a in ids if len(near[a]) >= min_points}
+    clusters, seen = [], set()
+    for start in core - seen:
+        if start in seen:
+            continue
+        members, stack = set(), [start]
+        seen.add(start)
+        while stack:
+            a = stack.pop()
+            members.add(a)
+            for b in near[a]:
+                if b in core and b not in seen:
+                    seen.add(b)
+                    stack.append(b)
+        members |= {b for a in list(members) for b in near[a]}
+        clusters.append(frozenset(members))
+    return set(clusters)
+
+def random_points(rng, n):
+    centers = [(-1.28 + rng.uniform(-0.05, 0.05), 36.82 + rng.uniform(-0.05, 0.05)) for _ in range(6)]
+    points = {}
+    for i in range(n):
+        if rng.random() < 0.7:
+            lat, lng = rng.choice(centers)
+            points[f'p{i}'] = (lat + rng.gauss(0, 0.003), lng + rng.gauss(0, 0.003))
+        else:
+            points[f'p{i}'] = (-1.28 + rng.uniform(-0.08, 0.08), 36.82 + rng.uniform(-0.08, 0.08))
+    return points
+
+def test_matches_brute_force_dbscan_through_adds_and_removes():
+    """Test that incremental clusters equal a from-scratch DBSCAN after every batch of changes."""
+    rng = random.Random(3)
+    points = random_points(rng, 400)
+    engine = HotspotEngine(eps_m=400, min_points=5, window_hours=1000, ref_lat=-1.28)
+    live = {}
+    for step, (point_id, (lat, lng)) in enumerate(points.items()):
+        engine.add(point_id, lat, lng, 1_700_000_000 + step, 'High')
+        live[point_id] = (lat, lng)
+        if step % 3 == 0 and step:
+            gone = rng.choice(list(live))
+            engine.remove(gone)
+            del live[gone]
+        if step % 50 == 49:
+            found = {frozenset(h.incident_ids) for h in engine.hotspots()}
+            assert found == brute_force(live, 400, 5)
+    assert engine.hotspots()
+
+def test_window_evicts_old_incidents_and_clusters():
+    """Test that incidents older than the window drop out and their hotspot disappears."""
+    engine = HotspotEngine(eps_m=500, min_points=3, window_hours=2)
+    for i, severity in enumerate(['Critical', 'High', 'High']):
+        engine.add(f'a{i}', -0.1 + i * 0.001, 34.75, f'2025-05-01T10:{i:02d}:00', severity)
+    [hotspot] = engine.hotspots()
+    assert hotspot.count == 3 and hotspot.severity == 'Critical'
+    assert hotspot.severity_mix == {'Critical': 1, 'High': 2}
+    assert hotspot.radius_m < 200 and abs(hotspot.lat + 0.099) < 1e-9
+    assert hotspot_alert(hotspot)['type'] == 'Emergency'
+    engine.add('late', 1.0, 36.0, '2025-05-01T13:00:00')
+    assert engine.hotspots() == [] and len(engine) == 1
+
+def test_alert_ids_differ_for_hotspots_sharing_a_border_point():
+    """Test that two hotspots touching the same border incident still get distinct alert ids."""
+    engine = HotspotEngine(eps_m=500, min_points=4, window_hours=24)
+    for i in range(4):
+        engine.add(f'l{i}', 0.0, -0.0085 + i * 0.0005, '2025-05-01T10:00:00')
+        engine.add(f'r{i}', 0.0, 0.0010 + i * 0.0005, '2025-05-01T10:00:00')
+    engine.add('a', 0.0, -0.0030, '2025-05-01T10:00:00')  # within eps of l3 and r0 only
+    hotspots = engine.hotspots()
+    assert len(hotspots) == 2 and all('a' in h.incident_ids for h in hotspots)
+    assert {hotspot_alert(h)['id'] for h in hotspots} == {'hotspot_l0', 'hotspot_r0'}
+
+def test_follows_collection_cache_changes():
+    """Test that the observer adds, moves and removes incidents from document changes."""
+    engine = HotspotEngine(eps_m=500, min_points=3, window_hours=24)
+    for i in range(3):
+        engine.on_change(f'i{i}', {'location': {'lat': -0.1, 'lng': 34.75 + i * 0.001},
+                                   'created_at': '2025-05-01T10:00:00', 'severity': 'Low'})
+    assert engine.hotspots()[0].count == 3
+    engine.on_change('i0', {'location': {'lat': 0.5, 'lng': 35.0}, 'created_at': '2025-05-01T10:00:00'})
+    assert engine.hotspots() == []
+    engine.on_change('i0', None)
+    assert len(engine) == 2 and engine.stats()['hotspots'] == 0
+
+def test_current_hotspots_measure_the_window_from_now():
+    """Test that a cluster whose newest incident is older than the window is not reported."""
+    engine = HotspotEngine(eps_m=500, min_points=3, window_hours=2)
+    created = datetime.utcnow() - timedelta(hours=3)
+    for i in range(3):
+        engine.add(f'a{i}', -0.1 + i * 0.001, 34.75, created)
+    assert len(engine.hotspots()) == 1
+    with patch('src.models.hotspots._engine', engine):
+        assert current_hotspots() == []
+    assert len(engine) == 0
@@ -0,0 +1,37 @@
+import threading
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from src.utils.ids import id_timestamp, new_id, new_ids
+
+def test_ids_are_unique_and_ordered_per_thread():
+    """Test that concurrent threads mint distinct ids, each thread in ascending order."""
+    batches = []
+    def mint():
+        batches.append([new_id('inc_') for _ in range(20000)] + new_ids(5000, 'inc_'))
+    threads = [threading.Thread(target=mint) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(batch == sorted(batch) for batch in batches)
+    ids = [i for batch in batches for i in batch]
+    assert len(set(ids)) == len(ids)
+    assert all(i.startswith('inc_') and len(i) == 30 for i in ids)
+
+def test_clock_stepping_back_keeps_ids_monotonic():
+    """Test that ids keep increasing when the wall clock moves backwards."""
+    millis = 1_800_000_000_000
+    minted = []
+    def mint():  # in its own thread, so the mocked clock does not leak into other tests
+        with patch('src.utils.ids.time.time_ns', return_value=millis * 1_000_000):
+            minted.append(new_id())
+        with patch('src.utils.ids.time.time_ns', return_value=(millis - 5000) * 1_000_000):
+            minted.append(new_id())
+    thread = threading.Thread(target=mint)
+    thread.start()
+    thread.join()
+    first, second = minted
+    assert second > first
+    assert id_timestamp(first) == datetime.fromtimestamp(millis / 1000, tz=timezone.utc)
+    assert id_timestamp(second) == id_timestamp(first)
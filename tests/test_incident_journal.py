@@ -0,0 +1,49 @@
+import json
+from unittest.mock import patch
+from src.incidents.incidents_widget import IncidentManager
+from src.incidents.journal_store import JournalStore
+
+def test_mutations_survive_reopen_and_torn_tail(tmp_path):
+    """Test that journaled writes replay on load and a torn final record is dropped."""
+    path = str(tmp_path / 'incidents.json')
+    (tmp_path / 'incidents.json').write_text(json.dumps([{'id': 'inc_1', 'title': 'Flood'}]))
+    store = JournalStore(path)
+    store.put({'id': 'inc_2', 'title': 'Fire'})
+    store.put({'id': 'inc_1', 'title': 'Flood', 'status': 'Resolved'})
+    store.delete('inc_2')
+    store.put({'id': 'inc_3', 'title': 'Landslide'})
+    store.close()
+    with open(store.journal_path, 'ab') as f:
+        f.write(b'\x00\x00\x01\x00garbage')  # crash in the middle of an append
+
+    reopened = JournalStore(path)
+    assert [d['id'] for d in reopened.values()] == ['inc_1', 'inc_3']
+    assert reopened.get('inc_1')['status'] == 'Resolved'
+    reopened.put({'id': 'inc_4', 'title': 'Drought'})
+    reopened.close()
+    assert len(JournalStore(path)) == 3
+
+def test_compaction_rewrites_snapshot_and_empties_journal(tmp_path):
+    """Test that compaction leaves a plain JSON list and an empty journal."""
+    path = str(tmp_path / 'incidents.json')
+    store = JournalStore(path, compact_min_records=3)
+    for i in range(3):
+        store.put({'id': f'inc_{i}', 'title': 'Flood'})
+    assert [d['id'] for d in json.loads((tmp_path / 'incidents.json').read_text())] == ['inc_0', 'inc_1', 'inc_2']
+    assert (tmp_path / 'incidents.json.journal').stat().st_size == 0
+    assert not (tmp_path / 'incidents.json.tmp').exists()
+
+def test_unreadable_data_is_set_aside_and_writes_still_work(tmp_path):
+    """Test that a corrupt snapshot is moved aside and the manager keeps an empty, writable store."""
+    for directory in ('incidents', 'data'):
+        (tmp_path / directory).mkdir()
+    (tmp_path / 'data' / 'incidents.json').write_text('[{"id": "inc_1",')
+    with patch('src.incidents.incidents_widget.current_dir', str(tmp_path / 'incidents')):
+        manager = IncidentManager()
+
+    assert manager.load_error and manager.get_all_incidents() == []
+    incident_id = manager.add_incident({'title': 'Flood', 'type': 'Flood', 'severity': 'High',
+                                        'location': 'Pune', 'description': 'River over the banks'})
+    assert manager.update_incident(incident_id, {'status': 'Resolved'})
+    assert manager.delete_incident(incident_id)
+    assert [p.name.split('.unreadable-')[0] for p in (tmp_path / 'data').glob('*.unreadable-*')] == ['incidents.json']
@@ -0,0 +1,46 @@
+import random
+from src.incidents.search_index import IncidentSearchIndex
+
+WORDS = ['flood', 'fire', 'river', 'overflow', 'lorry', 'kisumu', 'nyalenda', 'road', 'bridge', 'market']
+TYPES = ['Flood', 'Fire', 'Other']
+SEVERITIES = ['Low', 'Medium', 'High']
+
+def scan(documents, text, type=None, severity=None):
+    text = text.lower()
+    return [d['id'] for d in documents
+            if (not text or any(text in str(d.get(f) or '').lower() for f in ('title', 'description', 'location')))
+            and (type is None or d['type'] == type) and (severity is None or d['severity'] == severity)]
+
+def make_incident(i, rng):
+    return {'id': f'inc_{i}', 'title': ' '.join(rng.sample(WORDS, 2)).title(),
+            'description': ' '.join(rng.sample(WORDS, 4)), 'location': f'{rng.choice(WORDS).title()}, Kenya',
+            'type': rng.choice(TYPES), 'severity': rng.choice(SEVERITIES)}
+
+def test_search_matches_full_scan_through_updates_and_deletes():
+    """Test that index results equal the substring scan after adds, updates and deletes."""
+    rng = random.Random(7)
+    documents = {f'inc_{i}': make_incident(i, rng) for i in range(3000)}
+    index = IncidentSearchIndex(documents.values())
+    for i in rng.sample(range(3000), 300):
+        documents[f'inc_{i}'] = dict(make_incident(i, rng), title='Collapsed bridge')
+        index.update(documents[f'inc_{i}'])
+    for i in rng.sample(range(3000), 1700):  # enough to trigger a repack
+        assert index.remove(f'inc_{i}')
+        del documents[f'inc_{i}']
+    for i in range(3000, 3200):
+        documents[f'inc_{i}'] = make_incident(i, rng)
+        index.add(documents[f'inc_{i}'])
+
+    queries = [('', None, None), ('flo', None, None), ('r', 'Fire', None), ('BRIDGE', None, 'High'),
+               ('kisumu, k', None, None), ('river flood', 'Flood', 'Low'), ('absent', None, None), ('', 'Other', 'Medium')]
+    for text, type, severity in queries:
+        expected = scan(documents.values(), text, type, severity)
+        assert [d['id'] for d in index.search(text, type, severity)] == expected, (text, type, severity)
+    assert len(index) == len(documents)
+
+def test_query_does_not_match_across_fields():
+    """Test that a phrase spanning the end of one field and the start of the next is not a hit."""
+    index = IncidentSearchIndex([{'id': 'inc_1', 'title': 'River', 'description': 'flood', 'location': '',
+                                  'type': 'Flood', 'severity': 'Low'}])
+    assert index.search('river flood') == []
+    assert [d['id'] for d in index.search('river')] == ['inc_1']
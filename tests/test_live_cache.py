@@ -0,0 +1,77 @@
+from bson import ObjectId
+from bson.timestamp import Timestamp
+from unittest.mock import MagicMock, patch
+from pymongo.errors import OperationFailure, ServerSelectionTimeoutError
+from src.models.live_cache import CollectionCache, LiveCache
+
+def test_indexes_follow_updates_and_deletes():
+    """Test that equality indexes move documents between buckets incrementally."""
+    cache = CollectionCache('incidents', ('status', 'severity'))
+    first, second = ObjectId(), ObjectId()
+    cache.upsert({'_id': first, 'status': 'active', 'severity': 'High'})
+    cache.upsert({'_id': second, 'status': 'active', 'severity': 'Low'})
+    cache.upsert({'_id': first, 'status': 'closed', 'severity': 'High'})
+    assert cache.counts_by('status') == {'active': 1, 'closed': 1}
+    assert [d['_id'] for d in cache.find(status='active', severity='Low')] == [str(second)]
+    cache.delete(second)
+    assert cache.summary() == {'total': 1, 'by_status': {'closed': 1}, 'by_severity': {'High': 1}}
+
+def test_change_events_update_cache_and_record_lag():
+    """Test that change stream events are applied and their lag sampled."""
+    cache = LiveCache(db=MagicMock())
+    document_id = ObjectId()
+    cache.apply_change({
+        'operationType': 'insert', 'ns': {'coll': 'resources'},
+        'documentKey': {'_id': document_id},
+        'fullDocument': {'_id': document_id, 'status': 'available', 'type': 'Vehicle'},
+        'clusterTime': Timestamp(0, 1),
+    })
+    assert cache.resources.count(status='available') == 1
+    cache.apply_change({'operationType': 'delete', 'ns': {'coll': 'resources'},
+                        'documentKey': {'_id': document_id}, 'clusterTime': Timestamp(0, 1)})
+    assert cache.resources.count() == 0
+    assert cache.lag.stats()['samples'] == 2
+
+def test_reads_return_copies_limited_to_fields():
+    """Test that callers get copies, projected when asked, and cannot change cached documents."""
+    cache = CollectionCache('incidents', ('status',))
+    document_id = ObjectId()
+    cache.upsert({'_id': document_id, 'status': 'active', 'title': 'Flood', 'notes': 'long text'})
+    found = cache.find(fields=('title',), status='active')
+    assert found == [{'_id': str(document_id), 'title': 'Flood'}]
+    found[0]['status'] = 'closed'
+    cache.get(document_id)['status'] = 'closed'
+    assert cache.count(status='active') == 1
+    assert cache.get(document_id)['status'] == 'active'
+
+def test_seeds_in_background_and_retries():
+    """Test that start() returns at once and seeding retries until the server answers."""
+    db = MagicMock()
+    db.watch.side_effect = OperationFailure("not a replica set", code=40573)
+    attempts = []
+    def find(*args, **kwargs):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ServerSelectionTimeoutError("down")
+        return []
+    db.__getitem__.return_value.find.side_effect = find
+    cache = LiveCache(db=db, poll_interval=60)
+    seeded = []
+    cache.subscribe(seeded.append)
+    with patch('src.models.live_cache.SEED_RETRY_INTERVAL', 0.01):
+        cache.start()
+        assert cache.wait_ready(timeout=5)
+    cache.stop(timeout=1)
+    assert cache.mode == 'polling' and sorted(seeded) == ['incidents', 'resources']
+
+def test_observe_loads_current_documents_then_follows_changes():
+    """Test that an observer gets the current documents once and every later change."""
+    cache = CollectionCache('incidents', ('status',))
+    cache.upsert({'_id': 'a', 'status': 'active'})
+    loaded, changes = [], []
+    cache.observe(lambda document_id, document: changes.append((document_id, document and document['status'])),
+                  lambda documents: loaded.extend(d['_id'] for d in documents))
+    cache.upsert({'_id': 'b', 'status': 'closed'})
+    cache.delete('a')
+    assert loaded == ['a']
+    assert changes == [('b', 'closed'), ('a', None)]
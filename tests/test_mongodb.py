@@ -3,6 +3,7 @@ import pytest
 from unittest.mock import patch, MagicMock
 from pymongo.errors import ConnectionFailure
 from bson import ObjectId
+from src.utils import mongo_pool
 from src.utils.mongodb_client import MongoDBClient, get_mongodb_client
 
 @pytest.fixture(autouse=True)
@@ -23,10 +24,17 @@ def mongodb_client():
     client.initialized = False
     return client
 
+@pytest.fixture(autouse=True)
+def reset_shared_clients():
+    """Drop shared clients cached by earlier tests."""
+    mongo_pool._clients.clear()
+    yield
+    mongo_pool._clients.clear()
+
 @pytest.fixture
 def mock_mongo_client():
     """Create mock MongoDB client."""
-    with patch('src.utils.mongodb_client.MongoClient') as mock_client:
+    with patch('src.utils.mongo_pool.MongoClient') as mock_client:
         client_instance = MagicMock()
         db = MagicMock()
         collection = MagicMock()
@@ -37,7 +45,7 @@ def mock_mongo_client():
         db.__getitem__.return_value = collection
         client_instance.admin.command.return_value = True
         
-        return {
+        yield {
             'client': mock_client,
             'client_instance': client_instance,
             'db': db,
@@ -58,7 +66,8 @@ def test_lazy_initialization(mongodb_client):
 def test_successful_connection(mongodb_client, mock_mongo_client):
     """Test successful database connection."""
     mongodb_client.initialize_connection()
-    mock_mongo_client['client'].assert_called_once_with('mongodb://localhost:27017')
+    mock_mongo_client['client'].assert_called_once()
+    assert mock_mongo_client['client'].call_args.args == ('mongodb://localhost:27017',)
     mock_mongo_client['client_instance'].admin.command.assert_called_once_with('ping')
     assert mongodb_client.initialized is True
 
@@ -93,6 +102,15 @@ def test_connection_error(mock_mongo_client):
         client.initialize_connection()
     assert "Failed to connect to MongoDB: Connection failed" in str(exc_info.value)
 
+def test_managers_share_one_client(mock_mongo_client):
+    """Test that every caller gets the same pooled client with configured options."""
+    with patch.dict(os.environ, {'MONGODB_MAX_POOL_SIZE': '7'}):
+        first = mongo_pool.get_mongo_client()
+        mongo_pool.get_database('other_db')
+    assert first is mongo_pool.get_mongo_client()
+    mock_mongo_client['client'].assert_called_once()
+    assert mock_mongo_client['client'].call_args.kwargs['maxPoolSize'] == 7
+
 def test_missing_env_vars():
     """Test handling of missing environment variables."""
     with patch.dict(os.environ, {}, clear=True):
@@ -100,3 +118,13 @@ def test_missing_env_vars():
         with pytest.raises(ValueError) as exc_info:
             client.initialize_connection()
         assert "MongoDB connection details not found in environment variables" in str(exc_info.value)
+
+def test_close_keeps_shared_client_open(mongodb_client, mock_mongo_client):
+    """Test that closing one user of the pool leaves the shared client to the others."""
+    mongodb_client.initialize_connection()
+    shared = mongo_pool.get_mongo_client()
+    mongodb_client.close()
+    shared.close.assert_not_called()
+    assert mongo_pool.get_mongo_client() is shared
+    mongo_pool.close_mongo_clients()
+    shared.close.assert_called_once()
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import mongomock
+from bson import ObjectId
+from src.models.incident import IncidentManager
+from src.models.offline_store import OfflineStore, OfflineSync, to_millis
+from src.models.resource import ResourceManager
+from src.models.resource_stats import ResourceCounters
+
+def make_store():
+    return OfflineStore(':memory:')
+
+def test_local_writes_are_served_locally_and_queued():
+    """Test that inserts, updates and deletes are readable at once and marked for push."""
+    store = make_store()
+    first = store.insert('incidents', {'title': 'Flood', 'status': 'active', 'resources_assigned': []})
+    second = store.insert('incidents', {'title': 'Fire', 'status': 'active'})
+    store.update('incidents', first, {'$set': {'status': 'closed'}, '$addToSet': {'resources_assigned': 'r1'}})
+    store.delete('incidents', second)
+
+    assert store.get('incidents', first)['resources_assigned'] == ['r1']
+    assert [d['_id'] for d in store.find('incidents', {'status': 'closed'})] == [first]
+    assert store.get('incidents', second) is None
+    assert store.pending('incidents') == 2
+
+def test_remote_changes_merge_last_writer_wins():
+    """Test that a newer local edit survives a pull while an older one is replaced."""
+    store = make_store()
+    newer = store.insert('incidents', {'title': 'Local edit', 'status': 'escalated'})
+    older = store.insert('incidents', {'title': 'Stale edit', 'status': 'escalated'})
+    local_updated = store.get('incidents', newer)['updated_at']
+
+    result = store.apply_remote('incidents', [
+        {'_id': newer, 'title': 'Server', 'status': 'active', 'updated_at': local_updated - timedelta(seconds=1)},
+        {'_id': older, 'title': 'Server', 'status': 'closed', 'updated_at': local_updated + timedelta(seconds=1)},
+        {'_id': 'remote-only', 'title': 'New', 'status': 'active', 'updated_at': datetime(2024, 1, 1)},
+    ])
+
+    assert result == {'applied': 2, 'kept_local': 1}
+    assert store.get('incidents', newer)['status'] == 'escalated'
+    assert store.get('incidents', older)['status'] == 'closed'
+    assert store.pending('incidents') == 1
+    assert to_millis(store.get('incidents', 'remote-only')['updated_at']) == to_millis(datetime(2024, 1, 1))
+
+def make_sync(store):
+    return OfflineSync(store, mongomock.MongoClient().db, collections=('incidents',), batch_size=2)
+
+def test_push_writes_local_changes_unless_the_server_is_newer():
+    """Test that push upserts and deletes local changes and keeps a newer server edit."""
+    store = make_store()
+    sync = make_sync(store)
+    server = sync.db.incidents
+    created = store.insert('incidents', {'title': 'Flood', 'status': 'active'})
+    removed = store.insert('incidents', {'title': 'Fire', 'status': 'active'})
+    stale = store.insert('incidents', {'title': 'Quake', 'status': 'active'})
+    server.insert_many([{'_id': ObjectId(removed), 'title': 'Fire', 'updated_at': datetime(2024, 1, 1)},
+                        {'_id': ObjectId(stale), 'title': 'Quake', 'status': 'closed',
+                         'updated_at': datetime.utcnow() + timedelta(minutes=1)}])
+    store.delete('incidents', removed)
+
+    assert sync.push('incidents') == {'pushed': 2, 'server_won': 1}
+    assert server.find_one({'_id': ObjectId(created)})['title'] == 'Flood'
+    assert server.find_one({'_id': ObjectId(removed)}) is None
+    assert store.get('incidents', stale)['status'] == 'closed'
+    assert store.pending() == 0
+
+def test_pull_merges_server_changes_past_the_watermark():
+    """Test that pull applies server documents in updated_at order and advances the watermark."""
+    store = make_store()
+    sync = make_sync(store)
+    server = sync.db.incidents
+    server.insert_many([{'title': f'Incident {i}', 'status': 'active', 'updated_at': datetime(2024, 1, 1, i)}
+                        for i in range(3)])
+
+    assert sync.pull('incidents') == {'pulled': 3, 'kept_local': 0}
+    assert store.count('incidents') == 3
+    assert store.watermark('incidents') == to_millis(datetime(2024, 1, 1, 2))
+    server.update_one({'title': 'Incident 0'}, {'$set': {'status': 'closed', 'updated_at': datetime(2024, 1, 2)}})
+    # The watermark is inclusive, so the newest unchanged document is pulled again
+    assert sync.pull('incidents') == {'pulled': 2, 'kept_local': 0}
+    assert [d['title'] for d in store.find('incidents', {'status': 'closed'})] == ['Incident 0']
+
+def test_reconcile_drops_clean_rows_deleted_on_the_server():
+    """Test that rows gone from the server are dropped unless they have unpushed changes."""
+    store = make_store()
+    sync = make_sync(store)
+    server = sync.db.incidents
+    ids = server.insert_many([{'title': t, 'updated_at': datetime(2024, 1, 1)} for t in ('A', 'B')]).inserted_ids
+    sync.pull('incidents')
+    local = store.insert('incidents', {'title': 'Local'})
+    server.delete_one({'_id': ids[0]})
+
+    assert sync.reconcile_deletions('incidents') == 1
+    assert store.get('incidents', str(ids[0])) is None
+    assert store.get('incidents', str(ids[1])) and store.get('incidents', local)
+
+def test_manager_mutations_stamp_updated_at():
+    """Test that assigning, unassigning and closing move updated_at so sync sees them."""
+    db = mongomock.MongoClient().db
+    with patch('src.models.incident.get_database', return_value=db):
+        manager = IncidentManager()
+    incident_id = str(db.incidents.insert_one({'status': 'active', 'resources_assigned': [],
+                                               'updated_at': datetime(2024, 1, 1)}).inserted_id)
+    stamps = []
+    for change in (lambda: manager.assign_resource(incident_id, 'r1'),
+                   lambda: manager.unassign_resource(incident_id, 'r1'),
+                   lambda: manager.close_incident(incident_id, 'done')):
+        assert change()
+        stamps.append(db.incidents.find_one()['updated_at'])
+    assert datetime(2024, 1, 1) < stamps[0] <= stamps[1] <= stamps[2]
+
+def test_offline_manager_reads_and_writes_the_store():
+    """Test that a manager built on the offline store never touches the server."""
+    store = make_store()
+    db = mongomock.MongoClient().db
+    with patch('src.models.incident.get_database', return_value=db):
+        manager = IncidentManager(offline=store)
+    incident_id = manager.create_incident({'title': 'Flood', 'type': 'Flood', 'severity': 'High',
+                                           'location': 'Pune', 'description': '', 'created_by': 'u'})
+    assert manager.close_incident(incident_id, 'done')
+    assert manager.queue_assign_resource(incident_id, 'r1').result()
+
+    assert manager.get_incident(incident_id)['resources_assigned'] == ['r1']
+    assert manager.list_incidents({'status': 'closed'}, ('title',)) == [{'_id': incident_id, 'title': 'Flood'}]
+    assert db.incidents.count_documents({}) == 0 and store.pending('incidents') == 1
+
+def test_offline_counters_reconcile_from_the_store():
+    """Test that an offline manager recounts resources from the local store, not the server."""
+    store = make_store()
+    db = mongomock.MongoClient().db
+    db.resources.insert_one({'type': 'Ambulance', 'status': 'available', 'location': 'Pune'})
+    with patch('src.models.resource.get_database', return_value=db):
+        manager = ResourceManager(offline=store)
+    manager.counters = ResourceCounters()
+    store.insert('resources', {'type': 'Boat', 'status': 'assigned', 'location': 'Pune',
+                               'created_at': datetime.utcnow()})
+    store.insert('resources', {'type': 'Boat', 'status': 'available', 'location': 'Pune',
+                               'created_at': datetime.utcnow()})
+    manager.reconcile_counters()
+    assert manager.counters.type_counts() == {'Boat': 2}
+    assert manager.get_status_counts() == {'assigned': 1, 'available': 1}
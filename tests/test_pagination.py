@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+from bson import ObjectId
+
+from src.models.pagination import decode_cursor, encode_cursor, fetch_page, iter_batches
+
+START = datetime(2025, 6, 1, 12, 0, 0, 123000)
+
+@pytest.fixture
+def collection():
+    collection = mongomock.MongoClient().db.incidents
+    # Three documents share each timestamp, and two have none at all
+    collection.insert_many([{'_id': ObjectId(), 'n': n, 'created_at': START - timedelta(minutes=n // 3),
+                             'status': 'Closed' if n % 2 else 'Active'} for n in range(12)])
+    collection.insert_many([{'_id': ObjectId(), 'n': n, 'status': 'Active'} for n in (12, 13)])
+    return collection
+
+def expected_order(collection, query=None):
+    rows = list(collection.find(query or {}))
+    dated = sorted((r for r in rows if 'created_at' in r), key=lambda r: (r['created_at'], r['_id']), reverse=True)
+    undated = sorted((r for r in rows if 'created_at' not in r), key=lambda r: r['_id'], reverse=True)
+    return [r['n'] for r in dated + undated]
+
+def walk(collection, query=None, limit=4):
+    seen, cursor = [], None
+    while True:
+        page = fetch_page(collection, query, limit, cursor)
+        seen += [row['n'] for row in page.items]
+        if page.next_cursor is None:
+            return seen
+        cursor = page.next_cursor
+
+def test_cursor_round_trip():
+    """Test that a cursor decodes to the microsecond timestamp and id it was made from."""
+    oid = ObjectId()
+    assert decode_cursor(encode_cursor({'_id': oid, 'created_at': START})) == (START, oid)
+    assert decode_cursor(encode_cursor({'_id': oid})) == (None, oid)
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor')
+
+def test_pages_break_created_at_ties_by_id(collection):
+    """Test that paging through equal timestamps and missing ones returns every row once, in order."""
+    assert walk(collection, limit=4) == expected_order(collection)
+    assert walk(collection, limit=1) == expected_order(collection)
+
+def test_filter_applies_with_cursor(collection):
+    """Test that a filter still applies on pages after the first."""
+    query = {'status': 'Active'}
+    assert walk(collection, query, limit=2) == expected_order(collection, query)
+
+def test_iter_batches_stops_after_last_page(collection):
+    """Test that batches stop at the end, including when the total is a multiple of the batch size."""
+    assert [len(batch) for batch in iter_batches(collection, batch_size=5)] == [5, 5, 4]
+    assert [len(batch) for batch in iter_batches(collection, batch_size=7)] == [7, 7]
+    assert list(iter_batches(collection, {'status': 'Missing'})) == []
@@ -0,0 +1,45 @@
+from unittest.mock import MagicMock
+from datetime import datetime
+from bson import ObjectId
+from src.models.pagination import SORT_KEY, after_cursor, encode_cursor
+from src.models.query_profiler import ProfiledCollection, QueryProfiler, index_covers, shape_of, suggest_index
+
+def test_shape_ignores_values_and_suggests_esr_index():
+    """Test that filters differing only in values share a shape and get an equality-sort-range index."""
+    assert shape_of({'status': 'active'}) == shape_of({'status': 'closed'})
+    query = {'created_at': {'$gte': 1}, 'status': 'active'}
+    assert suggest_index(query, [('severity', -1)]) == [('status', 1), ('severity', -1), ('created_at', 1)]
+
+def test_profiled_cursor_records_sort_and_report_skips_existing_index():
+    """Test that iterating a wrapped cursor records one timed shape and suggests only missing indexes."""
+    collection = MagicMock()
+    collection.name = 'incidents'
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.limit.return_value = cursor
+    cursor.__next__.side_effect = [{'_id': 1}, {'_id': 2}, StopIteration]
+    collection.find.return_value = cursor
+    profiler = QueryProfiler(explain_rate=0)
+    wrapped = ProfiledCollection(collection, profiler)
+
+    for status in ('active', 'closed'):
+        cursor.__next__.side_effect = [{'_id': 1}, StopIteration]
+        list(wrapped.find({'status': status}).sort('created_at', -1).limit(10))
+
+    [row] = profiler.report()
+    assert row['count'] == 2
+    assert row['sort'] == [('created_at', -1)]
+    assert row['suggested_index'] == [('status', 1), ('created_at', -1)]
+    existing = {'incidents': {'status_1_created_at_-1': {'key': [('status', 1), ('created_at', -1)]}}}
+    assert profiler.report(index_information=existing)[0]['suggested_index'] is None
+
+def test_keyset_pages_are_covered_by_the_listing_indexes():
+    """Test that cursor predicates count as sort/range, so the existing listing indexes cover later pages."""
+    listing = [('created_at', -1), ('_id', -1)]
+    by_status = [('status', 1), ('created_at', -1), ('_id', -1)]
+    dated = encode_cursor({'created_at': datetime(2025, 1, 1), '_id': ObjectId()})
+    undated = encode_cursor({'_id': ObjectId()})
+    for cursor in (dated, undated):
+        assert index_covers(listing, suggest_index(after_cursor({}, cursor), SORT_KEY))
+        assert index_covers(by_status, suggest_index(shape_of(after_cursor({'status': 'active'}, cursor)), SORT_KEY))
+    assert suggest_index(after_cursor({'status': 'active'}, dated), SORT_KEY) == by_status
@@ -0,0 +1,32 @@
+from src.incidents.recommendation_store import RecommendationStore
+
+RESOURCES = [{'resource': 'Rescue Boats', 'priority': 1}]
+
+def test_recommendations_persist_until_model_inputs_change(tmp_path):
+    """Test that stored results survive reopening and go stale only on type/severity edits."""
+    path = str(tmp_path / 'recommendations.sqlite3')
+    incident = {'id': 'inc_1', 'title': 'Flood', 'type': 'Flood', 'severity': 'High'}
+    store = RecommendationStore(path)
+    store.put(incident, RESOURCES)
+    store.close()
+
+    reopened = RecommendationStore(path)
+    assert reopened.get(dict(incident, title='River flood', location='Kisumu')) == RESOURCES
+    assert reopened.get(dict(incident, severity='Critical')) is None
+    assert reopened.stats()['hits'] == 1 and reopened.stats()['stale'] == 1
+    assert reopened.stats()['disk_reads'] == 1  # the second lookup came from the cache
+    assert reopened.unanalyzed([incident, dict(incident, id='inc_2')]) == [dict(incident, id='inc_2')]
+
+def test_missing_rows_are_cached_and_deletes_stick(tmp_path):
+    """Test that unanalyzed incidents do not hit disk on every repaint and deletes are remembered."""
+    store = RecommendationStore(str(tmp_path / 'recommendations.sqlite3'))
+    incident = {'id': 'inc_1', 'type': 'Fire', 'severity': 'Low'}
+    for _ in range(3):
+        assert store.get(incident) is None
+    assert store.stats()['disk_reads'] == 1 and store.stats()['misses'] == 3
+    store.put_many([(incident, RESOURCES), ({'id': 'inc_2', 'type': 'Fire', 'severity': 'Low'}, [])])
+    assert store.get(incident, count=False) == RESOURCES
+    store.delete('inc_1')
+    store.clear_cache()
+    assert store.get(incident) is None
+    assert store.get({'id': 'inc_2', 'type': 'Fire', 'severity': 'Low'}) == []
@@ -0,0 +1,69 @@
+import os
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from unittest.mock import patch
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QApplication, QMessageBox
+
+from src.dashboard.alert_widget import AlertWidget
+from src.widgets.record_table import Column, RecordTableModel
+
+app = QApplication.instance() or QApplication([])
+
+def make_model():
+    return RecordTableModel([
+        Column("Title", 'title'),
+        Column("Severity", 'severity', colors={'Critical': ('#e74c3c', '#ffffff')}),
+    ])
+
+def record_signals(model):
+    events = []
+    model.rowsRemoved.connect(lambda parent, first, last: events.append(('removed', first, last)))
+    model.rowsInserted.connect(lambda parent, first, last: events.append(('inserted', first, last)))
+    model.dataChanged.connect(lambda top, bottom: events.append(('changed', top.row(), bottom.row())))
+    model.modelReset.connect(lambda: events.append(('reset',)))
+    return events
+
+def test_set_records_applies_row_diffs():
+    """Test that a refresh emits only the removed, inserted and changed rows."""
+    model = make_model()
+    records = [{'id': i, 'title': f'Incident {i}', 'severity': 'Low'} for i in range(10)]
+    model.set_records(records)
+    events = record_signals(model)
+
+    updated = [r for r in records if r['id'] not in (2, 3, 7)]
+    updated.insert(0, {'id': 10, 'title': 'Incident 10', 'severity': 'High'})
+    updated[5] = dict(updated[5], severity='Critical')
+    model.set_records(updated)
+
+    assert events == [('removed', 7, 7), ('removed', 2, 3), ('inserted', 0, 0), ('changed', 5, 5)]
+    assert [model.record(row)['id'] for row in range(model.rowCount())] == [10, 0, 1, 4, 5, 6, 8, 9]
+    assert model.data(model.index(5, 1)) == 'Critical'
+    assert model.data(model.index(5, 1), Qt.BackgroundRole).color().name() == '#e74c3c'
+    assert model.data(model.index(4, 1), Qt.BackgroundRole) is None
+
+def test_reordered_records_reset_the_model():
+    """Test that a change in row order falls back to a single reset."""
+    model = make_model()
+    records = [{'id': i, 'title': f'Incident {i}', 'severity': 'Low'} for i in range(5)]
+    model.set_records(records)
+    events = record_signals(model)
+    model.set_records(list(reversed(records)))
+    assert events == [('reset',)]
+    assert model.row_of(4) == 0
+    assert model.remove(4) and model.rowCount() == 4
+
+def test_deleting_one_of_two_same_titled_alerts_keeps_the_other():
+    """Test that alert rows are keyed by id, so equal titles neither reset the model nor delete together."""
+    widget = AlertWidget()
+    twin = dict(widget.alerts[0], id='alert_flash_flood_2', area='Harbour')
+    widget.alerts.append(twin)
+    widget.update_table(widget.alerts)
+    events = record_signals(widget.table.table_model)
+    widget.update_table(widget.alerts)
+    assert events == []
+
+    with patch.object(QMessageBox, 'question', return_value=QMessageBox.Yes):
+        widget.delete_alert(twin)
+    assert [a['id'] for a in widget.alerts] == ['alert_flash_flood', 'alert_power_outage']
+    assert [r['area'] for r in widget.table.table_model.records()] == ['Downtown Area', 'North District']
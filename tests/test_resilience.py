@@ -0,0 +1,90 @@
+from unittest.mock import MagicMock
+import pytest
+from pymongo.errors import AutoReconnect, ConnectionFailure, InvalidOperation, ServerSelectionTimeoutError
+from src.utils.resilience import (CLOSED, OPEN, CircuitBreaker, CircuitOpenError, ConnectionGuard,
+                                  ResilientCollection, RetryBudget, Spool, SpoolBacklogError)
+
+def make_guard(tmp_path, **kwargs):
+    return ConnectionGuard(CircuitBreaker(failure_threshold=2, reset_timeout=60),
+                           RetryBudget(capacity=1), Spool(str(tmp_path / 'spool.jsonl')), **kwargs)
+
+def test_breaker_opens_and_fails_fast(tmp_path):
+    """Test that repeated connection errors open the breaker and later calls skip the server."""
+    guard = make_guard(tmp_path, retries=0)
+    down = MagicMock(side_effect=AutoReconnect('down'))
+    for _ in range(2):
+        with pytest.raises(AutoReconnect):
+            guard.call(down)
+    assert guard.breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        guard.call(down)
+    assert down.call_count == 2
+    guard.breaker.record_success()  # e.g. a successful heartbeat
+    assert guard.health()['state'] == CLOSED
+
+def test_writes_spool_while_down_and_replay_in_order(tmp_path):
+    """Test that deferrable writes are spooled during an outage and replayed on recovery."""
+    guard = make_guard(tmp_path)
+    raw = MagicMock()
+    raw.name = 'incidents'
+    raw.database.name = 'Disaster_Management_System'
+    raw.database.__getitem__.return_value = raw
+    raw.insert_one.side_effect = AutoReconnect('down')
+    raw.update_one.side_effect = AutoReconnect('down')
+    collection = ResilientCollection(raw, guard)
+
+    result = collection.insert_one({'title': 'Flood'})
+    collection.update_one({'_id': result.inserted_id}, {'$set': {'status': 'closed'}})
+    assert result.spooled and guard.health()['spooled_writes'] == 2
+
+    raw.insert_one.side_effect = raw.update_one.side_effect = None
+    assert guard.replay_spool() == {'applied': 2, 'dropped': 0, 'remaining': 0}
+    assert raw.insert_one.call_args.args[0]['_id'] == result.inserted_id
+    assert raw.update_one.call_args.args == ({'_id': result.inserted_id}, {'$set': {'status': 'closed'}})
+    assert not (tmp_path / 'spool.jsonl').exists()
+
+def spooling_collection(guard):
+    raw = MagicMock()
+    raw.name = 'incidents'
+    raw.database.name = 'Disaster_Management_System'
+    raw.database.__getitem__.return_value = raw
+    return raw, ResilientCollection(raw, guard)
+
+def test_spooled_write_is_not_acknowledged_and_non_idempotent_updates_fail(tmp_path):
+    """Test that a spooled write reports acknowledged=False and $inc/$push are never spooled."""
+    guard = make_guard(tmp_path)
+    raw, collection = spooling_collection(guard)
+    raw.update_one.side_effect = AutoReconnect('down')
+
+    result = collection.update_one({'_id': 1}, {'$set': {'status': 'closed'}, '$addToSet': {'tags': 'x'}})
+    assert result.acknowledged is False
+    with pytest.raises(InvalidOperation):
+        result.modified_count
+    with pytest.raises(ConnectionFailure):
+        collection.update_one({'_id': 1}, {'$inc': {'views': 1}})
+    assert guard.spool.size() == 1
+
+def test_new_writes_wait_for_spool_to_drain(tmp_path):
+    """Test that a write made after recovery is applied after the older spooled one."""
+    guard = make_guard(tmp_path)
+    raw, collection = spooling_collection(guard)
+    raw.update_one.side_effect = AutoReconnect('down')
+    collection.update_one({'_id': 1}, {'$set': {'status': 'old'}})
+
+    # Still down with a backlog: idempotent writes queue behind it, others are refused
+    collection.update_one({'_id': 1}, {'$set': {'status': 'newer'}})
+    with pytest.raises(SpoolBacklogError):
+        collection.update_one({'_id': 1}, {'$push': {'log': 'x'}})
+
+    raw.update_one.side_effect = None
+    collection.update_one({'_id': 1}, {'$set': {'status': 'newest'}})
+    assert [c.args[1]['$set']['status'] for c in raw.update_one.call_args_list[-3:]] == ['old', 'newer', 'newest']
+    assert guard.spool.size() == 0
+
+def test_server_selection_timeout_opens_breaker_without_retry(tmp_path):
+    """Test that a server-selection timeout opens the breaker at once and is not retried."""
+    guard = make_guard(tmp_path, retries=2)
+    down = MagicMock(side_effect=ServerSelectionTimeoutError('no servers'))
+    with pytest.raises(ServerSelectionTimeoutError):
+        guard.call(down)
+    assert down.call_count == 1 and guard.breaker.state == OPEN
@@ -0,0 +1,56 @@
+from unittest.mock import MagicMock
+from src.models.resource_stats import ResourceCounters
+
+RESOURCES = [
+    {"_id": "r1", "type": "Ambulance", "status": "Available", "location": {"area": "Skardu Valley"}},
+    {"_id": "r2", "type": "Ambulance", "status": "available", "location": {"area": "Hunza Valley"}},
+    {"_id": "r3", "type": "Fire Truck", "status": "Maintenance", "location": "Islamabad"},
+]
+
+def test_load_counts_per_dimension():
+    """Test that counts are rolled up per type, status and region."""
+    counters = ResourceCounters()
+    counters.load(RESOURCES)
+    assert counters.count() == 3
+    assert counters.count(status="available") == 2
+    assert counters.count(resource_type="Ambulance", region="Skardu Valley") == 1
+    assert counters.region_counts()["Islamabad"] == 1
+
+def test_transition_moves_between_buckets():
+    """Test that status transitions update the counters in place."""
+    counters = ResourceCounters()
+    counters.load(RESOURCES)
+    assert counters.transition("r1", status="assigned")
+    assert counters.status_counts() == {"available": 1, "assigned": 1, "maintenance": 1}
+    assert not counters.transition("unknown", status="assigned")
+
+def test_reconcile_repairs_drift():
+    """Test that reconciliation reports and repairs drift."""
+    counters = ResourceCounters()
+    counters.load(RESOURCES)
+    counters.transition("r3", status="available")
+    collection = MagicMock()
+    collection.find.return_value = RESOURCES
+
+    drift = counters.reconcile(collection)
+    assert drift == {
+        ("Fire Truck", "available", "Islamabad"): -1,
+        ("Fire Truck", "maintenance", "Islamabad"): 1,
+    }
+    assert counters.count(status="maintenance") == 1
+
+def test_reconcile_keeps_transitions_made_while_reading():
+    """Test that a transition during the database read is not overwritten by the stale documents."""
+    counters = ResourceCounters()
+    counters.load(RESOURCES)
+
+    def stale_read(*args):
+        counters.transition("r1", status="assigned")
+        counters.forget("r2")
+        yield from RESOURCES
+
+    collection = MagicMock()
+    collection.find.side_effect = stale_read
+    counters.reconcile(collection)
+    assert counters.status_counts() == {"assigned": 1, "maintenance": 1}
+    assert counters.count() == 2
@@ -0,0 +1,65 @@
+import math
+
+import numpy as np
+
+from src.ai.routing import RoadGraph, haversine_m
+
+def small_graph(seed=5, n=40, edges=120):
+    """Random directed graph with parallel edges and some unreachable nodes"""
+    rng = np.random.default_rng(seed)
+    src = rng.integers(0, n - 3, edges)
+    dst = rng.integers(0, n - 3, edges)
+    seconds = rng.uniform(10, 300, edges)
+    lat = -1.3 + rng.uniform(0, 0.2, n)
+    lng = 36.8 + rng.uniform(0, 0.2, n)
+    return RoadGraph(lat, lng, src, dst, seconds), src, dst, seconds
+
+def brute_force_times(n, src, dst, seconds):
+    """All-pairs travel times by Floyd-Warshall"""
+    times = np.full((n, n), math.inf)
+    np.fill_diagonal(times, 0.0)
+    for u, v, t in zip(src, dst, seconds):
+        times[u, v] = min(times[u, v], max(t, 1e-3))
+    for k in range(n):
+        times = np.minimum(times, times[:, k:k + 1] + times[k:k + 1, :])
+    return times
+
+def test_csr_keeps_fastest_parallel_edge():
+    """Test that CSR rows list each neighbour once with the fastest edge time."""
+    graph = RoadGraph([0, 0, 0], [0, 0.01, 0.02], [0, 0, 0, 1], [1, 1, 2, 2], [50, 30, 90, 20])
+    assert graph.indptr.tolist() == [0, 2, 3, 3]
+    assert graph.indices.tolist() == [1, 2, 2]
+    assert np.allclose(graph.weights, [30, 90, 20])
+    assert graph.rev_indptr.tolist() == [0, 0, 1, 3]
+
+def test_one_to_many_and_bidirectional_match_brute_force():
+    """Test one-to-many (both directions) and point-to-point times against Floyd-Warshall."""
+    graph, src, dst, seconds = small_graph()
+    expected = brute_force_times(graph.n_nodes, src, dst, seconds)
+    for source in range(graph.n_nodes):
+        assert np.allclose(graph.one_to_many(source), expected[source], rtol=1e-5)
+        assert np.allclose(graph.one_to_many(source, reverse=True), expected[:, source], rtol=1e-5)
+        for target in range(0, graph.n_nodes, 3):
+            assert math.isclose(graph.travel_time(source, target), expected[source, target], rel_tol=1e-5)
+    assert graph.cache_misses == 2 * graph.n_nodes
+
+def test_nearest_node_matches_haversine_scan():
+    """Test that KD-tree snapping picks the closest node by great-circle distance."""
+    graph, *_ = small_graph()
+    rng = np.random.default_rng(9)
+    for lat, lng in zip(-1.35 + rng.uniform(0, 0.3, 50), 36.75 + rng.uniform(0, 0.3, 50)):
+        distances = haversine_m(lat, lng, graph.lat, graph.lng)
+        node, snap = graph.nearest_node(lat, lng)
+        assert node == int(np.argmin(distances)) and math.isclose(snap, distances.min(), rel_tol=1e-6)
+
+def test_rank_by_eta_orders_resources():
+    """Test that resources are ranked by road time plus off-road legs, unlocated ones last."""
+    graph, *_ = small_graph()
+    destination = (float(graph.lat[0]), float(graph.lng[0]))
+    resources = [{'name': f'r{i}', 'location': {'lat': float(graph.lat[i]), 'lng': float(graph.lng[i])}}
+                 for i in range(graph.n_nodes)] + [{'name': 'nowhere'}]
+    ranked = graph.rank_by_eta(destination, resources)
+    assert ranked[0] == (0.0, resources[0])
+    assert dict((r['name'], eta) for eta, r in ranked)['nowhere'] == math.inf
+    times = graph.one_to_many(0, reverse=True)
+    assert [eta for eta, _ in ranked] == sorted(float(times[i]) for i in range(graph.n_nodes)) + [math.inf]
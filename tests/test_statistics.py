@@ -0,0 +1,38 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+from src.models.statistics import InMemoryStatistics, StatisticsService, summary_pipeline
+
+INCIDENTS = [
+    {'status': 'active', 'severity': 'High', 'type': 'Flood', 'created_at': datetime(2024, 1, 5)},
+    {'status': 'active', 'severity': 'Low', 'type': 'Fire', 'created_at': datetime(2024, 1, 15)},
+    {'status': 'closed', 'severity': 'High', 'type': 'Flood', 'created_at': datetime(2024, 2, 1)},
+]
+
+def test_in_memory_summary_with_date_range():
+    """Test that the in-memory stand-in counts only documents matching the filter."""
+    stats = InMemoryStatistics(incidents=INCIDENTS)
+    summary = stats.incident_summary({'created_at': {'$gte': datetime(2024, 1, 1), '$lte': datetime(2024, 1, 31)}})
+    assert summary == {
+        'total': 2,
+        'by_status': {'active': 2},
+        'by_severity': {'High': 1, 'Low': 1},
+        'by_type': {'Flood': 1, 'Fire': 1},
+    }
+
+def test_service_runs_single_facet_pipeline():
+    """Test that the service issues one aggregation and compacts its facet output."""
+    db = MagicMock()
+    db.resources.aggregate.return_value = iter([{
+        'total': [{'n': 3}],
+        'by_status': [{'_id': 'available', 'n': 2}, {'_id': 'assigned', 'n': 1}],
+        'by_type': [{'_id': 'Vehicle', 'n': 3}],
+    }])
+    summary = StatisticsService(db).resource_summary()
+    db.resources.aggregate.assert_called_once_with(summary_pipeline(('status', 'type')))
+    assert summary == {'total': 3, 'by_status': {'available': 2, 'assigned': 1}, 'by_type': {'Vehicle': 3}}
+
+def test_empty_collection_summary():
+    """Test that an empty result yields zero counts rather than failing."""
+    db = MagicMock()
+    db.incidents.aggregate.return_value = iter([{'total': [], 'by_status': [], 'by_severity': [], 'by_type': []}])
+    assert StatisticsService(db).incident_summary() == InMemoryStatistics().incident_summary()
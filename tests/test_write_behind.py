@@ -0,0 +1,75 @@
+import mongomock
+import pytest
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from src.models import write_behind
+from src.models.write_behind import WriteBehindQueue, close_write_behind_queue, merge_update
+
+@pytest.fixture
+def queue():
+    queue = WriteBehindQueue(flush_interval=60)
+    yield queue
+    queue.close(timeout=5)
+
+def test_merge_update_combines_only_equivalent_updates():
+    """Test that same-path $set/$inc fold together and overlapping paths do not."""
+    pending = {'$set': {'status': 'active'}, '$inc': {'count': 1}}
+    assert merge_update(pending, {'$set': {'status': 'closed', 'notes': 'x'}, '$inc': {'count': 2}})
+    assert pending == {'$set': {'status': 'closed', 'notes': 'x'}, '$inc': {'count': 3}}
+    assert not merge_update(pending, {'$set': {'count': 0}})
+    assert not merge_update(pending, {'$set': {'notes.text': 'y'}})
+    assert pending == {'$set': {'status': 'closed', 'notes': 'x'}, '$inc': {'count': 3}}
+    # Other operators merge on disjoint paths only
+    assert merge_update(pending, {'$push': {'log': 'y'}})
+    assert not merge_update(pending, {'$push': {'log': 'z'}})
+    assert pending['$push'] == {'log': 'y'}
+
+def test_flush_writes_merged_updates_and_reports_missing_documents(queue):
+    """Test that flush applies queued updates in order and a ticket for a missing document resolves False."""
+    collection = mongomock.MongoClient().db.incidents
+    existing = collection.insert_one({'status': 'active', 'count': 0}).inserted_id
+    tickets = [queue.submit(collection, str(existing), {'$inc': {'count': 1}}),
+               queue.submit(collection, existing, {'$inc': {'count': 2}}),
+               queue.submit(collection, existing, {'$set': {'status': 'closed'}}),
+               queue.submit(collection, ObjectId(), {'$set': {'status': 'closed'}})]
+    assert queue.pending() == 2
+    assert queue.flush(timeout=5)
+    assert [t.result(timeout=1) for t in tickets] == [True, True, True, False]
+    assert collection.find_one({'_id': existing}, {'_id': 0}) == {'status': 'closed', 'count': 3}
+    assert queue.stats['merged'] == 2 and queue.stats['unmatched'] == 1
+
+class FailingCollection:
+    """Collection whose ordered bulk write fails at operation ``fail_at``"""
+    full_name = 'db.failing'
+
+    def __init__(self, fail_at):
+        self.fail_at = fail_at
+
+    def bulk_write(self, operations, ordered):
+        raise BulkWriteError({'writeErrors': [{'index': self.fail_at, 'errmsg': 'boom'}],
+                              'nMatched': self.fail_at})
+
+def test_ordered_failure_fails_that_operation_and_later_ones(queue):
+    """Test that tickets before the failed operation succeed and the rest raise."""
+    collection = FailingCollection(fail_at=1)
+    tickets = [queue.submit(collection, ObjectId(), {'$set': {'n': n}}) for n in range(3)]
+    queue.flush(timeout=5)
+    assert tickets[0].result(timeout=1) is True
+    for ticket in tickets[1:]:
+        with pytest.raises(BulkWriteError):
+            ticket.result(timeout=1)
+    assert (queue.stats['written'], queue.stats['failed']) == (1, 2)
+
+def test_closing_the_shared_queue_flushes_it_and_never_creates_one():
+    """Test that the exit hook writes pending updates and is a no-op when the queue was never used."""
+    close_write_behind_queue()
+    assert write_behind._queue is None
+    collection = mongomock.MongoClient().db.incidents
+    document_id = collection.insert_one({'status': 'active'}).inserted_id
+    queue = write_behind.get_write_behind_queue()
+    ticket = queue.submit(collection, document_id, {'$set': {'status': 'closed'}})
+    close_write_behind_queue(timeout=5)
+    assert ticket.result(timeout=0) is True
+    assert collection.find_one({'_id': document_id})['status'] == 'closed'
+    assert write_behind._queue is None